@@ -12,3 +12,4 @@ Class ChamberNetworkCommands
 """
 
 from .chamber_net_interface import ChamberNetworkCommands
+from .async_chamber_net_interface import AsyncChamberNetworkCommands
@@ -0,0 +1,144 @@
+"""
+Asyncio variant of ChamberNetworkCommands.
+
+The commands are sent to OctoPrint with an AsyncHttpSession (see connection_handler/async_http.py) on one keep-alive
+connection, waiting for the end of a movement polls the flag with asyncio.sleep() in between. Thus any number of
+chambers can be moved and monitored from one event loop without a thread per chamber. The G-Code of the commands is the
+same as of ChamberNetworkCommands.
+
+    chamber = AsyncChamberNetworkCommands(ip_address='134.28.25.201', api_key='...')
+    await chamber.chamber_connect_serial()
+    await asyncio.wait_for(chamber.chamber_jog_abs(x=100, y=100, z=150, speed=50), timeout=60)
+    await chamber.close()
+"""
+import asyncio
+import time
+
+from connection_handler import AsyncHttpSession
+from .chamber_net_interface import build_jog_gcode, build_home_gcode, build_z_tilt_gcode, parse_flag
+
+
+class AsyncChamberNetworkCommands:
+    """
+    See module doc-string. The commands return the same dicts as ChamberNetworkCommands.
+
+    :param ip_address:  ip address of chamber in local network. e.g. '134.28.25.201'
+    :param api_key:     octoprint's application specific api key (self-generated) to register http requests
+    :param http:        session with coroutines get() and post(), a new AsyncHttpSession if not given
+    """
+    ip_address: str = None
+    http: AsyncHttpSession = None
+    header_api: dict = None
+    header_tjson: dict = None
+    api_connection_endpoint: str = None
+    api_printer_cmd_endpoint: str = None
+    api_printer_tool_endpoint: str = None
+    check_flag_timeout: float = 0.05    # unit [s], interval of polling the flag while waiting for a movement
+
+    def __init__(self, ip_address: str, api_key: str, http=None):
+        self.ip_address = 'http://' + ip_address
+        self.http = http if http is not None else AsyncHttpSession()
+        self.header_api = {'X-Api-Key': api_key}
+        self.header_tjson = {'X-Api-Key': api_key, 'Content-Type': 'application/json'}
+        self.api_connection_endpoint = self.ip_address + '/api/connection'
+        self.api_printer_cmd_endpoint = self.ip_address + '/api/printer/command'
+        self.api_printer_tool_endpoint = self.ip_address + '/api/printer/tool'
+
+    async def close(self):
+        await self.http.close()
+        return
+
+    async def chamber_connect_serial(self):
+        """
+        Initiates Octoprint serial connection to chamber (printer). Network errors are returned, not raised.
+
+        :return: Success >> dict of {'status_code' : int , 'content' : str} from server response |
+                Exception >> dict of {'status_code' : int = -1, 'error' : str}
+        """
+        try:    # handle wrong ip address or similar network connection problems
+            response = await asyncio.wait_for(self.http.post(url=self.api_connection_endpoint,
+                                                             headers=self.header_tjson, json={"command": "connect"}),
+                                              timeout=2)
+        except (OSError, asyncio.TimeoutError) as e:
+            return {'status_code': -1, 'error': 'An error occurred! ' + repr(e)}
+        if response.status_code >= 400:
+            return {'status_code': -1, 'error': 'An error occurred! Status Code: ' + str(response.status_code)}
+        return {'status_code': response.status_code, 'content': response.content}
+
+    async def chamber_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0,
+                              timing: dict = None):
+        """
+        Takes absolute coordinates to move to and returns once the movement is finished.
+        :param speed: speed for movement in [mm/s]
+        :param timing: optional dict, gets durations in [s] of 'jog_submit' and 'flag_wait' written to it
+        :return: dict {'status code' : str, 'content' : str} of server response
+        """
+        return await self.__jog_with_flag(x, y, z, speed * 60, abs_coordinate=True, timing=timing)
+
+    async def chamber_start_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0,
+                                    timing: dict = None):
+        """
+        Same as chamber_jog_abs() but returns right after the request is submitted, see chamber_wait_for_flag().
+        """
+        return await self.__jog_with_flag(x, y, z, speed * 60, abs_coordinate=True, timing=timing, wait=False)
+
+    async def chamber_jog_rel(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0):
+        """
+        Takes relative coordinates to move to from current position and returns once the movement is finished.
+        :param speed: speed for movement in [mm/s]
+        :return: dict {'status code' : str, 'content' : str} of server response
+        """
+        return await self.__jog_with_flag(x, y, z, speed * 60, abs_coordinate=False)
+
+    async def chamber_home_with_flag(self, axis: str = ''):
+        """
+        Homes the given axis, e.g. 'xyz', and returns once homing is finished.
+        :return: dict {'status code' : str, 'content' : str} of server response
+        """
+        return await self.__send_gcode_with_flag(build_home_gcode(axis))
+
+    async def chamber_z_tilt_with_flag(self):
+        """
+        Runs the Z-Tilt compensation of Klipper and returns once it is finished.
+        :return: dict {'status code' : str, 'content' : str} of server response
+        """
+        return await self.__send_gcode_with_flag(build_z_tilt_gcode())
+
+    async def chamber_isflagset(self) -> bool:
+        """
+        :return: TRUE > flag is set, commands are still running | FALSE > flag not set
+        """
+        while True:     # ask chamber multiple times until valid response is received
+            response = await self.http.get(url=self.api_printer_tool_endpoint, headers=self.header_tjson)
+            isflagset = parse_flag(str(response.content, encoding='utf-8'))
+            if isflagset is not None:
+                return isflagset
+            print("Chamber Error: Flag not found in octoprint response. Trying again...")
+            await asyncio.sleep(self.check_flag_timeout)
+
+    async def chamber_wait_for_flag(self):
+        """
+        Returns once the flag is reset, i.e. the running commands of the chamber are done.
+        """
+        while await self.chamber_isflagset():
+            await asyncio.sleep(self.check_flag_timeout)
+        return
+
+    async def __jog_with_flag(self, x: float, y: float, z: float, speed: float, abs_coordinate: bool,
+                              timing: dict = None, wait: bool = True):
+        submit_start = time.perf_counter()
+        response = await self.http.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson,
+                                        json={"commands": build_jog_gcode(x, y, z, speed, abs_coordinate)})
+        submit_end = time.perf_counter()
+        if wait:
+            await self.chamber_wait_for_flag()
+        if timing is not None:
+            timing['jog_submit'] = submit_end - submit_start
+            timing['flag_wait'] = time.perf_counter() - submit_end
+        return {'status_code': response.status_code, 'content': response.content}
+
+    async def __send_gcode_with_flag(self, g_code_list: list):
+        response = await self.http.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson,
+                                        json={"commands": g_code_list})
+        await self.chamber_wait_for_flag()
+        return {'status_code': response.status_code, 'content': response.content}
@@ -15,6 +15,75 @@ import json
 import requests
 import time
 
+GCODE_SET_FLAG = 'M104 T0 S1'  # used to mark when (jog) cmd started
+GCODE_RESET_FLAG = 'M104 T0 S0'  # used to mark when (jog) cmd completed
+GCODE_WAIT_FOR_MOVES_TO_FINISH = 'M400'
+
+
+def build_jog_gcode(x: float, y: float, z: float, speed: float, abs_coordinate: bool) -> list:
+    """
+    G-Code list of a jog that sets the flag before and resets it after the movement, see chamber_isflagset().
+
+    :param speed: speed for movement in [mm/min], 2 decimal
+    :return: list of G-Code commands
+    """
+    # todo: Check why the coordinates are rounded to two decimals! why did I set this limit? this limits accuracy to +/- 5um. Did not find any reason in klipper or octoprint documentation (11.02.2025)
+    # round numbers and build XYZ-parts
+    x_code = ' X' + str(round(x, 2))
+    y_code = ' Y' + str(round(y, 2))
+    z_code = ' Z' + str(round(z, 2))
+    speed_code = ' F' + str(round(speed, 2))
+
+    # assemble custom GCode...
+    g_code_list = [GCODE_SET_FLAG]
+    g_code_list.append('M105')  # requests Tool 0 Temp info. Necessary in first server request.
+    if abs_coordinate:
+        g_code_list.append("G90")  # set absolute coordinates
+    else:
+        g_code_list.append("G91")  # set relative coordinates
+    g_code_list.append('G1' + x_code + y_code + z_code + speed_code)
+    g_code_list.append(GCODE_WAIT_FOR_MOVES_TO_FINISH)
+    g_code_list.append(GCODE_RESET_FLAG)
+    g_code_list.append("G90")   # always set global coordinates in the end to prevent malfunction when octoprint used in webbrowser at the same time
+    return g_code_list
+
+
+def build_home_gcode(axis: str) -> list:
+    """
+    G-Code list of homing the given axis with flag, see chamber_home_with_flag().
+
+    :param axis: arbitrary string containing x/X, y/Y, z/Z. e.g. axis = 'xyz' or 'xy' or 'Zyx' ...
+    :return: list of G-Code commands
+    """
+    home_gcode = 'G28 '
+    if 'x' in axis.lower():
+        home_gcode += 'X0 '
+    if 'y' in axis.lower():
+        home_gcode += 'Y0 '
+    if 'z' in axis.lower():
+        home_gcode += 'Z0'
+    return [GCODE_SET_FLAG, home_gcode, GCODE_RESET_FLAG]
+
+
+def build_z_tilt_gcode() -> list:
+    """
+    G-Code list of the Klipper Z-Tilt compensation with flag, see chamber_z_tilt_with_flag().
+    """
+    return [GCODE_SET_FLAG, "Z_tilt_adjust", GCODE_WAIT_FOR_MOVES_TO_FINISH, GCODE_RESET_FLAG]
+
+
+def parse_flag(info_str: str):
+    """
+    Reads the flag (Tool 0 target temperature) from the response of octoprint's tool endpoint.
+
+    :return: True if flag is set, False if not, None if the response holds no target
+    """
+    str_found_position = info_str.find('"target": ')
+    if str_found_position < 0:
+        return None
+    flag_position_offset = 10
+    return bool(info_str[str_found_position + flag_position_offset] == '1')
+
 
 class ChamberNetworkCommands(connection_handler.NetworkDevice):
     # private properties
@@ -25,15 +94,16 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
     api_system_cmd_endpoint: str = None
     api_printer_cmd_endpoint: str = None
     api_printer_tool_endpoint: str = None
+    http = requests     # module or session with get() and post(), e.g. the recording or replay of a Transcript
 
-    gcode_set_flag = 'M104 T0 S1'  # used to mark when (jog) cmd started
-    gcode_reset_flag = 'M104 T0 S0'  # used to mark when (jog) cmd completed
-    gcode_wait_for_moves_to_finish = 'M400'
+    gcode_set_flag = GCODE_SET_FLAG
+    gcode_reset_flag = GCODE_RESET_FLAG
+    gcode_wait_for_moves_to_finish = GCODE_WAIT_FOR_MOVES_TO_FINISH
     __debug_gcode_sleep_5s = 'G4 P5000'
 
     __checkFlagTimeout = 0.05    # timeout for checking flag in seconds. Compromise between speed of measurement (low timeout, frequent checking) and responsiveness of chamber (do not overload chamber with requests)
 
-    def __init__(self, ip_address: str = None, api_key: str = None):
+    def __init__(self, ip_address: str = None, api_key: str = None, http=None):
         """
         Stores ip address of chamber and initializes private standard headers and addresses.
         Also, directly requests the chamber to connect to driver board via serial
@@ -41,7 +111,10 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
 
         :param ip_address:  ip address of chamber in local network. e.g. '134.28.25.201'
         :param api_key:     octoprint's application specific api key (self-generated) to register http requests
+        :param http:        replacement of the requests module for all http requests, e.g. Transcript.record_http()
         """
+        if http is not None:
+            self.http = http
         super().set_ip_address('http://' + ip_address)
         super().set_api_key(api_key)
 
@@ -79,7 +152,7 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
             "command": "connect"
         }
         try:    # handle wrong ip address or similar network connection problems
-            response = requests.post(url=self.api_connection_endpoint, headers=self.header_tjson, json=payload, timeout=2)
+            response = self.http.post(url=self.api_connection_endpoint, headers=self.header_tjson, json=payload, timeout=2)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             return {'status_code': -1, 'error': 'An error occurred! Status Code: ' + str(e)}
@@ -95,64 +168,73 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
         payload = {
             "command": "disconnect"
         }
-        response = requests.post(url=self.api_connection_endpoint, headers=self.header_tjson, json=payload)
+        response = self.http.post(url=self.api_connection_endpoint, headers=self.header_tjson, json=payload)
         return {'status_code': response.status_code, 'content': response.content}
 
 
     def __chamber_jog_with_flag(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 100.0,
-                                abs_coordinate: bool = False):
+                                abs_coordinate: bool = False, timing: dict = None, wait: bool = True):
         """
         Receives x,y,z parameters, desired speed and coordinate-context and requests chamber movement via custom
         G-Code list via http. This enables busy waiting for chamber movements to finish!
 
         **This function only returns once the jog operation is finished! Polls every 0.05 sec**
+        (unless wait is False)
         :param x: x-direction distance or coordinate [mm], 2 decimal
         :param y: y-direction distance or coordinate [mm], 2 decimal
         :param z: z-direction distance or coordinate [mm], 2 decimal
         :param speed: speed for movement in [mm/min], 2 decimal
         :param abs_coordinate: boolean flag if total coordinates should be used
+        :param timing: optional dict, gets durations in [s] of 'jog_submit' (http request) and 'flag_wait' (polling
+            until movement finished) written to it
+        :param wait: if False, returns right after the request is submitted. The flag stays set until the movement
+            is done and can be polled by chamber_isflagset()
         :return: dict {'status code' : str, 'content' : str} of server response
         """
-        # todo: Check why the coordinates are rounded to two decimals! why did I set this limit? this limits accuracy to +/- 5um. Did not find any reason in klipper or octoprint documentation (11.02.2025)
-        # round numbers and build XYZ-parts
-        x_code = ' X' + str(round(x, 2))
-        y_code = ' Y' + str(round(y, 2))
-        z_code = ' Z' + str(round(z, 2))
-        speed_code = ' F' + str(round(speed, 2))
-
-        # assemble custom GCode...
-        g_code_list = [self.gcode_set_flag]
-        g_code_list.append('M105')  # requests Tool 0 Temp info. Necessary in first server request.
-        if abs_coordinate:
-            g_code_list.append("G90")  # set absolute coordinates
-        else:
-            g_code_list.append("G91")  # set relative coordinates
-        g_code_list.append('G1' + x_code + y_code + z_code + speed_code)
-        g_code_list.append(self.gcode_wait_for_moves_to_finish)
-        g_code_list.append(self.gcode_reset_flag)
-        g_code_list.append("G90")   # always set global coordinates in the end to prevent malfunction when octoprint used in webbrowser at the same time
-
         # send g-code-cmd-request via http
         payload = {
-            "commands": g_code_list
+            "commands": build_jog_gcode(x, y, z, speed, abs_coordinate)
         }
-        response = requests.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
+        submit_start = time.perf_counter()
+        response = self.http.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
+        submit_end = time.perf_counter()
 
-        while self.chamber_isflagset():
+        while wait and self.chamber_isflagset():
             time.sleep(self.__checkFlagTimeout)
 
+        if timing is not None:
+            timing['jog_submit'] = submit_end - submit_start
+            timing['flag_wait'] = time.perf_counter() - submit_end
+
         return {'status_code': response.status_code, 'content': response.content}
 
-    def chamber_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0):
+    def chamber_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0, timing: dict = None):
         """
         Takes absolute coordinates to move to.
         :param x: desired x position [mm], 2 decimal
         :param y: desired y position [mm], 2 decimal
         :param z: desired z position [mm], 2 decimal
         :param speed: speed for movement in [mm/s]
+        :param timing: optional dict to receive durations of the jog phases, see __chamber_jog_with_flag()
         :return: dict {'status code' : str, 'content' : str} of server response
         """
-        response = self.__chamber_jog_with_flag(x=x, y=y, z=z, speed=(speed * 60), abs_coordinate=True)
+        response = self.__chamber_jog_with_flag(x=x, y=y, z=z, speed=(speed * 60), abs_coordinate=True, timing=timing)
+        return response
+
+    def chamber_start_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0,
+                              timing: dict = None):
+        """
+        Same as chamber_jog_abs() but does not wait for the movement to finish. Used for continuous scanning, the
+        caller measures while the chamber moves and polls chamber_isflagset() to detect the end of the movement.
+        :param x: desired x position [mm], 2 decimal
+        :param y: desired y position [mm], 2 decimal
+        :param z: desired z position [mm], 2 decimal
+        :param speed: speed for movement in [mm/s]
+        :param timing: optional dict to receive durations of the jog phases, see __chamber_jog_with_flag()
+        :return: dict {'status code' : str, 'content' : str} of server response
+        """
+        response = self.__chamber_jog_with_flag(x=x, y=y, z=z, speed=(speed * 60), abs_coordinate=True, timing=timing,
+                                                wait=False)
         return response
 
     def chamber_jog_rel(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0):
@@ -176,38 +258,11 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
         :param axis: arbitrary string containing x/X, y/Y, z/Z. e.g. axis = 'xyz' or 'xy' or 'Zyx' ...
         :return: dict {'status code' : str, 'content' : str} of server response
         """
-        # initialize flags if letter found
-        flag_x = False
-        flag_y = False
-        flag_z = False
-
-        # check for letters in string
-        for i in axis:
-            if i == 'x' or i == 'X':
-                flag_x = True
-            if i == 'y' or i == 'Y':
-                flag_y = True
-            if i == 'z' or i == 'Z':
-                flag_z = True
-
-        home_gcode = 'G28 '
-        if flag_x:
-            home_gcode += 'X0 '
-        if flag_y:
-            home_gcode += 'Y0 '
-        if flag_z:
-            home_gcode += 'Z0'
-
-        # assemble custom GCode...
-        g_code_list = [self.gcode_set_flag]
-        g_code_list.append(home_gcode)
-        g_code_list.append(self.gcode_reset_flag)
-
         # send g-code-cmd-request via http
         payload = {
-            "commands": g_code_list
+            "commands": build_home_gcode(axis)
         }
-        response = requests.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
+        response = self.http.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
 
         while self.chamber_isflagset():
             time.sleep(self.__checkFlagTimeout)
@@ -219,7 +274,7 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
         Initiates an overall system restart of the chamber (Server and Klipper).
         :return: dict {'status code' : str, 'content' : str} of server response
         """
-        response = requests.post(url=self.api_system_cmd_endpoint + '/core/restart', headers=self.header_api)
+        response = self.http.post(url=self.api_system_cmd_endpoint + '/core/restart', headers=self.header_api)
         return {'status_code': response.status_code, 'content': response.content}
 
     def chamber_z_tilt_with_flag(self):
@@ -228,16 +283,11 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
         position of each z-stepper accordingly.
         :return: dict {'status code' : str, 'content' : str} of server response
         """
-        g_code_list = [self.gcode_set_flag]
-        g_code_list.append("Z_tilt_adjust") # Custom GCode command of klipper
-        g_code_list.append(self.gcode_wait_for_moves_to_finish)
-        g_code_list.append(self.gcode_reset_flag)
-
         # send g-code-cmd-request via http
         payload = {
-            "commands": g_code_list
+            "commands": build_z_tilt_gcode()
         }
-        response = requests.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
+        response = self.http.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
 
         while self.chamber_isflagset():
             time.sleep(self.__checkFlagTimeout)
@@ -253,21 +303,13 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
         This function can be used to realise busy waiting on the movements of the chamber.
         :return: TRUE > flag is set | FALSE > flag not set
         """
-        str_found_position = -1
-        flag_position_offset = 10
-        info_str = ""
-        while str_found_position < 0:   # ask chamber multiple times until valid response is received
-            response = requests.get(url=self.api_printer_tool_endpoint, headers=self.header_tjson)
-            info = response.content
-            info_str = str(info, encoding='utf-8')
-            str_found_position = info_str.find('"target": ')
-            if str_found_position < 0:
+        isflagset = None
+        while isflagset is None:   # ask chamber multiple times until valid response is received
+            response = self.http.get(url=self.api_printer_tool_endpoint, headers=self.header_tjson)
+            isflagset = parse_flag(str(response.content, encoding='utf-8'))
+            if isflagset is None:
                 print("Chamber Error: Flag not found in octoprint response. Trying again...") # debug - never triggered with 0.05s timeout - 18.12.2024
                 time.sleep(self.__checkFlagTimeout)   # wait a little to not overload chamber with requests
-
-        flag_position = str_found_position + flag_position_offset
-
-        isflagset = bool(info_str[flag_position] == '1')
         return isflagset
 
     def chamber_set_flag(self):
@@ -286,7 +328,7 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
                 "tool0": 1
             }
         }
-        response = requests.post(url=self.api_printer_tool_endpoint, headers=self.header_tjson, json=payload)
+        response = self.http.post(url=self.api_printer_tool_endpoint, headers=self.header_tjson, json=payload)
         return {'status_code': response.status_code, 'content': response.content}
 
     def chamber_reset_flag(self):
@@ -305,7 +347,7 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
                 "tool0": 0
             }
         }
-        response = requests.post(url=self.api_printer_tool_endpoint, headers=self.header_tjson, json=payload)
+        response = self.http.post(url=self.api_printer_tool_endpoint, headers=self.header_tjson, json=payload)
         return {'status_code': response.status_code, 'content': response.content}
 
     def chamber_send_custom_GCode_with_flag(self, g_code_list: list):
@@ -321,7 +363,7 @@ class ChamberNetworkCommands(connection_handler.NetworkDevice):
         payload = {
             "commands": g_code_list
         }
-        response = requests.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
+        response = self.http.post(url=self.api_printer_cmd_endpoint, headers=self.header_tjson, json=payload)
 
         while self.chamber_isflagset():
             time.sleep(self.__checkFlagTimeout)
@@ -3,3 +3,7 @@ _summary_
 """
 
 from connection_handler.network_device import NetworkDevice
+from connection_handler.transcript import Transcript, TranscriptMismatch
+from connection_handler.device_actor import DeviceActor, DeviceProxy, AsyncDeviceProxy, PRIORITY_JOG, PRIORITY_NORMAL, \
+    PRIORITY_BACKGROUND
+from connection_handler.async_http import AsyncHttpSession, AsyncHttpResponse
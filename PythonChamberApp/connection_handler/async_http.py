@@ -0,0 +1,154 @@
+"""
+Minimal asyncio HTTP/1.1 client for the REST APIs of the network devices (OctoPrint).
+
+AsyncHttpSession has the same get() / post() interface as the requests module, but as coroutines, and keeps one
+keep-alive connection per host, so polling does not open a new TCP connection per request. Requests to the same host
+are sent one after another on that connection, requests to different hosts run concurrently in one event loop
+without any thread. A connection that was closed by the server is reopened once per request.
+
+Only what the devices need is supported: http and https, bodies with Content-Length or chunked transfer encoding,
+no redirects, no cookies, no proxies.
+"""
+import asyncio
+import json as json_module
+import ssl
+from urllib.parse import urlsplit
+
+
+class AsyncHttpResponse:
+    """
+    Response of AsyncHttpSession with the attributes of requests.Response that the devices use.
+    """
+    status_code: int = None
+    headers: dict = None    # lower case header names
+    content: bytes = None
+
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json_module.loads(self.content)
+
+
+class AsyncHttpSession:
+    """
+    See module doc-string. Must be used within one event loop, close() closes all connections.
+
+    :param timeout: unit [s], maximum duration of one request including connect
+    """
+    timeout: float = None
+    __connections: dict = None  # {(scheme, host, port): (reader, writer)}
+    __locks: dict = None        # {(scheme, host, port): asyncio.Lock}, one request at a time per connection
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self.__connections = {}
+        self.__locks = {}
+
+    async def get(self, url: str, headers: dict = None) -> AsyncHttpResponse:
+        return await self.request('GET', url, headers)
+
+    async def post(self, url: str, headers: dict = None, json=None, data: bytes = None) -> AsyncHttpResponse:
+        if json is not None:
+            data = json_module.dumps(json).encode('utf-8')
+            headers = dict(headers or {})
+            headers.setdefault('Content-Type', 'application/json')
+        return await self.request('POST', url, headers, data)
+
+    async def request(self, method: str, url: str, headers: dict = None, data: bytes = None) -> AsyncHttpResponse:
+        """
+        Sends the request on the keep-alive connection of the host.
+
+        :raises asyncio.TimeoutError: if the request takes longer than the timeout of the session
+        :raises ConnectionError: if the connection fails twice
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported url scheme of {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        header_lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive",
+                        f"Content-Length: {len(data) if data is not None else 0}"]
+        for name, value in (headers or {}).items():
+            header_lines.append(f"{name}: {value}")
+        request_bytes = ('\r\n'.join(header_lines) + '\r\n\r\n').encode('latin-1') + (data or b'')
+
+        lock = self.__locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            return await asyncio.wait_for(self.__send(key, request_bytes, method), self.timeout)
+
+    async def close(self):
+        for reader, writer in self.__connections.values():
+            writer.close()
+        self.__connections = {}
+        return
+
+    async def __send(self, key: tuple, request_bytes: bytes, method: str) -> AsyncHttpResponse:
+        for attempt in range(2):
+            reused = key in self.__connections
+            if not reused:
+                scheme, host, port = key
+                self.__connections[key] = await asyncio.open_connection(
+                    host, port, ssl=ssl.create_default_context() if scheme == 'https' else None)
+            reader, writer = self.__connections[key]
+            try:
+                writer.write(request_bytes)
+                await writer.drain()
+                response, keep_alive = await self.__read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.__drop_connection(key)
+                if reused and attempt == 0:     # keep-alive connection was closed by the server meanwhile
+                    continue
+                raise ConnectionError(f"Connection to {key[1]}:{key[2]} failed")
+            except BaseException:   # e.g. cancelled by timeout, the connection is in an unknown state
+                self.__drop_connection(key)
+                raise
+            if not keep_alive:
+                self.__drop_connection(key)
+            return response
+
+    async def __read_response(self, reader: asyncio.StreamReader, method: str) -> tuple:
+        """
+        :return: tuple (AsyncHttpResponse, True if the connection can be reused)
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        version, status_code = status_line.decode('latin-1').split(' ', 2)[:2]
+        status_code = int(status_code)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+        if method == 'HEAD' or status_code in (204, 304) or 100 <= status_code < 200:
+            content = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            content = b''
+            while True:
+                chunk_size = int((await reader.readline()).split(b';')[0], 16)
+                if chunk_size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):  # trailer
+                        pass
+                    break
+                content += await reader.readexactly(chunk_size)
+                await reader.readexactly(2)     # CRLF after chunk
+        elif 'content-length' in headers:
+            content = await reader.readexactly(int(headers['content-length']))
+        else:   # body ends with the connection
+            content = await reader.read()
+            keep_alive = False
+        return AsyncHttpResponse(status_code, headers, content), keep_alive
+
+    def __drop_connection(self, key: tuple):
+        connection = self.__connections.pop(key, None)
+        if connection is not None:
+            connection[1].close()
+        return
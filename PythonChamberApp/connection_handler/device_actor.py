@@ -0,0 +1,218 @@
+"""
+Device actors: every physical device (chamber, PNA) is owned by one dedicated thread that executes the commands of all
+other threads one after another from a command queue.
+
+A command is any callable, usually a method of the device. DeviceActor.submit() queues it and returns a
+concurrent.futures.Future right away, so the GUI thread never blocks on GPIB or HTTP and gets the result via
+Future.add_done_callback(). DeviceActor.call() queues the command and waits for its result, it is used by threads that
+are allowed to block (measurement threads, workers).
+
+The queue is ordered by priority, then by submission. Interactive jogs of the user are submitted with PRIORITY_JOG and
+overtake queued commands of lower priority. Commands that are already executed are never interrupted.
+
+DeviceProxy forwards every method call to the actor with call(), so the proxy can be given to the existing measurement
+routines in place of the device:
+
+    chamber_actor = DeviceActor(ChamberNetworkCommands(ip_address, api_key), 'chamber')
+    chamber = chamber_actor.proxy()
+    chamber.chamber_jog_abs(x=100, y=100, z=150, speed=50)     # executed by the chamber thread
+    future = chamber_actor.submit(chamber_actor.device.chamber_jog_rel, x=1.0, speed=10, priority=PRIORITY_JOG)
+
+Sequences that must not be interleaved with commands of other threads (e.g. preset and setup of the PNA) are submitted
+as one function that works on actor.device. Calls of the actor thread to its own proxy are executed right away, so
+such functions may also use the proxy.
+
+AsyncDeviceProxy is the counterpart for asyncio code: method calls return awaitables of the actor futures, so blocking
+devices (VISA) can be awaited together with other coroutines without a thread per activity.
+"""
+import asyncio
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+
+PRIORITY_JOG = 0            # interactive jogs of the user
+PRIORITY_NORMAL = 10        # measurement routines, configuration
+PRIORITY_BACKGROUND = 20    # polling and other requests that may wait
+
+
+class DeviceActor:
+    """
+    Owns a device and executes all commands to it in one thread, see module doc-string.
+
+    :param device: device object, e.g. ChamberNetworkCommands or E8361RemoteGPIB
+    :param name: name of the actor thread
+    """
+    device = None
+    name: str = None
+    __queue: queue.PriorityQueue = None
+    __counter: itertools.count = None   # keeps commands of the same priority in order of submission
+    __thread: threading.Thread = None
+    __stop_item = None
+
+    def __init__(self, device, name: str = 'device'):
+        self.device = device
+        self.name = name
+        self.__queue = queue.PriorityQueue()
+        self.__counter = itertools.count()
+        self.__stop_item = object()
+        self.__thread = threading.Thread(target=self.__run, name=f"{name}-actor", daemon=True)
+        self.__thread.start()
+
+    def submit(self, function, *args, priority: int = PRIORITY_NORMAL, **kwargs) -> Future:
+        """
+        Queues the command function(*args, **kwargs).
+
+        :return: Future of the command, holds its return value or exception once it is executed
+        """
+        future = Future()
+        if not self.is_alive():
+            future.set_exception(RuntimeError(f"Device actor '{self.name}' is stopped"))
+            return future
+        self.__queue.put((priority, next(self.__counter), function, args, kwargs, future))
+        return future
+
+    def call(self, function, *args, priority: int = PRIORITY_NORMAL, **kwargs):
+        """
+        Queues the command and waits until it is executed. Called from the actor thread, the command is executed
+        right away.
+
+        :return: return value of the command, exceptions of the command are raised
+        """
+        if threading.current_thread() is self.__thread:
+            return function(*args, **kwargs)
+        return self.submit(function, *args, priority=priority, **kwargs).result()
+
+    def get_num_pending(self) -> int:
+        """
+        :return: number of queued commands that are not executed yet
+        """
+        return self.__queue.qsize()
+
+    def is_alive(self) -> bool:
+        return self.__thread.is_alive() and self.__stop_item is not None
+
+    def stop(self, wait: bool = True):
+        """
+        Stops the actor thread once the queued commands are executed. Commands submitted afterwards fail.
+
+        :param wait: if True, blocks until the queued commands are executed
+        """
+        stop_item = self.__stop_item
+        if stop_item is None:
+            return
+        self.__stop_item = None
+        self.__queue.put((float('inf'), next(self.__counter), stop_item, (), {}, None))
+        if wait and threading.current_thread() is not self.__thread:
+            self.__thread.join()
+        return
+
+    def proxy(self):
+        """
+        :return: DeviceProxy that forwards all method calls of the device to this actor
+        """
+        return DeviceProxy(self)
+
+    def async_proxy(self):
+        """
+        :return: AsyncDeviceProxy that forwards all method calls of the device to this actor as awaitables
+        """
+        return AsyncDeviceProxy(self)
+
+    def __run(self):
+        stop_item = self.__stop_item
+        while True:
+            priority, count, function, args, kwargs, future = self.__queue.get()
+            if function is stop_item:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = function(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        return
+
+
+class DeviceProxy:
+    """
+    Stands in for the device of a DeviceActor. Method calls are executed by the actor thread and block until they are
+    done, attributes are read from the device directly. Context managers returned by the device (e.g. pna_batch())
+    are entered and exited by the actor thread as well.
+    """
+
+    def __init__(self, actor: DeviceActor):
+        object.__setattr__(self, '_DeviceProxy__actor', actor)
+
+    def __getattr__(self, name: str):
+        actor = self.__actor
+        attribute = getattr(actor.device, name)
+        if not callable(attribute):
+            return attribute
+
+        def call_on_actor(*args, **kwargs):
+            result = actor.call(attribute, *args, **kwargs)
+            if hasattr(result, '__enter__') and hasattr(result, '__exit__'):
+                return _ActorContextManager(actor, result)
+            return result
+        return call_on_actor
+
+    def __setattr__(self, name: str, value):
+        setattr(self.__actor.device, name, value)
+
+    def get_actor(self) -> DeviceActor:
+        return self.__actor
+
+
+class _ActorContextManager:
+    """
+    Runs __enter__ and __exit__ of a context manager of the device in the actor thread.
+    """
+
+    def __init__(self, actor: DeviceActor, context_manager):
+        self.__actor = actor
+        self.__context_manager = context_manager
+
+    def __enter__(self):
+        return self.__actor.call(self.__context_manager.__enter__)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.__actor.call(self.__context_manager.__exit__, exc_type, exc_value, traceback)
+
+
+class AsyncDeviceProxy:
+    """
+    Stands in for the device of a DeviceActor in asyncio code. Method calls are queued on the actor and return an
+    awaitable of the result, attributes are read from the device directly. The keyword 'priority' sets the priority of
+    the command in the queue.
+
+    Cancelling the awaitable, e.g. by asyncio.wait_for(), removes a queued command from the queue. A command that is
+    already executed by the actor thread runs to its end.
+    """
+
+    def __init__(self, actor: DeviceActor):
+        self.__actor = actor
+
+    def __getattr__(self, name: str):
+        actor = self.__actor
+        attribute = getattr(actor.device, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call_on_actor(*args, priority: int = PRIORITY_NORMAL, **kwargs):
+            return await asyncio.wrap_future(actor.submit(attribute, *args, priority=priority, **kwargs))
+        return call_on_actor
+
+    async def run(self, function, *args, priority: int = PRIORITY_NORMAL, **kwargs):
+        """
+        Executes function(*args, **kwargs) in the actor thread, e.g. a sequence of commands on get_actor().device that
+        must not be interleaved with other commands.
+
+        :return: return value of the function
+        """
+        return await asyncio.wrap_future(self.__actor.submit(function, *args, priority=priority, **kwargs))
+
+    def get_actor(self) -> DeviceActor:
+        return self.__actor
@@ -0,0 +1,331 @@
+"""
+Recording and deterministic replay of the traffic to the PNA (VISA) and the chamber (HTTP).
+
+Recording wraps the pyvisa resource manager of E8361RemoteGPIB and the http module of ChamberNetworkCommands. Every
+transaction is appended to the Transcript with its start time, duration, request and response, errors included.
+The transcript is stored as json-lines file (gzip compressed if the file name ends with '.gz'), one transaction per
+line: {"t": start [s], "d": duration [s], "ch": "visa"|"http", "op": str, "req": ..., "resp": ..., "err": ...}.
+HTTP headers (API key!) are not recorded, URLs are stored without host so the replay works with any ip address.
+
+Replay drives E8361RemoteGPIB and ChamberNetworkCommands from a loaded transcript without any device:
+
+    transcript = Transcript.load('scan.jsonl.gz')
+    vna = E8361RemoteGPIB(resource_manager=transcript.replay_resource_manager(realtime=False))
+    chamber = ChamberNetworkCommands(ip_address='replay', api_key='', http=transcript.replay_http(realtime=False))
+
+The recorded responses are returned in order per channel. With realtime, each response is delayed by the recorded
+duration of the transaction, otherwise responses are returned as fast as possible, so the python side can be profiled
+in isolation. Strict replay raises a TranscriptMismatch if a request differs from the recording, non-strict replay
+skips forward to the next matching transaction. Loops that depend on wall-clock time (continuous scan, settling
+detection) only replay reliably in realtime and non-strict.
+"""
+import gzip
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pyvisa
+import requests
+
+TRANSCRIPT_CHANNELS = ('visa', 'http')
+
+
+class TranscriptMismatch(Exception):
+    """
+    Request of the replayed program differs from the recorded request.
+    """
+
+
+class Transcript:
+    """
+    List of recorded transactions with factories of the recording and replay wrappers, see module doc-string.
+    """
+    entries: list = None
+    __start: float = None
+    __lock: threading.Lock = None
+    __cursor: dict = None      # {channel: index of next entry to replay}
+
+    def __init__(self, entries: list = None):
+        self.entries = [] if entries is None else list(entries)
+        self.__start = time.perf_counter()
+        self.__lock = threading.Lock()
+        self.rewind()
+
+    # recording
+    def record_resource_manager(self, resource_manager: pyvisa.ResourceManager):
+        """
+        :return: wrapper of the resource manager, all resources opened by the wrapper are recorded
+        """
+        return _RecordingResourceManager(self, resource_manager)
+
+    def record_http(self, http=requests):
+        """
+        :param http: module or session with get() and post() used by ChamberNetworkCommands
+        :return: wrapper of http, all requests are recorded
+        """
+        return _RecordingHttp(self, http)
+
+    def record(self, channel: str, op: str, request, call):
+        """
+        Calls call() and appends the transaction. Errors are recorded and raised again.
+
+        :return: return value of call()
+        """
+        start = time.perf_counter()
+        entry = {'t': round(start - self.__start, 6), 'ch': channel, 'op': op, 'req': request}
+        try:
+            response = call()
+        except Exception as e:
+            entry['d'] = round(time.perf_counter() - start, 6)
+            entry['err'] = _error_to_json(e)
+            self.__append(entry)
+            raise
+        entry['d'] = round(time.perf_counter() - start, 6)
+        entry['resp'] = response if channel == 'visa' else _response_to_json(response)
+        self.__append(entry)
+        return response
+
+    def save(self, file_name: str):
+        """
+        Writes the transcript as json-lines file, gzip compressed if the file name ends with '.gz'.
+        """
+        open_func = gzip.open if file_name.endswith('.gz') else open
+        with self.__lock:
+            entries = list(self.entries)
+        with open_func(file_name, 'wt', encoding='utf-8') as file:
+            for entry in entries:
+                file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        return
+
+    @staticmethod
+    def load(file_name: str):
+        """
+        :return: Transcript of the given json-lines file, None if the file could not be read
+        """
+        open_func = gzip.open if file_name.endswith('.gz') else open
+        try:
+            with open_func(file_name, 'rt', encoding='utf-8') as file:
+                entries = [json.loads(line) for line in file if line.strip() != '']
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error - transcript could not be read: {e}")
+            return None
+        return Transcript(entries)
+
+    # replay
+    def replay_resource_manager(self, realtime: bool = False, strict: bool = True):
+        """
+        :return: resource manager that opens replayed resources, pass it to E8361RemoteGPIB(resource_manager=...)
+        """
+        return _ReplayResourceManager(self, realtime, strict)
+
+    def replay_http(self, realtime: bool = False, strict: bool = True):
+        """
+        :return: replacement of the http module, pass it to ChamberNetworkCommands(http=...)
+        """
+        return _ReplayHttp(self, realtime, strict)
+
+    def rewind(self):
+        """
+        Restarts the replay of all channels at the first transaction.
+        """
+        self.__cursor = {channel: 0 for channel in TRANSCRIPT_CHANNELS}
+        return
+
+    def replay(self, channel: str, op: str, request, realtime: bool, strict: bool) -> dict:
+        """
+        Takes the next transaction of the channel. Waits the recorded duration if realtime.
+
+        :return: recorded entry
+        """
+        with self.__lock:
+            idx = self.__cursor[channel]
+            while idx < len(self.entries) and self.entries[idx]['ch'] != channel:
+                idx += 1
+            first_idx = idx
+            while idx < len(self.entries) and not strict and \
+                    (self.entries[idx]['ch'] != channel or self.entries[idx]['op'] != op or
+                     self.entries[idx]['req'] != request):
+                idx += 1
+            if idx >= len(self.entries):
+                raise TranscriptMismatch(f"No recorded {channel} transaction left for {op} {request}")
+            entry = self.entries[idx]
+            if entry['op'] != op or entry['req'] != request:
+                raise TranscriptMismatch(f"Transaction {first_idx}: recorded {entry['op']} {entry['req']}, "
+                                         f"replayed {op} {request}")
+            self.__cursor[channel] = idx + 1
+        if realtime:
+            time.sleep(entry.get('d', 0.0))
+        if 'err' in entry:
+            raise _error_from_json(entry['err'])
+        return entry
+
+    def __append(self, entry: dict):
+        with self.__lock:
+            self.entries.append(entry)
+        return
+
+
+def _error_to_json(error: Exception) -> dict:
+    error_json = {'type': type(error).__name__, 'msg': str(error)}
+    if isinstance(error, pyvisa.errors.VisaIOError):
+        error_json['code'] = int(error.error_code)
+    return error_json
+
+
+def _error_from_json(error_json: dict) -> Exception:
+    if 'code' in error_json:
+        return pyvisa.errors.VisaIOError(error_json['code'])
+    error_type = getattr(requests.exceptions, error_json['type'], None)
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        return error_type(error_json['msg'])
+    return RuntimeError(f"{error_json['type']}: {error_json['msg']}")
+
+
+def _response_to_json(response) -> dict:
+    return {'status_code': response.status_code, 'content': response.content.decode('utf-8', errors='replace')}
+
+
+def _url_path(url: str) -> str:
+    return urlsplit(url).path
+
+
+class _RecordingResourceManager:
+    def __init__(self, transcript: Transcript, resource_manager):
+        self.__transcript = transcript
+        self.__resource_manager = resource_manager
+
+    def list_resources(self, query: str = '?*::INSTR'):
+        return tuple(self.__transcript.record('visa', 'list', query,
+                                              lambda: list(self.__resource_manager.list_resources(query))))
+
+    def open_resource(self, resource_name: str, **kwargs):
+        self.__transcript.record('visa', 'open', resource_name, lambda: None)
+        return _RecordingResource(self.__transcript, self.__resource_manager.open_resource(resource_name, **kwargs))
+
+
+class _RecordingResource:
+    """
+    Proxy of a pyvisa resource, write/query/read/clear/send_ifc/close are recorded, attributes are passed through.
+    """
+    def __init__(self, transcript: Transcript, resource):
+        object.__setattr__(self, '_transcript', transcript)
+        object.__setattr__(self, '_resource', resource)
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resource, name, value)
+
+    def write(self, message: str):
+        return self._transcript.record('visa', 'write', message, lambda: self._resource.write(message))
+
+    def query(self, message: str):
+        return self._transcript.record('visa', 'query', message, lambda: self._resource.query(message))
+
+    def read(self, *args):
+        return self._transcript.record('visa', 'read', None, lambda: self._resource.read(*args))
+
+    def clear(self):
+        return self._transcript.record('visa', 'clear', None, lambda: self._resource.clear())
+
+    def send_ifc(self):
+        return self._transcript.record('visa', 'ifc', None, lambda: self._resource.send_ifc())
+
+    def close(self):
+        return self._transcript.record('visa', 'close', None, lambda: self._resource.close())
+
+
+class _RecordingHttp:
+    def __init__(self, transcript: Transcript, http):
+        self.__transcript = transcript
+        self.__http = http
+
+    def get(self, url: str, **kwargs):
+        return self.__transcript.record('http', 'get', {'url': _url_path(url)},
+                                        lambda: self.__http.get(url, **kwargs))
+
+    def post(self, url: str, **kwargs):
+        return self.__transcript.record('http', 'post', {'url': _url_path(url), 'json': kwargs.get('json')},
+                                        lambda: self.__http.post(url, **kwargs))
+
+
+class _ReplayResourceManager:
+    def __init__(self, transcript: Transcript, realtime: bool, strict: bool):
+        self.__transcript = transcript
+        self.__realtime = realtime
+        self.__strict = strict
+
+    def list_resources(self, query: str = '?*::INSTR'):
+        return tuple(self.__transcript.replay('visa', 'list', query, self.__realtime, self.__strict)['resp'])
+
+    def open_resource(self, resource_name: str, **kwargs):
+        self.__transcript.replay('visa', 'open', resource_name, self.__realtime, self.__strict)
+        return _ReplayResource(self.__transcript, resource_name, self.__realtime, self.__strict)
+
+
+class _ReplayResource:
+    """
+    Stand-in of a pyvisa resource answering from the transcript. Attributes (timeout, terminations, ...) are kept
+    locally.
+    """
+    def __init__(self, transcript: Transcript, resource_name: str, realtime: bool, strict: bool):
+        self.resource_name = resource_name
+        self.timeout = 2000
+        self.chunk_size = 20 * 1024
+        self.read_termination = '\n'
+        self.write_termination = '\n'
+        self.__transcript = transcript
+        self.__realtime = realtime
+        self.__strict = strict
+
+    def __replay(self, op: str, request):
+        return self.__transcript.replay('visa', op, request, self.__realtime, self.__strict).get('resp')
+
+    def write(self, message: str):
+        return self.__replay('write', message)
+
+    def query(self, message: str):
+        return self.__replay('query', message)
+
+    def read(self, *args):
+        return self.__replay('read', None)
+
+    def clear(self):
+        return self.__replay('clear', None)
+
+    def send_ifc(self):
+        return self.__replay('ifc', None)
+
+    def close(self):
+        return self.__replay('close', None)
+
+
+class _ReplayResponse:
+    def __init__(self, response_json: dict):
+        self.status_code = response_json['status_code']
+        self.content = response_json['content'].encode('utf-8')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error (replayed)", response=self)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _ReplayHttp:
+    def __init__(self, transcript: Transcript, realtime: bool, strict: bool):
+        self.__transcript = transcript
+        self.__realtime = realtime
+        self.__strict = strict
+
+    def get(self, url: str, **kwargs):
+        entry = self.__transcript.replay('http', 'get', {'url': _url_path(url)}, self.__realtime, self.__strict)
+        return _ReplayResponse(entry['resp'])
+
+    def post(self, url: str, **kwargs):
+        entry = self.__transcript.replay('http', 'post', {'url': _url_path(url), 'json': kwargs.get('json')},
+                                         self.__realtime, self.__strict)
+        return _ReplayResponse(entry['resp'])
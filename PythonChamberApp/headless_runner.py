@@ -0,0 +1,275 @@
+"""
+Headless entry point to run an AutoMeasurement or BodyScan from a scan spec file without the userinterface.
+Neither PyQt6 nor matplotlib are imported, progress is printed to stdout. The chamber must be homed already.
+
+Usage (from PythonChamberApp directory):
+    python headless_runner.py <scan_spec.json> [--verbose] [--record <file.jsonl.gz> | --replay <file.jsonl.gz>]
+
+With --record, all VISA and HTTP traffic is stored as transcript (see connection_handler/transcript.py). With --replay,
+the scan runs offline against a recorded transcript instead of chamber and VNA, e.g. to profile the python side.
+
+Scan spec (json-file): see doc-string of measurement_routines/scan_spec.py, with the additional connection entries
+{
+    "chamber":          {"ip_address": str, "api_key": str},
+    "vna":              {"visa_address": str, "use_keysight": bool (optional, default false),
+                         "batch_commands": bool (optional, default false), "shadow_cache": bool (optional, default false),
+                         "visa_library": str (optional, e.g. "@py" for pyvisa-py on LAN transports),
+                         "timeout": int (optional, unit [ms], VISA timeout, default of the transport)},
+    ...
+}
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+
+from chamber_net_interface import ChamberNetworkCommands
+from connection_handler import Transcript
+from vna_net_interface import E8361RemoteGPIB
+from measurement_routines import AutoMeasurementRoutine, BodyScanRoutine, format_timing_summary, \
+    validate_scan_spec, calc_mesh_vectors, check_move_boundary, configure_vna
+
+PROGRESS_PRINT_INTERVAL = 5.0   # unit [s], minimum time between two progress lines
+
+
+def load_scan_spec(file_path: str):
+    """
+    Reads the scan spec from given json file and checks that all necessary entries are given.
+
+    :return: spec dict or None if file is invalid
+    """
+    try:
+        with open(file_path, 'r') as file:
+            spec = json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error - scan spec could not be read: {e}")
+        return None
+
+    if 'chamber' not in spec or 'vna' not in spec:
+        print("Error - scan spec misses 'chamber' or 'vna' connection entries!")
+        return None
+    if validate_scan_spec(spec) is not True:
+        return None
+    return spec
+
+
+class ConsolePrinter:
+    """
+    Prints the signals of a measurement routine to stdout. Progress lines are rate-limited.
+    """
+    def __init__(self, verbose: bool = False, prefix: str = ''):
+        self.verbose = verbose
+        self.prefix = prefix    # e.g. name of the rig if several scans print to the same console
+        self.stopped = False
+        self.stop_reason = None     # set if the routine stopped itself, e.g. retry budget exhausted
+        self.__last_progress_print = 0.0
+
+    def print_update(self, message: str):
+        print(self.prefix + message, flush=True)
+
+    def print_log(self, message: str, level: int):
+        if level >= logging.WARNING or self.verbose:
+            print(self.prefix + message, flush=True)
+
+    def print_progress(self, progress: dict):
+        now = time.monotonic()
+        is_last_point = progress.get('total_current_point_number') == progress['total_points_in_measurement']
+        if now - self.__last_progress_print < PROGRESS_PRINT_INTERVAL and not is_last_point:
+            return
+        self.__last_progress_print = now
+        print(f"{self.prefix}[{progress['status_flag']}] point {progress.get('total_current_point_number', 0)}/"
+              f"{progress['total_points_in_measurement']}, layer {progress.get('current_layer_number', 0)}/"
+              f"{progress['num_of_layers_in_measurement']}, time to go {progress['time_to_go']}s", flush=True)
+
+    def print_timing(self, summary: dict):
+        if self.verbose:
+            print(self.prefix + format_timing_summary(summary), flush=True)
+
+    def print_error(self, error: dict):
+        if error['error_code'] == 0:
+            self.stopped = True
+        print(f"{self.prefix}Error {error['error_code']}: {error['error_msg']}", flush=True)
+
+    def print_finished(self, finished_info: dict):
+        self.stop_reason = finished_info.get('stop_reason')
+        print(f"{self.prefix}Measurement finished after {finished_info['duration']}. Data saved to {finished_info['file_location']}",
+              flush=True)
+
+
+def connect_devices(connection: dict, transcript: Transcript = None, replay: bool = False, realtime: bool = False):
+    """
+    Connects chamber and VNA of given connection entries and applies the command optimizations of the VNA.
+
+    :param connection: dict with the 'chamber' and 'vna' connection entries, see module doc-string
+    :param transcript: records all VISA and HTTP traffic if given, or is replayed instead of chamber and VNA if replay
+    :param realtime: replay with the recorded durations of the transactions instead of as fast as possible
+    :return: tuple (chamber, vna) or None if a device is not available
+    """
+    http = None
+    resource_manager = None
+    if transcript is not None and replay:
+        http = transcript.replay_http(realtime=realtime)
+        resource_manager = transcript.replay_resource_manager(realtime=realtime)
+    elif transcript is not None:
+        http = transcript.record_http()
+    chamber = ChamberNetworkCommands(ip_address=connection['chamber']['ip_address'],
+                                     api_key=connection['chamber']['api_key'], http=http)
+    response = chamber.chamber_connect_serial()
+    if response['status_code'] == -1:
+        print(f"Error - Chamber not available: {response['error']}")
+        return None
+
+    use_keysight = connection['vna'].get('use_keysight', False)
+    if use_keysight and sys.platform == 'win32':
+        # same dll paths as in runner.py, may be adapted dependent on installation path of Keysight IO Libraries
+        os.add_dll_directory('C:\\Program Files\\Keysight\\IO Libraries Suite\\bin')
+        os.add_dll_directory('C:\\Program Files (x86)\\Keysight\\IO Libraries Suite\\bin')
+    vna = E8361RemoteGPIB(use_keysight=use_keysight, visa_library=connection['vna'].get('visa_library'),
+                          resource_manager=resource_manager)
+    if transcript is not None and not replay:
+        vna.resource_manager = transcript.record_resource_manager(vna.resource_manager)
+    if vna.connect_pna(connection['vna']['visa_address'], timeout=connection['vna'].get('timeout')) is False:
+        print("Error - VNA not available.")
+        return None
+    print(f"Connected to {vna.pna_read_idn()}", flush=True)
+    vna.pna_set_command_optimization(batching=connection['vna'].get('batch_commands', False),
+                                     shadow_cache=connection['vna'].get('shadow_cache', False))
+    return chamber, vna
+
+
+def prepare_output_file(spec: dict):
+    """
+    Checks the mesh against the workspace boundaries and the output file against override and creates its directory.
+
+    :return: absolute path of the output file without extension or None if the scan must not be started
+    """
+    x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+    if check_move_boundary(x_vec, y_vec, z_vec) is not True:
+        print("Error - Configured mesh defines coordinates out of workspace boundaries.")
+        return None
+
+    output_file = os.path.abspath(spec['output_file'])
+    if os.path.isfile(output_file + '.json'):
+        print(f"Error - {output_file}.json already exists. Override is not permitted.")
+        return None
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    return output_file
+
+
+def build_routine(spec: dict, chamber: ChamberNetworkCommands, vna: E8361RemoteGPIB, output_file: str,
+                  state_cache: dict = None):
+    """
+    Configures the VNA and creates the measurement routine given by the scan spec.
+
+    :param state_cache: PNA state cache of configure_vna(), speeds up consecutive scans on the same VNA
+    :return: AutoMeasurementRoutine or BodyScanRoutine, None if the VNA could not be configured
+    """
+    x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+    meas_name = 'AutoMeasurement' if spec['type'] == 'auto_measurement' else 'BodyScan'
+    vna_info = configure_vna(vna, spec['vna_config'], meas_name, state_cache)
+    if vna_info is None:
+        return None
+
+    zero_position = tuple(spec['zero_position'])
+    if spec['type'] == 'auto_measurement':
+        return AutoMeasurementRoutine(chamber=chamber, vna=vna, vna_info=vna_info, x_vec=x_vec, y_vec=y_vec,
+                                      z_vec=z_vec, mov_speed=spec['jog_speed'], zero_position=zero_position,
+                                      file_location=output_file, move_pattern=spec['move_pattern'],
+                                      file_type_json_readable=spec.get('file_type_json_readable', True),
+                                      adaptive_config=spec.get('adaptive'), roi=spec.get('roi'),
+                                      continuous_config=spec.get('continuous'),
+                                      recovery_config=spec.get('error_recovery'),
+                                      averaging_config=spec.get('averaging'))
+    return BodyScanRoutine(chamber=chamber, vna=vna, vna_info=vna_info, x_vec=x_vec, y_vec=y_vec, z_vec=z_vec,
+                           mov_speed=spec['jog_speed'], origin=zero_position, file_location=output_file,
+                           move_pattern=spec['move_pattern'],
+                           z_move_sleep_time=spec['mesh'].get('z_move_sleep_time', 0.0), roi=spec.get('roi'),
+                           settling_config=spec.get('settling'), recovery_config=spec.get('error_recovery'),
+                           averaging_config=spec.get('averaging'))
+
+
+def connect_printer(routine, printer: ConsolePrinter):
+    """
+    Connects all signals of the routine to the console printer.
+    """
+    routine.signals.update.connect(printer.print_update)
+    routine.signals.log.connect(printer.print_log)
+    routine.signals.progress.connect(printer.print_progress)
+    routine.signals.timing_summary.connect(printer.print_timing)
+    routine.signals.error.connect(printer.print_error)
+    routine.signals.finished.connect(printer.print_finished)
+    return
+
+
+def run_scan(spec: dict, verbose: bool = False, transcript: Transcript = None, replay: bool = False,
+             realtime: bool = False):
+    """
+    Connects chamber and VNA, configures the VNA and runs the measurement routine given by the scan spec.
+
+    :param transcript: records all VISA and HTTP traffic if given, or is replayed instead of chamber and VNA if replay
+    :param realtime: replay with the recorded durations of the transactions instead of as fast as possible
+    :return: True if measurement completed, False otherwise
+    """
+    output_file = prepare_output_file(spec)
+    if output_file is None:
+        return False
+
+    devices = connect_devices(spec, transcript=transcript, replay=replay, realtime=realtime)
+    if devices is None:
+        return False
+    chamber, vna = devices
+
+    routine = build_routine(spec, chamber, vna, output_file)
+    if routine is None:
+        vna.disconnect_pna()
+        return False
+
+    printer = ConsolePrinter(verbose=verbose)
+    connect_printer(routine, printer)
+
+    # Ctrl+C stops the routine at the next point, so the measurement file is still written
+    signal.signal(signal.SIGINT, lambda signum, frame: routine.stop())
+    routine.run()
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    vna.disconnect_pna()
+    return not printer.stopped
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Run an AutoMeasurement or BodyScan without the userinterface.")
+    parser.add_argument('scan_spec', help="path to scan spec json-file, see headless_runner.py doc-string")
+    parser.add_argument('--verbose', action='store_true', help="print per-point messages and timing summaries")
+    transcript_group = parser.add_mutually_exclusive_group()
+    transcript_group.add_argument('--record', metavar='FILE', help="store VISA and HTTP traffic as transcript")
+    transcript_group.add_argument('--replay', metavar='FILE', help="run offline against a recorded transcript")
+    parser.add_argument('--realtime', action='store_true', help="replay with the recorded transaction durations")
+    args = parser.parse_args(argv)
+
+    spec = load_scan_spec(args.scan_spec)
+    if spec is None:
+        return 1
+    transcript = None
+    if args.replay is not None:
+        transcript = Transcript.load(args.replay)
+        if transcript is None:
+            return 1
+    elif args.record is not None:
+        transcript = Transcript()
+    try:
+        success = run_scan(spec, verbose=args.verbose, transcript=transcript, replay=args.replay is not None,
+                           realtime=args.realtime)
+    finally:
+        if args.record is not None:
+            transcript.save(args.record)
+            print(f"Transcript of {len(transcript.entries)} transactions stored in {args.record}")
+    if success is not True:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Measurement routines of the chamber without any Qt dependency.
+
+The loops of AutoMeasurement and BodyScan are implemented here as plain classes. The process controller wraps them in
+QRunnables for the GUI, the headless_runner executes them directly from the command line.
+"""
+
+from .routine_signals import CallbackSignal, RoutineSignals
+from .phase_timer import PhaseTimer, format_timing_summary
+from .auto_measurement import AutoMeasurementRoutine
+from .body_scan import BodyScanRoutine
+from .scan_spec import validate_scan_spec, calc_mesh_vectors, check_move_boundary, configure_vna
+from .job_queue import MeasurementJobQueue
+from .path_planner import MOVE_PATTERNS, AxisCostModel, plan_point_path, plan_auto_measurement_path, \
+    plan_body_scan_columns
+from .dry_run import VnaTimingModel, simulate_scan, format_dry_run_report
+from .adaptive_refinement import ADAPTIVE_DEFAULTS, AdaptiveRefinement, validate_adaptive_config, \
+    fill_point_list_grid, read_point_list_data_array
+from .roi_mask import ROI_SHAPES, validate_roi, calc_roi_mask
+from .continuous_scan import CONTINUOUS_DEFAULTS, resample_continuous_data
+from .settling import SETTLING_DEFAULTS, SettlingDetector
+from .adaptive_averaging import AVERAGING_DEFAULTS, AdaptiveAverager, resolve_averaging_config
+from .error_recovery import RECOVERY_DEFAULTS, RecoveryPolicy, classify_error
+from .segment_sweep import validate_segments, apply_segments, calc_segment_frequencies, get_frequency_vector, \
+    parse_segment_string, format_segment_string
+from .async_scan import ASYNC_SCAN_DEFAULTS, AsyncScanRoutine
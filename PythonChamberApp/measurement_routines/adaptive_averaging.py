@@ -0,0 +1,160 @@
+"""
+Adaptive averaging of the PNA sweeps per point.
+
+With fixed averaging, every point is measured with 'avg_num' sweeps, no matter if it lies in the main beam or deep in
+the sidelobes. The AdaptiveAverager switches the averaging of the PNA off and averages single sweeps on the host
+instead. After each sweep the noise is estimated from the sweep-to-sweep variance and averaging stops as soon as the
+standard uncertainty of the averaged amplitude is below the target [dB] at all frequencies, or the maximum number of
+averages is reached. Points with high signal to noise ratio stop after 'min_averages' sweeps, low-level points keep
+averaging up to 'max_averages' and keep the quality of fixed averaging.
+
+Each sweep is read out from the PNA, so adaptive averaging pays off if the readout is short compared to the sweep
+(narrow IF bandwidth, many averages). The number of averages of every point is stored in the measurement file.
+The averaging of the PNA is switched back on when the routine ends, see restore_pna_average().
+"""
+import numpy as np
+from vna_net_interface import E8361RemoteGPIB
+
+AVERAGING_DEFAULTS = {
+    'target_uncertainty': 0.05,     # unit [dB], standard uncertainty of the averaged amplitude to stop averaging at
+    'min_averages': 2,              # sweeps before the first noise estimate, at least 2
+    'max_averages': None,           # maximum number of sweeps per point, None for 'avg_num' of the PNA configuration
+    'parameter': None,              # S-parameter that is evaluated, None for the first measured parameter
+}
+
+
+def resolve_averaging_config(config: dict, avg_num: int) -> dict:
+    """
+    :param config: adaptive averaging settings, missing keys default to AVERAGING_DEFAULTS
+    :param avg_num: average number of the PNA configuration, maximum number of averages if not given
+    :return: settings with 'min_averages' and 'max_averages' resolved, max_averages >= min_averages >= 2
+    """
+    config = dict(AVERAGING_DEFAULTS, **config)
+    config['min_averages'] = max(2, int(config['min_averages']))
+    if config['max_averages'] is None:
+        config['max_averages'] = avg_num
+    config['max_averages'] = max(config['min_averages'], int(config['max_averages']))
+    return config
+
+
+def calc_amplitude_uncertainty(pointer_sum: np.ndarray, power_sum: np.ndarray, num_sweeps: int) -> np.ndarray:
+    """
+    :param pointer_sum: sum of the complex readings of all sweeps per frequency
+    :param power_sum: sum of the squared magnitudes of the readings of all sweeps per frequency
+    :param num_sweeps: number of summed sweeps, at least 2
+    :return: standard uncertainty [dB] of the averaged amplitude per frequency, inf where the average is zero
+    """
+    mean = pointer_sum / num_sweeps
+    variance = np.maximum(power_sum - num_sweeps * np.abs(mean) ** 2, 0.0) / (num_sweeps - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_error = np.sqrt(variance / num_sweeps) / np.abs(mean)
+    relative_error = np.where(np.isfinite(relative_error), relative_error, np.inf)
+    return 20 * np.log10(1 + relative_error)
+
+
+class AdaptiveAverager:
+    """
+    Triggers and averages single sweeps until the target uncertainty is reached, see module doc-string.
+
+    :param vna: PNA with the measurement already configured
+    :param vna_info: PNA configuration of the measurement
+    :param config: settings, missing keys default to AVERAGING_DEFAULTS
+    """
+    vna: E8361RemoteGPIB = None
+    vna_meas_name: str = None
+    parameters: list = None
+    config: dict = None
+    pna_avg_num: int = 1    # average number of the PNA configuration, restored by restore_pna_average()
+    num_averages: int = 0       # number of averaged sweeps of the last trigger()
+    point_averages: list = None     # [[x, y, z, num_averages], ...] of the measured points in order of measurement
+    __data: dict = None     # averaged data of the last trigger() per parameter, rows [frequency, real, imag]
+
+    def __init__(self, vna: E8361RemoteGPIB, vna_info: dict, config: dict = None):
+        self.vna = vna
+        self.vna_meas_name = vna_info['meas_name']
+        self.parameters = list(vna_info['parameter'])
+        self.pna_avg_num = int(vna_info['avg_num'])
+        self.config = resolve_averaging_config({} if config is None else config, vna_info['avg_num'])
+        if self.config['parameter'] not in self.parameters:
+            self.config['parameter'] = self.parameters[0]
+        self.num_averages = 0
+        self.point_averages = []
+        self.__data = {}
+
+    def trigger(self) -> int:
+        """
+        Measures all parameters with as many sweeps as needed. The averaging of the PNA is switched off if it is on,
+        e.g. after the PNA was reconfigured by the error recovery.
+
+        :return: number of averaged sweeps
+        """
+        meas = self.vna.get_measurement(self.vna_meas_name)
+        if meas is not None and meas.avg_num != 1:
+            self.vna.pna_disable_average(self.vna_meas_name)
+        pointer_sum = {}
+        power_sum = None
+        frequencies = {}
+        num_sweeps = 0
+        while True:
+            self.vna.pna_trigger_measurement(self.vna_meas_name)
+            for parameter in self.parameters:
+                data = np.array(self.vna.pna_read_meas_data(self.vna_meas_name, parameter), dtype=float)
+                pointer = data[:, 1] + 1j * data[:, 2]
+                pointer_sum[parameter] = pointer_sum.get(parameter, 0) + pointer
+                frequencies[parameter] = data[:, 0]
+                if parameter == self.config['parameter']:
+                    power_sum = (0 if power_sum is None else power_sum) + np.abs(pointer) ** 2
+            num_sweeps += 1
+            if num_sweeps >= self.config['max_averages']:
+                break
+            if num_sweeps >= self.config['min_averages']:
+                uncertainty = calc_amplitude_uncertainty(pointer_sum[self.config['parameter']], power_sum, num_sweeps)
+                if np.max(uncertainty) <= self.config['target_uncertainty']:
+                    break
+        self.__data = {}
+        for parameter in self.parameters:
+            mean = pointer_sum[parameter] / num_sweeps
+            self.__data[parameter] = np.column_stack((frequencies[parameter], mean.real, mean.imag))
+        self.num_averages = num_sweeps
+        return num_sweeps
+
+    def restore_pna_average(self):
+        """
+        Switches the averaging of the PNA back on with the average number of the PNA configuration. Must be called
+        when the routine ends, otherwise following measurements with the same configuration (e.g. the next job of the
+        queue) run with one sweep per point.
+        """
+        meas = self.vna.get_measurement(self.vna_meas_name)
+        if meas is not None and self.pna_avg_num > 1 and meas.avg_num != self.pna_avg_num:
+            self.vna.pna_set_average_number(self.vna_meas_name, self.pna_avg_num)
+        return
+
+    def read(self, parameter: str) -> np.ndarray:
+        """
+        :return: averaged data of the last trigger(), rows [frequency, real, imag] like pna_read_meas_data()
+        """
+        return self.__data[parameter]
+
+    def add_point(self, x_coor: float, y_coor: float, z_coor: float):
+        """
+        Records the number of averages of the last trigger() for the measured point.
+        """
+        self.point_averages.append([float(x_coor), float(y_coor), float(z_coor), self.num_averages])
+        return
+
+    def to_json_dict(self) -> dict:
+        """
+        :return: settings and statistics of the number of averages for the measurement file
+        """
+        num_averages = np.array([row[3] for row in self.point_averages]) if len(self.point_averages) > 0 \
+            else np.zeros(1)
+        return dict(self.config, num_points_averaged=len(self.point_averages),
+                    mean_averages=float(np.mean(num_averages)), max_averages_used=int(np.max(num_averages)),
+                    num_points_at_max=int(np.count_nonzero(num_averages >= self.config['max_averages'])))
+
+    def get_point_averages(self) -> dict:
+        """
+        :return: dict {'columns': list[str], 'values': list[list[float]]} with the number of averages of every point,
+            rows in order of measurement, coordinates like the data rows
+        """
+        return {'columns': ['x', 'y', 'z', 'num_averages'], 'values': self.point_averages}
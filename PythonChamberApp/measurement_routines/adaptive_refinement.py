@@ -0,0 +1,462 @@
+"""
+Adaptive mesh refinement of the AutoMeasurement.
+
+Instead of probing every point of the mesh, only a coarse XY-grid (every coarse_step-th point of the mesh, edges
+always included) is measured in each Z-layer first. Each cell of the coarse grid is then rated by the expected error
+of interpolating amplitude [dB] and phase [deg] between its four corners, estimated from the curvature of the field
+along the cell edges (see AdaptiveRefinement.cell_error). Where the expected error exceeds the tolerances, the cell is
+split in four by measuring its edge midpoints and its center. This repeats until all cells are within tolerance, cells reach the mesh spacing or the
+point budget is used up.
+
+All points stay on the mesh, so the measurement file keeps the mesh in its 'measurement_config' and only lists the
+measured points in 'data' ('data_format': 'point_list'). fill_point_list_grid() rebuilds the cells from the measured
+points and interpolates all points in between, so the display of the GUI can show point lists like full meshes.
+
+With a region of interest mask (see roi_mask.py) only points inside of the mask are measured. Cells that reach
+outside of the mask are split down to the mesh spacing, so the measured points follow the outline of the mask.
+
+Cells are given as tuple (z_idx, x0_idx, x1_idx, y0_idx, y1_idx) of indices in the mesh vectors.
+"""
+import numpy as np
+from .path_planner import AxisCostModel, plan_auto_measurement_path, plan_point_path
+from .roi_mask import calc_roi_mask
+from .segment_sweep import get_frequency_vector
+
+ADAPTIVE_DEFAULTS = {
+    'coarse_step': 4,           # take every coarse_step-th mesh point in X and Y for the coarse grid
+    'amp_tolerance': 0.5,       # unit [dB], maximum expected amplitude error of interpolated points
+    'phase_tolerance': 5.0,     # unit [deg], maximum expected phase error of interpolated points
+    'dynamic_range': 40.0,      # unit [dB], amplitudes further below the maximum are treated as noise floor
+    'max_points': None,         # point budget of the whole measurement, None for no limit
+    'parameter': None,          # S-parameter that is evaluated, None for the first measured parameter
+}
+
+
+def validate_adaptive_config(config: dict):
+    """
+    Checks the entries of an adaptive refinement config. Prints the reason if invalid.
+
+    :return: True if valid, False otherwise
+    """
+    unknown_keys = [key for key in config if key not in ADAPTIVE_DEFAULTS]
+    if len(unknown_keys) > 0:
+        print(f"Error - adaptive refinement config has unknown entries: {unknown_keys}")
+        return False
+    coarse_step = config.get('coarse_step', ADAPTIVE_DEFAULTS['coarse_step'])
+    if isinstance(coarse_step, bool) or not isinstance(coarse_step, (int, np.integer)) or coarse_step < 1:
+        print("Error - adaptive refinement 'coarse_step' must be an integer >= 1!")
+        return False
+    for key in ['amp_tolerance', 'phase_tolerance', 'dynamic_range']:
+        if config.get(key, ADAPTIVE_DEFAULTS[key]) <= 0:
+            print(f"Error - adaptive refinement '{key}' must be > 0!")
+            return False
+    max_points = config.get('max_points')
+    if max_points is not None and (not isinstance(max_points, (int, np.integer)) or max_points < 1):
+        print("Error - adaptive refinement 'max_points' must be None or an integer >= 1!")
+        return False
+    return True
+
+
+def coarse_indices(num_steps: int, coarse_step: int) -> np.ndarray:
+    """
+    :return: indices of every coarse_step-th mesh point, the last point of the mesh is always included
+    """
+    indices = np.arange(0, num_steps, max(1, int(coarse_step)))
+    if len(indices) > 0 and indices[-1] != num_steps - 1:
+        indices = np.append(indices, num_steps - 1)
+    return indices
+
+
+def coarse_cells(num_x: int, num_y: int, num_z: int, coarse_step: int) -> list:
+    """
+    :return: list of all cells of the coarse grid in all Z-layers
+    """
+    x_idx = coarse_indices(num_x, coarse_step)
+    y_idx = coarse_indices(num_y, coarse_step)
+    # a single point in X or Y gives cells of zero width in that axis
+    x_bounds = list(zip(x_idx[:-1], x_idx[1:])) if len(x_idx) > 1 else [(x_idx[0], x_idx[0])]
+    y_bounds = list(zip(y_idx[:-1], y_idx[1:])) if len(y_idx) > 1 else [(y_idx[0], y_idx[0])]
+    return [(z, int(x0), int(x1), int(y0), int(y1)) for z in range(num_z) for x0, x1 in x_bounds
+            for y0, y1 in y_bounds]
+
+
+def split_cell(cell: tuple):
+    """
+    Splits a cell at its midpoints. Axes that are at mesh spacing already are not split.
+
+    :return: tuple (sub_cells, nodes) with list of sub cells and list of all (x_idx, y_idx, z_idx) of the split.
+        sub_cells is empty if the cell can not be split any more.
+    """
+    z, x0, x1, y0, y1 = cell
+    x_split = [x0, (x0 + x1) // 2, x1] if x1 - x0 > 1 else [x0, x1]
+    y_split = [y0, (y0 + y1) // 2, y1] if y1 - y0 > 1 else [y0, y1]
+    if len(x_split) == 2 and len(y_split) == 2:
+        return [], []
+    sub_cells = [(z, x_split[i], x_split[i + 1], y_split[j], y_split[j + 1])
+                 for i in range(len(x_split) - 1) for j in range(len(y_split) - 1)]
+    nodes = sorted({(x, y, z) for x in x_split for y in y_split})
+    return sub_cells, nodes
+
+
+def cell_corners(cell: tuple) -> list:
+    """
+    :return: list of the (x_idx, y_idx, z_idx) corners of a cell, duplicates removed for cells of zero width
+    """
+    z, x0, x1, y0, y1 = cell
+    return sorted({(x0, y0, z), (x1, y0, z), (x0, y1, z), (x1, y1, z)})
+
+
+def cell_in_mask(cell: tuple, mask: np.ndarray) -> bool:
+    """
+    :return: True if any point of the cell is inside of the mask
+    """
+    z, x0, x1, y0, y1 = cell
+    return bool(np.any(mask[x0:x1 + 1, y0:y1 + 1, z]))
+
+
+class AdaptiveRefinement:
+    """
+    Decides which points of the mesh are measured by an adaptive AutoMeasurement.
+    The routine measures coarse_path() first, hands every measured point to add_measurement() and asks for
+    next_path() whenever all planned points are measured. The measurement is done when no more points are returned.
+    """
+    x_vec: np.ndarray = None
+    y_vec: np.ndarray = None
+    z_vec: np.ndarray = None
+    config: dict = None
+    parameter: str = None
+    num_points_planned: int = 0
+    refinement_round: int = 0
+    max_phase_step: float = 90.0    # unit [deg], larger phase steps between two points can not be interpolated
+    mask: np.ndarray = None     # bool array of shape (len(x_vec), len(y_vec), len(z_vec)), True for points to measure
+    __values: dict = None   # {(x_idx, y_idx, z_idx): complex np.ndarray over frequency}
+    __planned: set = None   # all nodes that were handed to the routine so far
+    __cells: list = None    # current leaf cells that may still be split
+
+    def __init__(self, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, config: dict = None,
+                 mask: np.ndarray = None):
+        self.x_vec = np.array(x_vec, dtype=float)
+        self.y_vec = np.array(y_vec, dtype=float)
+        self.z_vec = np.array(z_vec, dtype=float)
+        if mask is None:
+            mask = np.ones((len(self.x_vec), len(self.y_vec), len(self.z_vec)), dtype=bool)
+        self.mask = np.array(mask, dtype=bool)
+        self.config = dict(ADAPTIVE_DEFAULTS)
+        if config is not None:
+            self.config.update(config)
+        self.parameter = self.config['parameter']
+        self.__values = {}
+        self.__planned = set()
+        self.__cells = [cell for cell in coarse_cells(len(self.x_vec), len(self.y_vec), len(self.z_vec),
+                                                      self.config['coarse_step']) if cell_in_mask(cell, self.mask)]
+
+    def coarse_path(self, move_pattern: str, cost_model: AxisCostModel = None) -> np.ndarray:
+        """
+        Plans the coarse grid of all Z-layers with the move pattern of the measurement (see path_planner.py).
+
+        :return: array of shape (num_points, 3) in visiting order in chamber coordinates [mm]
+        """
+        x_idx = coarse_indices(len(self.x_vec), self.config['coarse_step'])
+        y_idx = coarse_indices(len(self.y_vec), self.config['coarse_step'])
+        self.__planned.update((int(x), int(y), z) for z in range(len(self.z_vec)) for y in y_idx for x in x_idx
+                              if self.mask[x, y, z])
+        self.num_points_planned = len(self.__planned)
+        return plan_auto_measurement_path(self.x_vec[x_idx], self.y_vec[y_idx], self.z_vec, move_pattern, cost_model,
+                                          self.mask[np.ix_(x_idx, y_idx)])
+
+    def next_path(self, cost_model: AxisCostModel, start: np.ndarray = None) -> np.ndarray:
+        """
+        next_points() in the order of the shortest travel time, starting close to start.
+
+        :return: array of shape (num_points, 3) in visiting order in chamber coordinates [mm], empty if finished
+        """
+        return plan_point_path(self.next_points(), cost_model, start)
+
+    def add_measurement(self, x_coor: float, y_coor: float, z_coor: float, pointer: np.ndarray):
+        """
+        Stores the complex values of the evaluated parameter of one measured point in chamber coordinates [mm].
+        """
+        node = (int(np.argmin(np.abs(self.x_vec - x_coor))), int(np.argmin(np.abs(self.y_vec - y_coor))),
+                int(np.argmin(np.abs(self.z_vec - z_coor))))
+        self.__values[node] = np.array(pointer, dtype=complex)
+        return
+
+    def next_points(self) -> np.ndarray:
+        """
+        Evaluates all cells whose corners are measured and splits those out of tolerance, worst cells first,
+        as long as the point budget allows it. Cells with corners outside of the mask are always split.
+
+        :return: array of shape (num_points, 3) of the points to measure next in chamber coordinates [mm],
+            empty if the refinement is finished
+        """
+        floor_db = self.__noise_floor_db()
+        rated_cells = []
+        open_cells = []     # cells with unmeasured corners are kept for the next call
+        for cell in self.__cells:
+            corners = cell_corners(cell)
+            if not all(corner in self.__values or not self.mask[corner] for corner in corners):
+                open_cells.append(cell)
+            elif not all(self.mask[corner] for corner in corners):
+                rated_cells.append((np.inf, cell))
+            else:
+                rated_cells.append((self.cell_error(cell, floor_db), cell))
+        rated_cells.sort(key=lambda rated_cell: rated_cell[0], reverse=True)
+
+        new_nodes = []
+        new_node_set = set()
+        new_cells = []
+        for error, cell in rated_cells:
+            if error <= 1.0:
+                continue
+            sub_cells, nodes = split_cell(cell)
+            nodes = [node for node in nodes if self.mask[node] and node not in self.__planned and
+                     node not in new_node_set]
+            sub_cells = [sub_cell for sub_cell in sub_cells if cell_in_mask(sub_cell, self.mask)]
+            if len(sub_cells) == 0:
+                continue
+            if self.config['max_points'] is not None and \
+                    self.num_points_planned + len(new_nodes) + len(nodes) > self.config['max_points']:
+                continue
+            new_nodes += nodes
+            new_node_set.update(nodes)
+            new_cells += sub_cells
+        self.__cells = open_cells + new_cells
+        if len(new_nodes) > 0:
+            self.refinement_round += 1
+        return self.__plan_nodes(new_nodes)
+
+    def cell_error(self, cell: tuple, floor_db: np.ndarray) -> float:
+        """
+        Rates a cell by the expected error of interpolating between its corners. Along each cell edge the second
+        difference of amplitude [dB] and phase [deg] with the next measured point behind each end of the edge gives
+        the curvature, the maximum error of linear interpolation is 1/8 of it times the squared edge length. The next
+        measured point may lie at any distance, e.g. after uneven splits or at the remainder cell of the mesh edge.
+        Inside of the cell the errors of both axes add up, so the worst edge of X and the worst edge of Y are summed.
+        Edges longer than the mesh spacing without any measured point behind them can not be rated and are out of
+        tolerance. Phase steps above max_phase_step between two corners can not be interpolated reliably and are
+        always out of tolerance.
+        Amplitudes are clipped at the noise floor, phase is only rated where all points are above the noise floor.
+
+        :return: max(amplitude error / amp_tolerance, phase error / phase_tolerance), > 1 means out of tolerance
+        """
+        z, x0, x1, y0, y1 = cell
+        edges = []  # (node_a, node_b, axis) of each edge of the cell
+        if x1 > x0:
+            edges += [((x0, y, z), (x1, y, z), 0) for y in sorted({y0, y1})]
+        if y1 > y0:
+            edges += [((x, y0, z), (x, y1, z), 1) for x in sorted({x0, x1})]
+
+        error = 0.0
+        amp_error = [0.0, 0.0]      # unit [dB], worst expected amplitude error of the X- and Y-edges
+        phase_error = [0.0, 0.0]    # unit [deg], worst expected phase error of the X- and Y-edges
+        for node_a, node_b, axis in edges:
+            phase_step, above_floor = self.__phase_step(node_a, node_b, floor_db)
+            if np.any(above_floor):
+                error = max(error, np.max(np.abs(phase_step[above_floor])) / self.max_phase_step)
+            # curvature with the next measured point behind each end of the edge, points in order p - q - r
+            edge_length = node_b[axis] - node_a[axis]
+            edge_rated = False
+            for p, q, r in [(self.__next_measured(node_a, axis, -1), node_a, node_b),
+                            (node_a, node_b, self.__next_measured(node_b, axis, 1))]:
+                if p is None or r is None:
+                    continue
+                edge_rated = True
+                # second difference of unevenly spaced points, scaled to the error of linear interpolation
+                dist_pq = q[axis] - p[axis]
+                dist_qr = r[axis] - q[axis]
+                scale = edge_length ** 2 / 8 * 2 / (dist_pq + dist_qr)
+                amp_q = self.__amp_db(q, floor_db)
+                amp_curvature = (self.__amp_db(r, floor_db) - amp_q) / dist_qr - \
+                    (amp_q - self.__amp_db(p, floor_db)) / dist_pq
+                amp_error[axis] = max(amp_error[axis], scale * np.max(np.abs(amp_curvature)))
+                phase_step_pq, above_floor_pq = self.__phase_step(p, q, floor_db)
+                phase_step_qr, above_floor_qr = self.__phase_step(q, r, floor_db)
+                rated = above_floor_pq & above_floor_qr
+                if np.any(rated):
+                    phase_curvature = phase_step_qr[rated] / dist_qr - phase_step_pq[rated] / dist_pq
+                    phase_error[axis] = max(phase_error[axis], scale * np.max(np.abs(phase_curvature)))
+            if not edge_rated and edge_length > 1:
+                return float(np.inf)
+        return float(max(error, sum(amp_error) / self.config['amp_tolerance'],
+                         sum(phase_error) / self.config['phase_tolerance']))
+
+    def to_json_dict(self) -> dict:
+        """
+        :return: refinement settings for the 'measurement_config' of the measurement file
+        """
+        return {'coarse_step': int(self.config['coarse_step']),
+                'amp_tolerance': float(self.config['amp_tolerance']),
+                'phase_tolerance': float(self.config['phase_tolerance']),
+                'dynamic_range': float(self.config['dynamic_range']),
+                'max_points': self.config['max_points'],
+                'parameter': self.parameter,
+                'refinement_rounds': self.refinement_round,
+                'num_points_measured': len(self.__values)}
+
+    def __amp_db(self, node: tuple, floor_db: np.ndarray) -> np.ndarray:
+        """
+        :return: amplitude of a measured node in [dB] over frequency, clipped at the noise floor
+        """
+        return np.maximum(20 * np.log10(np.maximum(np.abs(self.__values[node]), 1e-15)), floor_db)
+
+    def __phase_step(self, node_a: tuple, node_b: tuple, floor_db: np.ndarray):
+        """
+        :return: tuple (wrapped phase step from node_a to node_b over frequency [deg],
+            bool array of frequencies where both nodes are above the noise floor)
+        """
+        phase_step = np.degrees(np.angle(self.__values[node_b] * np.conj(self.__values[node_a])))
+        return phase_step, (self.__amp_db(node_a, floor_db) > floor_db) & (self.__amp_db(node_b, floor_db) > floor_db)
+
+    def __next_measured(self, node: tuple, axis: int, direction: int):
+        """
+        :return: closest measured node behind node in direction (+1 / -1) along axis (0 for X, 1 for Y), None if none
+        """
+        num_steps = len(self.x_vec) if axis == 0 else len(self.y_vec)
+        other = list(node)
+        for idx in range(node[axis] + direction, num_steps if direction > 0 else -1, direction):
+            other[axis] = idx
+            if tuple(other) in self.__values:
+                return tuple(other)
+        return None
+
+    def __noise_floor_db(self) -> np.ndarray:
+        """
+        :return: noise floor per frequency [dB], dynamic_range below the maximum of all measured points
+        """
+        if len(self.__values) == 0:
+            return np.array(-np.inf)
+        max_amplitude = np.max(np.abs(np.array(list(self.__values.values()))), axis=0)
+        return 20 * np.log10(np.maximum(max_amplitude, 1e-15)) - self.config['dynamic_range']
+
+    def __plan_nodes(self, nodes: list) -> np.ndarray:
+        """
+        Marks nodes as planned and converts them to chamber coordinates [mm].
+        """
+        self.__planned.update(nodes)
+        self.num_points_planned = len(self.__planned)
+        if len(nodes) == 0:
+            return np.zeros((0, 3))
+        nodes = np.array(nodes, dtype=int)
+        return np.column_stack((self.x_vec[nodes[:, 0]], self.y_vec[nodes[:, 1]], self.z_vec[nodes[:, 2]]))
+
+
+def fill_point_list_grid(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, indices: np.ndarray,
+                         values: np.ndarray, coarse_step: int, mask: np.ndarray = None) -> np.ndarray:
+    """
+    Rebuilds the full mesh from the measured points of an adaptive measurement. Cells are split again wherever all
+    points of the split were measured, all remaining points of a cell are bilinear interpolated between its corners
+    in amplitude [dB] and phase.
+    Points of cells with unmeasured corners (stopped measurement) and points outside of the mask stay zero.
+    Measurements of all points (coarse_step 1) are only sorted into the grid.
+
+    :param mask: optional region of interest mask of the measurement, points outside of it are not expected to be
+        measured
+
+    :param indices: array of shape (num_points, 3) with the (x_idx, y_idx, z_idx) of all measured points
+    :param values: complex array of shape (num_points, ...) with the measured values of each point
+    :return: complex array of shape (len(x_vec), len(y_vec), len(z_vec), ...)
+    """
+    x_vec = np.asarray(x_vec, dtype=float)
+    y_vec = np.asarray(y_vec, dtype=float)
+    values = np.asarray(values, dtype=complex)
+    indices = np.asarray(indices, dtype=int).reshape(-1, 3)
+    grid = np.zeros((len(x_vec), len(y_vec), len(z_vec)) + values.shape[1:], dtype=complex)
+    measured = np.zeros((len(x_vec), len(y_vec), len(z_vec)), dtype=bool)
+    grid[indices[:, 0], indices[:, 1], indices[:, 2]] = values
+    measured[indices[:, 0], indices[:, 1], indices[:, 2]] = True
+    if mask is None:
+        mask = np.ones(measured.shape, dtype=bool)
+    if coarse_step <= 1:
+        return grid
+
+    cells = [cell for cell in coarse_cells(len(x_vec), len(y_vec), len(z_vec), coarse_step)
+             if cell_in_mask(cell, mask)]
+    while len(cells) > 0:
+        cell = cells.pop()
+        sub_cells, nodes = split_cell(cell)
+        sub_cells = [sub_cell for sub_cell in sub_cells if cell_in_mask(sub_cell, mask)]
+        if len(sub_cells) > 0 and all(measured[node] or not mask[node] for node in nodes):
+            cells += sub_cells
+            continue
+        if not all(measured[corner] for corner in cell_corners(cell)):
+            continue
+        z, x0, x1, y0, y1 = cell
+        # relative position of each mesh point in the cell, zero for cells of zero width
+        tx = (x_vec[x0:x1 + 1] - x_vec[x0]) / (x_vec[x1] - x_vec[x0]) if x1 > x0 else np.zeros(1)
+        ty = (y_vec[y0:y1 + 1] - y_vec[y0]) / (y_vec[y1] - y_vec[y0]) if y1 > y0 else np.zeros(1)
+        tx = tx.reshape((-1, 1) + (1,) * (values.ndim - 1))
+        ty = ty.reshape((1, -1) + (1,) * (values.ndim - 1))
+        weights = [(1 - tx) * (1 - ty), tx * (1 - ty), (1 - tx) * ty, tx * ty]
+        corners = [grid[x0, y0, z], grid[x1, y0, z], grid[x0, y1, z], grid[x1, y1, z]]
+        # amplitude is interpolated in [dB], phase as offset to the first corner, like cell_error() rates the cells
+        amplitude_db = sum(weight * 20 * np.log10(np.maximum(np.abs(corner), 1e-15))
+                           for weight, corner in zip(weights, corners))
+        phase = sum(weight * np.angle(corner * np.conj(corners[0])) for weight, corner in zip(weights, corners))
+        interpolated = 10 ** (amplitude_db / 20) * np.exp(1j * (np.angle(corners[0]) + phase))
+        cell_filled = measured[x0:x1 + 1, y0:y1 + 1, z] | ~mask[x0:x1 + 1, y0:y1 + 1, z]
+        grid[x0:x1 + 1, y0:y1 + 1, z][~cell_filled] = interpolated[~cell_filled]
+    return grid
+
+
+def read_point_list_data_array(measurement_config: dict, data: list) -> np.ndarray:
+    """
+    Converts the 'data' of a measurement file with 'data_format': 'point_list' to the data array of the display,
+    see display_measurement_read_file() of the ProcessController. Used for adaptive measurements and measurements
+    with region of interest mask ('roi'), points outside of the mask are zero.
+
+    :return: np.ndarray of shape (2, num_parameter, sweep_num_points, mesh_x_steps, mesh_y_steps, mesh_z_steps),
+        first index 0 for amplitude and 1 for phase [deg]
+    """
+    shape = [measurement_config['mesh_x_steps'], measurement_config['mesh_y_steps'],
+             measurement_config['mesh_z_steps']]
+    num_parameter = len(measurement_config['parameter'])
+    num_freq = measurement_config['sweep_num_points']
+    data_array = np.zeros([2, num_parameter, num_freq] + shape)
+    rows = np.array(data, dtype=float).reshape(-1, 4 + 2 * num_parameter)
+    if len(rows) == 0:
+        return data_array
+
+    # data rows are relative to zero position, mesh is given in chamber coordinates
+    idx = []
+    for axis, coor in enumerate('xyz'):
+        axis_min = measurement_config[f'mesh_{coor}_min'] - measurement_config['zero_position'][axis]
+        axis_max = measurement_config[f'mesh_{coor}_max'] - measurement_config['zero_position'][axis]
+        idx.append(_linspace_index(rows[:, axis], axis_min, axis_max, shape[axis]))
+    f_idx = _nearest_index(rows[:, 3], get_frequency_vector(measurement_config))
+    point_keys, inverse = np.unique(np.ravel_multi_index(idx, shape), return_inverse=True)
+    values = np.zeros((len(point_keys), num_parameter, num_freq), dtype=complex)
+    for parameter_idx in range(num_parameter):
+        values[inverse, parameter_idx, f_idx] = rows[:, 4 + 2 * parameter_idx] * \
+            np.exp(1j * np.radians(rows[:, 5 + 2 * parameter_idx]))
+
+    x_vec = np.linspace(measurement_config['mesh_x_min'], measurement_config['mesh_x_max'], shape[0])
+    y_vec = np.linspace(measurement_config['mesh_y_min'], measurement_config['mesh_y_max'], shape[1])
+    z_vec = np.linspace(measurement_config['mesh_z_min'], measurement_config['mesh_z_max'], shape[2])
+    mask = None
+    if measurement_config.get('roi') is not None:
+        mask = calc_roi_mask(x_vec, y_vec, z_vec, measurement_config['roi'], measurement_config['zero_position'])
+    grid = fill_point_list_grid(x_vec, y_vec, z_vec, np.column_stack(np.unravel_index(point_keys, shape)), values,
+                                measurement_config.get('adaptive_refinement', {}).get('coarse_step', 1), mask)
+    grid = np.moveaxis(grid, [3, 4], [0, 1])
+    data_array[0] = np.abs(grid)
+    data_array[1] = np.degrees(np.angle(grid))
+    return data_array
+
+
+def _nearest_index(values: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """
+    :return: index of the closest point of the ascending vector for each value
+    """
+    if len(vector) < 2:
+        return np.zeros(len(values), dtype=int)
+    idx = np.clip(np.searchsorted(vector, values), 1, len(vector) - 1)
+    return np.where(np.abs(values - vector[idx - 1]) <= np.abs(vector[idx] - values), idx - 1, idx).astype(int)
+
+
+def _linspace_index(values: np.ndarray, start: float, stop: float, num: int) -> np.ndarray:
+    """
+    :return: index of the closest point of np.linspace(start, stop, num) for each value
+    """
+    if num < 2 or stop == start:
+        return np.zeros(len(values), dtype=int)
+    return np.clip(np.round((values - start) / (stop - start) * (num - 1)), 0, num - 1).astype(int)
@@ -0,0 +1,233 @@
+"""
+Asyncio variant of the AutoMeasurement loop.
+
+The AsyncScanRoutine splits every point in the stages move, trigger and readout, each is a coroutine with its own
+timeout (see ASYNC_SCAN_DEFAULTS). Since the sweep of a point is finished before its data is read, the readout and
+storage of point i run concurrently with the move to point i+1 (asyncio.gather), the PNA only waits for the chamber if
+the move takes longer than the readout:
+
+    move(0) > trigger(0) > [move(1) | readout(0)] > trigger(1) > [move(2) | readout(1)] > ...
+
+The chamber and the PNA are reached by the asyncio clients AsyncChamberNetworkCommands and AsyncE8361RemoteGPIB, so
+several rigs are scanned from one event loop without a thread per device:
+
+    routines = [AsyncScanRoutine(chamber, vna, ...) for chamber, vna in rigs]
+    results = await asyncio.gather(*[routine.run() for routine in routines])
+
+The routine assumes that the PNA is configured (see configure_vna() in scan_spec.py) and the chamber is connected and
+homed. The measurement file has the same format as the one of the AutoMeasurementRoutine, the durations of the stages
+are stored in 'async_scan' of the measurement_config. A failed or timed out stage stops the scan, the points measured
+so far are written to the file. Adaptive refinement, roi, continuous scanning, adaptive averaging and the error
+recovery of the AutoMeasurementRoutine are not supported.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .routine_signals import RoutineSignals
+from .path_planner import AxisCostModel, plan_auto_measurement_path
+from .segment_sweep import get_frequency_vector
+
+ASYNC_SCAN_DEFAULTS = {
+    'move_timeout': 120.0,      # unit [s], maximum duration of the move to one point incl. waiting for the flag
+    'sweep_timeout': 60.0,      # unit [s], maximum duration of the trigger incl. all averages of one point
+    'readout_timeout': 30.0,    # unit [s], maximum duration of reading all parameters of one point
+}
+
+
+class AsyncScanRoutine:
+    """
+    See module doc-string. The chamber and the vna must be the asyncio clients, e.g. AsyncChamberNetworkCommands and
+    AsyncE8361RemoteGPIB, all other arguments are the same as of the AutoMeasurementRoutine.
+    It emits the signals of the AutoMeasurementRoutine, if no signals object is given, RoutineSignals are used.
+
+    :param scan_config: timeouts of the stages, missing keys default to ASYNC_SCAN_DEFAULTS
+    """
+    chamber = None
+    vna = None
+    signals: RoutineSignals = None
+    _is_running: bool = None
+    vna_meas_name: str = None
+    parameters: list = None     # measured S-parameters in order of the data columns, S11 > S12 > S22
+    config: dict = None
+
+    chamber_mov_speed: float = 0  # unit [mm/s]
+    zero_position: tuple[float, ...] = None
+    move_pattern: str = None
+    scan_path: np.ndarray = None    # shape (num_points, 3), XYZ-coordinates in the order they are measured
+    file_location: str = None
+    json_format_readable: bool = None
+    json_data_storage: dict = None
+    stage_times: dict = None    # unit [s], summed durations of the stages 'move', 'trigger' and 'readout'
+
+    def __init__(self, chamber, vna, vna_info: dict, x_vec: tuple[float, ...], y_vec: tuple[float, ...],
+                 z_vec: tuple[float, ...], mov_speed: float, zero_position: tuple[float, ...], file_location: str,
+                 move_pattern: str, file_type_json_readable: bool = True, signals=None, scan_path: np.ndarray = None,
+                 scan_config: dict = None):
+        if signals is None:
+            signals = RoutineSignals()
+        self.signals = signals
+        self.chamber = chamber
+        self.vna = vna
+        self.vna_meas_name = vna_info['meas_name']
+        self.parameters = [parameter for parameter in ('S11', 'S12', 'S22') if parameter in vna_info['parameter']]
+        self.config = dict(ASYNC_SCAN_DEFAULTS, **(scan_config or {}))
+        self.chamber_mov_speed = mov_speed
+        self.zero_position = zero_position
+        self.move_pattern = move_pattern
+        if scan_path is None:
+            scan_path = plan_auto_measurement_path(np.array(x_vec, dtype=float), np.array(y_vec, dtype=float),
+                                                   np.array(z_vec, dtype=float), move_pattern,
+                                                   AxisCostModel(mov_speed))
+        self.scan_path = np.array(scan_path, dtype=float)
+        self.file_location = file_location + '.json'
+        self.json_format_readable = file_type_json_readable
+        self.stage_times = {'move': 0.0, 'trigger': 0.0, 'readout': 0.0}
+
+        measurement_config = {
+            'type':             'Auto Measurement Data JSON',
+            'timestamp':        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'zero_position':    zero_position,
+            'move_pattern':     move_pattern,
+            'mesh_x_min':       x_vec[0],  # [mm]
+            'mesh_x_max':       x_vec[-1],  # [mm]
+            'mesh_x_steps':     len(x_vec),
+            'mesh_y_min':       y_vec[0],  # [mm]
+            'mesh_y_max':       y_vec[-1],  # [mm]
+            'mesh_y_steps':     len(y_vec),
+            'mesh_z_min':       z_vec[0],  # [mm]
+            'mesh_z_max':       z_vec[-1],  # [mm]
+            'mesh_z_steps':     len(z_vec),
+            'movespeed':        mov_speed,  # [mm/s]
+            'parameter':        self.parameters,
+            'freq_start':       vna_info['freq_start'],  # [Hz]
+            'freq_stop':        vna_info['freq_stop'],  # [Hz]
+            'sweep_num_points': vna_info['sweep_num_points'],
+            'if_bw':            vna_info['if_bw'],  # [Hz]
+            'output_power':     vna_info['output_power'],  # [dBm]
+            'average_number':   vna_info['avg_num'],
+        }
+        if vna_info.get('segments'):
+            measurement_config['segments'] = vna_info['segments']
+            measurement_config['frequencies'] = get_frequency_vector(vna_info).tolist()
+        self.json_data_storage = {'measurement_config': measurement_config, 'data': []}
+
+    async def run(self) -> dict:
+        """
+        Scans all points of the scan path and writes the measurement file.
+
+        :return: dict {'file_location': str, 'stopped': bool, 'duration': str}, same as the finished signal
+        """
+        self._is_running = True
+        self.signals.update.emit("Started the AsyncScan")
+        total_num_of_points = len(self.scan_path)
+        progress_dict = {
+            'total_points_in_measurement': total_num_of_points,
+            'num_of_layers_in_measurement': len(np.unique(self.scan_path[:, 2])),
+            'status_flag': "Measurement running ...",
+            'time_to_go': 'N/A',
+        }
+        meas_start = time.perf_counter()
+        stopped = False
+        try:
+            if total_num_of_points > 0:
+                await self.__move(self.scan_path[0])
+            for point_idx in range(total_num_of_points):
+                if self._is_running is False:
+                    self.signals.error.emit({'error_code': 0, 'error_msg': "AsyncScan was stopped by user."})
+                    stopped = True
+                    break
+                await self.__trigger()
+                # readout of this point and move to the next one share the time
+                stages = [asyncio.ensure_future(self.__readout(self.scan_path[point_idx]))]
+                if point_idx + 1 < total_num_of_points:
+                    stages.append(asyncio.ensure_future(self.__move(self.scan_path[point_idx + 1])))
+                try:
+                    await asyncio.gather(*stages)
+                except BaseException:
+                    for stage in stages:
+                        stage.cancel()
+                    raise
+
+                elapsed = time.perf_counter() - meas_start
+                progress_dict['total_current_point_number'] = point_idx + 1
+                progress_dict['time_to_go'] = round(elapsed / (point_idx + 1) * (total_num_of_points - point_idx - 1))
+                self.signals.progress.emit(progress_dict)
+        except Exception as e:
+            error_msg = f"AsyncScan failed at point {progress_dict.get('total_current_point_number', 0) + 1}: {e!r}"
+            self.signals.error.emit({'error_code': -1, 'error_msg': error_msg})
+            self.signals.update.emit(error_msg)
+            stopped = True
+
+        duration = time.perf_counter() - meas_start
+        progress_dict['status_flag'] = "Measurement stopped" if stopped else "Measurement finished"
+        self.signals.progress.emit(progress_dict)
+        self.json_data_storage['measurement_config']['duration'] = str(timedelta(seconds=duration))
+        self.json_data_storage['measurement_config']['async_scan'] = dict(
+            self.config, num_points=progress_dict.get('total_current_point_number', 0),
+            **{stage + '_time': round(stage_time, 3) for stage, stage_time in self.stage_times.items()},
+            overlap_time=round(max(sum(self.stage_times.values()) - duration, 0.0), 3))
+        await asyncio.to_thread(self.__write_file)
+        self.signals.update.emit("AsyncScan is completed!" if not stopped else "AsyncScan was interrupted")
+
+        result = {'file_location': "\n< " + self.file_location + ">\n", 'stopped': stopped,
+                  'duration': str(timedelta(seconds=round(duration)))}
+        self.signals.finished.emit(result)
+        return result
+
+    def stop(self):
+        """
+        Stops the scan before the next point, the points measured so far are written to the file.
+        """
+        self._is_running = False
+
+    async def __move(self, position: np.ndarray):
+        start = time.perf_counter()
+        x_coor, y_coor, z_coor = (float(coor) for coor in position)
+        await asyncio.wait_for(self.chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=z_coor,
+                                                            speed=self.chamber_mov_speed),
+                               self.config['move_timeout'])
+        self.stage_times['move'] += time.perf_counter() - start
+        self.signals.position_update.emit({'abs_x': x_coor, 'abs_y': y_coor, 'abs_z': z_coor})
+        return
+
+    async def __trigger(self):
+        start = time.perf_counter()
+        success = await asyncio.wait_for(self.vna.pna_trigger_measurement(self.vna_meas_name),
+                                         self.config['sweep_timeout'])
+        if success is False:
+            raise RuntimeError(f"Trigger of measurement {self.vna_meas_name} failed")
+        self.stage_times['trigger'] += time.perf_counter() - start
+        return
+
+    async def __readout(self, position: np.ndarray):
+        """
+        Reads all parameters of the point at position and appends its rows to the data of the measurement file.
+        """
+        start = time.perf_counter()
+        x_coor, y_coor, z_coor = (float(position[i] - self.zero_position[i]) for i in range(3))
+        columns = []
+        frequencies = None
+        for parameter in self.parameters:
+            data = await asyncio.wait_for(self.vna.pna_read_meas_data(self.vna_meas_name, parameter),
+                                          self.config['readout_timeout'])
+            data = np.array(data, dtype=float)
+            pointer = data[:, 1] + 1j * data[:, 2]
+            columns += [np.abs(pointer), np.degrees(np.angle(pointer))]
+            frequencies = data[:, 0]
+        for f_idx in range(len(frequencies)):
+            self.json_data_storage['data'].append([x_coor, y_coor, z_coor, float(frequencies[f_idx])] +
+                                                  [float(column[f_idx]) for column in columns])
+        self.stage_times['readout'] += time.perf_counter() - start
+        return
+
+    def __write_file(self):
+        # same order as the AutoMeasurementRoutine, independent of the move pattern
+        self.json_data_storage['data'] = sorted(self.json_data_storage['data'],
+                                                key=lambda row: (row[2], row[1], row[0], row[3]))
+        with open(self.file_location, 'w') as file:
+            file.write(json.dumps(self.json_data_storage, indent=4 if self.json_format_readable else None))
+        return
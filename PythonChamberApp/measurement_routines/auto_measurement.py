@@ -0,0 +1,887 @@
+import time
+import logging
+
+from chamber_net_interface import ChamberNetworkCommands
+from vna_net_interface import E8361RemoteGPIB
+from datetime import datetime, timedelta
+import json
+import os
+import numpy as np
+from .phase_timer import PhaseTimer
+from .routine_signals import RoutineSignals
+from .path_planner import AxisCostModel, plan_auto_measurement_path
+from .adaptive_refinement import AdaptiveRefinement
+from .roi_mask import calc_roi_mask
+from .error_recovery import RecoveryPolicy
+from .adaptive_averaging import AdaptiveAverager
+from .segment_sweep import get_frequency_vector
+from .continuous_scan import CONTINUOUS_DEFAULTS, plan_continuous_lines, calc_line_speed, calc_run_up, \
+    calc_line_endpoints, tag_sweep_positions, resample_line, resample_continuous_data
+
+
+class AutoMeasurementRoutine:
+    """
+    The AutoMeasurementRoutine class implements the measurement loop of an auto measurement without Qt dependency.
+    In the GUI it is run by the AutoMeasurement QRunnable of the process controller, headless by the headless_runner.
+    It gets handed the chamber object and the VNA object to reach them via network and GPIB adapter.
+    The defined measurement-mesh configuration and VNA configuration are stored in the saved results
+    (json-) file of the routine.
+
+    The routine assumes that the VNA is already set up and the chamber is connected and ready to move!
+    Making this sure is task of the method that starts the AutoMeasurement.
+
+    If an adaptive_config is given, only a coarse grid of the mesh is planned and refined where the measured field
+    needs it (see adaptive_refinement.py). If a roi (region of interest) is given, only the points of the mesh inside
+    of it are measured (see roi_mask.py). In both cases the measurement file lists the measured points only.
+    If a continuous_config is given, each X-line is measured on-the-fly while the chamber moves (see continuous_scan.py).
+    If an averaging_config is given, each point is averaged until the measured noise meets the target uncertainty
+    instead of a fixed number of sweeps (see adaptive_averaging.py).
+
+    It emits signals to enable monitoring and display in the GUI.
+    Those are defined in 'AutoMeasurementSignals' class. If no signals object is given, RoutineSignals are used.
+
+    It is interruptable at specific points by calling the AutoMeasurement.stop() method of the object.
+
+    Errors while measuring a point are recovered by a RecoveryPolicy with the optional recovery_config (see
+    error_recovery.py). The routine stops itself if the retry budget of the policy is exhausted.
+    """
+
+    # Properties
+    chamber: ChamberNetworkCommands = None
+    signals: RoutineSignals = None
+    _is_running: bool = None
+    vna: E8361RemoteGPIB = None
+    vna_info_buffer: dict = None
+    vna_meas_name: str = None
+
+    mesh_x_vector: np.ndarray = None
+    mesh_y_vector: np.ndarray = None
+    mesh_z_vector: np.ndarray = None
+    chamber_mov_speed: float = 0  # unit [mm/s], see jog command doc-string!
+    zero_position: tuple[float, ...] = [0, 0, 0]  # zero position must be known to write relative antenna coordinates to meas file
+    move_pattern: str = None    # 'line-by-line', 'snake' or 'optimized', see path_planner.py
+    scan_path: np.ndarray = None    # shape (num_points, 3), XYZ-coordinates in the order they are measured
+    refinement: AdaptiveRefinement = None   # only set for adaptive measurements, extends scan_path while running
+    roi_mask: np.ndarray = None     # only set for measurements with region of interest, True for points to measure
+    continuous: dict = None     # only set for continuous measurements, settings see CONTINUOUS_DEFAULTS
+    averaging: AdaptiveAverager = None  # only set for adaptive averaging, replaces the fixed averaging of the PNA
+
+    store_as_json: bool = None
+    measurement_file_json = None
+    json_format_readable: bool = None
+    json_data_storage: dict = None
+    json_S11: dict = None
+    json_S12: dict = None
+    json_S22: dict = None
+
+    # live view of measured field, see field_update signal
+    live_view_parameter: str = None
+    live_view_freq_idx: int = 0
+    live_view_min_interval: float = 0.5     # unit [s], minimum time between two field_update emits
+    __live_view_buffer: dict = None     # points measured since last field_update emit
+    __live_view_last_emit: float = 0
+
+    average_time_per_point: float = 0  # unit [s], calculated from all points that were measured so far
+    phase_timer: PhaseTimer = None  # durations of the phases of each point, stored in measurement file
+    measurement_iteration_success: bool = False     # flag to indicate if measurement done and to redo measurement if error occured (in Try-block)
+    error_log_path: str = None
+    recovery: RecoveryPolicy = None     # classifies errors of the measurement loop and recovers PNA / chamber
+    stop_reason: str = None     # set if the routine stops itself, e.g. when the retry budget is exhausted
+    vna_state: dict = None      # snapshot of the configured PNA for the 'state_recall' tier of the error recovery
+    __continuous_start_delays: list = None   # calibrated start delays of all lines so far [s]
+    __continuous_num_sweeps: int = 0
+
+    def __init__(self, chamber: ChamberNetworkCommands, vna: E8361RemoteGPIB, vna_info: dict, x_vec: tuple[float, ...],
+                 y_vec: tuple[float, ...], z_vec: tuple[float, ...], mov_speed: float, zero_position: tuple[float, ...],
+                 file_location: str, move_pattern:str, file_type_json: bool = True, file_type_json_readable: bool = True,
+                 signals=None, scan_path: np.ndarray = None, adaptive_config: dict = None, roi: dict = None,
+                 continuous_config: dict = None, recovery_config: dict = None, averaging_config: dict = None):
+        # todo - check if movement pattern alternation works
+
+        if signals is None:
+            signals = RoutineSignals()
+        self.signals = signals
+        self.chamber = chamber  # Comment here when testing without chamber
+        self.vna = vna
+        self.vna_info_buffer = vna_info     # to enable re-configuration of PNA in exception handling
+        self.vna_meas_name = vna_info['meas_name']
+        self.recovery = RecoveryPolicy({'clear_status': self.vna.pna_clear_status,
+                                        'ifc': self.vna.pna_reset_interface,
+                                        'state_recall': self.__recall_pna_state,
+                                        'full_preset': self.__reconfigure_pna}, recovery_config)
+
+        # Note: AutoMeasurement Thread assumes that the start-method already set up the PNA / VNA successfully and uses
+        # vna_info just for docu in json file. If the PNA / VNA is not set up correctly, the thread will fail.
+
+        self.move_pattern = move_pattern
+        self.mesh_x_vector = np.array(x_vec, dtype=float)
+        self.mesh_y_vector = np.array(y_vec, dtype=float)
+        self.mesh_z_vector = np.array(z_vec, dtype=float)
+        self.chamber_mov_speed = mov_speed
+        if continuous_config is not None:
+            assert adaptive_config is None and roi is None, \
+                "AutoMeasurementRoutine: Continuous scanning can not be combined with adaptive refinement or roi!"
+            assert averaging_config is None, \
+                "AutoMeasurementRoutine: Continuous scanning can not be combined with adaptive averaging!"
+            self.continuous = dict(CONTINUOUS_DEFAULTS, **continuous_config)
+        if averaging_config is not None:
+            self.averaging = AdaptiveAverager(vna, vna_info, averaging_config)
+        if roi is not None:
+            self.roi_mask = calc_roi_mask(self.mesh_x_vector, self.mesh_y_vector, self.mesh_z_vector, roi,
+                                          zero_position)
+            assert self.roi_mask is not None, "AutoMeasurementRoutine: Invalid region of interest given!"
+        if adaptive_config is not None:
+            # only a coarse grid is planned, the rest of the points follows from the measured field
+            self.refinement = AdaptiveRefinement(self.mesh_x_vector, self.mesh_y_vector, self.mesh_z_vector,
+                                                 adaptive_config, self.roi_mask)
+            if self.refinement.parameter not in vna_info['parameter']:
+                self.refinement.parameter = vna_info['parameter'][0]
+            if scan_path is None:
+                scan_path = self.refinement.coarse_path(move_pattern, AxisCostModel(mov_speed))
+        if scan_path is None:
+            scan_path = plan_auto_measurement_path(self.mesh_x_vector, self.mesh_y_vector, self.mesh_z_vector,
+                                                   move_pattern, AxisCostModel(mov_speed), self.roi_mask)
+        self.scan_path = np.array(scan_path, dtype=float)
+        self.zero_position = zero_position
+        self.store_as_json = file_type_json
+        self.json_format_readable = file_type_json_readable
+
+        # live view defaults to first measured parameter at first frequency point
+        self.live_view_parameter = vna_info['parameter'][0]
+        self.live_view_freq_idx = 0
+        self.__live_view_buffer = {'x_idx': [], 'y_idx': [], 'amplitude': [], 'phase': []}
+
+        self.phase_timer = PhaseTimer(['jog_submit', 'flag_wait', 'vna_trigger'] +
+                                      ['readout_' + parameter for parameter in vna_info['parameter']] +
+                                      ['conversion', 'storage', 'error_recovery'])
+
+        # redundant None initialization to be sure
+        self.json_S11 = None
+        self.json_S12 = None
+        self.json_S22 = None
+
+        # setup path to error log
+        self.error_log_path = os.path.join(os.path.dirname(os.path.dirname(file_location)), "error_log.txt")
+        with open(self.error_log_path, "a") as file:
+            file.write(f"\n\n#### Started new AutoMeasurement - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ####\n")
+
+        if self.store_as_json:
+            # open ONE measurement file
+            json_file_location = file_location + '.json'
+            self.measurement_file_json = open(json_file_location, "w")
+
+            # initialize json data storage for measurement
+            self.json_data_storage = {}
+            measurement_config = {
+                'type':             'Auto Measurement Data JSON',
+                'timestamp':        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'zero_position':    zero_position,
+                'move_pattern':     move_pattern,
+                'mesh_x_min':       x_vec[0], #[mm]
+                'mesh_x_max':       x_vec[-1], #[mm]
+                'mesh_x_steps':     len(x_vec),
+                'mesh_y_min':       y_vec[0], #[mm]
+                'mesh_y_max':       y_vec[-1], #[mm]
+                'mesh_y_steps':     len(y_vec),
+                'mesh_z_min':       z_vec[0], #[mm]
+                'mesh_z_max':       z_vec[-1], #[mm]
+                'mesh_z_steps':     len(z_vec),
+                'movespeed':        mov_speed, #[mm/s]
+                'parameter':        vna_info['parameter'],
+                'freq_start':       vna_info['freq_start'], #[Hz]
+                'freq_stop':        vna_info['freq_stop'], #[Hz]
+                'sweep_num_points': vna_info['sweep_num_points'],
+                'if_bw':            vna_info['if_bw'], #[Hz]
+                'output_power':     vna_info['output_power'], #[dBm]
+                'average_number':   vna_info['avg_num'],
+            }
+            if vna_info.get('segments'):
+                # non-uniform frequency axis of the segment sweep, see segment_sweep.py
+                measurement_config['segments'] = vna_info['segments']
+                measurement_config['frequencies'] = get_frequency_vector(vna_info).tolist()
+            if self.refinement is not None or self.roi_mask is not None:
+                # data lists the measured points only, see read_point_list_data_array() in adaptive_refinement.py
+                measurement_config['data_format'] = 'point_list'
+            if self.refinement is not None:
+                measurement_config['adaptive_refinement'] = self.refinement.to_json_dict()
+            if self.roi_mask is not None:
+                measurement_config['roi'] = roi
+            if self.averaging is not None:
+                measurement_config['adaptive_averaging'] = self.averaging.to_json_dict()
+            if self.continuous is not None:
+                measurement_config['continuous'] = dict(self.continuous)
+                if not self.continuous['resample']:
+                    # data lists the raw sweeps, see resample_continuous_data() in continuous_scan.py
+                    measurement_config['data_format'] = 'continuous'
+            self.json_data_storage['measurement_config'] = measurement_config
+            self.json_data_storage['data'] = []
+
+            # setup dictionaries for separate parameter measurements and assign index in reduced list
+            amp_idx = 4
+            phase_idx = 5
+            if 'S11' in vna_info['parameter']:
+                self.json_S11 = {'parameter': 'S11', 'values': [], 'amp_idx': amp_idx, 'phase_idx': phase_idx}
+                amp_idx += 2
+                phase_idx += 2
+            if 'S12' in vna_info['parameter']:
+                self.json_S12 = {'parameter': 'S12', 'values': [], 'amp_idx': amp_idx, 'phase_idx': phase_idx}
+                amp_idx += 2
+                phase_idx += 2
+            if 'S22' in vna_info['parameter']:
+                self.json_S22 = {'parameter': 'S22', 'values': [], 'amp_idx': amp_idx, 'phase_idx': phase_idx}
+        else:
+            assert False, "AutoMeasurementRoutine: Only JSON file type is supported at the moment!"
+
+    def run(self):
+        try:
+            self.__run_scan()
+        finally:
+            if self.averaging is not None:     # restored by close_all_files() already unless the scan failed
+                self.averaging.restore_pna_average()
+        return
+
+    def __run_scan(self):
+        self.signals.update.emit("Started the AutoMeasurementThread")
+        self.__save_pna_state()
+        if self.continuous is not None:
+            self.__run_continuous()
+            return
+        travel_time = AxisCostModel(self.chamber_mov_speed).path_duration(self.scan_path)
+        self.signals.update.emit(f"Move pattern '{self.move_pattern}', predicted travel time {round(travel_time)}s")
+
+        # assemble string that names all generated files.
+        file_locations_string = "\n< "
+        if self.measurement_file_json is not None:
+            file_locations_string += self.measurement_file_json.name
+        file_locations_string += ">\n"
+
+        # calculate num of points and layers for progress monitoring, adaptive measurements start with the coarse grid
+        # and masked measurements (roi) only count the points inside of the mask
+        num_of_layers = len(self.mesh_z_vector)
+        total_num_of_points = len(self.scan_path)
+        num_of_points_per_layer = self.__num_of_points_in_layer(self.scan_path[0, 2]) if total_num_of_points > 0 else 0
+
+        progress_dict = {
+            'total_points_in_measurement': total_num_of_points,
+            'num_of_layers_in_measurement': num_of_layers,
+            'num_of_points_in_current_layer': num_of_points_per_layer,
+            'status_flag': "Measurement running ...",
+            'time_to_go': 'N/A',    # time to go in [seconds] as float
+        }
+
+        meas_start_timestamp = datetime.now()   # restarted after the first point, set for a stop before
+        layer_count = 0
+        point_in_layer_count = 0
+        total_point_count = 0
+
+        # a layer is finished when the path moves on to another z-coordinate
+        # adaptive measurements append the refinement points to the scan path whenever all planned points are done
+        point_idx = 0
+        while point_idx < len(self.scan_path):
+            x_coor, y_coor, z_coor = self.scan_path[point_idx]
+            layer_idx = int(np.argmin(np.abs(self.mesh_z_vector - z_coor)))
+            if point_idx > 0 and layer_idx + 1 != layer_count:
+                self.__emit_live_view(layer_count, self.scan_path[point_idx - 1, 2])  # flush points of finished layer
+                self.signals.timing_summary.emit(self.phase_timer.get_summary())
+                point_in_layer_count = 0
+                progress_dict['num_of_points_in_current_layer'] = self.__num_of_points_in_layer(z_coor)
+            layer_count = layer_idx + 1
+            point_in_layer_count += 1
+            total_point_count += 1
+
+            # START TRY BLOCK & WHILE LOOP HERE
+            self.phase_timer.start_point()
+            self.recovery.begin_point()
+            self.measurement_iteration_success = False
+            while not self.measurement_iteration_success:
+
+                # check for interruption
+                if self._is_running is False:
+                    self.signals.error.emit({'error_code': 0, 'error_msg': self.__stop_message()})
+                    self.signals.update.emit("Auto Measurement was interrupted")
+                    progress_dict['status_flag'] = "Measurement stopped"
+                    self.__append_to_error_log(
+                        f"AutoMeasurement was stopped at [{x_coor}, {y_coor}, {z_coor}]: {self.__stop_message()}.")
+                    self.signals.progress.emit(progress_dict)
+                    self.signals.timing_summary.emit(self.phase_timer.get_summary())
+                    self.close_all_files(meas_start_timestamp)
+                    self.signals.finished.emit({'file_location': file_locations_string,
+                                                'stopped': True,
+                                                'stop_reason': self.stop_reason,
+                                                'duration': str(timedelta(seconds=(round((datetime.now() - meas_start_timestamp).total_seconds()))))})
+                    return
+                try:
+                    self.signals.log.emit('Request movement to X: ' + str(x_coor) + ' Y: ' + str(y_coor) + ' Z: ' + str(z_coor),
+                                          logging.DEBUG)
+                    jog_timing = {}
+                    self.chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=z_coor, speed=self.chamber_mov_speed,
+                                                 timing=jog_timing) # Comment here when testing without chamber
+                    for phase, duration in jog_timing.items():
+                        self.phase_timer.add(phase, duration)
+                    self.signals.position_update.emit({'abs_x': x_coor, 'abs_y': y_coor, 'abs_z': z_coor})
+                    self.signals.log.emit("Movement done!", logging.DEBUG)
+
+                    # Routine to do vna measurement and store data somewhere put here...
+                    self.signals.log.emit("Trigger measurement...", logging.DEBUG)
+                    with self.phase_timer.measure('vna_trigger'):
+                        if self.averaging is not None:  # sweeps are read out and averaged in trigger()
+                            num_averages = self.averaging.trigger()
+                            self.signals.log.emit(f"{num_averages} sweeps averaged", logging.DEBUG)
+                        else:
+                            self.vna.pna_trigger_measurement(self.vna_meas_name)
+                    self.signals.log.emit("Measurement done! Read data from VNA and write to file...", logging.DEBUG)
+
+                    x_coor_antennas = x_coor - self.zero_position[0]
+                    y_coor_antennas = y_coor - self.zero_position[1]
+                    z_coor_antennas = z_coor - self.zero_position[2]
+
+                    for json_dic in [self.json_S11, self.json_S12, self.json_S22]:
+                        if json_dic is not None:
+                            # read data to buffer property
+                            self.signals.log.emit(f"JSON-routine reads {json_dic['parameter']}-Parameter Values...", logging.DEBUG)
+                            with self.phase_timer.measure('readout_' + json_dic['parameter']):
+                                if self.averaging is not None:
+                                    data = self.averaging.read(json_dic['parameter'])
+                                else:
+                                    data = self.vna.pna_read_meas_data(self.vna_meas_name, json_dic['parameter'])
+                            with self.phase_timer.measure('conversion'):
+                                data = np.array(data, dtype=float)
+                                pointer = data[:, 1] + 1j * data[:, 2]
+                                amplitude = np.abs(pointer)
+                                phase = np.degrees(np.angle(pointer))
+                            with self.phase_timer.measure('storage'):
+                                for f_idx in range(len(data)):
+                                    json_dic['values'].append([x_coor_antennas, y_coor_antennas, z_coor_antennas, data[f_idx, 0], float(amplitude[f_idx]), float(phase[f_idx])])
+                                if json_dic['parameter'] == self.live_view_parameter:
+                                    self.__append_to_live_view(x_coor, y_coor, amplitude, phase)
+                                if self.refinement is not None and json_dic['parameter'] == self.refinement.parameter:
+                                    self.refinement.add_measurement(x_coor, y_coor, z_coor, pointer)
+                            self.signals.log.emit(f"{json_dic['parameter']} data appended.", logging.DEBUG)
+                    if self.averaging is not None:
+                        self.averaging.add_point(x_coor_antennas, y_coor_antennas, z_coor_antennas)
+
+                    # flag success of measurement
+                    self.measurement_iteration_success = True
+
+                except Exception as e:
+                    self.__handle_error(e, f"[{x_coor}, {y_coor}, {z_coor}]")
+
+            # END TRY BLOCK & WHILE LOOP HERE
+            self.phase_timer.end_point()
+
+            # Timekeeping for average time per point
+            if total_point_count == 1:
+                meas_start_timestamp = datetime.now()
+                progress_dict['time_to_go'] = 0
+            else:
+                self.average_time_per_point = (datetime.now() - meas_start_timestamp).total_seconds() / (total_point_count - 1)
+                progress_dict['time_to_go'] = round(self.average_time_per_point * (total_num_of_points - total_point_count))
+
+
+            # give progression update
+            progress_dict['total_current_point_number'] = total_point_count
+            progress_dict['current_layer_number'] = layer_count
+            progress_dict['current_point_number_in_layer'] = point_in_layer_count
+            self.signals.progress.emit(progress_dict)
+
+            # live view update, throttled so GUI load does not depend on point rate
+            if time.monotonic() - self.__live_view_last_emit >= self.live_view_min_interval:
+                self.__emit_live_view(layer_count, z_coor)
+
+            point_idx += 1
+            if point_idx == len(self.scan_path) and self.refinement is not None:
+                refinement_path = self.refinement.next_path(AxisCostModel(self.chamber_mov_speed),
+                                                            self.scan_path[-1])
+                if len(refinement_path) > 0:
+                    self.scan_path = np.concatenate((self.scan_path, refinement_path))
+                    total_num_of_points = len(self.scan_path)
+                    progress_dict['total_points_in_measurement'] = total_num_of_points
+                    self.signals.update.emit(f"Refinement round {self.refinement.refinement_round}: "
+                                             f"{len(refinement_path)} more points")
+
+        self.__emit_live_view(layer_count, z_coor)    # flush remaining points of last layer
+        self.signals.timing_summary.emit(self.phase_timer.get_summary())
+
+        self.signals.update.emit("AutoMeasurement is completed!")
+        progress_dict['status_flag'] = "Measurement finished"
+        self.signals.progress.emit(progress_dict)
+        self.close_all_files(meas_start_timestamp)  # before finished, the next job of the queue may start right after it
+        self.signals.finished.emit({'file_location': file_locations_string,
+                                    'stopped': False,
+                                    'duration': str(timedelta(seconds=(round((datetime.now() - meas_start_timestamp).total_seconds()))))})
+        return
+
+    def __run_continuous(self):
+        """
+        Measurement loop of continuous scans. Each X-line is driven as one move while the PNA sweeps, the sweeps are
+        tagged with the position of the motion model when the line is done (see continuous_scan.py).
+        The rows of 'point_timing' in the measurement file are lines instead of points.
+        """
+        file_locations_string = "\n< " + self.measurement_file_json.name + ">\n"
+        cost_model = AxisCostModel(self.chamber_mov_speed)
+        lines = plan_continuous_lines(self.mesh_y_vector, self.mesh_z_vector, self.move_pattern)
+        num_of_lines_per_layer = len(self.mesh_y_vector)
+        num_x = len(self.mesh_x_vector)
+
+        progress_dict = {
+            'total_points_in_measurement': num_x * len(lines),
+            'num_of_layers_in_measurement': len(self.mesh_z_vector),
+            'num_of_points_in_current_layer': num_x * num_of_lines_per_layer,
+            'status_flag': "Measurement running ...",
+            'time_to_go': 'N/A',    # time to go in [seconds] as float
+        }
+        meas_start_timestamp = datetime.now()
+        self.__continuous_start_delays = []
+        self.__continuous_num_sweeps = 0
+
+        line_speed = self.continuous['line_speed']
+        if line_speed is None:
+            sweep_period = self.__measure_sweep_period(lines[0])
+            line_speed = calc_line_speed(self.mesh_x_vector, sweep_period, self.continuous['samples_per_step'],
+                                         self.chamber_mov_speed)
+            self.signals.update.emit(f"Sweep period {round(sweep_period, 3)}s")
+        line_speed = cost_model.move_profile([0, 0, 0], [1, 0, 0], line_speed)[1]    # limited by max X speed
+        run_up = calc_run_up(cost_model, line_speed)
+        self.continuous['line_speed'] = line_speed
+        self.continuous['run_up'] = run_up
+        self.signals.update.emit(f"Continuous scan of {len(lines)} lines at {round(line_speed, 2)}mm/s")
+
+        layer_count = 0
+        for line_idx, (y_coor, z_coor, forward) in enumerate(lines):
+            if line_idx // num_of_lines_per_layer + 1 != layer_count:
+                self.signals.timing_summary.emit(self.phase_timer.get_summary())
+            layer_count = line_idx // num_of_lines_per_layer + 1
+            line_start, line_stop = calc_line_endpoints(self.mesh_x_vector, y_coor, z_coor, forward, run_up)
+
+            self.phase_timer.start_point()
+            self.recovery.begin_point()
+            self.measurement_iteration_success = False
+            while not self.measurement_iteration_success:
+
+                # check for interruption
+                if self._is_running is False:
+                    self.signals.error.emit({'error_code': 0, 'error_msg': self.__stop_message()})
+                    self.signals.update.emit("Auto Measurement was interrupted")
+                    progress_dict['status_flag'] = "Measurement stopped"
+                    self.__append_to_error_log(
+                        f"AutoMeasurement was stopped at line Y: {y_coor}, Z: {z_coor}: {self.__stop_message()}.")
+                    self.signals.progress.emit(progress_dict)
+                    self.signals.timing_summary.emit(self.phase_timer.get_summary())
+                    self.close_all_files(meas_start_timestamp)
+                    self.signals.finished.emit({'file_location': file_locations_string,
+                                                'stopped': True,
+                                                'stop_reason': self.stop_reason,
+                                                'duration': str(timedelta(seconds=(round((datetime.now() - meas_start_timestamp).total_seconds()))))})
+                    return
+                try:
+                    self.__measure_line(cost_model, line_start, line_stop, line_speed)
+                    self.measurement_iteration_success = True
+
+                except Exception as e:
+                    self.__handle_error(e, f"line Y: {y_coor}, Z: {z_coor}")
+            self.phase_timer.end_point()
+
+            # Timekeeping for average time per line
+            average_time_per_line = (datetime.now() - meas_start_timestamp).total_seconds() / (line_idx + 1)
+            self.average_time_per_point = average_time_per_line / num_x
+            progress_dict['time_to_go'] = round(average_time_per_line * (len(lines) - line_idx - 1))
+
+            # give progression update
+            progress_dict['total_current_point_number'] = (line_idx + 1) * num_x
+            progress_dict['current_layer_number'] = layer_count
+            progress_dict['current_point_number_in_layer'] = (line_idx % num_of_lines_per_layer + 1) * num_x
+            self.signals.progress.emit(progress_dict)
+
+            if time.monotonic() - self.__live_view_last_emit >= self.live_view_min_interval:
+                self.__emit_live_view(layer_count, z_coor)
+
+        self.__emit_live_view(layer_count, lines[-1][1])    # flush remaining points of last layer
+        self.signals.timing_summary.emit(self.phase_timer.get_summary())
+
+        self.signals.update.emit("AutoMeasurement is completed!")
+        progress_dict['status_flag'] = "Measurement finished"
+        self.signals.progress.emit(progress_dict)
+        self.close_all_files(meas_start_timestamp)  # before finished, the next job of the queue may start right after it
+        self.signals.finished.emit({'file_location': file_locations_string,
+                                    'stopped': False,
+                                    'duration': str(timedelta(seconds=(round((datetime.now() - meas_start_timestamp).total_seconds()))))})
+        return
+
+    def __measure_sweep_period(self, first_line: tuple) -> float:
+        """
+        Moves to the first point of the first line and takes one sweep of all parameters to measure the sweep period
+        including readout and flag polling. Retries like the measurement loop if an error occurs.
+
+        :return: sweep period [s], 0 if the measurement was stopped before
+        """
+        y_coor, z_coor, forward = first_line
+        x_coor = self.mesh_x_vector[0] if forward else self.mesh_x_vector[-1]
+        self.recovery.begin_point()
+        while self._is_running is not False:
+            try:
+                self.chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=z_coor, speed=self.chamber_mov_speed)
+                sweep_start = time.perf_counter()
+                self.vna.pna_trigger_measurement(self.vna_meas_name)
+                for json_dic in [self.json_S11, self.json_S12, self.json_S22]:
+                    if json_dic is not None:
+                        self.vna.pna_read_meas_data(self.vna_meas_name, json_dic['parameter'])
+                self.chamber.chamber_isflagset()
+                return time.perf_counter() - sweep_start
+            except Exception as e:
+                self.__handle_error(e, "sweep period measurement")
+        return 0.0
+
+    def __measure_line(self, cost_model: AxisCostModel, line_start: np.ndarray, line_stop: np.ndarray,
+                       line_speed: float):
+        """
+        Jogs to the start of the line, starts the line move and sweeps until the chamber reports the end of the move
+        (or the measurement is stopped). The sweeps inside of the mesh are tagged with their position and stored.
+        Lines of a single X-point can not be swept on-the-fly, their point is measured at standstill instead.
+        """
+        if len(self.mesh_x_vector) < 2:
+            self.__measure_line_point(line_start[1], line_start[2])
+            return
+        jog_timing = {}
+        self.chamber.chamber_jog_abs(x=line_start[0], y=line_start[1], z=line_start[2], speed=self.chamber_mov_speed,
+                                     timing=jog_timing)
+        for phase, duration in jog_timing.items():
+            self.phase_timer.add(phase, duration)
+        self.signals.position_update.emit({'abs_x': line_start[0], 'abs_y': line_start[1], 'abs_z': line_start[2]})
+
+        jog_timing = {}
+        self.signals.log.emit(f"Start line move to X: {line_stop[0]} at {line_speed}mm/s", logging.DEBUG)
+        self.chamber.chamber_start_jog_abs(x=line_stop[0], y=line_stop[1], z=line_stop[2], speed=line_speed,
+                                           timing=jog_timing)
+        submit_end = time.perf_counter()
+        self.phase_timer.add('jog_submit', jog_timing['jog_submit'])
+
+        sweep_times = []
+        frequencies = None
+        pointers = {}
+        last_busy_poll = submit_end
+        move_end = None
+        while True:
+            trigger_start = time.perf_counter()
+            self.vna.pna_trigger_measurement(self.vna_meas_name)
+            trigger_end = time.perf_counter()
+            self.phase_timer.add('vna_trigger', trigger_end - trigger_start)
+            sweep_times.append(0.5 * (trigger_start + trigger_end))
+            for json_dic in [self.json_S11, self.json_S12, self.json_S22]:
+                if json_dic is not None:
+                    with self.phase_timer.measure('readout_' + json_dic['parameter']):
+                        data = self.vna.pna_read_meas_data(self.vna_meas_name, json_dic['parameter'])
+                    with self.phase_timer.measure('conversion'):
+                        data = np.array(data, dtype=float)
+                        frequencies = data[:, 0]
+                        pointers.setdefault(json_dic['parameter'], []).append(data[:, 1] + 1j * data[:, 2])
+
+            poll_start = time.perf_counter()
+            is_busy = self.chamber.chamber_isflagset()
+            poll_end = time.perf_counter()
+            self.phase_timer.add('flag_wait', poll_end - poll_start)
+            if not is_busy:
+                move_end = 0.5 * (last_busy_poll + poll_end)  # flag was reset between the last two polls
+                break
+            last_busy_poll = poll_start
+            if self._is_running is False:
+                break
+
+        # start of the movement, calibrated by the observed end of the move unless given fixed
+        start_delay = self.continuous['start_delay']
+        if start_delay is None:
+            if move_end is not None:
+                move_duration = cost_model.move_duration(line_start, line_stop, line_speed)
+                self.__continuous_start_delays.append(max(0.0, move_end - submit_end - move_duration))
+            start_delay = float(np.median(self.__continuous_start_delays)) if self.__continuous_start_delays else 0.0
+        positions = tag_sweep_positions(cost_model, line_start, line_stop, line_speed, np.array(sweep_times),
+                                        submit_end + start_delay)
+
+        with self.phase_timer.measure('storage'):
+            # only sweeps inside of the mesh, sweeps at the same position (before / after the move) are skipped
+            half_step = abs(self.mesh_x_vector[1] - self.mesh_x_vector[0]) / 2
+            keep = (positions[:, 0] >= np.min(self.mesh_x_vector) - half_step) & \
+                   (positions[:, 0] <= np.max(self.mesh_x_vector) + half_step)
+            keep[1:] &= np.diff(positions[:, 0]) != 0
+            self.__continuous_num_sweeps += int(np.count_nonzero(keep))
+            for json_dic in [self.json_S11, self.json_S12, self.json_S22]:
+                if json_dic is None:
+                    continue
+                parameter_pointers = np.array(pointers[json_dic['parameter']])[keep]
+                amplitude = np.abs(parameter_pointers)
+                phase = np.degrees(np.angle(parameter_pointers))
+                for sweep_idx, (x_coor, y_coor, z_coor) in enumerate(positions[keep] - self.zero_position):
+                    for f_idx in range(len(frequencies)):
+                        json_dic['values'].append([float(x_coor), float(y_coor), float(z_coor), frequencies[f_idx],
+                                                   float(amplitude[sweep_idx, f_idx]), float(phase[sweep_idx, f_idx])])
+                if json_dic['parameter'] == self.live_view_parameter:
+                    grid_pointers = resample_line(positions[keep, 0], parameter_pointers, self.mesh_x_vector)
+                    for x_coor, grid_pointer in zip(self.mesh_x_vector, grid_pointers):
+                        self.__append_to_live_view(x_coor, line_start[1], np.abs(grid_pointer),
+                                                   np.degrees(np.angle(grid_pointer)))
+        self.signals.position_update.emit({'abs_x': line_stop[0], 'abs_y': line_stop[1], 'abs_z': line_stop[2]})
+        return
+
+    def __measure_line_point(self, y_coor: float, z_coor: float):
+        """
+        Measures the only X-point of a line at standstill, stored like one sweep of a continuous line.
+        """
+        x_coor = float(self.mesh_x_vector[0])
+        jog_timing = {}
+        self.chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=z_coor, speed=self.chamber_mov_speed, timing=jog_timing)
+        for phase, duration in jog_timing.items():
+            self.phase_timer.add(phase, duration)
+        self.signals.position_update.emit({'abs_x': x_coor, 'abs_y': y_coor, 'abs_z': z_coor})
+        with self.phase_timer.measure('vna_trigger'):
+            self.vna.pna_trigger_measurement(self.vna_meas_name)
+        self.__continuous_num_sweeps += 1
+        for json_dic in [self.json_S11, self.json_S12, self.json_S22]:
+            if json_dic is None:
+                continue
+            with self.phase_timer.measure('readout_' + json_dic['parameter']):
+                data = np.array(self.vna.pna_read_meas_data(self.vna_meas_name, json_dic['parameter']), dtype=float)
+            with self.phase_timer.measure('storage'):
+                pointer = data[:, 1] + 1j * data[:, 2]
+                amplitude = np.abs(pointer)
+                phase = np.degrees(np.angle(pointer))
+                for f_idx in range(len(data)):
+                    json_dic['values'].append([x_coor - self.zero_position[0], y_coor - self.zero_position[1],
+                                               z_coor - self.zero_position[2], data[f_idx, 0],
+                                               float(amplitude[f_idx]), float(phase[f_idx])])
+                if json_dic['parameter'] == self.live_view_parameter:
+                    self.__append_to_live_view(x_coor, y_coor, amplitude, phase)
+        return
+
+    def stop(self):
+        """
+        Method to interrupt the thread in the next possible moment (thread checks for interruption regularly)
+        """
+        self._is_running = False
+
+    def __num_of_points_in_layer(self, z_coor: float) -> int:
+        """
+        :return: number of points of the scan path planned so far in the layer at z_coor
+        """
+        return int(np.count_nonzero(np.abs(self.scan_path[:, 2] - z_coor) < 1e-9))
+
+    def set_live_view_selection(self, parameter: str, freq_idx: int):
+        """
+        Selects which S-parameter and frequency point are sent via field_update signal.
+        Points that were measured before the change are not sent again.
+        """
+        if parameter in self.vna_info_buffer['parameter']:
+            self.live_view_parameter = parameter
+        self.live_view_freq_idx = max(0, int(freq_idx))
+        return
+
+    def __append_to_live_view(self, x_coor: float, y_coor: float, amplitude: np.ndarray, phase: np.ndarray):
+        """
+        Buffers amplitude and phase of the live view frequency of one measured point until next field_update emit.
+        """
+        freq_idx = min(self.live_view_freq_idx, len(amplitude) - 1)
+        self.__live_view_buffer['x_idx'].append(int(np.argmin(np.abs(self.mesh_x_vector - x_coor))))
+        self.__live_view_buffer['y_idx'].append(int(np.argmin(np.abs(self.mesh_y_vector - y_coor))))
+        self.__live_view_buffer['amplitude'].append(amplitude[freq_idx])
+        self.__live_view_buffer['phase'].append(phase[freq_idx])
+        return
+
+    def __emit_live_view(self, layer_number: int, z_coor: float):
+        """
+        Emits all buffered live view points as numpy arrays via field_update signal and clears the buffer.
+        """
+        self.__live_view_last_emit = time.monotonic()
+        if len(self.__live_view_buffer['x_idx']) == 0:
+            return
+        freq_idx = self.live_view_freq_idx
+        num_freq_points = self.vna_info_buffer['sweep_num_points']
+        frequency = get_frequency_vector(self.vna_info_buffer)[min(freq_idx, num_freq_points - 1)]
+        self.signals.field_update.emit({'parameter': self.live_view_parameter,
+                                        'freq_idx': freq_idx,
+                                        'frequency': float(frequency),
+                                        'layer_number': layer_number,
+                                        'z_coor': z_coor - self.zero_position[2],
+                                        'x_idx': np.array(self.__live_view_buffer['x_idx']),
+                                        'y_idx': np.array(self.__live_view_buffer['y_idx']),
+                                        'amplitude': np.array(self.__live_view_buffer['amplitude']),
+                                        'phase': np.array(self.__live_view_buffer['phase'])})
+        self.__live_view_buffer = {'x_idx': [], 'y_idx': [], 'amplitude': [], 'phase': []}
+        return
+
+    def close_all_files(self, meas_start_timestamp: datetime = None):
+        """
+        Detects all open files, writes data to them if necessary and closes all files.
+        This function must be called before Thread finishes.
+        """
+        # update measurement duration in measurement_config
+        if meas_start_timestamp is not None:
+            time_taken_sec = (datetime.now() - meas_start_timestamp).total_seconds()
+            self.json_data_storage['measurement_config']['duration'] = str(timedelta(seconds=time_taken_sec))
+
+        if self.refinement is not None:
+            self.json_data_storage['measurement_config']['adaptive_refinement'] = self.refinement.to_json_dict()
+        if self.averaging is not None:
+            self.averaging.restore_pna_average()
+            averaging_info = self.averaging.to_json_dict()
+            self.json_data_storage['measurement_config']['adaptive_averaging'] = averaging_info
+            self.signals.update.emit(f"Adaptive averaging: mean {round(averaging_info['mean_averages'], 1)} "
+                                     f"averages, {averaging_info['num_points_at_max']} points at maximum of "
+                                     f"{averaging_info['max_averages']}")
+        self.json_data_storage['measurement_config']['error_recovery'] = self.recovery.to_json_dict()
+        if self.recovery.num_errors > 0:
+            self.signals.update.emit(f"{self.recovery.num_errors} errors recovered in "
+                                     f"{round(self.recovery.recovery_time, 1)}s: {self.recovery.num_per_class}")
+        if self.continuous is not None:
+            self.continuous['num_sweeps'] = self.__continuous_num_sweeps
+            if len(self.__continuous_start_delays) > 0:
+                self.continuous['start_delay'] = float(np.median(self.__continuous_start_delays))
+            self.json_data_storage['measurement_config']['continuous'].update(self.continuous)
+
+        # per-point durations of all phases, rows in order of measurement (not sorted like data!)
+        self.json_data_storage['point_timing'] = self.phase_timer.to_json_dict()
+        if self.averaging is not None:
+            # number of averages of each point, rows in order of measurement (not sorted like data!)
+            self.json_data_storage['point_averages'] = self.averaging.get_point_averages()
+
+        # close json file - dicts must be assembled and data written to file before close()
+        if self.measurement_file_json is not None:
+            self.signals.update.emit("Reading data from dicts and print to json file...")
+            # Assembly large data-list with syntax:
+            #   [ [x, y, z, f, S11-amp, S11-ph, S12-amp, S12-ph, S22-amp, S22-ph], ... ]
+            #   Dependent on the parameters that are supposed to be measured, each point-list in the overall list
+            #   has length of 6 (one S-param), 8 (two S-param) or 10 (three S-param). The order in which they are
+            #   stored, if present, is S11 > S12 > S22. Their indexing shifts so that point-lists are as short as
+            #   possible. Indexes are stored in property buffer-dicts as 'amp_idx' and 'phase_idx'.
+            # 1. generate point_list_entry-buffer with right length to store all parameter measurements
+            num_of_parameters = self.json_data_storage['measurement_config']['parameter'].__len__()
+            point_list_entry_buffer = [0.0, 0.0, 0.0, 0.0]
+            for i in range(num_of_parameters):
+                point_list_entry_buffer.append(0.0)  # amplitude
+                point_list_entry_buffer.append(0.0)  # phase
+            # 2. find total length of list, each list should be same length //
+            # assign base-buffer to read from coor & freq
+            num_points_measured = 0
+            base_buffer = None
+            for par_dict in [self.json_S11, self.json_S12, self.json_S22]:
+                if par_dict is not None:
+                    num_points_measured = par_dict['values'].__len__()
+                    base_buffer = par_dict      # base_buffer always overridden since same XYZ and Freq for all S-params
+            # 3. run through base-buffer list to get all coordinates and frequencies and append the measured
+            # amplitudes and phases to the data-list as ONE list-entry for all measured S-parameters in one point
+            # at one frequency.
+            for idx in range(num_points_measured):
+                point_list_entry_buffer[0] = float(base_buffer['values'][idx][0])  # X-coor, typecast to float because numpy
+                point_list_entry_buffer[1] = float(base_buffer['values'][idx][1])  # Y-coor, typecast to float because numpy
+                point_list_entry_buffer[2] = float(base_buffer['values'][idx][2])  # Z-coor, typecast to float because numpy
+                point_list_entry_buffer[3] = float(base_buffer['values'][idx][3])  # Frequency
+                for par_dict in [self.json_S11, self.json_S12, self.json_S22]:
+                    if par_dict is not None:
+                        point_list_entry_buffer[par_dict['amp_idx']] = par_dict['values'][idx][4]
+                        point_list_entry_buffer[par_dict['phase_idx']] = par_dict['values'][idx][5]
+                self.json_data_storage['data'].append(point_list_entry_buffer.copy())  # Must use copy(), otherwise only reference handed to list!
+
+            # decide if formatting readable
+            indent = None
+            if self.json_format_readable:
+                indent = 4
+
+            # New 04.01.25 -- Sort list to be independent of movement pattern!
+            # List always looks like one ran through the mesh in
+            # 1. x-positive-direction, 2. y-positive-direction, 3. z-positive-direction
+            # Frequency is sorted as well, but should not be necessary to sort it again since PNA always measures
+            # from low to high frequency.
+            # Continuous measurements keep the raw sweeps in the order of measurement, one block of rows per sweep.
+            if self.continuous is None:
+                self.json_data_storage['data'] = sorted(self.json_data_storage['data'], key=lambda sublist: (sublist[2], #z
+                                                                                                             sublist[1], #y
+                                                                                                             sublist[0], #x
+                                                                                                             sublist[3]))#f
+            elif self.continuous['resample']:
+                self.json_data_storage['continuous_raw_data'] = self.json_data_storage['data']
+                self.json_data_storage['data'] = resample_continuous_data(self.json_data_storage['measurement_config'],
+                                                                          self.json_data_storage['continuous_raw_data'])
+
+
+            self.measurement_file_json.write(json.dumps(self.json_data_storage, indent=indent))
+            self.signals.update.emit(f"Data written to {self.measurement_file_json.name}")
+            self.measurement_file_json.close()
+
+        return
+
+    def __append_to_error_log(self, error_msg: str):
+        """
+        Appends an error message to the error log file with timestamp.
+        """
+        with open(self.error_log_path, 'a') as file:
+            file.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {error_msg}\n")
+        return
+
+    def __handle_error(self, e: Exception, context: str) -> bool:
+        """
+        Hands an error of the measurement loop to the recovery policy (see error_recovery.py) and reports the error
+        event. If the retry budget is exhausted, the routine is stopped like by the process controller.
+
+        :param context: where the error occurred, e.g. coordinates of the point
+        :return: True >> retry, False >> measurement must stop
+        """
+        self.signals.log.emit(f"Error occurred at {context}", logging.WARNING)
+        self.__append_to_error_log(f"Error occurred at {context}: {e}")
+        event = self.recovery.handle(e, context)
+        self.phase_timer.add('error_recovery', event['recovery_time'])
+        self.__append_to_error_log(f"Recovery event: {json.dumps(event)}")
+        self.signals.error.emit(event)
+        if event['give_up']:
+            self.stop_reason = f"retry budget exhausted ({event['error_class']} error at {context})"
+            self.signals.log.emit(f"Stop measurement, {self.stop_reason}", logging.ERROR)
+            self._is_running = False
+            return False
+        self.signals.log.emit(f"{event['error_class']} error recovered by '{event['action']}' after "
+                              f"{round(event['recovery_time'], 2)}s. Restarting measurement at {context}...",
+                              logging.WARNING)
+        return True
+
+    def __save_pna_state(self):
+        """
+        Takes the snapshot of the configured PNA that is restored by the 'state_recall' tier of the error recovery
+        instead of a full preset and reconfiguration.
+        """
+        self.vna_state = self.vna.pna_save_state(f"{self.vna_meas_name}_recovery.cst")
+        if self.vna_state is None:
+            self.signals.log.emit("PNA state could not be saved, error recovery falls back to full preset",
+                                  logging.WARNING)
+        return
+
+    def __recall_pna_state(self) -> bool:
+        """
+        :return: True >> PNA state snapshot restored, False >> no snapshot or recall failed
+        """
+        return self.vna.pna_recall_state(self.vna_state)
+
+    def __stop_message(self) -> str:
+        """
+        :return: reason for the interruption of the measurement loop
+        """
+        if self.stop_reason is not None:
+            return f"Measurement stopped, {self.stop_reason}"
+        return "Thread was interrupted by process controller"
+
+    def __reconfigure_pna(self):
+        """
+        Presets PNA and reconfigures measurement as throughout init-routine.
+
+        :return: True >> success, False >> failed
+        """
+        self.vna.pna_preset()
+        # reconfigure PNA by file setup
+        if 'vna_preset_from_file' in self.vna_info_buffer:
+            return self.vna.pna_preset_from_file(self.vna_info_buffer['vna_preset_from_file'],
+                                                 self.vna_meas_name) not in (None, False)
+        else:   # reconfigure PNA by manual setup
+            return self.vna.pna_add_measurement_detailed(meas_name=self.vna_meas_name,
+                                                         parameter=self.vna_info_buffer['parameter'],
+                                                         freq_start=self.vna_info_buffer['freq_start'],
+                                                         freq_stop=self.vna_info_buffer['freq_stop'],
+                                                         if_bw=self.vna_info_buffer['if_bw'],
+                                                         sweep_num_points=self.vna_info_buffer['sweep_num_points'],
+                                                         output_power=self.vna_info_buffer['output_power'],
+                                                         trigger_manual=True,
+                                                         average_number=self.vna_info_buffer['avg_num'],
+                                                         segments=self.vna_info_buffer.get('segments'))
@@ -0,0 +1,548 @@
+import time
+import logging
+from chamber_net_interface import ChamberNetworkCommands
+from vna_net_interface import E8361RemoteGPIB
+from datetime import datetime, timedelta
+import json
+import os
+import numpy as np
+from .phase_timer import PhaseTimer
+from .routine_signals import RoutineSignals
+from .path_planner import AxisCostModel, plan_body_scan_columns, expand_body_scan_path
+from .roi_mask import calc_roi_mask, column_z_vectors
+from .settling import SettlingDetector
+from .adaptive_averaging import AdaptiveAverager
+from .error_recovery import RecoveryPolicy
+from .segment_sweep import get_frequency_vector
+
+
+class BodyScanRoutine:
+    """
+    The BodyScanRoutine class implements the measurement loop of a body scan without Qt dependency.
+    In the GUI it is run by the BodyScan QRunnable of the process controller, headless by the headless_runner.
+    It gets handed the chamber object and the VNA object to reach them via network and GPIB adapter.
+
+    Specified for the usecase of scanning upper bodies fixed in the measurement chamber,
+    the class works with .cst-config files on the VNA (PNA) only. Manual measurement configuration is not supported.
+    The routine stores the results in a .json file at a specified filepath given via init().
+
+    The routine assumes that the VNA is already set up and the chamber is connected and ready to move!
+    Making this sure is task of the method that starts the BodyScan.
+
+    It emits signals to enable monitoring and display in the GUI.
+    Those are defined in 'AutoMeasurementSignals' class. If no signals object is given, RoutineSignals are used.
+
+    It is interruptable at specific points by calling the BodyScan.stop() method of the object.
+
+    If a roi (region of interest) is given, only the points of the mesh inside of it are measured (see roi_mask.py).
+    XY-columns without any point inside are skipped, the others only run through their Z-coordinates inside.
+
+    If a settling_config is given, the routine does not sleep z_move_sleep_time after each move but waits until fast
+    PNA readings agree (see settling.py). z_move_sleep_time is the timeout of the settling then.
+
+    If an averaging_config is given, each point is averaged until the measured noise meets the target uncertainty
+    instead of a fixed number of sweeps (see adaptive_averaging.py).
+
+    Errors while measuring a point are recovered by a RecoveryPolicy with the optional recovery_config (see
+    error_recovery.py). The routine stops itself if the retry budget of the policy is exhausted.
+
+    The overall structure of this class is very similar to the AutoMeasurementRoutine!
+    """
+
+    # Properties
+    # Properties
+    chamber: ChamberNetworkCommands = None
+    signals: RoutineSignals = None
+    _is_running: bool = None
+    vna: E8361RemoteGPIB = None
+    vna_info_buffer: dict = None
+    vna_meas_name: str = None
+
+    move_pattern: str = None    # 'line-by-line', 'snake' or 'optimized', see path_planner.py
+    scan_columns: np.ndarray = None     # shape (num_columns, 2), XY-coordinates in the order they are measured
+    column_z: list = None   # Z-coordinates measured in each column of scan_columns, mesh_z_vector without roi
+    roi_mask: np.ndarray = None     # only set for scans with region of interest, True for points to measure
+    mesh_x_vector: np.ndarray = None
+    mesh_y_vector: np.ndarray = None
+    mesh_z_vector: np.ndarray = None
+    chamber_mov_speed: float = 0  # unit [mm/s], see jog command doc-string!
+    z_move_sleep_time: float = 0.0  # unit [s], sleep time after z-movement to let chamber/body settle
+    settling: SettlingDetector = None   # only set for adaptive settling, replaces the sleep after each move
+    averaging: AdaptiveAverager = None  # only set for adaptive averaging, replaces the fixed averaging of the PNA
+    origin: tuple[float, ...] = None
+    z_move_below: float = 0.5  # unit [mm], offset to move below next XY-point before measurement to avoid z-direction lack ~0.2mm when chamber changes direction
+
+    measurement_file_json = None
+    json_data_storage: dict = None
+    json_S11: dict = None
+    json_S12: dict = None
+    json_S22: dict = None
+
+    average_time_per_point: float = 0  # unit [s], calculated from all points that were measured so far
+    phase_timer: PhaseTimer = None  # durations of the phases of each point, stored in measurement file
+    measurement_iteration_success: bool = False  # flag to indicate if measurement done and to redo measurement if error occured (in Try-block)
+    error_log_path: str = None
+    recovery: RecoveryPolicy = None     # classifies errors of the measurement loop and recovers PNA / chamber
+    stop_reason: str = None     # set if the routine stops itself, e.g. when the retry budget is exhausted
+    vna_state: dict = None      # snapshot of the configured PNA for the 'state_recall' tier of the error recovery
+
+    def __init__(self, chamber: ChamberNetworkCommands, vna: E8361RemoteGPIB, vna_info: dict, x_vec: tuple[float, ...],
+                 y_vec: tuple[float, ...], z_vec: tuple[float, ...], mov_speed: float, origin: tuple[float, ...],
+                 file_location: str, move_pattern: str, z_move_sleep_time: float = 0.0, signals=None,
+                 scan_columns: np.ndarray = None, roi: dict = None, settling_config: dict = None,
+                 recovery_config: dict = None, averaging_config: dict = None):
+        if signals is None:
+            signals = RoutineSignals()
+        self.signals = signals
+        self.chamber = chamber  # Comment here when testing without chamber
+        self.vna = vna
+        self.vna_info_buffer = vna_info  # to enable re-configuration of PNA in exception handling
+        self.vna_meas_name = vna_info['meas_name']
+        self.recovery = RecoveryPolicy({'clear_status': self.vna.pna_clear_status,
+                                        'ifc': self.vna.pna_reset_interface,
+                                        'state_recall': self.__recall_pna_state,
+                                        'full_preset': self.__reconfigure_pna}, recovery_config)
+        # Note: Same as for AutoMeasurement Thread, BodyScan assumes that the start-method already set up the PNA / VNA
+        # successfully and uses vna_info just for docu in json file.
+        # If the PNA / VNA is not set up correctly, the thread will fail.
+
+        self.move_pattern = move_pattern
+        self.mesh_x_vector = np.array(x_vec, dtype=float)
+        self.mesh_y_vector = np.array(y_vec, dtype=float)
+        self.mesh_z_vector = np.array(z_vec, dtype=float)
+        self.chamber_mov_speed = mov_speed
+        self.z_move_sleep_time = z_move_sleep_time
+        self.origin = origin
+        if settling_config is not None:
+            settling_config = dict(settling_config)
+            if settling_config.get('timeout') is None:
+                settling_config['timeout'] = z_move_sleep_time
+            assert settling_config['timeout'] > 0, "BodyScanRoutine: Adaptive settling needs a timeout > 0!"
+            # PNA averaging stays off after settling if the averaging is done by the AdaptiveAverager
+            settle_vna_info = vna_info if averaging_config is None else dict(vna_info, avg_num=1)
+            self.settling = SettlingDetector(vna, settle_vna_info, settling_config)
+        if averaging_config is not None:
+            self.averaging = AdaptiveAverager(vna, vna_info, averaging_config)
+        if roi is not None:
+            self.roi_mask = calc_roi_mask(self.mesh_x_vector, self.mesh_y_vector, self.mesh_z_vector, roi, origin)
+            assert self.roi_mask is not None, "BodyScanRoutine: Invalid region of interest given!"
+        if scan_columns is None:
+            scan_columns = plan_body_scan_columns(self.mesh_x_vector, self.mesh_y_vector, self.mesh_z_vector,
+                                                  move_pattern, self.z_move_below, AxisCostModel(mov_speed),
+                                                  self.roi_mask)
+        self.scan_columns = np.array(scan_columns, dtype=float).reshape(-1, 2)
+        if self.roi_mask is None:
+            self.column_z = [self.mesh_z_vector] * len(self.scan_columns)
+        else:
+            self.column_z = column_z_vectors(self.scan_columns, self.mesh_x_vector, self.mesh_y_vector,
+                                             self.mesh_z_vector, self.roi_mask)
+
+        self.phase_timer = PhaseTimer(['jog_below', 'jog_submit', 'flag_wait', 'settle', 'vna_trigger'] +
+                                      ['readout_' + parameter for parameter in vna_info['parameter']] +
+                                      ['conversion', 'storage', 'error_recovery'])
+
+        # redundant None initialization to be sure
+        self.json_S11 = None
+        self.json_S12 = None
+        self.json_S22 = None
+
+        # setup path to error log
+        self.error_log_path = os.path.join(os.path.dirname(os.path.dirname(file_location)), "error_log.txt")
+        with open(self.error_log_path, "a") as file:
+            file.write(f"\n\n#### Started new BodyScan - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ####\n")
+
+        # open ONE measurement file
+        json_file_location = file_location + '.json'
+        self.measurement_file_json = open(json_file_location, "w")
+
+        # initialize json data storage for measurement
+        self.json_data_storage = {}
+        measurement_config = {
+            'type': 'Body Scan Data JSON',
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'zero_position': origin,    # redundant information, but for better readability with automeasurement methods
+            'origin_position': origin,
+            'move_pattern': move_pattern,
+            'mesh_x_min': x_vec[0],  # [mm]
+            'mesh_x_max': x_vec[-1],  # [mm]
+            'mesh_x_steps': len(x_vec),
+            'mesh_y_min': y_vec[0],  # [mm]
+            'mesh_y_max': y_vec[-1],  # [mm]
+            'mesh_y_steps': len(y_vec),
+            'mesh_z_min': z_vec[0],  # [mm]
+            'mesh_z_max': z_vec[-1],  # [mm]
+            'mesh_z_steps': len(z_vec),
+            'movespeed': mov_speed,  # [mm/s]
+            'parameter': vna_info['parameter'],
+            'freq_start': vna_info['freq_start'],  # [Hz]
+            'freq_stop': vna_info['freq_stop'],  # [Hz]
+            'sweep_num_points': vna_info['sweep_num_points'],
+            'if_bw': vna_info['if_bw'],  # [Hz]
+            'output_power': vna_info['output_power'],  # [dBm]
+            'average_number': vna_info['avg_num'],
+        }
+        if vna_info.get('segments'):
+            # non-uniform frequency axis of the segment sweep, see segment_sweep.py
+            measurement_config['segments'] = vna_info['segments']
+            measurement_config['frequencies'] = get_frequency_vector(vna_info).tolist()
+        if self.roi_mask is not None:
+            # data lists the measured points only, see read_point_list_data_array() in adaptive_refinement.py
+            measurement_config['data_format'] = 'point_list'
+            measurement_config['roi'] = roi
+        if self.settling is not None:
+            measurement_config['settling'] = self.settling.to_json_dict()
+        if self.averaging is not None:
+            measurement_config['adaptive_averaging'] = self.averaging.to_json_dict()
+        self.json_data_storage['measurement_config'] = measurement_config
+        self.json_data_storage['data'] = []
+
+        # setup dictionaries for separate parameter measurements and assign index in reduced list
+        amp_idx = 4
+        phase_idx = 5
+        if 'S11' in vna_info['parameter']:
+            self.json_S11 = {'parameter': 'S11', 'values': [], 'amp_idx': amp_idx, 'phase_idx': phase_idx}
+            amp_idx += 2
+            phase_idx += 2
+        if 'S12' in vna_info['parameter']:
+            self.json_S12 = {'parameter': 'S12', 'values': [], 'amp_idx': amp_idx, 'phase_idx': phase_idx}
+            amp_idx += 2
+            phase_idx += 2
+        if 'S22' in vna_info['parameter']:
+            self.json_S22 = {'parameter': 'S22', 'values': [], 'amp_idx': amp_idx, 'phase_idx': phase_idx}
+
+    def run(self):
+        try:
+            self.__run_scan()
+        finally:
+            if self.averaging is not None:     # restored by close_all_files() already unless the scan failed
+                self.averaging.restore_pna_average()
+        return
+
+    def __run_scan(self):
+        self.signals.update.emit("Started BodyScan Thread")
+        self.__save_pna_state()
+        travel_path, _ = expand_body_scan_path(self.scan_columns, self.mesh_z_vector, self.z_move_below,
+                                               self.column_z)
+        travel_time = AxisCostModel(self.chamber_mov_speed).path_duration(travel_path)
+        self.signals.update.emit(f"Move pattern '{self.move_pattern}', predicted travel time {round(travel_time)}s")
+
+        # assemble string to display file location
+        file_location_string = "\n< " + self.measurement_file_json.name + " >\n"
+
+        # calculate num of points and layers for progress monitoring, only points inside of the roi are counted
+        num_of_points_per_layer = len(self.scan_columns)
+        num_of_layers = len(self.mesh_z_vector)
+        total_num_of_points = sum(len(z_column) for z_column in self.column_z)
+
+        # initialize progress dict and send first update
+        progress_dict = {
+            'total_points_in_measurement': total_num_of_points,
+            'num_of_layers_in_measurement': num_of_layers,
+            'num_of_points_in_current_layer': num_of_points_per_layer,
+            'status_flag': "Measurement running ...",
+            'time_to_go': 'N/A',  # time to go in [seconds] as float
+        }
+
+        meas_start_timestamp = datetime.now()   # restarted after the first point, set for a stop before
+        layer_count = 0
+        point_in_layer_count = 0
+        total_point_count = 0
+
+        # START MEASUREMENT LOOP
+        for column_idx, ((x_coor, y_coor), z_column) in enumerate(zip(self.scan_columns, self.column_z)):
+            layer_count = 0             # reset layer count at each new point
+            point_in_layer_count += 1   # increment point in layer count for each new XY point addressed
+            # Move below point, avoid chamber z-direction lack
+            self.signals.log.emit(f"Move below next XY-point: ({x_coor}, {y_coor})", logging.DEBUG)
+            move_below_start = time.perf_counter()
+            self.chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=float(z_column[0]) - self.z_move_below,
+                                         speed=self.chamber_mov_speed)  # Comment here when testing without chamber
+            move_below_duration = time.perf_counter() - move_below_start
+            for z_coor in z_column:
+                layer_count += 1
+                total_point_count += 1
+
+                # START TRY BLOCK & WHILE LOOP HERE
+                self.phase_timer.start_point()
+                self.phase_timer.add('jog_below', move_below_duration)     # booked on first point of XY-column
+                move_below_duration = 0.0
+                self.recovery.begin_point()
+                self.measurement_iteration_success = False
+                while not self.measurement_iteration_success:
+
+                    # check for interruption
+                    if self._is_running is False:
+                        self.signals.error.emit({'error_code': 0, 'error_msg': self.__stop_message()})
+                        self.signals.update.emit("Auto Measurement was interrupted")
+                        progress_dict['status_flag'] = "Measurement stopped"
+                        self.__append_to_error_log(
+                            f"AutoMeasurement was stopped at [{x_coor}, {y_coor}, {z_coor}]: {self.__stop_message()}.")
+                        self.signals.progress.emit(progress_dict)
+                        self.signals.timing_summary.emit(self.phase_timer.get_summary())
+                        self.close_all_files(meas_start_timestamp)
+                        self.signals.finished.emit({'file_location': file_location_string,
+                                                    'stopped': True,
+                                                    'stop_reason': self.stop_reason,
+                                                    'duration': str(timedelta(seconds=(round((datetime.now() - meas_start_timestamp).total_seconds()))))})
+                        return
+                    try:
+                        self.signals.log.emit('Request movement to X: ' + str(x_coor) + ' Y: ' + str(y_coor) + ' Z: ' + str(z_coor),
+                                              logging.DEBUG)
+                        jog_timing = {}
+                        self.chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=z_coor, speed=self.chamber_mov_speed,
+                                                     timing=jog_timing) # Comment here when testing without chamber
+                        for phase, duration in jog_timing.items():
+                            self.phase_timer.add(phase, duration)
+                        self.signals.position_update.emit({'abs_x': x_coor, 'abs_y': y_coor, 'abs_z': z_coor})
+                        self.signals.log.emit("Movement done!", logging.DEBUG)
+
+                        # sleep to let chamber/body settle #
+                        if self.settling is not None:
+                            settle_time, num_readings, settled = self.settling.wait()
+                            self.phase_timer.add('settle', settle_time)
+                            if settled:
+                                self.signals.log.emit(f"Settled after {round(settle_time, 3)}s "
+                                                      f"({num_readings} readings)", logging.DEBUG)
+                            else:
+                                self.signals.log.emit(f"Settling timed out after {round(settle_time, 3)}s at "
+                                                      f"[{x_coor}, {y_coor}, {z_coor}]", logging.WARNING)
+                        else:
+                            with self.phase_timer.measure('settle'):
+                                time.sleep(self.z_move_sleep_time)
+
+                        # Routine to do vna measurement and store data somewhere put here...
+                        self.signals.log.emit("Trigger measurement...", logging.DEBUG)
+                        with self.phase_timer.measure('vna_trigger'):
+                            if self.averaging is not None:  # sweeps are read out and averaged in trigger()
+                                num_averages = self.averaging.trigger()
+                                self.signals.log.emit(f"{num_averages} sweeps averaged", logging.DEBUG)
+                            else:
+                                self.vna.pna_trigger_measurement(self.vna_meas_name)    # Comment here when testing without VNA
+                        self.signals.log.emit("Measurement done! Read data from VNA and write to file...", logging.DEBUG)
+
+                        x_coor_antennas = x_coor - self.origin[0]
+                        y_coor_antennas = y_coor - self.origin[1]
+                        z_coor_antennas = z_coor - self.origin[2]
+
+                        # read data from VNA
+                        for json_dic in [self.json_S11, self.json_S12, self.json_S22]:
+                            if json_dic is not None:
+                                # read data to buffer property
+                                self.signals.log.emit(
+                                    f"JSON-routine reads {json_dic['parameter']}-Parameter Values...", logging.DEBUG)
+                                with self.phase_timer.measure('readout_' + json_dic['parameter']):
+                                    if self.averaging is not None:
+                                        data = self.averaging.read(json_dic['parameter'])
+                                    else:
+                                        data = self.vna.pna_read_meas_data(self.vna_meas_name, json_dic['parameter'])   # comment here when testing without VNA
+                                with self.phase_timer.measure('conversion'):
+                                    data = np.array(data, dtype=float)
+                                    pointer = data[:, 1] + 1j * data[:, 2]
+                                    amplitude = np.abs(pointer)
+                                    phase = np.degrees(np.angle(pointer))
+                                with self.phase_timer.measure('storage'):
+                                    for f_idx in range(len(data)):
+                                        json_dic['values'].append(
+                                            [x_coor_antennas, y_coor_antennas, z_coor_antennas, data[f_idx, 0],
+                                             float(amplitude[f_idx]), float(phase[f_idx])])
+                                self.signals.log.emit(f"{json_dic['parameter']} data appended.", logging.DEBUG)
+                        if self.averaging is not None:
+                            self.averaging.add_point(x_coor_antennas, y_coor_antennas, z_coor_antennas)
+
+                        # flag success of measurement
+                        self.measurement_iteration_success = True
+
+                    except Exception as e:
+                        self.__handle_error(e, f"[{x_coor}, {y_coor}, {z_coor}]")
+
+                    # END TRY BLOCK & WHILE LOOP HERE
+
+                    # Timekeeping for average time per point
+                    if total_point_count == 1:
+                        meas_start_timestamp = datetime.now()
+                        progress_dict['time_to_go'] = 0
+                    else:
+                        self.average_time_per_point = (datetime.now() - meas_start_timestamp).total_seconds() / (total_point_count - 1)
+                        progress_dict['time_to_go'] = round(self.average_time_per_point * (total_num_of_points - total_point_count))
+
+                    # give progression update
+                    progress_dict['total_current_point_number'] = total_point_count
+                    progress_dict['current_layer_number'] = layer_count
+                    progress_dict['current_point_number_in_layer'] = point_in_layer_count
+                    self.signals.progress.emit(progress_dict)
+                self.phase_timer.end_point()
+            if (column_idx + 1) % len(self.mesh_x_vector) == 0:
+                self.signals.timing_summary.emit(self.phase_timer.get_summary())   # summary after each line of XY-points
+        # END MEASUREMENT LOOP
+
+        self.signals.update.emit("AutoMeasurement is completed!")
+        progress_dict['status_flag'] = "Measurement finished"
+        self.signals.progress.emit(progress_dict)
+        self.close_all_files(meas_start_timestamp)  # before finished, the next job of the queue may start right after it
+        self.signals.finished.emit({'file_location': file_location_string,
+                                    'stopped': False,
+                                    'duration': str(timedelta(
+                                        seconds=(round((datetime.now() - meas_start_timestamp).total_seconds()))))})
+        return
+
+    def stop(self):
+        """
+        Method to interrupt the thread in the next possible moment (thread checks for interruption regularly)
+        """
+        self._is_running = False
+
+    def close_all_files(self, meas_start_timestamp: datetime = None):
+        """
+        SAME AS AutoMeasurementRoutine.close_all_files(), only little simplification
+
+        Detects all open files, writes data to them if necessary and closes all files.
+        This function must be called before Thread finishes.
+        """
+        # update measurement duration in measurement_config
+        if meas_start_timestamp is not None:
+            time_taken_sec = (datetime.now() - meas_start_timestamp).total_seconds()
+            self.json_data_storage['measurement_config']['duration'] = str(timedelta(seconds=time_taken_sec))
+
+        if self.settling is not None:
+            settling_info = self.settling.to_json_dict()
+            self.json_data_storage['measurement_config']['settling'] = settling_info
+            self.signals.update.emit(f"Adaptive settling: mean {round(settling_info['mean_settle_time'], 3)}s, "
+                                     f"max {round(settling_info['max_settle_time'], 3)}s, "
+                                     f"{settling_info['num_timeouts']} timeouts")
+        if self.averaging is not None:
+            self.averaging.restore_pna_average()
+            averaging_info = self.averaging.to_json_dict()
+            self.json_data_storage['measurement_config']['adaptive_averaging'] = averaging_info
+            self.signals.update.emit(f"Adaptive averaging: mean {round(averaging_info['mean_averages'], 1)} "
+                                     f"averages, {averaging_info['num_points_at_max']} points at maximum of "
+                                     f"{averaging_info['max_averages']}")
+
+        self.json_data_storage['measurement_config']['error_recovery'] = self.recovery.to_json_dict()
+        if self.recovery.num_errors > 0:
+            self.signals.update.emit(f"{self.recovery.num_errors} errors recovered in "
+                                     f"{round(self.recovery.recovery_time, 1)}s: {self.recovery.num_per_class}")
+
+        # per-point durations of all phases, rows in order of measurement (not sorted like data!)
+        self.json_data_storage['point_timing'] = self.phase_timer.to_json_dict()
+        if self.averaging is not None:
+            # number of averages of each point, rows in order of measurement (not sorted like data!)
+            self.json_data_storage['point_averages'] = self.averaging.get_point_averages()
+
+        # close json file - dicts must be assembled and data written to file before close()
+        self.signals.update.emit("Reading data from dicts and print to json file...")
+        # Assembly large data-list with syntax:
+        #   [ [x, y, z, f, S11-amp, S11-ph, S12-amp, S12-ph, S22-amp, S22-ph], ... ]
+        #   Dependent on the parameters that are supposed to be measured, each point-list in the overall list
+        #   has length of 6 (one S-param), 8 (two S-param) or 10 (three S-param). The order in which they are
+        #   stored, if present, is S11 > S12 > S22. Their indexing shifts so that point-lists are as short as
+        #   possible. Indexes are stored in property buffer-dicts as 'amp_idx' and 'phase_idx'.
+        # 1. generate point_list_entry-buffer with right length to store all parameter measurements
+        num_of_parameters = self.json_data_storage['measurement_config']['parameter'].__len__()
+        point_list_entry_buffer = [0.0, 0.0, 0.0, 0.0]
+        for i in range(num_of_parameters):
+            point_list_entry_buffer.append(0.0)  # amplitude
+            point_list_entry_buffer.append(0.0)  # phase
+        # 2. find total length of list, each list should be same length //
+        # assign base-buffer to read from coor & freq
+        num_points_measured = 0
+        base_buffer = None
+        for par_dict in [self.json_S11, self.json_S12, self.json_S22]:
+            if par_dict is not None:
+                num_points_measured = par_dict['values'].__len__()
+                base_buffer = par_dict  # base_buffer always overridden since same XYZ and Freq for all S-params
+        # 3. run through base-buffer list to get all coordinates and frequencies and append the measured
+        # amplitudes and phases to the data-list as ONE list-entry for all measured S-parameters in one point
+        # at one frequency.
+        for idx in range(num_points_measured):
+            point_list_entry_buffer[0] = float(base_buffer['values'][idx][0])  # X-coor, typecast to regular float for json library
+            point_list_entry_buffer[1] = float(base_buffer['values'][idx][1])  # Y-coor, typecast to regular float for json library
+            point_list_entry_buffer[2] = float(base_buffer['values'][idx][2])  # Z-coor, typecast to regular float for json library
+            point_list_entry_buffer[3] = float(base_buffer['values'][idx][3])  # Frequency, typecast to regular float for json library
+            for par_dict in [self.json_S11, self.json_S12, self.json_S22]:
+                if par_dict is not None:
+                    point_list_entry_buffer[par_dict['amp_idx']] = par_dict['values'][idx][4]
+                    point_list_entry_buffer[par_dict['phase_idx']] = par_dict['values'][idx][5]
+            self.json_data_storage['data'].append(
+                point_list_entry_buffer.copy())  # Must use copy(), otherwise only reference handed to list!
+
+        # Sort list to be independent of movement pattern // comply with read-method of processController
+        self.json_data_storage['data'] = sorted(self.json_data_storage['data'],
+                                                key=lambda sublist: (sublist[2],  # z
+                                                                     sublist[1],  # y
+                                                                     sublist[0],  # x
+                                                                     sublist[3]))  # f
+
+        # decide if formatting readable
+        indent = 4
+        self.measurement_file_json.write(json.dumps(self.json_data_storage, indent=indent))
+        self.signals.update.emit(f"Data written to {self.measurement_file_json.name}")
+        self.measurement_file_json.close()
+
+        return
+
+    def __append_to_error_log(self, error_msg: str):
+        """
+        Appends an error message to the error log file with timestamp.
+        """
+        with open(self.error_log_path, 'a') as file:
+            file.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {error_msg}\n")
+        return
+
+    def __handle_error(self, e: Exception, context: str) -> bool:
+        """
+        Hands an error of the measurement loop to the recovery policy (see error_recovery.py) and reports the error
+        event. If the retry budget is exhausted, the routine is stopped like by the process controller.
+
+        :param context: where the error occurred, e.g. coordinates of the point
+        :return: True >> retry, False >> measurement must stop
+        """
+        self.signals.log.emit(f"Error occurred at {context}", logging.WARNING)
+        self.__append_to_error_log(f"Error occurred at {context}: {e}")
+        event = self.recovery.handle(e, context)
+        self.phase_timer.add('error_recovery', event['recovery_time'])
+        self.__append_to_error_log(f"Recovery event: {json.dumps(event)}")
+        self.signals.error.emit(event)
+        if event['give_up']:
+            self.stop_reason = f"retry budget exhausted ({event['error_class']} error at {context})"
+            self.signals.log.emit(f"Stop measurement, {self.stop_reason}", logging.ERROR)
+            self._is_running = False
+            return False
+        self.signals.log.emit(f"{event['error_class']} error recovered by '{event['action']}' after "
+                              f"{round(event['recovery_time'], 2)}s. Restarting measurement at {context}...",
+                              logging.WARNING)
+        return True
+
+    def __save_pna_state(self):
+        """
+        Takes the snapshot of the configured PNA that is restored by the 'state_recall' tier of the error recovery
+        instead of a full preset and reconfiguration.
+        """
+        self.vna_state = self.vna.pna_save_state(f"{self.vna_meas_name}_recovery.cst")
+        if self.vna_state is None:
+            self.signals.log.emit("PNA state could not be saved, error recovery falls back to full preset",
+                                  logging.WARNING)
+        return
+
+    def __recall_pna_state(self) -> bool:
+        """
+        :return: True >> PNA state snapshot restored, False >> no snapshot or recall failed
+        """
+        return self.vna.pna_recall_state(self.vna_state)
+
+    def __stop_message(self) -> str:
+        """
+        :return: reason for the interruption of the measurement loop
+        """
+        if self.stop_reason is not None:
+            return f"Measurement stopped, {self.stop_reason}"
+        return "Thread was interrupted by process controller"
+
+    def __reconfigure_pna(self):
+        """
+        Reconfigures the PNA with the stored configuration in self.vna_info_buffer >> only .cst file configuration!
+
+        :return: True >> success, False >> failed
+        """
+        self.vna.pna_preset()
+        return self.vna.pna_preset_from_file(self.vna_info_buffer['vna_preset_from_file'],
+                                             self.vna_meas_name) not in (None, False)
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Continuous on-the-fly scanning of the AutoMeasurement.
+
+Instead of stopping at every point of the mesh, each X-line is driven as one constant speed move while the PNA sweeps
+as fast as it can. The chamber only reports the end of the move (busy flag, see chamber_start_jog_abs()), so the
+position of each sweep is interpolated by the trapezoidal motion model of the AxisCostModel from the time of the
+sweep. The delay between the submit of the move and the start of the movement is calibrated after every line from
+the observed end of the move (median of all lines so far) or can be given fixed as 'start_delay'.
+
+Each line starts with a run-up, so the chamber reaches the line speed before the first mesh point. The line speed
+follows from the sweep period by default: samples_per_step sweeps are taken per mesh step.
+
+The sweeps are tagged with their interpolated position and stored as raw rows [x, y, z, f, amp, phase, ...] like
+measured points ('data_format': 'continuous'). resample_continuous_data() interpolates amplitude and unwrapped phase of
+each line onto the X-coordinates of the mesh, so the data can be displayed and processed like a regular measurement.
+With 'resample' the measurement file holds the resampled mesh in 'data' and the raw sweeps in 'continuous_raw_data'.
+"""
+import numpy as np
+from .path_planner import AxisCostModel
+from .segment_sweep import get_frequency_vector
+
+CONTINUOUS_DEFAULTS = {
+    'line_speed': None,         # unit [mm/s], speed of the X-line moves, None to derive it from the sweep period
+    'samples_per_step': 2,      # sweeps per mesh step in X if line_speed is None
+    'start_delay': None,        # unit [s], delay from submit of the line move to start of movement, None to calibrate
+    'resample': True,           # store the data resampled onto the mesh, raw sweeps in 'continuous_raw_data'
+}
+
+
+def plan_continuous_lines(y_vec: np.ndarray, z_vec: np.ndarray, move_pattern: str) -> list:
+    """
+    Order of the X-lines of a continuous scan. 'line-by-line' runs all lines in positive X-direction, 'snake' and
+    'optimized' alternate the direction of X with every line and the direction of Y with every layer.
+
+    :return: list of tuples (y_coor, z_coor, forward) in scan order
+    """
+    lines = []
+    forward = True
+    y_forward = True
+    for z_coor in z_vec:
+        for y_coor in (y_vec if y_forward else y_vec[::-1]):
+            lines.append((float(y_coor), float(z_coor), forward))
+            if move_pattern != 'line-by-line':
+                forward = not forward
+        if move_pattern != 'line-by-line':
+            y_forward = not y_forward
+    return lines
+
+
+def calc_line_speed(x_vec: np.ndarray, sweep_period: float, samples_per_step: int, max_speed: float) -> float:
+    """
+    :param sweep_period: duration of one sweep including readout [s]
+    :return: speed of the X-line moves [mm/s], so samples_per_step sweeps are taken per mesh step
+    """
+    x_step = abs(float(x_vec[1] - x_vec[0])) if len(x_vec) > 1 else 0.0
+    if x_step == 0 or sweep_period <= 0:
+        return float(max_speed)
+    return float(min(max_speed, x_step / (max(1, int(samples_per_step)) * sweep_period)))
+
+
+def calc_run_up(cost_model: AxisCostModel, line_speed: float) -> float:
+    """
+    :return: distance [mm] the X-axis needs to accelerate to line speed
+    """
+    speed = min(line_speed, float(cost_model.axis_max_speed[0]))
+    return speed ** 2 / (2 * float(cost_model.axis_acceleration[0]))
+
+
+def calc_line_endpoints(x_vec: np.ndarray, y_coor: float, z_coor: float, forward: bool, run_up: float) -> tuple:
+    """
+    :return: tuple (start, stop) of the line move in chamber coordinates [mm], extended by the run-up on both ends
+        and clipped to the workspace of the chamber
+    """
+    from .scan_spec import X_MAX_COOR     # scan_spec imports this module
+    x_first, x_last = (x_vec[0], x_vec[-1]) if forward else (x_vec[-1], x_vec[0])
+    direction = 1 if forward else -1
+    start = np.array([np.clip(x_first - direction * run_up, 0, X_MAX_COOR), y_coor, z_coor], dtype=float)
+    stop = np.array([np.clip(x_last + direction * run_up, 0, X_MAX_COOR), y_coor, z_coor], dtype=float)
+    return start, stop
+
+
+def tag_sweep_positions(cost_model: AxisCostModel, start: np.ndarray, target: np.ndarray, line_speed: float,
+                        sweep_times: np.ndarray, move_start: float) -> np.ndarray:
+    """
+    :param sweep_times: time stamps of the sweeps (time.perf_counter()) [s]
+    :param move_start: time stamp of the start of the movement [s]
+    :return: array of shape (len(sweep_times), 3) with the interpolated XYZ-positions [mm]
+    """
+    return cost_model.move_positions(start, target, np.asarray(sweep_times, dtype=float) - move_start, line_speed)
+
+
+def resample_line(x_samples: np.ndarray, pointers: np.ndarray, x_grid: np.ndarray) -> np.ndarray:
+    """
+    Interpolates amplitude and unwrapped phase of the sweeps of one line onto the grid. Grid points further than half
+    a grid step outside of the sampled range stay zero.
+
+    :param x_samples: X-positions of the sweeps [mm]
+    :param pointers: complex values of shape (num_sweeps, num_freq)
+    :return: complex values of shape (len(x_grid), num_freq)
+    """
+    x_grid = np.asarray(x_grid, dtype=float)
+    pointers = np.asarray(pointers, dtype=complex)
+    result = np.zeros((len(x_grid), pointers.shape[1] if pointers.ndim == 2 else 0), dtype=complex)
+    if len(x_samples) == 0:
+        return result
+    order = np.argsort(x_samples, kind='stable')
+    x_samples = np.asarray(x_samples, dtype=float)[order]
+    pointers = pointers[order]
+    half_step = abs(float(x_grid[1] - x_grid[0])) / 2 if len(x_grid) > 1 else 0.0
+    inside = (x_grid >= x_samples[0] - half_step) & (x_grid <= x_samples[-1] + half_step)
+    amplitude = np.abs(pointers)
+    phase = np.unwrap(np.angle(pointers), axis=0)
+    for f_idx in range(pointers.shape[1]):
+        result[inside, f_idx] = np.interp(x_grid[inside], x_samples, amplitude[:, f_idx]) * \
+            np.exp(1j * np.interp(x_grid[inside], x_samples, phase[:, f_idx]))
+    return result
+
+
+def resample_continuous_data(measurement_config: dict, data: list) -> list:
+    """
+    Converts the raw sweeps of a continuous measurement to data rows of all points of the mesh, sorted like the
+    'data' of a regular measurement file. Points of lines that were not measured are zero.
+
+    :param data: raw rows [x, y, z, f, amp, phase, ...] relative to zero position, stored sweep after sweep
+    :return: list of rows [x, y, z, f, amp, phase, ...] relative to zero position
+    """
+    num_parameter = len(measurement_config['parameter'])
+    num_freq = measurement_config['sweep_num_points']
+    zero_position = measurement_config['zero_position']
+    x_grid, y_grid, z_grid = [np.linspace(measurement_config[f'mesh_{coor}_min'],
+                                          measurement_config[f'mesh_{coor}_max'],
+                                          measurement_config[f'mesh_{coor}_steps']) - zero_position[axis]
+                              for axis, coor in enumerate('xyz')]
+    freq_vec = get_frequency_vector(measurement_config)
+    values = np.zeros((len(z_grid), len(y_grid), len(x_grid), num_freq, num_parameter), dtype=complex)
+
+    rows = np.array(data, dtype=float).reshape(-1, 4 + 2 * num_parameter)
+    if len(rows) > 0:
+        # one block of num_freq rows per sweep
+        sweeps = rows.reshape(-1, num_freq, 4 + 2 * num_parameter)
+        y_idx = np.argmin(np.abs(sweeps[:, 0, 1, None] - y_grid), axis=1)
+        z_idx = np.argmin(np.abs(sweeps[:, 0, 2, None] - z_grid), axis=1)
+        for line_key in np.unique(np.column_stack((z_idx, y_idx)), axis=0):
+            line_sweeps = sweeps[(z_idx == line_key[0]) & (y_idx == line_key[1])]
+            for parameter_idx in range(num_parameter):
+                pointers = line_sweeps[:, :, 4 + 2 * parameter_idx] * \
+                    np.exp(1j * np.radians(line_sweeps[:, :, 5 + 2 * parameter_idx]))
+                values[line_key[0], line_key[1], :, :, parameter_idx] = resample_line(line_sweeps[:, 0, 0],
+                                                                                     pointers, x_grid)
+
+    result = []
+    for z_idx, z_coor in enumerate(z_grid):
+        for y_idx, y_coor in enumerate(y_grid):
+            for x_idx, x_coor in enumerate(x_grid):
+                for f_idx, frequency in enumerate(freq_vec):
+                    row = [float(x_coor), float(y_coor), float(z_coor), float(frequency)]
+                    for pointer in values[z_idx, y_idx, x_idx, f_idx]:
+                        row += [float(np.abs(pointer)), float(np.degrees(np.angle(pointer)))]
+                    result.append(row)
+    return result
+
+
+def estimate_line_durations(cost_model: AxisCostModel, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray,
+                            move_pattern: str, line_speed: float, start_position: np.ndarray = None) -> np.ndarray:
+    """
+    Predicts the duration of each line of a continuous scan: the jog to the run-up start and the line move itself.
+
+    :param start_position: chamber position before the scan, defaults to the start of the first line
+    :return: duration of each line in scan order [s]
+    """
+    run_up = calc_run_up(cost_model, line_speed)
+    lines = plan_continuous_lines(y_vec, z_vec, move_pattern)
+    position = None if start_position is None else np.asarray(start_position, dtype=float)
+    durations = np.zeros(len(lines))
+    for line_idx, (y_coor, z_coor, forward) in enumerate(lines):
+        line_start, line_stop = calc_line_endpoints(x_vec, y_coor, z_coor, forward, run_up)
+        durations[line_idx] = cost_model.path_duration(line_start[None, :], position) + \
+            cost_model.move_duration(line_start, line_stop, line_speed) + cost_model.move_overhead_time
+        position = line_stop
+    return durations
@@ -0,0 +1,353 @@
+"""
+Dry run of AutoMeasurement and BodyScan without any hardware.
+
+The move sequence of the routines is planned exactly like the routines do it (see path_planner.py, move below each
+XY-point in the BodyScan) and fed through the axis cost model of the chamber and a timing model of the PNA sweep.
+The result gives the expected duration of the whole scan and of each layer as well as the expected size of the
+measurement file for each storage format. All durations are given in [ms].
+
+Adaptive auto measurements (see adaptive_refinement.py) are simulated with their coarse grid only, as the refinement
+depends on the measured field. The result names the maximum number of refinement points in addition.
+Scans with region of interest (see roi_mask.py) only plan the points inside of the mask.
+Body scans with adaptive settling (see settling.py) are simulated with the shortest settling time, all settle readings
+agree right away. The result names the timeout in addition, which is the longest settling time per point.
+Scans with adaptive averaging (see adaptive_averaging.py) are simulated with the fewest averages, every point reaches
+the target uncertainty after 'min_averages' sweeps. The result names the duration with 'max_averages' in addition.
+Continuous auto measurements (see continuous_scan.py) are simulated line by line, the PNA sweeps while the chamber
+moves. The result holds the duration of the same scan stop-and-go for comparison.
+
+The timing models use typical values of the chamber and the E8361A PNA. They are class attributes and can be adapted
+if the measured 'point_timing' of previous measurement files shows different values.
+"""
+import json
+import numpy as np
+from .body_scan import BodyScanRoutine
+from .scan_spec import calc_mesh_vectors
+from .path_planner import AxisCostModel, plan_auto_measurement_path, plan_body_scan_columns, expand_body_scan_path
+from .adaptive_refinement import AdaptiveRefinement, coarse_indices
+from .roi_mask import calc_roi_mask, column_z_vectors
+from .continuous_scan import CONTINUOUS_DEFAULTS, calc_line_speed, estimate_line_durations
+from .settling import SETTLING_DEFAULTS
+from .adaptive_averaging import resolve_averaging_config
+from .segment_sweep import apply_segments, calc_sweep_bandwidths, get_frequency_vector
+
+
+class VnaTimingModel:
+    """
+    Duration of pna_trigger_measurement() and pna_read_meas_data() per point.
+    S11 is stimulated from port 1, S12 and S22 from port 2, so each used source port needs one sweep per average.
+    Readout is transferred as ascii over GPIB: stimulus values plus real and imaginary part per frequency point.
+    """
+    trigger_overhead_time: float = 0.03     # unit [s], SCPI trigger and *OPC? polling
+    sweep_time_factor: float = 1.2          # measure time per frequency point is sweep_time_factor / if_bw
+    retrace_time: float = 0.015             # unit [s], per sweep
+    readout_overhead_time: float = 0.02     # unit [s], per parameter, select measurement and two queries
+    readout_bytes_per_freq_point: int = 60  # 3 ascii values per frequency point, ~20 characters each
+    readout_throughput: float = 250e3       # unit [bytes/s], typical GPIB throughput for ascii transfer
+    host_time_per_value: float = 2e-6       # unit [s], conversion and storage per frequency point and parameter
+
+    def sweep_duration(self, vna_info: dict) -> float:
+        """
+        :return: duration of one triggered (averaged) measurement of all parameters [s]
+        """
+        source_ports = {'1' if parameter == 'S11' else '2' for parameter in vna_info['parameter']}
+        # segment sweeps measure each segment with its own IF bandwidth, see segment_sweep.py
+        single_sweep = float(np.sum(self.sweep_time_factor / calc_sweep_bandwidths(vna_info))) + self.retrace_time
+        return self.trigger_overhead_time + vna_info['avg_num'] * len(source_ports) * single_sweep
+
+    def readout_duration(self, vna_info: dict) -> float:
+        """
+        :return: duration to read all parameters of one point from the PNA [s]
+        """
+        single_readout = self.readout_overhead_time + \
+            vna_info['sweep_num_points'] * self.readout_bytes_per_freq_point / self.readout_throughput
+        return len(vna_info['parameter']) * single_readout
+
+    def settle_duration(self, vna_info: dict, settling_config: dict) -> float:
+        """
+        :return: shortest duration of adaptive settling (see settling.py), all readings agree right away [s]
+        """
+        settle_info = dict(vna_info, parameter=[vna_info['parameter'][0]], avg_num=1,
+                           sweep_num_points=settling_config['num_points'], segments=None)
+        num_readings = settling_config['num_agreeing'] + 1
+        return num_readings * (self.sweep_duration(settle_info) + self.readout_duration(settle_info))
+
+    def host_duration(self, vna_info: dict) -> float:
+        """
+        :return: duration of conversion and storage of one point in the routine [s]
+        """
+        return len(vna_info['parameter']) * vna_info['sweep_num_points'] * self.host_time_per_value
+
+
+def estimate_file_size(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, zero_position: tuple, vna_info: dict,
+                       num_timing_phases: int, indent: int = None, num_sample_rows: int = 2000,
+                       num_points: int = None) -> int:
+    """
+    Estimates the size of the json measurement file as written by close_all_files() of the routines.
+    A sample of data rows with the real coordinates and frequencies is serialized and scaled to the number of
+    measured points.
+
+    :param num_points: number of measured points, defaults to the full mesh
+    :return: expected file size [bytes]
+    """
+    if num_points is None:
+        num_points = len(x_vec) * len(y_vec) * len(z_vec)
+    num_rows = num_points * vna_info['sweep_num_points']
+    if num_rows == 0:
+        return 0
+    rng = np.random.default_rng(0)
+
+    sample_size = min(num_rows, num_sample_rows)
+    point_idx = rng.integers(0, len(x_vec) * len(y_vec) * len(z_vec), sample_size)
+    x_idx, y_idx, z_idx = np.unravel_index(point_idx, (len(x_vec), len(y_vec), len(z_vec)))
+    frequencies = get_frequency_vector(vna_info)
+    sample_rows = []
+    for i in range(sample_size):
+        row = [float(x_vec[x_idx[i]] - zero_position[0]), float(y_vec[y_idx[i]] - zero_position[1]),
+               float(z_vec[z_idx[i]] - zero_position[2]), float(frequencies[rng.integers(0, len(frequencies))])]
+        for _ in vna_info['parameter']:
+            row += [float(rng.uniform(1e-4, 1.0)), float(rng.uniform(-180, 180))]
+        sample_rows.append(row)
+    sample_timing = np.round(rng.uniform(0, 2000, (sample_size, num_timing_phases)), 3).tolist()
+
+    storage = {'measurement_config': {'type': 'Auto Measurement Data JSON', 'timestamp': '2000-01-01 00:00:00',
+                                      'zero_position': list(zero_position), 'move_pattern': 'line-by-line',
+                                      'mesh_x_min': float(x_vec[0]), 'mesh_x_max': float(x_vec[-1]),
+                                      'mesh_x_steps': len(x_vec), 'mesh_y_min': float(y_vec[0]),
+                                      'mesh_y_max': float(y_vec[-1]), 'mesh_y_steps': len(y_vec),
+                                      'mesh_z_min': float(z_vec[0]), 'mesh_z_max': float(z_vec[-1]),
+                                      'mesh_z_steps': len(z_vec), 'movespeed': 0.0,
+                                      'parameter': vna_info['parameter'], 'freq_start': vna_info['freq_start'],
+                                      'freq_stop': vna_info['freq_stop'],
+                                      'sweep_num_points': vna_info['sweep_num_points'], 'if_bw': vna_info['if_bw'],
+                                      'output_power': vna_info['output_power'], 'average_number': vna_info['avg_num'],
+                                      'duration': '1 day, 0:00:00.000000'},
+               'data': [],
+               'point_timing': {'unit': 'ms', 'phases': ['phase'] * num_timing_phases, 'values': []}}
+    if vna_info.get('segments'):
+        storage['measurement_config']['segments'] = vna_info['segments']
+        storage['measurement_config']['frequencies'] = get_frequency_vector(vna_info).tolist()
+    base_size = len(json.dumps(storage, indent=indent))
+    storage['data'] = sample_rows
+    bytes_per_row = (len(json.dumps(storage, indent=indent)) - base_size) / sample_size
+    storage['data'] = []
+    storage['point_timing']['values'] = sample_timing
+    bytes_per_timing_row = (len(json.dumps(storage, indent=indent)) - base_size) / sample_size
+    return int(base_size + bytes_per_row * num_rows + bytes_per_timing_row * num_points)
+
+
+def simulate_scan(spec: dict, vna_info: dict, start_position: tuple = None, cost_model: AxisCostModel = None,
+                  vna_model: VnaTimingModel = None) -> dict:
+    """
+    Runs the dry run of given scan spec (see scan_spec.py) without touching any hardware.
+
+    :param spec: scan spec of an auto_measurement or body_scan
+    :param vna_info: PNA configuration with 'parameter', 'freq_start', 'freq_stop', 'if_bw', 'sweep_num_points',
+        'output_power' and 'avg_num'. For .cst configurations the values of the file must be known.
+    :param start_position: chamber position before the scan, defaults to the first point of the scan
+    :param cost_model: chamber motion model, defaults to AxisCostModel with the jog speed of the spec
+    :return: dict {'type': str, 'move_pattern': str, 'num_points': int, 'num_moves': int, 'total_ms': float,
+                   'phases_ms': {'move': float, 'settle': float, 'vna_sweep': float, 'readout': float, 'host': float},
+                   'layer_label': 'z-layer' or 'y-line', 'layer_ms': list[float],
+                   'file_size_bytes': {'json_readable': int, 'json_compact': int}}
+        'json_compact' is only given for auto_measurement, body scans are always stored readable.
+        Adaptive auto measurements add 'refinement_points_max': int, durations and sizes are those of the coarse grid.
+        Body scans with adaptive settling add 'settle_timeout_ms': float, durations are those of the shortest settling.
+        Scans with adaptive averaging add 'averaging': {'min_averages': int, 'max_averages': int, 'max_total_ms':
+        float}, durations are those of the fewest averages.
+        Continuous auto measurements add 'continuous': {'line_speed': float [mm/s], 'num_lines': int,
+        'num_sweeps': int, 'stop_and_go_ms': float}, 'num_moves' counts the jogs to the line starts and line moves.
+    """
+    vna_info = apply_segments(dict(vna_info))
+    if cost_model is None:
+        cost_model = AxisCostModel(spec['jog_speed'])
+    if vna_model is None:
+        vna_model = VnaTimingModel()
+    if spec['type'] == 'auto_measurement' and spec.get('continuous') is not None:
+        return _simulate_continuous_scan(spec, vna_info, start_position, cost_model, vna_model)
+
+    x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+    if spec['zero_position'] is None or None in spec['zero_position']:
+        reference = (x_vec[0], y_vec[0], z_vec[0])
+    else:
+        reference = tuple(spec['zero_position'])
+    mask = None
+    if spec.get('roi') is not None:
+        mask = calc_roi_mask(x_vec, y_vec, z_vec, spec['roi'], reference)
+    refinement_points_max = None
+    settle_timeout = None
+    if spec['type'] == 'auto_measurement':
+        if spec.get('adaptive') is not None:
+            refinement = AdaptiveRefinement(x_vec, y_vec, z_vec, spec['adaptive'], mask)
+            targets = refinement.coarse_path(spec['move_pattern'], cost_model)
+            max_points = refinement.config['max_points']
+            if max_points is None:
+                max_points = len(x_vec) * len(y_vec) * len(z_vec) if mask is None else int(np.count_nonzero(mask))
+            refinement_points_max = max(0, max_points - len(targets))
+            x_vec = x_vec[coarse_indices(len(x_vec), refinement.config['coarse_step'])]
+            y_vec = y_vec[coarse_indices(len(y_vec), refinement.config['coarse_step'])]
+        else:
+            targets = plan_auto_measurement_path(x_vec, y_vec, z_vec, spec['move_pattern'], cost_model, mask)
+        is_measure_point = np.ones(len(targets), dtype=bool)
+        layer_idx = np.argmin(np.abs(targets[:, 2:3] - z_vec), axis=1) if len(z_vec) > 0 else np.zeros(0, dtype=int)
+        settle_time = 0.0
+        num_timing_phases = 7 + len(vna_info['parameter'])
+        layer_label = 'z-layer'
+        num_layers = len(z_vec)
+    else:
+        columns = plan_body_scan_columns(x_vec, y_vec, z_vec, spec['move_pattern'], BodyScanRoutine.z_move_below,
+                                         cost_model, mask)
+        column_z = None if mask is None else column_z_vectors(columns, x_vec, y_vec, z_vec, mask)
+        targets, is_measure_point = expand_body_scan_path(columns, z_vec, BodyScanRoutine.z_move_below, column_z)
+        layer_idx = np.argmin(np.abs(targets[:, 1:2] - y_vec), axis=1) if len(y_vec) > 0 else np.zeros(0, dtype=int)
+        settle_time = spec['mesh'].get('z_move_sleep_time', 0.0)
+        if spec.get('settling') is not None:
+            settling_config = dict(SETTLING_DEFAULTS, **spec['settling'])
+            if settling_config['timeout'] is None:
+                settling_config['timeout'] = settle_time
+            settle_timeout = settling_config['timeout']
+            settle_time = min(settle_timeout, vna_model.settle_duration(vna_info, settling_config))
+        num_timing_phases = 9 + len(vna_info['parameter'])
+        layer_label = 'y-line'
+        num_layers = len(y_vec)
+
+    if start_position is None or None in start_position or len(targets) == 0:
+        start = None
+    else:
+        start = np.array(start_position, dtype=float)
+    move_s = cost_model.path_times(targets, start)
+
+    sweep_s = vna_model.sweep_duration(vna_info)
+    readout_s = vna_model.readout_duration(vna_info)
+    averaging = None
+    if spec.get('averaging') is not None:
+        # single sweeps are read out and averaged on the host, see adaptive_averaging.py
+        averaging_config = resolve_averaging_config(spec['averaging'], vna_info['avg_num'])
+        single_sweep_s = vna_model.sweep_duration(dict(vna_info, avg_num=1)) + readout_s
+        averaging = {'min_averages': averaging_config['min_averages'],
+                     'max_averages': averaging_config['max_averages'],
+                     'max_total_ms': float(np.sum(move_s) + np.count_nonzero(is_measure_point) *
+                                           (settle_time + averaging_config['max_averages'] * single_sweep_s +
+                                            vna_model.host_duration(vna_info))) * 1e3}
+        sweep_s = averaging_config['min_averages'] * vna_model.sweep_duration(dict(vna_info, avg_num=1))
+        readout_s = averaging_config['min_averages'] * readout_s
+    point_s = settle_time + sweep_s + readout_s + vna_model.host_duration(vna_info)
+    step_s = move_s + np.where(is_measure_point, point_s, 0.0)
+    layer_s = np.bincount(layer_idx, weights=step_s, minlength=num_layers)
+
+    num_points = int(np.count_nonzero(is_measure_point))
+    if spec['zero_position'] is None or None in spec['zero_position']:
+        zero_position = tuple(targets[0]) if len(targets) > 0 else (0.0, 0.0, 0.0)
+    else:
+        zero_position = tuple(spec['zero_position'])
+    file_size = {'json_readable': estimate_file_size(x_vec, y_vec, z_vec, zero_position, vna_info,
+                                                     num_timing_phases, indent=4, num_points=num_points)}
+    if spec['type'] == 'auto_measurement':
+        file_size['json_compact'] = estimate_file_size(x_vec, y_vec, z_vec, zero_position, vna_info,
+                                                       num_timing_phases, indent=None, num_points=num_points)
+
+    result = {'type': spec['type'],
+              'move_pattern': spec['move_pattern'],
+              'num_points': num_points,
+              'num_moves': len(targets),
+              'total_ms': float(np.sum(step_s)) * 1e3,
+              'phases_ms': {'move': float(np.sum(move_s)) * 1e3,
+                            'settle': num_points * settle_time * 1e3,
+                            'vna_sweep': num_points * sweep_s * 1e3,
+                            'readout': num_points * readout_s * 1e3,
+                            'host': num_points * vna_model.host_duration(vna_info) * 1e3},
+              'layer_label': layer_label,
+              'layer_ms': (layer_s * 1e3).tolist(),
+              'file_size_bytes': file_size}
+    if refinement_points_max is not None:
+        result['refinement_points_max'] = refinement_points_max
+    if settle_timeout is not None:
+        result['settle_timeout_ms'] = settle_timeout * 1e3
+    if averaging is not None:
+        result['averaging'] = averaging
+    return result
+
+
+def _simulate_continuous_scan(spec: dict, vna_info: dict, start_position: tuple, cost_model: AxisCostModel,
+                              vna_model: VnaTimingModel) -> dict:
+    """
+    Dry run of a continuous auto measurement, see simulate_scan().
+    """
+    config = dict(CONTINUOUS_DEFAULTS, **spec['continuous'])
+    x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+    sweep_s = vna_model.sweep_duration(vna_info) + vna_model.readout_duration(vna_info) + \
+        vna_model.host_duration(vna_info)
+    line_speed = config['line_speed']
+    if line_speed is None:
+        line_speed = calc_line_speed(x_vec, sweep_s, config['samples_per_step'], spec['jog_speed'])
+    line_speed = cost_model.move_profile([0, 0, 0], [1, 0, 0], line_speed)[1]
+
+    start = None if start_position is None or None in start_position else np.array(start_position, dtype=float)
+    line_s = estimate_line_durations(cost_model, x_vec, y_vec, z_vec, spec['move_pattern'], line_speed, start)
+    layer_s = line_s.reshape(len(z_vec), len(y_vec)).sum(axis=1)
+    num_sweeps = int(abs(x_vec[-1] - x_vec[0]) / line_speed / sweep_s) * len(line_s)
+
+    num_points = len(x_vec) * len(y_vec) * len(z_vec)
+    zero_position = (x_vec[0], y_vec[0], z_vec[0]) if spec['zero_position'] is None or None in spec['zero_position'] \
+        else tuple(spec['zero_position'])
+    num_rows = num_points + num_sweeps if config['resample'] else num_sweeps     # raw sweeps are stored as well
+    file_size = {file_format: estimate_file_size(x_vec, y_vec, z_vec, zero_position, vna_info,
+                                                 7 + len(vna_info['parameter']), indent=indent, num_points=num_rows)
+                 for file_format, indent in [('json_readable', 4), ('json_compact', None)]}
+
+    stop_and_go_spec = dict(spec)
+    del stop_and_go_spec['continuous']
+    stop_and_go = simulate_scan(stop_and_go_spec, vna_info, start_position, cost_model, vna_model)
+    return {'type': spec['type'],
+            'move_pattern': spec['move_pattern'],
+            'num_points': num_points,
+            'num_moves': 2 * len(line_s),
+            'total_ms': float(np.sum(line_s)) * 1e3,
+            'phases_ms': {'move': float(np.sum(line_s)) * 1e3,
+                          'settle': 0.0,
+                          'vna_sweep': num_sweeps * vna_model.sweep_duration(vna_info) * 1e3,
+                          'readout': num_sweeps * vna_model.readout_duration(vna_info) * 1e3,
+                          'host': num_sweeps * vna_model.host_duration(vna_info) * 1e3},
+            'layer_label': 'z-layer',
+            'layer_ms': (layer_s * 1e3).tolist(),
+            'file_size_bytes': file_size,
+            'continuous': {'line_speed': line_speed, 'num_lines': len(line_s), 'num_sweeps': num_sweeps,
+                           'stop_and_go_ms': stop_and_go['total_ms']}}
+
+
+def format_dry_run_report(result: dict) -> str:
+    """
+    Assembles a short text of the dry run result for console output.
+    """
+    total_s = result['total_ms'] / 1e3
+    text = (f"Dry run of {result['type']} ({result['move_pattern']}): {result['num_points']} points, "
+            f"{result['num_moves']} moves\n"
+            f"    total: {result['total_ms']:.0f} ms (~{int(total_s // 3600)}h {int(total_s % 3600 // 60)}min "
+            f"{total_s % 60:.0f}s)\n")
+    if 'refinement_points_max' in result:
+        text += (f"    adaptive: coarse grid only, up to {result['refinement_points_max']} refinement points "
+                 f"(~{result['refinement_points_max'] * total_s / max(result['num_points'], 1) / 60:.0f}min) "
+                 f"depend on the measured field\n")
+    if 'settle_timeout_ms' in result:
+        text += (f"    adaptive settling: shortest settling given, timeout {result['settle_timeout_ms'] / 1e3:.1f}s per point "
+                 f"(~{result['settle_timeout_ms'] / 1e3 * result['num_points'] / 60:.0f}min) if the body does not "
+                 f"settle\n")
+    if 'averaging' in result:
+        averaging = result['averaging']
+        text += (f"    adaptive averaging: {averaging['min_averages']} averages per point given, up to "
+                 f"{averaging['max_averages']} averages in low-level regions (total {averaging['max_total_ms']:.0f} ms "
+                 f"if all points need the maximum)\n")
+    if 'continuous' in result:
+        continuous = result['continuous']
+        text += (f"    continuous: {continuous['num_lines']} lines at {continuous['line_speed']:.1f} mm/s, "
+                 f"~{continuous['num_sweeps']} sweeps while moving, stop-and-go {continuous['stop_and_go_ms']:.0f} ms "
+                 f"({continuous['stop_and_go_ms'] / max(result['total_ms'], 1e-9):.1f}x)\n")
+    for name, duration in result['phases_ms'].items():
+        text += f"    {name}: {duration:.0f} ms\n"
+    layer_ms = np.array(result['layer_ms'])
+    if len(layer_ms) > 0:
+        text += (f"    per {result['layer_label']} ({len(layer_ms)}x): mean {np.mean(layer_ms):.0f} ms, "
+                 f"min {np.min(layer_ms):.0f} ms, max {np.max(layer_ms):.0f} ms\n")
+    for file_format, size in result['file_size_bytes'].items():
+        text += f"    file size {file_format}: {size / 1e6:.2f} MB\n"
+    return text.rstrip('\n')
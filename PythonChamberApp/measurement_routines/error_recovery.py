@@ -0,0 +1,193 @@
+"""
+Error classification and tiered recovery of the measurement routines.
+
+The routines retry a point (or line) until it is measured. Instead of sleeping a fixed second and string-matching the
+VISA error codes, every error is classified by its type and handed to a RecoveryPolicy:
+
+    visa_timeout    pyvisa VisaIOError VI_ERROR_TMO, the PNA did not answer in time
+    visa_ncic       pyvisa VisaIOError VI_ERROR_NCIC, the GPIB interface is not controller in charge
+    visa_io         any other VISA error
+    chamber_http    requests exception of the chamber (OctoPrint) interface
+    parse           the response could not be converted (ValueError, IndexError, TypeError, KeyError)
+    unknown         everything else
+
+Each class has an escalation ladder of recovery tiers (see ESCALATION). The n-th error of a class at the same point
+starts at the n-th tier of its ladder, tiers without an action or with a failing action escalate to the next tier:
+
+    retry           nothing to do, just measure again
+    clear_status    device clear and '*CLS' of the PNA
+    ifc             interface clear of the GPIB bus and reconnect
+    state_recall    recall of the PNA state snapshot taken at the start, see E8361RemoteGPIB.pna_save_state()
+    full_preset     preset of the PNA and full reconfiguration of the measurement
+
+Before each retry the policy sleeps an exponential backoff. The retry budgets limit the attempts per point and the
+errors per measurement, the routine stops the measurement when a budget is exhausted instead of retrying forever.
+The total budget is unlimited by default, so a long measurement is not stopped by errors that are spread over it, like
+the former retry loop did. Only a point that still fails after 'point_budget' attempts stops it.
+Every error yields a structured event dict, which the routines emit on signals.error and write to the error log.
+"""
+import time
+from datetime import datetime
+import pyvisa
+import requests
+
+VISA_ERROR_TIMEOUT = -1073807339    # VI_ERROR_TMO: Timeout expired before operation completed.
+VISA_ERROR_NCIC = -1073807264       # VI_ERROR_NCIC: The interface associated with this session is not currently
+                                    # the controller in charge.
+
+RECOVERY_TIERS = ('retry', 'clear_status', 'ifc', 'state_recall', 'full_preset')
+
+ESCALATION = {
+    'visa_timeout': ('retry', 'clear_status', 'state_recall', 'full_preset'),
+    'visa_ncic': ('ifc', 'state_recall', 'full_preset'),
+    'visa_io': ('clear_status', 'ifc', 'state_recall', 'full_preset'),
+    'chamber_http': ('retry',),
+    'parse': ('retry', 'clear_status', 'state_recall', 'full_preset'),
+    'unknown': ('retry', 'clear_status', 'full_preset'),
+}
+
+RECOVERY_DEFAULTS = {
+    'base_delay': 0.1,          # unit [s], backoff before the first retry of a point
+    'backoff_factor': 2.0,      # backoff is multiplied with each further attempt
+    'max_delay': 5.0,           # unit [s], upper limit of the backoff
+    'point_budget': 10,         # attempts per point (or line) before the measurement is stopped
+    'total_budget': None,       # errors per measurement before the measurement is stopped, None for unlimited
+    'max_stored_events': 100,   # number of last events that are stored in the measurement file
+}
+
+
+def classify_error(error: Exception) -> tuple:
+    """
+    :return: tuple (error class, error code) with the error classes of the module doc-string. The error code is the
+        VISA status code, the HTTP status code or -1 if the error has no code.
+    """
+    if isinstance(error, pyvisa.errors.VisaIOError):
+        if error.error_code == VISA_ERROR_TIMEOUT:
+            return 'visa_timeout', int(error.error_code)
+        if error.error_code == VISA_ERROR_NCIC:
+            return 'visa_ncic', int(error.error_code)
+        return 'visa_io', int(error.error_code)
+    if isinstance(error, requests.exceptions.RequestException):
+        response = getattr(error, 'response', None)
+        return 'chamber_http', response.status_code if response is not None else -1
+    if isinstance(error, (ValueError, IndexError, TypeError, KeyError)):
+        return 'parse', -1
+    # errors that only carry the VISA message, e.g. re-raised as str
+    if str(VISA_ERROR_TIMEOUT) in str(error):
+        return 'visa_timeout', VISA_ERROR_TIMEOUT
+    if str(VISA_ERROR_NCIC) in str(error):
+        return 'visa_ncic', VISA_ERROR_NCIC
+    return 'unknown', -1
+
+
+class RecoveryPolicy:
+    """
+    Tiered recovery with exponential backoff and retry budgets, see module doc-string.
+
+    :param actions: dict {tier: callable without arguments} of the recovery tiers the routine supports. An action
+        fails if it raises or returns False. Missing tiers are skipped, 'retry' needs no action.
+    :param config: settings, missing keys default to RECOVERY_DEFAULTS
+    """
+    actions: dict = None
+    config: dict = None
+    events: list = None         # last events, at most config['max_stored_events']
+    num_errors: int = 0
+    num_per_class: dict = None
+    num_per_action: dict = None
+    recovery_time: float = 0    # unit [s], backoff and recovery actions of all errors
+    __point_attempts: int = 0
+    __class_attempts: dict = None    # attempts of the point per error class
+
+    def __init__(self, actions: dict, config: dict = None):
+        self.actions = dict(actions)
+        self.config = dict(RECOVERY_DEFAULTS)
+        if config is not None:
+            self.config.update(config)
+        self.events = []
+        self.num_errors = 0
+        self.num_per_class = {}
+        self.num_per_action = {}
+        self.recovery_time = 0
+        self.__point_attempts = 0
+        self.__class_attempts = {}
+
+    def begin_point(self):
+        """
+        Resets the attempts of the point, call before the first attempt of every point (or line).
+        """
+        self.__point_attempts = 0
+        self.__class_attempts = {}
+        return
+
+    def handle(self, error: Exception, context: str = '') -> dict:
+        """
+        Classifies the error, sleeps the backoff and runs the recovery tier of the attempt. Nothing is done if a retry
+        budget is exhausted, the routine has to stop then.
+
+        :param context: where the error occurred, e.g. the coordinates of the point
+        :return: event dict {'time', 'context', 'error_class', 'error_type', 'error_code', 'error_msg', 'attempt',
+            'backoff', 'action', 'failed_actions', 'recovery_time', 'give_up'}
+        """
+        start = time.perf_counter()
+        self.__point_attempts += 1
+        self.num_errors += 1
+        error_class, error_code = classify_error(error)
+        self.num_per_class[error_class] = self.num_per_class.get(error_class, 0) + 1
+        self.__class_attempts[error_class] = self.__class_attempts.get(error_class, 0) + 1
+        event = {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'context': context,
+                 'error_class': error_class, 'error_type': type(error).__name__, 'error_code': error_code,
+                 'error_msg': str(error), 'attempt': self.__point_attempts, 'backoff': 0.0, 'action': None,
+                 'failed_actions': [], 'recovery_time': 0.0, 'give_up': False}
+
+        total_budget = self.config['total_budget']
+        if self.__point_attempts >= self.config['point_budget'] or \
+                (total_budget is not None and self.num_errors >= total_budget):
+            event['action'] = 'give_up'
+            event['give_up'] = True
+        else:
+            event['backoff'] = self.backoff(self.__point_attempts)
+            time.sleep(event['backoff'])
+            event['action'] = self.__run_tiers(ESCALATION[error_class], self.__class_attempts[error_class],
+                                               event['failed_actions'])
+        event['recovery_time'] = time.perf_counter() - start
+        self.recovery_time += event['recovery_time']
+        self.num_per_action[event['action']] = self.num_per_action.get(event['action'], 0) + 1
+        self.events.append(event)
+        if len(self.events) > self.config['max_stored_events']:
+            self.events.pop(0)
+        return event
+
+    def backoff(self, attempt: int) -> float:
+        """
+        :return: sleep time [s] before the given attempt (1...) of a point
+        """
+        return float(min(self.config['max_delay'],
+                         self.config['base_delay'] * self.config['backoff_factor'] ** (attempt - 1)))
+
+    def to_json_dict(self) -> dict:
+        """
+        :return: settings, statistics and the last events for the measurement file
+        """
+        return dict(self.config, num_errors=self.num_errors, num_per_class=dict(self.num_per_class),
+                    num_per_action=dict(self.num_per_action), recovery_time=self.recovery_time,
+                    events=list(self.events))
+
+    def __run_tiers(self, ladder: tuple, attempt: int, failed_actions: list) -> str:
+        """
+        Runs the tier of the attempt (1...) of the error class and escalates along the ladder until an action succeeds.
+
+        :return: tier that succeeded, 'failed' if no tier succeeded
+        """
+        for tier in ladder[min(attempt, len(ladder)) - 1:]:
+            if tier == 'retry':
+                return tier
+            action = self.actions.get(tier)
+            if action is None:
+                continue
+            try:
+                if action() is not False:
+                    return tier
+                failed_actions.append(tier)
+            except Exception as e:
+                failed_actions.append(f"{tier}: {e}")
+        return 'failed'
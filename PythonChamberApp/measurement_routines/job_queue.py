@@ -0,0 +1,174 @@
+"""
+Persistent queue of measurement jobs for unattended back-to-back scans.
+
+Each job holds a scan spec (see scan_spec.py) and a status. The queue is written to a json file after every change,
+so it survives restarts of the app. Jobs that were running when the app was closed are marked 'interrupted' on load
+and are not started again automatically, because their measurement file already exists.
+"""
+import json
+import os
+from datetime import datetime
+from .scan_spec import validate_scan_spec
+
+# job states
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_STOPPED = 'stopped'
+JOB_INTERRUPTED = 'interrupted'
+
+
+class MeasurementJobQueue:
+    """
+    Ordered list of measurement jobs that is persisted in a json file.
+
+    Job dict:
+        {'id': int, 'status': str, 'spec': dict, 'added': str, 'started': str, 'finished': str, 'message': str}
+
+    :param file_path: json file to store the queue in. Loaded on init if it exists.
+    """
+    file_path: str = None
+    __jobs: list = None
+    __next_id: int = 1
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.__jobs = []
+        self.__next_id = 1
+        self.load()
+
+    def load(self):
+        """
+        Reads the queue from file. Running jobs of a previous session are marked as interrupted.
+
+        :return: True if loaded, False if no file or invalid file
+        """
+        if not os.path.isfile(self.file_path):
+            return False
+        try:
+            with open(self.file_path, 'r') as file:
+                stored = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error - job queue file could not be read: {e}")
+            return False
+        self.__jobs = stored['jobs']
+        self.__next_id = stored['next_id']
+        for job in self.__jobs:
+            if job['status'] == JOB_RUNNING:
+                job['status'] = JOB_INTERRUPTED
+                job['message'] = "App was closed while job was running"
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Writes the queue to file. Uses a temporary file so a crash while writing does not corrupt the queue.
+        """
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'next_id': self.__next_id, 'jobs': self.__jobs}, file, indent=4)
+        os.replace(tmp_path, self.file_path)
+        return
+
+    def get_jobs(self) -> list[dict]:
+        return self.__jobs
+
+    def get_job(self, job_id: int):
+        """
+        :return: job dict or None if id unknown
+        """
+        for job in self.__jobs:
+            if job['id'] == job_id:
+                return job
+        return None
+
+    def is_output_file_queued(self, output_file: str):
+        """
+        :return: True if a pending or running job already writes to given output file
+        """
+        output_file = os.path.abspath(output_file)
+        for job in self.__jobs:
+            if job['status'] in [JOB_PENDING, JOB_RUNNING] and os.path.abspath(job['spec']['output_file']) == output_file:
+                return True
+        return False
+
+    def add_job(self, spec: dict):
+        """
+        Appends a new pending job with given scan spec.
+
+        :return: id of new job or None if spec is invalid
+        """
+        if validate_scan_spec(spec) is not True:
+            return None
+        job = {'id': self.__next_id, 'status': JOB_PENDING, 'spec': spec,
+               'added': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'started': '', 'finished': '', 'message': ''}
+        self.__next_id += 1
+        self.__jobs.append(job)
+        self.save()
+        return job['id']
+
+    def remove_job(self, job_id: int):
+        """
+        Removes given job from the queue. Running jobs can not be removed.
+
+        :return: True if removed, False otherwise
+        """
+        job = self.get_job(job_id)
+        if job is None or job['status'] == JOB_RUNNING:
+            return False
+        self.__jobs.remove(job)
+        self.save()
+        return True
+
+    def move_job(self, job_id: int, offset: int):
+        """
+        Moves given job by offset positions in the queue, e.g. -1 to execute it earlier.
+
+        :return: True if moved, False otherwise
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return False
+        old_idx = self.__jobs.index(job)
+        new_idx = min(max(old_idx + offset, 0), len(self.__jobs) - 1)
+        if new_idx == old_idx:
+            return False
+        self.__jobs.insert(new_idx, self.__jobs.pop(old_idx))
+        self.save()
+        return True
+
+    def clear_finished_jobs(self):
+        """
+        Removes all jobs that are done, failed, stopped or interrupted.
+        """
+        self.__jobs = [job for job in self.__jobs if job['status'] in [JOB_PENDING, JOB_RUNNING]]
+        self.save()
+        return
+
+    def get_next_pending_job(self, rig: str = None):
+        """
+        :param rig: name of the rig that asks for a job (see rig_orchestrator.py). Jobs bound to another rig by their
+            spec entry 'rig' are skipped, jobs without 'rig' are given to any rig.
+        :return: first pending job in queue order or None if there is none
+        """
+        for job in self.__jobs:
+            if job['status'] == JOB_PENDING and job['spec'].get('rig') in (None, rig):
+                return job
+        return None
+
+    def set_job_status(self, job_id: int, status: str, message: str = ''):
+        """
+        Updates status and message of given job and saves the queue. Timestamps are set for running and final states.
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return False
+        job['status'] = status
+        job['message'] = message
+        if status == JOB_RUNNING:
+            job['started'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        elif status != JOB_PENDING:
+            job['finished'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.save()
+        return True
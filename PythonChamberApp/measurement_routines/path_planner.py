@@ -0,0 +1,359 @@
+"""
+Planning of the order in which the measurement points are visited by the chamber.
+
+The classic move patterns 'line-by-line' and 'snake' run through the cubic mesh along X, then Y, then Z. Since the
+Z-axis of the chamber is much slower than X/Y and reverses with backlash, other visiting orders can save a lot of
+travel time. The 'optimized' pattern evaluates all axis priorities (which axis is run through first) as raster and
+boustrophedon (snake) variants with an axis-aware cost model and takes the fastest one.
+Irregular point sets are ordered by nearest neighbour and improved by 2-opt.
+
+The BodyScan always measures all Z-coordinates of one XY-position from below, so only the order of the XY-columns
+is planned for it. The move below each column is part of the predicted travel time.
+
+With a region of interest mask (see roi_mask.py) all patterns skip the points outside of the mask. BodyScan columns
+without any point inside are skipped, the others only run through their Z-coordinates inside of the mask.
+"""
+from itertools import permutations
+import numpy as np
+from .roi_mask import points_in_mask, column_z_vectors
+
+MOVE_PATTERNS = ['line-by-line', 'snake', 'optimized']
+MAX_MATRIX_POINTS = 2000    # above this number of points no cost matrix is built and 2-opt is skipped
+AXIS_IDX = {'x': 0, 'y': 1, 'z': 2}
+
+
+class AxisCostModel:
+    """
+    Predicts the duration of chamber_jog_abs() moves.
+
+    Klipper moves all axis on a straight line with the jog speed, but limits each axis to its maximum speed and
+    acceleration (e.g. max_z_velocity). The duration of a move is the longer of the straight line move and the
+    slowest axis, both with trapezoidal velocity profile. An axis that reverses its direction costs its backlash time
+    in addition. Each jog has a fixed overhead for the http request and the polling of the busy flag.
+
+    :param jog_speed: speed of the jog commands [mm/s]
+    """
+    jog_speed: float = 50.0
+    axis_max_speed: np.ndarray = np.array([200.0, 200.0, 15.0])         # unit [mm/s], X / Y / Z
+    axis_acceleration: np.ndarray = np.array([500.0, 500.0, 100.0])     # unit [mm/s^2], X / Y / Z
+    axis_backlash_time: np.ndarray = np.array([0.0, 0.0, 0.3])          # unit [s], X / Y / Z, per reversal
+    move_overhead_time: float = 0.2     # unit [s], http request + M400 + flag polling, without the movement itself
+
+    def __init__(self, jog_speed: float, axis_max_speed: tuple = None, axis_acceleration: tuple = None,
+                 axis_backlash_time: tuple = None, move_overhead_time: float = None):
+        self.jog_speed = jog_speed
+        if axis_max_speed is not None:
+            self.axis_max_speed = np.array(axis_max_speed, dtype=float)
+        if axis_acceleration is not None:
+            self.axis_acceleration = np.array(axis_acceleration, dtype=float)
+        if axis_backlash_time is not None:
+            self.axis_backlash_time = np.array(axis_backlash_time, dtype=float)
+        if move_overhead_time is not None:
+            self.move_overhead_time = move_overhead_time
+
+    @staticmethod
+    def __trapezoid_time(distance: np.ndarray, speed, acceleration) -> np.ndarray:
+        accel_distance = speed ** 2 / acceleration     # distance to accelerate to speed and back to zero
+        return np.where(distance >= accel_distance, distance / speed + speed / acceleration,
+                        2 * np.sqrt(distance / acceleration))
+
+    def travel_times(self, delta: np.ndarray) -> np.ndarray:
+        """
+        :param delta: array of shape (..., 3) with the XYZ-distances of the moves [mm]
+        :return: pure travel time of each move without overhead and backlash [s]
+        """
+        delta = np.abs(delta)
+        axis_speed = np.minimum(self.axis_max_speed, self.jog_speed)
+        axis_times = self.__trapezoid_time(delta, axis_speed, self.axis_acceleration).max(axis=-1)
+        line_time = self.__trapezoid_time(np.linalg.norm(delta, axis=-1), self.jog_speed,
+                                          np.min(self.axis_acceleration[:2]))
+        return np.maximum(axis_times, line_time)
+
+    def move_profile(self, start: np.ndarray, target: np.ndarray, speed: float = None):
+        """
+        Speed and acceleration of a single straight move along its direction, limited by the axis that reaches its
+        maximum first.
+
+        :param speed: requested speed of the move [mm/s], defaults to the jog speed
+        :return: tuple (distance [mm], speed [mm/s], acceleration [mm/s^2])
+        """
+        delta = np.asarray(target, dtype=float) - np.asarray(start, dtype=float)
+        distance = float(np.linalg.norm(delta))
+        if speed is None:
+            speed = self.jog_speed
+        if distance == 0:
+            return 0.0, float(speed), float(np.min(self.axis_acceleration))
+        direction = np.abs(delta) / distance
+        moving = direction > 0
+        speed = min(speed, float(np.min(self.axis_max_speed[moving] / direction[moving])))
+        acceleration = float(np.min(self.axis_acceleration[moving] / direction[moving]))
+        return distance, speed, acceleration
+
+    def move_positions(self, start: np.ndarray, target: np.ndarray, t: np.ndarray, speed: float = None) -> np.ndarray:
+        """
+        Positions during a single straight move with trapezoidal velocity profile.
+
+        :param t: times since the start of the movement [s], clipped to the duration of the move
+        :param speed: requested speed of the move [mm/s], defaults to the jog speed
+        :return: array of shape (len(t), 3) with the XYZ-positions [mm]
+        """
+        start = np.asarray(start, dtype=float)
+        target = np.asarray(target, dtype=float)
+        distance, speed, acceleration = self.move_profile(start, target, speed)
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        if distance == 0:
+            return np.tile(start, (len(t), 1))
+        speed = min(speed, np.sqrt(distance * acceleration))  # triangular profile of short moves
+        accel_time = speed / acceleration
+        duration = distance / speed + accel_time
+        t = np.clip(t, 0, duration)
+        t_decel = np.clip(t - (duration - accel_time), 0, None)
+        travelled = np.where(t < accel_time, 0.5 * acceleration * t ** 2, speed * (t - 0.5 * accel_time)) \
+            - 0.5 * acceleration * t_decel ** 2
+        return start + np.outer(travelled / distance, target - start)
+
+    def move_duration(self, start: np.ndarray, target: np.ndarray, speed: float = None) -> float:
+        """
+        :return: pure travel time of a single straight move without overhead and backlash [s]
+        """
+        distance, speed, acceleration = self.move_profile(start, target, speed)
+        return float(self.__trapezoid_time(np.array(distance), speed, acceleration))
+
+    def path_times(self, path: np.ndarray, start: np.ndarray = None) -> np.ndarray:
+        """
+        :param path: array of shape (num_moves, 3) with the targets of all moves in order [mm]
+        :param start: position before the first move, defaults to the first target
+        :return: duration of each move including overhead and backlash [s]
+        """
+        path = np.asarray(path, dtype=float)
+        if len(path) == 0:
+            return np.zeros(0)
+        if start is None:
+            start = path[0]
+        delta = np.diff(np.vstack((start, path)), axis=0)
+        times = self.travel_times(delta) + self.move_overhead_time
+        for axis in range(3):
+            if self.axis_backlash_time[axis] == 0:
+                continue
+            moving_idx = np.flatnonzero(delta[:, axis])
+            direction = np.sign(delta[moving_idx, axis])
+            reversal_idx = moving_idx[1:][direction[1:] != direction[:-1]]
+            times[reversal_idx] += self.axis_backlash_time[axis]
+        return times
+
+    def path_duration(self, path: np.ndarray, start: np.ndarray = None) -> float:
+        """
+        :return: predicted total travel time of the path [s], see path_times()
+        """
+        return float(np.sum(self.path_times(path, start)))
+
+
+def grid_path(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, axis_order: str = 'xyz',
+              boustrophedon: bool = False) -> np.ndarray:
+    """
+    Runs through the cubic mesh, the first axis of axis_order changes fastest, the last one slowest.
+    With boustrophedon, the direction of the first axis alternates with every line and the direction of the second
+    axis with every plane (like the 'snake' pattern of the measurement routines).
+
+    :return: array of shape (num_points, 3) with XYZ-coordinates in visiting order
+    """
+    vectors = {'x': np.asarray(x_vec, dtype=float), 'y': np.asarray(y_vec, dtype=float),
+               'z': np.asarray(z_vec, dtype=float)}
+    inner_vec, middle_vec, outer_vec = [vectors[axis] for axis in axis_order]
+    columns = [AXIS_IDX[axis] for axis in axis_order]
+
+    lines = []
+    inner_forward = True
+    middle_forward = True
+    for outer_coor in outer_vec:
+        for middle_coor in (middle_vec if middle_forward else middle_vec[::-1]):
+            line = np.empty((len(inner_vec), 3))
+            line[:, columns[0]] = inner_vec if inner_forward else inner_vec[::-1]
+            line[:, columns[1]] = middle_coor
+            line[:, columns[2]] = outer_coor
+            lines.append(line)
+            if boustrophedon:
+                inner_forward = not inner_forward
+        if boustrophedon:
+            middle_forward = not middle_forward
+    if len(lines) == 0:
+        return np.zeros((0, 3))
+    return np.concatenate(lines)
+
+
+def nearest_neighbour_order(cost_matrix: np.ndarray, start_idx: int = 0) -> np.ndarray:
+    """
+    :return: visiting order of all points, always continuing with the cheapest not yet visited point
+    """
+    num_points = len(cost_matrix)
+    visited = np.zeros(num_points, dtype=bool)
+    order = np.empty(num_points, dtype=int)
+    current = start_idx
+    for i in range(num_points):
+        order[i] = current
+        visited[current] = True
+        if i < num_points - 1:
+            costs = np.where(visited, np.inf, cost_matrix[current])
+            current = int(np.argmin(costs))
+    return order
+
+
+def two_opt(order: np.ndarray, cost_matrix: np.ndarray, max_passes: int = 20) -> np.ndarray:
+    """
+    Improves an open path (fixed start, free end) by reversing segments as long as it gets cheaper.
+    Assumes symmetric costs.
+
+    :return: improved visiting order
+    """
+    order = np.array(order)
+    num_points = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(num_points - 2):
+            a, b = order[i], order[i + 1]
+            c = order[i + 2:]
+            d = np.append(order[i + 3:], -1)    # -1 >> end of path, no following edge
+            new_cost = cost_matrix[a, c] + np.where(d >= 0, cost_matrix[b, d], 0.0)
+            old_cost = cost_matrix[a, b] + np.where(d >= 0, cost_matrix[c, d], 0.0)
+            gain = old_cost - new_cost
+            best = int(np.argmax(gain))
+            if gain[best] > 1e-9:
+                j = i + 2 + best
+                order[i + 1:j + 1] = order[i + 1:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return order
+
+
+def plan_point_path(points: np.ndarray, cost_model: AxisCostModel, start: np.ndarray = None) -> np.ndarray:
+    """
+    Orders an irregular point set by nearest neighbour, improved by 2-opt for up to MAX_MATRIX_POINTS points.
+    The path starts at the point closest to start (or the first point if no start is given).
+
+    :param points: array of shape (num_points, 3) [mm]
+    :return: array of shape (num_points, 3) in visiting order
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) < 2:
+        return points.copy()
+    start_idx = 0 if start is None else int(np.argmin(cost_model.travel_times(points - np.asarray(start))))
+
+    if len(points) > MAX_MATRIX_POINTS:
+        # no cost matrix for large sets, costs of the current point to all others are calculated on the fly
+        visited = np.zeros(len(points), dtype=bool)
+        order = np.empty(len(points), dtype=int)
+        current = start_idx
+        for i in range(len(points)):
+            order[i] = current
+            visited[current] = True
+            if i < len(points) - 1:
+                costs = cost_model.travel_times(points - points[current])
+                current = int(np.argmin(np.where(visited, np.inf, costs)))
+        return points[order]
+
+    cost_matrix = cost_model.travel_times(points[:, np.newaxis, :] - points[np.newaxis, :, :])
+    order = two_opt(nearest_neighbour_order(cost_matrix, start_idx), cost_matrix)
+    return points[order]
+
+
+def plan_auto_measurement_path(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, move_pattern: str,
+                               cost_model: AxisCostModel = None, mask: np.ndarray = None) -> np.ndarray:
+    """
+    Visiting order of the AutoMeasurement. 'line-by-line' and 'snake' run X first, then Y, then Z.
+    'optimized' takes the fastest of all axis priorities as raster and boustrophedon variant.
+
+    :param mask: optional bool array of shape (len(x_vec), len(y_vec), len(z_vec)), only points with True are visited
+    :return: array of shape (num_points, 3) with XYZ-coordinates in visiting order
+    """
+    if move_pattern == 'line-by-line':
+        return _apply_mask(grid_path(x_vec, y_vec, z_vec, 'xyz', boustrophedon=False), x_vec, y_vec, z_vec, mask)
+    if move_pattern == 'snake':
+        return _apply_mask(grid_path(x_vec, y_vec, z_vec, 'xyz', boustrophedon=True), x_vec, y_vec, z_vec, mask)
+    if cost_model is None:
+        cost_model = AxisCostModel(AxisCostModel.jog_speed)
+
+    best_path = None
+    best_duration = np.inf
+    for axis_order in permutations('xyz'):
+        for boustrophedon in [False, True]:
+            path = _apply_mask(grid_path(x_vec, y_vec, z_vec, ''.join(axis_order), boustrophedon),
+                               x_vec, y_vec, z_vec, mask)
+            duration = cost_model.path_duration(path)
+            if duration < best_duration:
+                best_path, best_duration = path, duration
+    return best_path
+
+
+def expand_body_scan_path(xy_columns: np.ndarray, z_vec: np.ndarray, z_move_below: float, column_z: list = None):
+    """
+    Adds the move below and all Z-coordinates to each XY-column, like BodyScanRoutine.run() moves.
+
+    :param column_z: optional list with the Z-coordinates of each column (see roi_mask.column_z_vectors()),
+        replaces z_vec for masked scans
+    :return: tuple (targets, is_measure_point) with targets of shape (num_moves, 3) and bool array that flags
+        measured points (False for the moves below)
+    """
+    if column_z is not None:
+        targets = [np.zeros((0, 3))]
+        is_measure_point = [np.zeros(0, dtype=bool)]
+        for xy_column, z_column in zip(xy_columns, column_z):
+            column_targets, column_is_measure_point = expand_body_scan_path([xy_column], z_column, z_move_below)
+            targets.append(column_targets)
+            is_measure_point.append(column_is_measure_point)
+        return np.concatenate(targets), np.concatenate(is_measure_point)
+
+    z_vec = np.asarray(z_vec, dtype=float)
+    if len(z_vec) == 0 or len(xy_columns) == 0:
+        return np.zeros((0, 3)), np.zeros(0, dtype=bool)
+    column_z = np.concatenate(([z_vec[0] - z_move_below], z_vec))
+    targets = np.empty((len(xy_columns), len(column_z), 3))
+    targets[:, :, :2] = np.asarray(xy_columns, dtype=float)[:, np.newaxis, :]
+    targets[:, :, 2] = column_z
+    is_measure_point = np.tile(np.arange(len(column_z)) > 0, len(xy_columns))
+    return targets.reshape(-1, 3), is_measure_point
+
+
+def plan_body_scan_columns(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, move_pattern: str,
+                           z_move_below: float, cost_model: AxisCostModel = None, mask: np.ndarray = None) -> np.ndarray:
+    """
+    Order of the XY-columns of the BodyScan. 'line-by-line' and 'snake' run X first, then Y.
+    'optimized' takes the fastest of X-first and Y-first as raster and boustrophedon variant, evaluated with
+    the moves below and through all Z-coordinates of each column.
+
+    :param mask: optional bool array of shape (len(x_vec), len(y_vec), len(z_vec)), columns without any True are
+        skipped
+    :return: array of shape (num_columns, 2) with XY-coordinates in visiting order
+    """
+    column_mask = None if mask is None else np.any(mask, axis=2)[:, :, np.newaxis]
+    if move_pattern == 'line-by-line':
+        return _apply_mask(grid_path(x_vec, y_vec, [0.0], 'xyz', boustrophedon=False), x_vec, y_vec, [0.0],
+                           column_mask)[:, :2]
+    if move_pattern == 'snake':
+        return _apply_mask(grid_path(x_vec, y_vec, [0.0], 'xyz', boustrophedon=True), x_vec, y_vec, [0.0],
+                           column_mask)[:, :2]
+    if cost_model is None:
+        cost_model = AxisCostModel(AxisCostModel.jog_speed)
+
+    best_columns = None
+    best_duration = np.inf
+    for axis_order in ['xyz', 'yxz']:
+        for boustrophedon in [False, True]:
+            columns = _apply_mask(grid_path(x_vec, y_vec, [0.0], axis_order, boustrophedon), x_vec, y_vec, [0.0],
+                                  column_mask)[:, :2]
+            column_z = None if mask is None else column_z_vectors(columns, x_vec, y_vec, z_vec, mask)
+            targets, _ = expand_body_scan_path(columns, z_vec, z_move_below, column_z)
+            duration = cost_model.path_duration(targets)
+            if duration < best_duration:
+                best_columns, best_duration = columns, duration
+    return best_columns
+
+
+def _apply_mask(path: np.ndarray, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray,
+                mask: np.ndarray = None) -> np.ndarray:
+    """
+    :return: path without the points outside of the mask, path itself if no mask is given
+    """
+    if mask is None or len(path) == 0:
+        return path
+    return path[points_in_mask(path, x_vec, y_vec, z_vec, mask)]
@@ -0,0 +1,130 @@
+"""
+High-resolution timing of the phases of each measured point in the acquisition threads.
+
+The measurement threads split the work of each point into phases (jog submit, flag wait, settle, VNA trigger, readout,
+conversion, storage, ...). A PhaseTimer accumulates the duration of each phase per point with time.perf_counter() and
+keeps one row per point. The rows are stored as compact array in the measurement file next to the data, summaries
+with histograms can be emitted via signal while the measurement is running.
+"""
+import time
+from contextlib import contextmanager
+import numpy as np
+
+
+class PhaseTimer:
+    """
+    Records the duration of named phases for every measured point.
+
+    Durations of the same phase within one point are summed up, e.g. if a point is retried after an error.
+    The 'total' column is appended automatically and holds the wall time between start_point() and end_point().
+
+    :param phases: names of the phases in the order they should be stored
+    """
+    phases: list[str] = None
+    __rows: list = None
+    __current: np.ndarray = None
+    __point_start: float = 0.0
+
+    def __init__(self, phases: list[str]):
+        self.phases = list(phases) + ['total']
+        self.__phase_idx = {name: idx for idx, name in enumerate(self.phases)}
+        self.__rows = []
+        self.__current = None
+
+    def start_point(self):
+        """
+        Starts the timing of a new point. An unfinished previous point is discarded.
+        """
+        self.__current = np.zeros(len(self.phases), dtype=float)
+        self.__point_start = time.perf_counter()
+        return
+
+    def add(self, phase: str, duration: float):
+        """
+        Adds duration [s] to given phase of the current point. Ignored if no point was started.
+        """
+        if self.__current is None:
+            return
+        self.__current[self.__phase_idx[phase]] += duration
+        return
+
+    @contextmanager
+    def measure(self, phase: str):
+        """
+        Context manager that adds the time spent inside the with-block to given phase of the current point.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def end_point(self):
+        """
+        Stores the timings of the current point as new row.
+        """
+        if self.__current is None:
+            return
+        self.__current[-1] = time.perf_counter() - self.__point_start
+        self.__rows.append(self.__current)
+        self.__current = None
+        return
+
+    def get_num_points(self) -> int:
+        return len(self.__rows)
+
+    def get_array(self) -> np.ndarray:
+        """
+        :return: array of shape (num_points, num_phases) with durations in [ms], rows in order of measurement
+        """
+        if len(self.__rows) == 0:
+            return np.zeros((0, len(self.phases)), dtype=float)
+        return np.array(self.__rows) * 1e3
+
+    def to_json_dict(self) -> dict:
+        """
+        :return: dict {'unit': 'ms', 'phases': list[str], 'values': list[list[float]]} to be stored in the
+            measurement file. Values are rounded to 1 us, one row per point in order of measurement.
+        """
+        return {'unit': 'ms',
+                'phases': self.phases,
+                'values': np.round(self.get_array(), 3).tolist()}
+
+    def get_summary(self, num_bins: int = 20) -> dict:
+        """
+        Calculates statistics and histogram of every phase over all points recorded so far.
+
+        :return: dict {'num_points': int, 'unit': 'ms',
+                       'phases': {name: {'mean': float, 'median': float, 'p95': float, 'max': float, 'sum': float,
+                                         'counts': list[int], 'bin_edges': list[float]}, ...}}
+        """
+        values = self.get_array()
+        summary = {'num_points': values.shape[0], 'unit': 'ms', 'phases': {}}
+        if values.shape[0] == 0:
+            return summary
+        for idx, name in enumerate(self.phases):
+            column = values[:, idx]
+            counts, bin_edges = np.histogram(column, bins=num_bins)
+            summary['phases'][name] = {'mean': float(np.mean(column)),
+                                       'median': float(np.median(column)),
+                                       'p95': float(np.percentile(column, 95)),
+                                       'max': float(np.max(column)),
+                                       'sum': float(np.sum(column)),
+                                       'counts': counts.tolist(),
+                                       'bin_edges': bin_edges.tolist()}
+        return summary
+
+
+def format_timing_summary(summary: dict) -> str:
+    """
+    Assembles a short text of mean and p95 duration per phase from a PhaseTimer summary for console output.
+    Phases that took no time at all are skipped.
+    """
+    if summary['num_points'] == 0:
+        return "Timing: no points measured yet"
+    text = f"Timing of {summary['num_points']} points [{summary['unit']}] (mean / p95):"
+    for name, stats in summary['phases'].items():
+        if stats['max'] == 0:
+            continue
+        text += f"\n    {name}: {stats['mean']:.1f} / {stats['p95']:.1f}"
+    return text
@@ -0,0 +1,165 @@
+"""
+Region of interest (ROI) masks of AutoMeasurement and BodyScan.
+
+The mesh of both measurements is a rectangular box. A ROI removes all points of the box outside of a cylinder,
+sphere, polygonal XY-outline or mask image before the scan starts, so only the sparse point set inside is planned and
+measured. All ROI coordinates are given in [mm] relative to the zero position (AutoMeasurement) or origin (BodyScan),
+the same coordinates that are written to the measurement file.
+
+ROI config (dict / json):
+    {"shape": "cylinder", "center": [x, y], "radius": float}                 cylinder along Z
+    {"shape": "sphere", "center": [x, y, z], "radius": float}
+    {"shape": "polygon", "points": [[x0, y0], [x1, y1], ...]}                XY-outline through all Z
+    {"shape": "image", "path": str, "x_range": [x_min, x_max], "y_range": [y_min, y_max], "threshold": float}
+        XY-mask image through all Z (.png or .npy). Columns of the image run from x_min to x_max, rows from y_max
+        (top) to y_min (bottom). Pixels brighter than threshold (0...1, default 0.5) are inside.
+optional for all shapes:
+    "invert": bool, measure the points outside of the shape instead
+"""
+import os
+import numpy as np
+
+ROI_SHAPES = ['cylinder', 'sphere', 'polygon', 'image']
+
+
+def validate_roi(roi: dict):
+    """
+    Checks that all entries of a ROI config are given. Prints the reason if not.
+
+    :return: True if valid, False otherwise
+    """
+    required_keys = {'cylinder': ['center', 'radius'], 'sphere': ['center', 'radius'], 'polygon': ['points'],
+                     'image': ['path', 'x_range', 'y_range']}
+    if roi.get('shape') not in ROI_SHAPES:
+        print(f"Error - ROI 'shape' must be one of {ROI_SHAPES}!")
+        return False
+    missing_keys = [key for key in required_keys[roi['shape']] if key not in roi]
+    if len(missing_keys) > 0:
+        print(f"Error - ROI '{roi['shape']}' misses entries: {missing_keys}")
+        return False
+    if roi['shape'] == 'polygon' and len(roi['points']) < 3:
+        print("Error - ROI polygon needs at least 3 points!")
+        return False
+    if roi['shape'] == 'image' and not os.path.isfile(roi['path']):
+        print(f"Error - ROI mask image {roi['path']} not found!")
+        return False
+    return True
+
+
+def calc_roi_mask(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray, roi: dict, reference: tuple):
+    """
+    Evaluates which points of the mesh are inside of the ROI.
+
+    :param x_vec: mesh coordinates in chamber coordinates [mm], same for y_vec and z_vec
+    :param reference: zero position (AutoMeasurement) or origin (BodyScan) in chamber coordinates [mm]
+    :return: bool np.ndarray of shape (len(x_vec), len(y_vec), len(z_vec)), True for points to measure.
+        None if the ROI config is invalid.
+    """
+    if validate_roi(roi) is not True:
+        return None
+    x_rel = np.asarray(x_vec, dtype=float)[:, np.newaxis, np.newaxis] - reference[0]
+    y_rel = np.asarray(y_vec, dtype=float)[np.newaxis, :, np.newaxis] - reference[1]
+    z_rel = np.asarray(z_vec, dtype=float)[np.newaxis, np.newaxis, :] - reference[2]
+
+    if roi['shape'] == 'cylinder':
+        mask = (x_rel - roi['center'][0]) ** 2 + (y_rel - roi['center'][1]) ** 2 <= roi['radius'] ** 2
+    elif roi['shape'] == 'sphere':
+        mask = (x_rel - roi['center'][0]) ** 2 + (y_rel - roi['center'][1]) ** 2 + \
+               (z_rel - roi['center'][2]) ** 2 <= roi['radius'] ** 2
+    elif roi['shape'] == 'polygon':
+        mask = points_in_polygon(x_rel, y_rel, np.array(roi['points'], dtype=float))
+    else:
+        image = read_mask_image(roi['path'])
+        if image is None:
+            return None
+        mask = sample_mask_image(x_rel, y_rel, image, roi['x_range'], roi['y_range'], roi.get('threshold', 0.5))
+
+    mask = np.broadcast_to(mask, (x_rel.shape[0], y_rel.shape[1], z_rel.shape[2]))
+    if roi.get('invert', False):
+        mask = ~mask
+    return np.array(mask, dtype=bool)
+
+
+def points_in_polygon(x: np.ndarray, y: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Even-odd rule, points on the outline may be inside or outside.
+
+    :param polygon: array of shape (num_corners, 2), closed automatically
+    :return: bool array of the broadcast shape of x and y
+    """
+    inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+    for (x0, y0), (x1, y1) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        if y0 == y1:
+            continue
+        crosses = (y0 > y) != (y1 > y)
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def read_mask_image(path: str):
+    """
+    Reads a mask image as gray values 0...1. .npy files are taken as they are.
+
+    :return: 2D np.ndarray or None if the image could not be read
+    """
+    try:
+        if path.endswith('.npy'):
+            image = np.load(path).astype(float)
+        else:
+            from matplotlib.image import imread
+            image = imread(path).astype(float)
+            if image.max() > 1.0:   # 8 bit images other than png
+                image /= 255.0
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error - ROI mask image could not be read: {e}")
+        return None
+    if image.ndim == 3:     # RGB(A) >> gray
+        image = np.mean(image[:, :, :3], axis=2)
+    return image
+
+
+def sample_mask_image(x: np.ndarray, y: np.ndarray, image: np.ndarray, x_range: list, y_range: list,
+                      threshold: float) -> np.ndarray:
+    """
+    Samples the nearest pixel of the mask image for each XY-point. Points outside of the image are outside.
+
+    :return: bool array of the broadcast shape of x and y
+    """
+    num_rows, num_columns = image.shape
+    column = np.round((x - x_range[0]) / (x_range[1] - x_range[0]) * (num_columns - 1)).astype(int)
+    row = np.round((y_range[1] - y) / (y_range[1] - y_range[0]) * (num_rows - 1)).astype(int)
+    column, row = np.broadcast_arrays(column, row)
+    on_image = (column >= 0) & (column < num_columns) & (row >= 0) & (row < num_rows)
+    mask = np.zeros(column.shape, dtype=bool)
+    mask[on_image] = image[row[on_image], column[on_image]] > threshold
+    return mask
+
+
+def points_in_mask(points: np.ndarray, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray,
+                   mask: np.ndarray) -> np.ndarray:
+    """
+    Looks up the mask value of the closest mesh point of each point.
+
+    :param points: array of shape (num_points, 3) in chamber coordinates [mm]
+    :return: bool array of shape (num_points,)
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    idx = [np.argmin(np.abs(points[:, axis:axis + 1] - np.asarray(vec, dtype=float)), axis=1)
+           for axis, vec in enumerate((x_vec, y_vec, z_vec))]
+    return mask[idx[0], idx[1], idx[2]]
+
+
+def column_z_vectors(xy_columns: np.ndarray, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray,
+                     mask: np.ndarray) -> list:
+    """
+    Z-coordinates inside of the mask for each XY-column of a BodyScan.
+
+    :param xy_columns: array of shape (num_columns, 2) in chamber coordinates [mm]
+    :return: list of np.ndarrays, one per column
+    """
+    z_vec = np.asarray(z_vec, dtype=float)
+    xy_columns = np.asarray(xy_columns, dtype=float).reshape(-1, 2)
+    x_idx = np.argmin(np.abs(xy_columns[:, 0:1] - np.asarray(x_vec, dtype=float)), axis=1)
+    y_idx = np.argmin(np.abs(xy_columns[:, 1:2] - np.asarray(y_vec, dtype=float)), axis=1)
+    return [z_vec[mask[x, y]] for x, y in zip(x_idx, y_idx)]
@@ -0,0 +1,51 @@
+"""
+Qt-free stand-in for the signals of the measurement routines.
+
+The routines in this package report their state via 'signals' objects with the same names as the
+AutoMeasurementSignals of the process controller (finished, error, progress, update, log, ...). When running in
+the GUI these are pyqtSignals, headless runs use RoutineSignals instead, so the routines never import PyQt6.
+"""
+
+
+class CallbackSignal:
+    """
+    Minimal replacement of a pyqtSignal. Connected callbacks are called synchronously in the emitting thread.
+    """
+    def __init__(self):
+        self.__callbacks = []
+
+    def connect(self, callback):
+        self.__callbacks.append(callback)
+        return
+
+    def disconnect(self, callback=None):
+        """
+        Removes given callback or all callbacks if None is given.
+        """
+        if callback is None:
+            self.__callbacks = []
+        elif callback in self.__callbacks:
+            self.__callbacks.remove(callback)
+        return
+
+    def emit(self, *args):
+        for callback in self.__callbacks:
+            callback(*args)
+        return
+
+
+class RoutineSignals:
+    """
+    Same signals as AutoMeasurementSignals (see AutoMeasurement_Thread.py for the emitted data) based on
+    CallbackSignal.
+    """
+    def __init__(self):
+        self.finished = CallbackSignal()
+        self.error = CallbackSignal()
+        self.result = CallbackSignal()
+        self.progress = CallbackSignal()
+        self.update = CallbackSignal()
+        self.log = CallbackSignal()
+        self.position_update = CallbackSignal()
+        self.field_update = CallbackSignal()
+        self.timing_summary = CallbackSignal()
@@ -0,0 +1,236 @@
+"""
+Scan specs describe one AutoMeasurement or BodyScan independent of the GUI. They are used by the headless_runner and
+as jobs of the MeasurementJobQueue.
+
+Scan spec (dict / json):
+{
+    "type":             "auto_measurement" or "body_scan",
+    "zero_position":    [x, y, z] in chamber coordinates [mm]. Zero position for auto_measurement, origin for body_scan.
+    "mesh":             see below,
+    "move_pattern":     "line-by-line", "snake" or "optimized" (see path_planner.py),
+    "jog_speed":        float [mm/s],
+    "vna_config":       {"preset_file": str} to configure the PNA by .cst file (required for body_scan) or
+                        {"parameter": ["S11", "S12", "S22"], "freq_start": float [Hz], "freq_stop": float [Hz],
+                         "if_bw": int [Hz], "sweep_num_points": int, "output_power": float [dBm], "avg_num": int,
+                         "segments": list (optional, segment sweep instead of linear sweep, see segment_sweep.py.
+                                     freq_start, freq_stop and sweep_num_points may be omitted then)},
+    "output_file":      str, path of the measurement file without extension, '.json' is appended
+    "file_type_json_readable": bool (optional, auto_measurement only, default true),
+    "adaptive":         dict (optional, auto_measurement only), adaptive mesh refinement instead of measuring every
+                        point of the mesh, keys see ADAPTIVE_DEFAULTS in adaptive_refinement.py
+    "roi":              dict (optional), region of interest mask, only points of the mesh inside are measured.
+                        Coordinates relative to zero_position, see roi_mask.py
+    "continuous":       dict (optional, auto_measurement only), measure each X-line on-the-fly while the chamber
+                        moves, keys see CONTINUOUS_DEFAULTS in continuous_scan.py. Not combinable with adaptive / roi
+                        and needs at least 2 steps in X
+    "settling":         dict (optional, body_scan only), wait until fast PNA readings agree after each move instead of
+                        sleeping z_move_sleep_time, keys see SETTLING_DEFAULTS in settling.py. The timeout defaults to
+                        z_move_sleep_time
+    "averaging":        dict (optional), average each point until the measured noise meets the target uncertainty
+                        instead of 'avg_num' sweeps, keys see AVERAGING_DEFAULTS in adaptive_averaging.py. The maximum
+                        number of averages defaults to 'avg_num'. Not combinable with continuous
+    "rig":              str (optional), name of the rig that runs the scan if several rigs are orchestrated, see
+                        rig_orchestrator.py. Scans without rig run on the next free rig
+    "error_recovery":   dict (optional), retry budgets and backoff of the error recovery, keys see RECOVERY_DEFAULTS
+                        in error_recovery.py. The 'total_budget' (errors per measurement) is unlimited by default, set
+                        it to stop a measurement that fails too often
+}
+
+mesh of auto_measurement, same inputs as in the GUI. XY centered around zero position, Z relative to zero position:
+    {"x_length", "x_num_steps", "y_length", "y_num_steps", "z_start", "z_stop", "z_num_steps"}
+mesh of body_scan, same inputs as in the GUI. All axis starting at origin:
+    {"x_length", "x_num_steps", "y_length", "y_num_steps", "z_length", "z_num_steps",
+     "z_move_sleep_time" (optional, [s])}
+alternatively for both types, coordinates to move to in chamber coordinates [mm]:
+    {"x_vec": list[float], "y_vec": list[float], "z_vec": list[float], "z_move_sleep_time" (optional, body_scan)}
+"""
+import json
+import zlib
+import numpy as np
+from vna_net_interface import E8361RemoteGPIB
+from .path_planner import MOVE_PATTERNS
+from .adaptive_refinement import validate_adaptive_config
+from .roi_mask import validate_roi
+from .continuous_scan import CONTINUOUS_DEFAULTS
+from .settling import SETTLING_DEFAULTS
+from .error_recovery import RECOVERY_DEFAULTS
+from .adaptive_averaging import AVERAGING_DEFAULTS
+from .segment_sweep import validate_segments, apply_segments
+
+# workspace boundaries of the chamber, same as in ProcessController
+X_MAX_COOR = 510.0
+Y_MAX_COOR = 454.0
+Z_MAX_COOR = 908.0
+
+VNA_INFO_KEYS = ['parameter', 'freq_start', 'freq_stop', 'if_bw', 'sweep_num_points', 'output_power', 'avg_num']
+
+
+def validate_scan_spec(spec: dict):
+    """
+    Checks that all necessary entries of a scan spec are given. Prints the reason if not.
+
+    :return: True if valid, False otherwise
+    """
+    required_keys = ['type', 'zero_position', 'mesh', 'move_pattern', 'jog_speed', 'vna_config', 'output_file']
+    missing_keys = [key for key in required_keys if key not in spec]
+    if len(missing_keys) > 0:
+        print(f"Error - scan spec misses entries: {missing_keys}")
+        return False
+    if spec['type'] not in ['auto_measurement', 'body_scan']:
+        print("Error - scan spec 'type' must be 'auto_measurement' or 'body_scan'!")
+        return False
+    if spec['move_pattern'] not in MOVE_PATTERNS:
+        print(f"Error - scan spec 'move_pattern' must be one of {MOVE_PATTERNS}!")
+        return False
+    if spec['type'] == 'body_scan' and 'preset_file' not in spec['vna_config']:
+        print("Error - body_scan only supports VNA configuration by .cst file ('preset_file')!")
+        return False
+    if 'segments' in spec['vna_config'] and validate_segments(spec['vna_config']['segments']) is not True:
+        return False
+    if spec.get('adaptive') is not None:
+        if spec['type'] != 'auto_measurement':
+            print("Error - adaptive refinement is only supported for auto_measurement!")
+            return False
+        if validate_adaptive_config(spec['adaptive']) is not True:
+            return False
+    if spec.get('roi') is not None and validate_roi(spec['roi']) is not True:
+        return False
+    if spec.get('continuous') is not None:
+        if spec['type'] != 'auto_measurement':
+            print("Error - continuous scanning is only supported for auto_measurement!")
+            return False
+        if spec.get('adaptive') is not None or spec.get('roi') is not None:
+            print("Error - continuous scanning can not be combined with 'adaptive' or 'roi'!")
+            return False
+        mesh = spec['mesh']
+        if (len(mesh['x_vec']) if 'x_vec' in mesh else mesh.get('x_num_steps', 0)) < 2:
+            print("Error - continuous scanning needs at least 2 steps in X!")
+            return False
+        unknown_keys = [key for key in spec['continuous'] if key not in CONTINUOUS_DEFAULTS]
+        if len(unknown_keys) > 0:
+            print(f"Error - scan spec 'continuous' has unknown entries: {unknown_keys}")
+            return False
+    if spec.get('settling') is not None:
+        if spec['type'] != 'body_scan':
+            print("Error - adaptive settling is only supported for body_scan!")
+            return False
+        unknown_keys = [key for key in spec['settling'] if key not in SETTLING_DEFAULTS]
+        if len(unknown_keys) > 0:
+            print(f"Error - scan spec 'settling' has unknown entries: {unknown_keys}")
+            return False
+        timeout = spec['settling'].get('timeout')
+        if timeout is None:
+            timeout = spec['mesh'].get('z_move_sleep_time', 0.0)
+        if timeout <= 0:
+            print("Error - adaptive settling needs a 'timeout' or 'z_move_sleep_time' > 0!")
+            return False
+    if spec.get('averaging') is not None:
+        if spec.get('continuous') is not None:
+            print("Error - adaptive averaging can not be combined with 'continuous'!")
+            return False
+        unknown_keys = [key for key in spec['averaging'] if key not in AVERAGING_DEFAULTS]
+        if len(unknown_keys) > 0:
+            print(f"Error - scan spec 'averaging' has unknown entries: {unknown_keys}")
+            return False
+        if spec['averaging'].get('target_uncertainty', 1.0) <= 0:
+            print("Error - scan spec 'averaging' needs a 'target_uncertainty' > 0!")
+            return False
+    if spec.get('error_recovery') is not None:
+        unknown_keys = [key for key in spec['error_recovery'] if key not in RECOVERY_DEFAULTS]
+        if len(unknown_keys) > 0:
+            print(f"Error - scan spec 'error_recovery' has unknown entries: {unknown_keys}")
+            return False
+        if spec['error_recovery'].get('point_budget', 1) < 1:
+            print("Error - scan spec 'error_recovery' needs a 'point_budget' >= 1!")
+            return False
+        if spec['error_recovery'].get('total_budget') is not None and spec['error_recovery']['total_budget'] < 1:
+            print("Error - scan spec 'error_recovery' needs a 'total_budget' >= 1 or None for unlimited!")
+            return False
+    return True
+
+
+def calc_mesh_vectors(spec: dict):
+    """
+    Calculates the chamber coordinates to move to like the measurement windows of the GUI do.
+
+    :return: tuple (x_vec, y_vec, z_vec) of np.ndarrays in chamber coordinates [mm]
+    """
+    mesh = spec['mesh']
+    if 'x_vec' in mesh:
+        return np.array(mesh['x_vec'], dtype=float), np.array(mesh['y_vec'], dtype=float), \
+            np.array(mesh['z_vec'], dtype=float)
+
+    x0, y0, z0 = spec['zero_position']
+    if spec['type'] == 'auto_measurement':
+        x_vec = np.linspace(-mesh['x_length'] / 2, mesh['x_length'] / 2, mesh['x_num_steps']) + x0
+        y_vec = np.linspace(-mesh['y_length'] / 2, mesh['y_length'] / 2, mesh['y_num_steps']) + y0
+        z_vec = np.linspace(mesh['z_start'], mesh['z_stop'], mesh['z_num_steps']) + z0
+    else:
+        x_vec = np.linspace(x0, x0 + mesh['x_length'], mesh['x_num_steps'])
+        y_vec = np.linspace(y0, y0 + mesh['y_length'], mesh['y_num_steps'])
+        z_vec = np.linspace(z0, z0 + mesh['z_length'], mesh['z_num_steps'])
+    return x_vec, y_vec, z_vec
+
+
+def check_move_boundary(x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray):
+    """
+    :return: True if all coordinates are inside the workspace of the chamber, else False
+    """
+    for vec, max_coor in [(x_vec, X_MAX_COOR), (y_vec, Y_MAX_COOR), (z_vec, Z_MAX_COOR)]:
+        if len(vec) == 0 or np.min(vec) < 0 or np.max(vec) > max_coor:
+            return False
+    return True
+
+
+def configure_vna(vna: E8361RemoteGPIB, vna_config: dict, meas_name: str, state_cache: dict = None):
+    """
+    Sets up the PNA by .cst file or manual configuration, same as the start handlers of the ProcessController.
+
+    If a state_cache dict is given, the PNA state of each configuration is saved once after the setup (see
+    E8361RemoteGPIB.pna_save_state()) and recalled in one step when the same configuration is requested again.
+
+    :param state_cache: dict {key: (state snapshot, vna_info)}, filled by this function, empty at first call
+    :return: vna_info dict as expected by the measurement routines or None if configuration failed
+    """
+    cache_key = json.dumps([vna_config, meas_name], sort_keys=True)
+    if state_cache is not None and cache_key in state_cache:
+        vna_state, vna_info = state_cache[cache_key]
+        if vna.pna_recall_state(vna_state):
+            return dict(vna_info)
+        del state_cache[cache_key]  # snapshot not available on PNA anymore, configure from scratch
+
+    vna_info = {'meas_name': meas_name}
+    if 'preset_file' in vna_config:
+        vna_info['vna_preset_from_file'] = vna_config['preset_file']
+        extra_info = vna.pna_preset_from_file(vna_config['preset_file'], meas_name)
+        if extra_info is None:
+            print("Error - Invalid .cst file path given!")
+            return None
+        for key in VNA_INFO_KEYS:
+            vna_info[key] = extra_info[key]
+        if 'segments' in extra_info:
+            vna_info['segments'] = extra_info['segments']
+    else:
+        if vna_config.get('segments'):
+            vna_info['segments'] = vna_config['segments']
+            vna_config = apply_segments(dict(vna_config))
+        for key in VNA_INFO_KEYS:
+            if key not in vna_config:
+                print(f"Error - manual VNA configuration misses '{key}'!")
+                return None
+            vna_info[key] = vna_config[key]
+        if len(vna_info['parameter']) == 0:
+            print("Error - Please select at least one S-parameter for measurement.")
+            return None
+        vna.pna_preset()
+        vna.pna_add_measurement_detailed(meas_name=meas_name, parameter=vna_info['parameter'],
+                                         freq_start=vna_info['freq_start'], freq_stop=vna_info['freq_stop'],
+                                         if_bw=vna_info['if_bw'], sweep_num_points=vna_info['sweep_num_points'],
+                                         output_power=vna_info['output_power'], trigger_manual=True,
+                                         average_number=vna_info['avg_num'], segments=vna_info.get('segments'))
+
+    if state_cache is not None:
+        vna_state = vna.pna_save_state(f"{meas_name}_{zlib.crc32(cache_key.encode()):08x}.cst")
+        if vna_state is not None:
+            state_cache[cache_key] = (vna_state, dict(vna_info))
+    return vna_info
@@ -0,0 +1,134 @@
+"""
+Segment sweeps of the PNA.
+
+Instead of one linear sweep from freq_start to freq_stop, the PNA sweeps a table of segments, each with its own number
+of points and optionally its own IF bandwidth (see E8361RemoteGPIB.pna_set_segment_sweep()). Bands without interest
+are skipped and narrow IF bandwidths are only spent where they are needed, which shortens the sweep of every point.
+
+vna_info / vna_config / measurement_config carry the table as optional key 'segments':
+    [{"freq_start": float [Hz], "freq_stop": float [Hz], "sweep_num_points": int, "if_bw": float [Hz] (optional)}, ...]
+The segments are ascending and do not overlap. 'freq_start', 'freq_stop' and 'sweep_num_points' then span all
+segments, 'if_bw' is the IF bandwidth of segments without own 'if_bw'. Measurement files of segment sweeps store the
+non-uniform frequency axis as 'frequencies', get_frequency_vector() must be used instead of np.linspace().
+
+The UI takes the table as text 'start:stop:points[:if_bw]' per segment, segments separated by ';'.
+"""
+import numpy as np
+
+SEGMENT_KEYS = ('freq_start', 'freq_stop', 'sweep_num_points', 'if_bw')
+MAX_SWEEP_POINTS = 16001    # maximum number of points of a sweep of the E8361A
+
+
+def validate_segments(segments: list):
+    """
+    Checks the segment table. Prints the reason if invalid.
+
+    :return: True if valid, False otherwise
+    """
+    if not isinstance(segments, list) or len(segments) == 0:
+        print("Error - 'segments' must be a non-empty list of segment dicts!")
+        return False
+    previous_stop = None
+    for idx, segment in enumerate(segments):
+        unknown_keys = [key for key in segment if key not in SEGMENT_KEYS]
+        missing_keys = [key for key in SEGMENT_KEYS[:3] if key not in segment]
+        if len(unknown_keys) > 0 or len(missing_keys) > 0:
+            print(f"Error - segment {idx + 1} has unknown keys {unknown_keys} or misses keys {missing_keys}!")
+            return False
+        if segment['freq_stop'] < segment['freq_start'] or int(segment['sweep_num_points']) < 1:
+            print(f"Error - segment {idx + 1} needs freq_start <= freq_stop and at least one point!")
+            return False
+        if 'if_bw' in segment and segment['if_bw'] <= 0:
+            print(f"Error - segment {idx + 1} needs a positive 'if_bw'!")
+            return False
+        if previous_stop is not None and segment['freq_start'] <= previous_stop:
+            print(f"Error - segment {idx + 1} overlaps the previous segment, segments must be ascending!")
+            return False
+        previous_stop = segment['freq_stop']
+    if sum(int(segment['sweep_num_points']) for segment in segments) > MAX_SWEEP_POINTS:
+        print(f"Error - segments exceed the maximum of {MAX_SWEEP_POINTS} sweep points!")
+        return False
+    return True
+
+
+def calc_segment_frequencies(segments: list) -> np.ndarray:
+    """
+    :return: frequency points [Hz] of the segment sweep, each segment spaced linear like the PNA does
+    """
+    return np.concatenate([np.linspace(segment['freq_start'], segment['freq_stop'], int(segment['sweep_num_points']))
+                           for segment in segments])
+
+
+def apply_segments(vna_info: dict) -> dict:
+    """
+    Sets 'freq_start', 'freq_stop' and 'sweep_num_points' of the vna_info to the span of its segments.
+    Nothing is changed without segments.
+
+    :return: the given vna_info
+    """
+    segments = vna_info.get('segments')
+    if segments:
+        vna_info['freq_start'] = float(segments[0]['freq_start'])
+        vna_info['freq_stop'] = float(segments[-1]['freq_stop'])
+        vna_info['sweep_num_points'] = int(sum(int(segment['sweep_num_points']) for segment in segments))
+    return vna_info
+
+
+def get_frequency_vector(config: dict) -> np.ndarray:
+    """
+    :param config: vna_info or measurement_config
+    :return: frequency points [Hz] of the measurement, stored 'frequencies', segment table or linear sweep
+    """
+    if config.get('frequencies') is not None:
+        return np.asarray(config['frequencies'], dtype=float)
+    if config.get('segments'):
+        return calc_segment_frequencies(config['segments'])
+    return np.linspace(config['freq_start'], config['freq_stop'], config['sweep_num_points'])
+
+
+def calc_sweep_bandwidths(config: dict) -> np.ndarray:
+    """
+    :param config: vna_info or measurement_config
+    :return: IF bandwidth [Hz] of every frequency point of the sweep
+    """
+    if not config.get('segments'):
+        return np.full(int(config['sweep_num_points']), float(config['if_bw']))
+    return np.concatenate([np.full(int(segment['sweep_num_points']), float(segment.get('if_bw', config['if_bw'])))
+                           for segment in config['segments']])
+
+
+def parse_segment_string(text: str):
+    """
+    Parses the segment table of the UI, 'start:stop:points[:if_bw]' per segment separated by ';'.
+
+    :return: list of segment dicts, empty list for empty text, None if the text is invalid
+    """
+    segments = []
+    for part in text.split(';'):
+        if part.strip() == '':
+            continue
+        values = part.split(':')
+        if len(values) not in (3, 4):
+            return None
+        try:
+            segment = {'freq_start': float(values[0]), 'freq_stop': float(values[1]),
+                       'sweep_num_points': int(values[2])}
+            if len(values) == 4:
+                segment['if_bw'] = float(values[3])
+        except ValueError:
+            return None
+        segments.append(segment)
+    return segments
+
+
+def format_segment_string(segments: list) -> str:
+    """
+    :return: segment table as text for the UI, see parse_segment_string()
+    """
+    parts = []
+    for segment in segments or []:
+        part = f"{segment['freq_start']:g}:{segment['freq_stop']:g}:{int(segment['sweep_num_points'])}"
+        if 'if_bw' in segment:
+            part += f":{segment['if_bw']:g}"
+        parts.append(part)
+    return '; '.join(parts)
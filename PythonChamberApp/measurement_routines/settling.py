@@ -0,0 +1,127 @@
+"""
+Adaptive settling detection of the BodyScan.
+
+After a move, the chamber and the scanned body swing for a while. Instead of sleeping a fixed, pessimistic
+z_move_sleep_time, the SettlingDetector switches the PNA to a short sweep with few frequency points and without
+averaging, takes readings back to back and proceeds as soon as consecutive readings agree within the amplitude [dB]
+and phase [deg] tolerances. The timeout caps the settling time, by default it is the z_move_sleep_time of the scan.
+The full sweep configuration is restored before the measurement of the point.
+
+The tolerances must be above the noise of the settle readings (same IF bandwidth as the measurement), otherwise the
+readings never agree and every point waits for the timeout.
+"""
+import time
+import numpy as np
+from vna_net_interface import E8361RemoteGPIB
+
+SETTLING_DEFAULTS = {
+    'num_points': 11,           # frequency points of the settle readings
+    'amp_tolerance': 0.1,       # unit [dB], maximum amplitude difference of consecutive readings
+    'phase_tolerance': 1.0,     # unit [deg], maximum phase difference of consecutive readings
+    'num_agreeing': 2,          # number of consecutive agreeing reading pairs to count as settled
+    'timeout': None,            # unit [s], maximum settling time, None for the z_move_sleep_time of the scan
+    'parameter': None,          # S-parameter that is evaluated, None for the first measured parameter
+}
+
+
+class SettlingDetector:
+    """
+    Waits until consecutive fast PNA readings agree, see module doc-string.
+
+    :param vna: PNA with the measurement already configured
+    :param vna_info: PNA configuration of the measurement, 'sweep_num_points' and 'avg_num' are restored after settling
+    :param config: settings, missing keys default to SETTLING_DEFAULTS
+    """
+    vna: E8361RemoteGPIB = None
+    vna_meas_name: str = None
+    vna_info: dict = None
+    config: dict = None
+    settle_times: list = None   # unit [s], settling time of every point
+    num_timeouts: int = 0
+
+    def __init__(self, vna: E8361RemoteGPIB, vna_info: dict, config: dict = None):
+        self.vna = vna
+        self.vna_meas_name = vna_info['meas_name']
+        self.vna_info = vna_info
+        self.config = dict(SETTLING_DEFAULTS)
+        if config is not None:
+            self.config.update(config)
+        if self.config['parameter'] not in vna_info['parameter']:
+            self.config['parameter'] = vna_info['parameter'][0]
+        self.settle_times = []
+        self.num_timeouts = 0
+
+    def wait(self) -> tuple:
+        """
+        Takes settle readings until consecutive readings agree or the timeout is reached.
+        The PNA is switched back to the sweep of the measurement in any case.
+
+        :return: tuple (settle time [s], number of readings, True if settled / False if timed out)
+        """
+        start = time.perf_counter()
+        num_readings = 0
+        num_agreeing = 0
+        previous = None
+        self.__set_settle_sweep(True)
+        try:
+            while num_agreeing < self.config['num_agreeing']:
+                if num_readings > 0 and time.perf_counter() - start >= self.config['timeout']:
+                    break
+                self.vna.pna_trigger_measurement(self.vna_meas_name)
+                data = np.array(self.vna.pna_read_meas_data(self.vna_meas_name, self.config['parameter']),
+                                dtype=float)
+                pointer = data[:, 1] + 1j * data[:, 2]
+                num_readings += 1
+                if previous is not None and self.readings_agree(previous, pointer):
+                    num_agreeing += 1
+                else:
+                    num_agreeing = 0
+                previous = pointer
+        finally:
+            self.__set_settle_sweep(False)
+        settle_time = time.perf_counter() - start
+        settled = num_agreeing >= self.config['num_agreeing']
+        self.settle_times.append(settle_time)
+        if not settled:
+            self.num_timeouts += 1
+        return settle_time, num_readings, settled
+
+    def readings_agree(self, reading_a: np.ndarray, reading_b: np.ndarray) -> bool:
+        """
+        :return: True if amplitude and phase of both complex readings agree within the tolerances at all frequencies
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.asarray(reading_b) / np.asarray(reading_a)
+        if not np.all(np.isfinite(ratio)):
+            return bool(np.allclose(reading_a, reading_b))
+        amp_diff = np.max(np.abs(20 * np.log10(np.abs(ratio))))
+        phase_diff = np.max(np.abs(np.degrees(np.angle(ratio))))
+        return bool(amp_diff <= self.config['amp_tolerance'] and phase_diff <= self.config['phase_tolerance'])
+
+    def to_json_dict(self) -> dict:
+        """
+        :return: settings and statistics of the settling times for the measurement file
+        """
+        settle_times = np.array(self.settle_times) if len(self.settle_times) > 0 else np.zeros(1)
+        return dict(self.config, num_points_settled=len(self.settle_times), num_timeouts=self.num_timeouts,
+                    mean_settle_time=float(np.mean(settle_times)), max_settle_time=float(np.max(settle_times)))
+
+    def __set_settle_sweep(self, enable: bool):
+        """
+        Switches between the short sweep of the settle readings and the sweep of the measurement.
+        """
+        segment_sweep = bool(self.vna_info.get('segments'))
+        with self.vna.pna_batch():
+            if enable:
+                if segment_sweep:   # settle readings use a short linear sweep, the segment table stays untouched
+                    self.vna.pna_set_sweep_type(self.vna_meas_name, 'LIN')
+                self.vna.pna_set_sweep_num_points(self.vna_meas_name, self.config['num_points'])
+                if self.vna_info['avg_num'] > 1:
+                    self.vna.pna_disable_average(self.vna_meas_name)
+            else:
+                self.vna.pna_set_sweep_num_points(self.vna_meas_name, self.vna_info['sweep_num_points'])
+                if segment_sweep:
+                    self.vna.pna_set_sweep_type(self.vna_meas_name, 'SEGM')
+                if self.vna_info['avg_num'] > 1:
+                    self.vna.pna_set_average_number(self.vna_meas_name, self.vna_info['avg_num'])
+        return
@@ -0,0 +1,108 @@
+"""
+Batched, rate-limited log/status bus for messages of acquisition threads.
+
+Measurement threads post several messages per measured point. Instead of forwarding each message as a queued
+cross-thread signal to the console and statusbar, messages are collected in a bounded buffer and flushed to the GUI
+by a timer at a fixed rate. Each flush emits all collected messages as one batch and only the latest message for the
+statusbar.
+
+Connect the thread's str-signal with Qt.ConnectionType.DirectConnection to LogBus.post() (or post_info()), so the slot
+runs in the emitting thread and only appends to the buffer.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# log levels, same values as python logging module
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+
+class LogBusSignals(QObject):
+    """
+    Defines the signals emitted by LogBus on every flush.
+
+    messages
+        >> list [(timestamp: str, level: int, message: str), ...] of all messages since the last flush
+
+    status
+        >> str, latest message with level >= status_level since the last flush. Not emitted if there is none.
+    """
+    messages = pyqtSignal(list)
+    status = pyqtSignal(str)
+
+
+class LogBus(QObject):
+    """
+    Collects messages from any thread and flushes them to the GUI at a fixed rate.
+
+    :param flush_interval_ms: time between two flushes. Must be created and started on the GUI thread.
+    :param max_buffered_messages: messages held between two flushes, oldest are dropped first when exceeded
+    :param status_level: minimum level of a message to be shown in the statusbar
+    """
+    def __init__(self, flush_interval_ms: int = 200, max_buffered_messages: int = 5000, status_level: int = INFO):
+        super().__init__()
+        self.signals = LogBusSignals()
+        self.status_level = status_level
+        self.__buffer = deque(maxlen=max_buffered_messages)
+        self.__lock = threading.Lock()
+        self.__num_dropped = 0
+        self.__flush_timer = QTimer()
+        self.__flush_timer.setInterval(flush_interval_ms)
+        self.__flush_timer.timeout.connect(self.flush)
+
+    def start(self):
+        self.__flush_timer.start()
+        return
+
+    def stop(self):
+        """
+        Stops the flush timer after flushing all remaining messages.
+        """
+        self.__flush_timer.stop()
+        self.flush()
+        return
+
+    def post(self, message: str, level: int = INFO):
+        """
+        Thread-safe. Adds a message with timestamp to the buffer.
+        """
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        with self.__lock:
+            if len(self.__buffer) == self.__buffer.maxlen:
+                self.__num_dropped += 1
+            self.__buffer.append((timestamp, level, message))
+        return
+
+    def post_info(self, message: str):
+        """
+        Thread-safe. Same as post() with level INFO, can be connected to str-signals.
+        """
+        self.post(message, INFO)
+        return
+
+    def flush(self):
+        """
+        Emits all buffered messages as one batch and the latest one to the statusbar. Runs on the GUI thread.
+        """
+        with self.__lock:
+            if len(self.__buffer) == 0:
+                return
+            batch = list(self.__buffer)
+            self.__buffer.clear()
+            num_dropped = self.__num_dropped
+            self.__num_dropped = 0
+
+        if num_dropped > 0:
+            batch.insert(0, (batch[0][0], WARNING, f"... {num_dropped} messages dropped, log rate too high ..."))
+        self.signals.messages.emit(batch)
+
+        for timestamp, level, message in reversed(batch):
+            if level >= self.status_level:
+                self.signals.status.emit(message)
+                break
+        return
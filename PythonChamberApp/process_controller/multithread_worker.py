@@ -38,6 +38,17 @@ class WorkerSignals(QObject):
     update = pyqtSignal(str)
 
 
+class DeviceResultSignals(QObject):
+    """
+    Hands the futures of device actor commands (see connection_handler/device_actor.py) to the GUI thread. The signal
+    is emitted by the actor thread once a command is done, the connected slot runs in the GUI thread.
+
+    result
+        tuple (handler, future), the slot calls handler(future)
+    """
+    result = pyqtSignal(tuple)
+
+
 class Worker(QRunnable):
     """
     Worker thread
@@ -5,22 +5,31 @@ operates as interface between GUI and Network commands.
 import os.path
 
 from chamber_net_interface import ChamberNetworkCommands
+from connection_handler import DeviceActor, PRIORITY_JOG
 import user_interface as ui_pkg
 from PyQt6.QtWidgets import QApplication, QMessageBox
-from PyQt6.QtCore import QThreadPool, QObject, pyqtSignal
+from PyQt6.QtCore import QThreadPool, QObject, pyqtSignal, Qt
 from .AutoMeasurement_Thread import AutoMeasurement
 from .BodyScan_Thread import BodyScan
-from .multithread_worker import Worker
+from .multithread_worker import Worker, DeviceResultSignals
 from .CalibrationRoutine_Thread import CalibrationRoutine
-from vna_net_interface import E8361RemoteGPIB
+from .log_bus import LogBus
+from measurement_routines import format_timing_summary, MeasurementJobQueue, calc_mesh_vectors, check_move_boundary, \
+    configure_vna, simulate_scan, format_dry_run_report, read_point_list_data_array, calc_roi_mask, \
+    resample_continuous_data, get_frequency_vector, validate_segments, apply_segments, validate_adaptive_config
+from measurement_routines.job_queue import JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_STOPPED
+from vna_net_interface import E8361RemoteGPIB, get_transport
 import numpy as np
 import json
 
 
 class ProcessController:
     # Properties
-    chamber: ChamberNetworkCommands = None
-    vna: E8361RemoteGPIB = None
+    chamber: ChamberNetworkCommands = None  # DeviceProxy of chamber_actor, see connection_handler/device_actor.py
+    vna: E8361RemoteGPIB = None     # DeviceProxy of vna_actor
+    chamber_actor: DeviceActor = None   # thread that owns the chamber, executes all chamber requests one after another
+    vna_actor: DeviceActor = None   # thread that owns the PNA, executes all GPIB requests one after another
+    __device_results: DeviceResultSignals = None    # hands results of the actors to the GUI thread
     gui_mainWindow: ui_pkg.MainWindow = None
     gui_app: QApplication = None
 
@@ -31,6 +40,28 @@ class ProcessController:
     ui_vna_control_process: Worker = None   # Assure that only one GPIB command/request is sent to VNA at a time
     ui_chamber_control_calibration_process: CalibrationRoutine = None  # Stores the calibration routine thread for convenience
 
+    # Interactive jogs are queued on the chamber actor with PRIORITY_JOG and executed one after another
+    __num_queued_jogs: int = 0
+    __max_queued_jogs: int = 10
+    __jog_target: list = None   # [x, y, z] position after all queued jogs, None if no jog is queued
+    __vna_configuring: bool = False     # PNA is set up for a measurement by the vna actor
+
+    # Batched logging of measurement threads to console/log and statusbar
+    auto_measurement_log_bus: LogBus = None
+    body_scan_log_bus: LogBus = None
+
+    # Measurement job queue, runs queued AutoMeasurement/BodyScan jobs one after another
+    measurement_job_queue: MeasurementJobQueue = None
+    job_queue_running: bool = False
+    __job_queue_current_job_id: int = None
+    __job_queue_vna_config: dict = None     # vna_config the PNA was last set up with by the queue, None if unknown
+    __job_queue_vna_info: dict = None       # vna_info read back from the PNA for __job_queue_vna_config
+    __job_queue_vna_states: dict = None     # PNA state snapshots of the vna_configs of the queue, see configure_vna()
+    __job_queue_meas_name: str = 'JobQueueMeasurement'
+
+    # PNA settings of .cst files that were applied in this session, {file path: vna_info}, used by dry runs
+    vna_preset_info_cache: dict = None
+
     # Position logging & validity check
     __x_live: float = None
     __y_live: float = None
@@ -61,6 +92,17 @@ class ProcessController:
                                                 chamber_z_head_bed_offset=self.__z_head_bed_offset)
         self.gui_mainWindow.show()
 
+        # setup log buses that flush messages of measurement threads to the GUI at a fixed rate
+        self.auto_measurement_log_bus = LogBus()
+        self.auto_measurement_log_bus.signals.messages.connect(
+            self.gui_mainWindow.ui_config_window.append_messages2console)
+        self.auto_measurement_log_bus.signals.status.connect(self.gui_mainWindow.update_status_bar)
+        self.auto_measurement_log_bus.start()
+        self.body_scan_log_bus = LogBus()
+        self.body_scan_log_bus.signals.messages.connect(self.gui_mainWindow.ui_body_scan_window.append_messages2log)
+        self.body_scan_log_bus.signals.status.connect(self.gui_mainWindow.update_status_bar)
+        self.body_scan_log_bus.start()
+
         # input default values into config GUI
         self.gui_mainWindow.ui_config_window.chamber_ip_line_edit.setText("134.28.25.201")
         self.gui_mainWindow.ui_config_window.chamber_api_line_edit.setText("03DEBAA8A11941879C08AE1C224A6E2C")
@@ -123,6 +165,14 @@ class ProcessController:
             self.auto_measurement_start_handler)
         self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_stop_button.pressed.connect(
             self.auto_measurement_terminate_thread_handler)
+        self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_add_to_queue_button.pressed.connect(
+            self.job_queue_add_auto_measurement_handler)
+        self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_dry_run_button.pressed.connect(
+            self.auto_measurement_dry_run_handler)
+        self.gui_mainWindow.ui_auto_measurement_window.live_view_parameter_comboBox.currentTextChanged.connect(
+            self.auto_measurement_live_view_selection_handler)
+        self.gui_mainWindow.ui_auto_measurement_window.live_view_freq_spinBox.valueChanged.connect(
+            self.auto_measurement_live_view_selection_handler)
 
         # todo connect all Slots & Signals of body scan window. Define all necessary methods!
         # connect all Slots & Signals body scan window
@@ -134,6 +184,10 @@ class ProcessController:
             self.body_scan_start_button_handler)
         self.gui_mainWindow.ui_body_scan_window.body_scan_stop_button.pressed.connect(
             self.body_scan_terminate_thread_handler)
+        self.gui_mainWindow.ui_body_scan_window.body_scan_add_to_queue_button.pressed.connect(
+            self.job_queue_add_body_scan_handler)
+        self.gui_mainWindow.ui_body_scan_window.body_scan_dry_run_button.pressed.connect(
+            self.body_scan_dry_run_handler)
 
         # connect all Slots & Signals display measurement window
         self.gui_mainWindow.ui_display_measurement_window.file_select_refresh_button.pressed.connect(
@@ -173,6 +227,39 @@ class ProcessController:
             self.display_measurement_update_yz_plot_callback)
         self.gui_mainWindow.ui_display_measurement_window.xy_plot_z_select_slider.valueChanged.connect(
             self.display_measurement_update_xy_plot_callback)
+        # volume is not connected to plane sliders, so the texture is only rebuilt on frequency/parameter/unit change
+        self.gui_mainWindow.ui_display_measurement_window.parameter_select_comboBox.currentTextChanged.connect(
+            self.display_measurement_update_volume_callback)
+        self.gui_mainWindow.ui_display_measurement_window.frequency_select_slider.valueChanged.connect(
+            self.display_measurement_update_volume_callback)
+        self.gui_mainWindow.ui_display_measurement_window.unit_display_comboBox.currentTextChanged.connect(
+            self.display_measurement_update_volume_callback)
+        self.gui_mainWindow.ui_display_measurement_window.coor_AUT_checkBox.checkStateChanged.connect(
+            self.display_measurement_update_volume_callback)
+        self.gui_mainWindow.ui_display_measurement_window.volume_enable_checkBox.checkStateChanged.connect(
+            self.display_measurement_update_volume_callback)
+        self.gui_mainWindow.ui_display_measurement_window.volume_mode_comboBox.currentTextChanged.connect(
+            self.display_measurement_update_volume_callback)
+
+        # connect all Slots & Signals job queue window
+        self.gui_mainWindow.ui_job_queue_window.job_queue_start_button.pressed.connect(self.job_queue_start_handler)
+        self.gui_mainWindow.ui_job_queue_window.job_queue_stop_button.pressed.connect(self.job_queue_stop_handler)
+        self.gui_mainWindow.ui_job_queue_window.job_move_up_button.pressed.connect(self.job_queue_move_up_handler)
+        self.gui_mainWindow.ui_job_queue_window.job_move_down_button.pressed.connect(self.job_queue_move_down_handler)
+        self.gui_mainWindow.ui_job_queue_window.job_remove_button.pressed.connect(self.job_queue_remove_handler)
+        self.gui_mainWindow.ui_job_queue_window.job_clear_finished_button.pressed.connect(
+            self.job_queue_clear_finished_handler)
+
+        self.vna_preset_info_cache = {}
+        self.__job_queue_vna_states = {}
+
+        # load job queue of last session
+        self.measurement_job_queue = MeasurementJobQueue(os.path.join(os.getcwd(), 'job_queue.json'))
+        self.gui_mainWindow.ui_job_queue_window.update_job_table(self.measurement_job_queue.get_jobs())
+
+        # results of device actor commands are handled in the GUI thread
+        self.__device_results = DeviceResultSignals()
+        self.__device_results.result.connect(self.__device_result_handler)
 
         # enable Multithread via threadpool
         self.threadpool = QThreadPool()
@@ -230,6 +317,8 @@ class ProcessController:
         This function checks if the requested movement leads to a valid position.
         If not a warning is prompted that gives the reason for position-error in detail.
 
+        Relative movements start from the position after all queued jogs.
+
         :param pos_update_info: {'abs_x': float, 'abs_y': float, 'abs_z': float, 'rel_x': float, 'rel_y': float, 'rel_z': float} all key-values optional!
         :return: True >> movement valid, False >> invalid movement request
         """
@@ -255,19 +344,19 @@ class ProcessController:
                 warn_msg += "Invalid absolute movement!\nRequest leads to Z: " + str(
                     new_z) + " but allowed range is [0, " + str(self.__z_max_coor) + "].\n"
         if 'rel_x' in pos_update_info:
-            new_x = self.__x_live + pos_update_info['rel_x']
+            new_x = self.__get_jog_target()[0] + pos_update_info['rel_x']
             if new_x < 0 or new_x > self.__x_max_coor:
                 invalid_flag = True
                 warn_msg += "Invalid relative movement!\nRequest leads to X: " + str(
                     new_x) + " but allowed range is [0, " + str(self.__x_max_coor) + "].\n"
         if 'rel_y' in pos_update_info:
-            new_y = self.__y_live + pos_update_info['rel_y']
+            new_y = self.__get_jog_target()[1] + pos_update_info['rel_y']
             if new_y < 0 or new_y > self.__y_max_coor:
                 invalid_flag = True
                 warn_msg += "Invalid relative movement!\nRequest leads to Y: " + str(
                     new_y) + " but allowed range is [0, " + str(self.__y_max_coor) + "].\n"
         if 'rel_z' in pos_update_info:
-            new_z = self.__z_live + pos_update_info['rel_z']
+            new_z = self.__get_jog_target()[2] + pos_update_info['rel_z']
             if new_z < 0 or new_z > self.__z_max_coor:
                 invalid_flag = True
                 warn_msg += "Invalid relative movement!\nRequest leads to Z: " + str(
@@ -279,6 +368,14 @@ class ProcessController:
         else:
             return True
 
+    def __get_jog_target(self) -> list:
+        """
+        :return: [x, y, z] position of the chamber after all queued jogs, the live position if no jog is queued
+        """
+        if self.__jog_target is not None:
+            return list(self.__jog_target)
+        return [self.__x_live, self.__y_live, self.__z_live]
+
     def check_if_busy(self):
         """
         This function checks the process controller for running threads (e.g. Worker, AutoMeasurement, BodyScan, CalibrationRoutine).
@@ -292,22 +389,43 @@ class ProcessController:
         process_running_flag = False
         process_running_string = ""
         if self.ui_chamber_control_process is not None:
-            process_running = True
+            process_running_flag = True
             process_running_string += "Chamber control routine is running.\n"
         if self.ui_vna_control_process is not None:
-            process_running = True
+            process_running_flag = True
             process_running_string += "VNA control routine is running.\n"
         if self.auto_measurement_process is not None:
-            process_running = True
+            process_running_flag = True
             process_running_string += "Auto Measurement process is running.\n"
         if self.body_scan_process is not None:
-            process_running = True
+            process_running_flag = True
             process_running_string += "Body Scan process is running.\n"
         if self.ui_chamber_control_calibration_process is not None:
-            process_running = True
+            process_running_flag = True
             process_running_string += "Calibration routine is running.\n"
+        if self.job_queue_running:
+            process_running_flag = True
+            process_running_string += "Measurement job queue is running.\n"
+        if self.__num_queued_jogs > 0:
+            process_running_flag = True
+            process_running_string += "Chamber jogs are queued.\n"
+        if self.__vna_configuring:
+            process_running_flag = True
+            process_running_string += "VNA configuration is running.\n"
         return process_running_flag, process_running_string
 
+    def __on_device_result(self, future, handler):
+        """
+        Calls handler(future) in the GUI thread once the device actor command of the future is done.
+        """
+        future.add_done_callback(lambda done_future: self.__device_results.result.emit((handler, done_future)))
+        return
+
+    def __device_result_handler(self, handler_future: tuple):
+        handler, future = handler_future
+        handler(future)
+        return
+
 
     # **UI_config_window Callbacks** ################################################
     def chamber_connect_button_handler_threaded(self):
@@ -327,6 +445,9 @@ class ProcessController:
         api_key = connect_data['api_key']
 
         # reset chamber data and disable chamber control section when clicked 'connect'
+        if self.chamber_actor is not None:
+            self.chamber_actor.stop(wait=False)
+        self.chamber_actor = None
         self.chamber: ChamberNetworkCommands = None
         self.gui_mainWindow.ui_config_window.set_chamber_connected(False)
         self.gui_mainWindow.disable_chamber_control_window()
@@ -368,7 +489,8 @@ class ProcessController:
             raise Exception("Jog request failed")
 
     def chamber_connect_result_handler(self, new_chamber: ChamberNetworkCommands):
-        self.chamber = new_chamber
+        self.chamber_actor = DeviceActor(new_chamber, 'chamber')
+        self.chamber = self.chamber_actor.proxy()
         self.gui_mainWindow.enable_chamber_control_window()
         self.gui_mainWindow.enable_auto_measurement_window()
         self.gui_mainWindow.enable_body_scan_window()
@@ -401,6 +523,9 @@ class ProcessController:
             return
 
         # reset vna property and tab
+        if self.vna_actor is not None:
+            self.vna_actor.stop(wait=False)
+        self.vna_actor = None
         self.vna = None
         self.gui_mainWindow.ui_config_window.set_vna_connected(False)
         self.gui_mainWindow.disable_vna_control_window()
@@ -411,21 +536,24 @@ class ProcessController:
         self.gui_mainWindow.ui_body_scan_window.vna_config_filepath_check_button.setEnabled(False)
 
         # start connect routine
-        connect_thread = Worker(self.vna_connect_routine, visa_address, self.gui_mainWindow.ui_config_window.get_use_keysight())
+        connect_thread = Worker(self.vna_connect_routine, visa_address, self.gui_mainWindow.ui_config_window.get_use_keysight(),
+                                self.gui_mainWindow.ui_config_window.get_use_command_optimization())
         connect_thread.signals.update.connect(self.gui_mainWindow.ui_config_window.append_message2console)
         connect_thread.signals.update.connect(self.gui_mainWindow.update_status_bar)
         connect_thread.signals.result.connect(self.vna_connect_result_handler)
 
         self.threadpool.start(connect_thread)
 
-    def vna_connect_routine(self, visa_address: str, use_keysight_flag: bool, update_callback, progress_callback, position_update_callback):
+    def vna_connect_routine(self, visa_address: str, use_keysight_flag: bool, command_optimization_flag: bool,
+                            update_callback, progress_callback, position_update_callback):
         """
         Sends '*IDN?' query to given visa_address-device and pushes the answer or error to update_callback.
         """
         update_callback.emit("Check if visa address is valid...")
         new_vna = E8361RemoteGPIB(use_keysight=use_keysight_flag)
         available_resources = new_vna.list_resources()
-        if visa_address in available_resources:     # check if given address available
+        # LAN resources (VXI-11, HiSLIP, raw socket) are usually not found by the resource search, so they are tried
+        if visa_address in available_resources or get_transport(visa_address) != 'gpib':
 
             if new_vna.connect_pna(visa_address) is False:
                 update_callback.emit("ERROR - Failed to open resource with pyvisa.")
@@ -439,6 +567,9 @@ class ProcessController:
                 return None
 
             update_callback.emit(f"Instrument response to IDN: {idn_response}")
+            if command_optimization_flag:
+                new_vna.pna_set_command_optimization(batching=True, shadow_cache=True)
+                update_callback.emit("SCPI command batching and settings cache enabled.")
             return new_vna
         else:
             update_callback.emit("ERROR - Given visa address matches no available resource.")
@@ -447,10 +578,13 @@ class ProcessController:
     def vna_connect_result_handler(self, new_vna: E8361RemoteGPIB):
         """
         Detects if IDN query failed by comparing 'new_vna' to None type.
-        If new_vna is not None-type, it is stored in process controller's vna property.
+        If new_vna is not None-type, it is handed to the vna actor thread and its proxy is stored in process
+        controller's vna property.
         """
         if new_vna is not None:
-            self.vna = new_vna
+            self.vna_actor = DeviceActor(new_vna, 'vna')
+            self.vna = self.vna_actor.proxy()
+            self.__job_queue_vna_states = {}    # snapshots are stored on the previous PNA
             #   Enable windows
             self.gui_mainWindow.enable_vna_control_window()
             self.gui_mainWindow.enable_auto_measurement_window()
@@ -476,7 +610,7 @@ class ProcessController:
         return
 
     def chamber_control_home_all_button_handler(self):
-        if self.ui_chamber_control_process is None:
+        if self.ui_chamber_control_process is None and self.__num_queued_jogs == 0:
             # Assure that Z-sensor is mounted
             if self.__accept_home_dialog() is False:
                 return
@@ -578,306 +712,129 @@ class ProcessController:
             return False
 
     def chamber_control_home_xy_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            custom_home: list = self.gui_mainWindow.ui_chamber_control_window.get_custom_home_position()
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-
-            self.ui_chamber_control_process = Worker(self.chamber_control_jog_to_abs_coor_routine,
-                                                         self.chamber, custom_home[0], custom_home[1], self.__z_live, jogspeed)
-
-            self.ui_chamber_control_process.signals.update.connect(
-                self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-            self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-            self.ui_chamber_control_process.signals.position_update.connect(self.chamber_control_update_live_position)
-
-            self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-            self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
+        custom_home: list = self.gui_mainWindow.ui_chamber_control_window.get_custom_home_position()
+        jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
+        self.chamber_control_queue_jog({'abs_x': custom_home[0], 'abs_y': custom_home[1]}, jogspeed)
         return
 
     def chamber_control_home_z_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            custom_home: list = self.gui_mainWindow.ui_chamber_control_window.get_custom_home_position()
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-
-            self.ui_chamber_control_process = Worker(self.chamber_control_jog_to_abs_coor_routine,
-                                                     self.chamber, self.__x_live, self.__y_live, custom_home[2],
-                                                     jogspeed)
-
-            self.ui_chamber_control_process.signals.update.connect(
-                self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-            self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-            self.ui_chamber_control_process.signals.position_update.connect(self.chamber_control_update_live_position)
-
-            self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-            self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
+        custom_home: list = self.gui_mainWindow.ui_chamber_control_window.get_custom_home_position()
+        jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
+        self.chamber_control_queue_jog({'abs_z': custom_home[2]}, jogspeed)
         return
 
     def chamber_control_x_inc_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            stepsize = self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
-
-            if self.check_movement_valid({'rel_x': stepsize}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_one_axis_rel_routine, self.chamber,
-                                                         'x',
-                                                         jogspeed, stepsize)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
-        return
+        self.__chamber_control_jog_one_axis('x', 1)
 
     def chamber_control_x_dec_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            stepsize = -1 * self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
-
-            if self.check_movement_valid({'rel_x': stepsize}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_one_axis_rel_routine, self.chamber,
-                                                         'x',
-                                                         jogspeed, stepsize)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
-        return
+        self.__chamber_control_jog_one_axis('x', -1)
 
     def chamber_control_y_inc_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            stepsize = self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
-
-            if self.check_movement_valid({'rel_y': stepsize}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_one_axis_rel_routine, self.chamber,
-                                                         'y',
-                                                         jogspeed, stepsize)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
-        return
+        self.__chamber_control_jog_one_axis('y', 1)
 
     def chamber_control_y_dec_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            stepsize = -1 * self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
-
-            if self.check_movement_valid({'rel_y': stepsize}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_one_axis_rel_routine, self.chamber,
-                                                         'y',
-                                                         jogspeed, stepsize)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
-        return
+        self.__chamber_control_jog_one_axis('y', -1)
 
     def chamber_control_z_inc_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            stepsize = self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
-
-            if self.check_movement_valid({'rel_z': stepsize}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_one_axis_rel_routine, self.chamber,
-                                                         'z',
-                                                         jogspeed, stepsize)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
-        return
+        self.__chamber_control_jog_one_axis('z', 1)
 
     def chamber_control_z_dec_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            stepsize = -1 * self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
-
-            if self.check_movement_valid({'rel_z': stepsize}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_one_axis_rel_routine, self.chamber,
-                                                         'z',
-                                                         jogspeed, stepsize)
+        self.__chamber_control_jog_one_axis('z', -1)
 
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
-        return
-
-    def chamber_control_jog_one_axis_rel_routine(self, chamber: ChamberNetworkCommands, axis: str, jogspeed: float,
-                                                 rel_coor: float, update_callback, progress_callback,
-                                                 position_update_callback):
+    def __chamber_control_jog_one_axis(self, axis: str, direction: int):
         """
-        This routine receives a chamber object and the desired relative coordinate-change on a given axis.
-        It should be used in combination with arrow-button menu.
-            * No Error handling when Server denies request!
+        Queues a relative jog of one axis by the stepsize of the arrow-button menu.
 
-        :param chamber: stored network chamber of process controller providing (network) interface to chamber
         :param axis: the axis that should be jogged - either 'x' or 'y' or 'z'
-        :param jogspeed: speed to move in [mm/s]
-        :param rel_coor: relative coordinate change on axis
-        :param update_callback: Callback signal to send string messages to consoles, status labels or similiar. Provided by Worker-class (Thread).
-        :param progress_callback: Callback signal to send dict with key-value pairs dependend on usecase. Provided by Worker-class (Thread).
-        :param position_update_callback: Callback signal to send new chamber position as dict
-            {'abs_x': float, 'abs_y': float, 'abs_z': float, 'rel_x': float, 'rel_y': float, 'rel_z': float}
-            all key-values optional! Provided by Worker-class (Thread).
-        """
-        update_callback.emit(
-            "Request Jog " + axis.upper() + " by " + str(rel_coor) + " mm with " + str(jogspeed) + " mm/s")
-        if axis == 'x':
-            response = chamber.chamber_jog_rel(x=rel_coor, speed=jogspeed)
-            position_update_callback.emit({'rel_x': rel_coor})
-        elif axis == 'y':
-            response = chamber.chamber_jog_rel(y=rel_coor, speed=jogspeed)
-            position_update_callback.emit({'rel_y': rel_coor})
-        elif axis == 'z':
-            response = chamber.chamber_jog_rel(z=rel_coor, speed=jogspeed)
-            position_update_callback.emit({'rel_z': rel_coor})
-        else:
-            update_callback("jog_one_axis routine got invalid axis parameter!")
-            raise Exception("jog_one_axis routine got invalid axis parameter!")
-
+        :param direction: 1 >> increase coordinate, -1 >> decrease coordinate
+        """
+        jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
+        stepsize = self.gui_mainWindow.ui_chamber_control_window.get_button_move_stepsize()
+        self.chamber_control_queue_jog({'rel_' + axis: direction * stepsize}, jogspeed)
         return
 
     def chamber_control_go_to_button_handler(self):
-        if self.ui_chamber_control_process is None:
-            jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
-            new_coordinates = self.gui_mainWindow.ui_chamber_control_window.get_go_abs_coor_inputs()
-            new_x = new_coordinates['x']
-            new_y = new_coordinates['y']
-            new_z = new_coordinates['z']
-
-            if self.check_movement_valid({'abs_x': new_x, 'abs_y': new_y, 'abs_z': new_z}):
-                # enable relative movement in case override was used before
-                self.gui_mainWindow.ui_chamber_control_window.control_buttons_widget.setEnabled(True)
-
-                # start request...
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_to_abs_coor_routine,
-                                                         self.chamber, new_x, new_y, new_z, jogspeed)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-
-        else:
-            self.gui_mainWindow.prompt_warning(
-                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
-                "Too many Requests")
+        jogspeed = self.gui_mainWindow.ui_chamber_control_window.get_button_move_jogspeed()
+        new_coordinates = self.gui_mainWindow.ui_chamber_control_window.get_go_abs_coor_inputs()
+        if self.chamber_control_queue_jog({'abs_x': new_coordinates['x'], 'abs_y': new_coordinates['y'],
+                                           'abs_z': new_coordinates['z']}, jogspeed):
+            # enable relative movement in case override was used before
+            self.gui_mainWindow.ui_chamber_control_window.control_buttons_widget.setEnabled(True)
         return
 
-    def chamber_control_jog_to_abs_coor_routine(self, chamber: ChamberNetworkCommands, x_coor: float, y_coor: float,
-                                                z_coor: float, jogspeed: float, update_callback, progress_callback,
-                                                position_update_callback):
+    def chamber_control_queue_jog(self, pos_update_info: dict, jogspeed: float) -> bool:
         """
-        This routine a receives chamber object and the desired new position as x,y,z coordinates.
-        It requests the chamber to move to the new position and signals updates.
-        It should be used with the "Go to absolute coordinates" menu in UI_chamber_control_window and auto-measurement procedure.
+        Queues an interactive jog on the chamber actor with PRIORITY_JOG, so the GUI never waits for the chamber and
+        jogs requested while the chamber moves are executed one after another. The live position is updated once the
+        jog is done.
+        Jogs are refused while a chamber control routine (homing, tilt adjustment) is running or the queue is full.
             * No Error handling when Server denies request!
 
-        :param chamber: stored network chamber of process controller providing (network) interface to chamber
-        :param x_coor: new desired x coordinate in [mm]
-        :param y_coor: new desired y coordinate in [mm]
-        :param z_coor: new desired z coordinate in [mm]
+        :param pos_update_info: {'abs_x': float, 'abs_y': float, 'abs_z': float, 'rel_x': float, 'rel_y': float, 'rel_z': float}
+            all key-values optional! Relative and absolute coordinates must not be mixed.
         :param jogspeed: speed to move in [mm/s]
-        :param update_callback: Callback signal to send string messages to consoles, status labels or similiar. Provided by Worker-class (Thread).
-        :param progress_callback: Callback signal to send dict with key-value pairs dependend on usecase. Provided by Worker-class (Thread).
-        :param position_update_callback: Callback signal to send new chamber position as dict
-            {'abs_x': float, 'abs_y': float, 'abs_z': float, 'rel_x': float, 'rel_y': float, 'rel_z': float}
-            all key-values optional! Provided by Worker-class (Thread).
-        """
-        update_callback.emit(
-            "Request Jog to X: " + str(x_coor) + " Y: " + str(y_coor) + " Z: " + str(z_coor) + " with " + str(
-                jogspeed) + "[mm/s]")
-        response = chamber.chamber_jog_abs(x=x_coor, y=y_coor, z=z_coor, speed=jogspeed)
-        position_update_callback.emit({'abs_x': x_coor, 'abs_y': y_coor, 'abs_z': z_coor})
+        :return: True if the jog was queued, False otherwise
+        """
+        if self.ui_chamber_control_process is not None:
+            self.gui_mainWindow.prompt_warning(
+                "Another chamber control request is processing at the moment!\nPlease wait until it is finished.",
+                "Too many Requests")
+            return False
+        if self.__num_queued_jogs >= self.__max_queued_jogs:
+            self.gui_mainWindow.prompt_warning(f"{self.__num_queued_jogs} jogs are queued already!\n"
+                                               f"Please wait until the chamber caught up.", "Too many Requests")
+            return False
+        target = self.__get_jog_target()
+        if None in target:
+            self.gui_mainWindow.prompt_warning("Position currently unknown!", "Invalid Live Position")
+            return False
+        check_info = {key: value for key, value in pos_update_info.items() if key.startswith('rel_')}
+        for idx, axis in enumerate(('x', 'y', 'z')):
+            if 'abs_' + axis in pos_update_info:
+                target[idx] = pos_update_info['abs_' + axis]
+                check_info['abs_' + axis] = target[idx]
+            elif 'rel_' + axis in pos_update_info:
+                target[idx] += pos_update_info['rel_' + axis]
+        if self.check_movement_valid(check_info) is False:
+            return False
 
+        if any(key.startswith('abs_') for key in pos_update_info):
+            msg = f"Request Jog to X: {target[0]} Y: {target[1]} Z: {target[2]} with {jogspeed} [mm/s]"
+            jog_future = self.chamber_actor.submit(self.chamber_actor.device.chamber_jog_abs, x=target[0], y=target[1],
+                                                   z=target[2], speed=jogspeed, priority=PRIORITY_JOG)
+            pos_update_info = {'abs_x': target[0], 'abs_y': target[1], 'abs_z': target[2]}
+        else:
+            msg = "Request Jog " + ", ".join(f"{key[-1].upper()} by {value} mm" for key, value in
+                                              pos_update_info.items()) + f" with {jogspeed} mm/s"
+            jog_future = self.chamber_actor.submit(self.chamber_actor.device.chamber_jog_rel,
+                                                   x=pos_update_info.get('rel_x', 0.0),
+                                                   y=pos_update_info.get('rel_y', 0.0),
+                                                   z=pos_update_info.get('rel_z', 0.0), speed=jogspeed,
+                                                   priority=PRIORITY_JOG)
+        self.__num_queued_jogs += 1
+        self.__jog_target = target
+        self.gui_mainWindow.ui_chamber_control_window.append_message2console(msg)
+        self.gui_mainWindow.update_status_bar(msg)
+        self.__on_device_result(jog_future, lambda future: self.__chamber_control_jog_done_handler(future,
+                                                                                                  pos_update_info))
+        return True
+
+    def __chamber_control_jog_done_handler(self, future, pos_update_info: dict):
+        """
+        Updates the live position once a queued jog is done.
+        """
+        self.__num_queued_jogs -= 1
+        if self.__num_queued_jogs == 0:
+            self.__jog_target = None
+        if future.exception() is not None:
+            self.gui_mainWindow.ui_chamber_control_window.append_message2console(
+                f"Jog request failed: {future.exception()}")
+            return
+        self.chamber_control_update_live_position(pos_update_info)
         return
 
     def chamber_control_z_tilt_button_handler(self):
-        if self.ui_chamber_control_process is None:
+        if self.ui_chamber_control_process is None and self.__num_queued_jogs == 0:
             # Assure that Z-sensor is mounted
             if self.__accept_z_tilt_dialog() is False:
                 return
@@ -1042,6 +999,59 @@ class ProcessController:
         self.ui_vna_control_process = None
         return
 
+    def configure_vna_threaded(self, vna_info: dict, result_handler):
+        """
+        Sets up the PNA for a measurement in the vna actor thread, so the GUI does not block on GPIB. The PNA is preset
+        from the .cst file given by 'vna_preset_from_file' or preset and configured by the manual entries of vna_info.
+        Other measurements can not be started meanwhile, see check_if_busy().
+
+        :param vna_info: vna configuration of the UI with 'meas_name'
+        :param result_handler: called in the GUI thread with the completed vna_info or None if the setup failed
+        """
+        self.__vna_configuring = True
+        self.gui_mainWindow.update_status_bar("Configuring VNA...")
+        vna_future = self.vna_actor.submit(self.vna_configure_routine, self.vna_actor.device, dict(vna_info))
+        self.__on_device_result(vna_future, lambda future: self.__vna_configured_handler(future, result_handler))
+        return
+
+    def __vna_configured_handler(self, future, result_handler):
+        self.__vna_configuring = False
+        if future.exception() is not None:
+            self.gui_mainWindow.update_status_bar(f"VNA configuration failed: {future.exception()}")
+            result_handler(None)
+            return
+        self.gui_mainWindow.update_status_bar("VNA configured")
+        result_handler(future.result())
+        return
+
+    def vna_configure_routine(self, vna: E8361RemoteGPIB, vna_info: dict):
+        """
+        Executed by the vna actor, see configure_vna_threaded().
+
+        :return: vna_info completed by the settings of the .cst file, None if the .cst file could not be loaded
+        """
+        if 'vna_preset_from_file' in vna_info:
+            extra_info = vna.pna_preset_from_file(vna_info['vna_preset_from_file'], vna_info['meas_name'])
+            if extra_info is None:
+                return None
+            vna_info['parameter'] = extra_info['parameter']
+            vna_info['freq_start'] = extra_info['freq_start']
+            vna_info['freq_stop'] = extra_info['freq_stop']
+            vna_info['if_bw'] = extra_info['if_bw']
+            vna_info['sweep_num_points'] = extra_info['sweep_num_points']
+            vna_info['output_power'] = extra_info['output_power']
+            vna_info['avg_num'] = extra_info['avg_num']
+            if 'segments' in extra_info:
+                vna_info['segments'] = extra_info['segments']
+        else:
+            vna.pna_preset()   # clean up vna
+            vna.pna_add_measurement_detailed(meas_name=vna_info['meas_name'], parameter=vna_info['parameter'],
+                                             freq_start=vna_info['freq_start'], freq_stop=vna_info['freq_stop'],
+                                             if_bw=vna_info['if_bw'], sweep_num_points=vna_info['sweep_num_points'],
+                                             output_power=vna_info['output_power'], trigger_manual=True,
+                                             average_number=vna_info['avg_num'], segments=vna_info.get('segments'))
+        return vna_info
+
     # **UI_auto_measurement_window Callbacks** ################################################
     def auto_measurement_start_handler(self):
         """
@@ -1095,35 +1105,71 @@ class ProcessController:
                                                "Unknown Zero Position")
             return
 
+        #   Check if region of interest holds points of the mesh
+        if self.check_roi_mask(mesh_info['x_vec'], mesh_info['y_vec'], mesh_info['z_vec'], mesh_info['roi'],
+                               (self.zero_pos_x, self.zero_pos_y, self.zero_pos_z)) is not True:
+            return
+
+        #   Check adaptive refinement settings
+        if mesh_info['adaptive'] is not None and validate_adaptive_config(mesh_info['adaptive']) is not True:
+            self.gui_mainWindow.prompt_warning("Invalid adaptive refinement settings.\nThe coarse step must be an "
+                                               "integer >= 1, tolerances must be > 0 and the point budget empty or "
+                                               "an integer >= 1.", "Invalid mesh configuration")
+            return
+
+        #   Check if continuous scanning is possible with the mesh
+        if mesh_info['continuous'] is not None and (mesh_info['adaptive'] is not None or mesh_info['roi'] is not None
+                                                    or mesh_info['averaging'] is not None
+                                                    or len(mesh_info['x_vec']) < 2):
+            self.gui_mainWindow.prompt_warning("Continuous scanning needs at least 2 steps in X and can not be "
+                                               "combined with adaptive refinement, a region of interest or adaptive "
+                                               "averaging.", "Invalid mesh configuration")
+            return
+
         #   Get vna config info
         vna_info = self.gui_mainWindow.ui_auto_measurement_window.get_vna_configuration()
         vna_info['meas_name'] = 'AutoMeasurement'   # default AutoMeasurement meas_name
 
-        #   Configure vna by .cst file if selected
-        if 'vna_preset_from_file' in vna_info:
-            extra_info = self.vna.pna_preset_from_file(vna_info['vna_preset_from_file'], vna_info['meas_name'])
-            vna_info['parameter'] = extra_info['parameter']
-            vna_info['freq_start'] = extra_info['freq_start']
-            vna_info['freq_stop'] = extra_info['freq_stop']
-            vna_info['if_bw'] = extra_info['if_bw']
-            vna_info['sweep_num_points'] = extra_info['sweep_num_points']
-            vna_info['output_power'] = extra_info['output_power']
-            vna_info['avg_num'] = extra_info['avg_num']
-            self.gui_mainWindow.ui_auto_measurement_window.update_vna_measurement_config_entries(vna_info)
-        else:   # Configure vna by manual input
+        #   Check manual vna input, .cst files are checked by the PNA
+        if 'vna_preset_from_file' not in vna_info:
             # check if at least one S-parameter selected for measurement
             if vna_info['parameter'].__len__() == 0:
                 self.gui_mainWindow.prompt_warning("Please select at least one S-parameter for measurement.",
                                                    "No S-parameter selected")
                 return
+            # check segment table if segment sweep is configured
+            if 'segments' in vna_info:
+                if vna_info['segments'] is None or validate_segments(vna_info['segments']) is not True:
+                    self.gui_mainWindow.prompt_warning("Invalid segment table. Please enter the segments as "
+                                                       "'start:stop:points[:if_bw]' separated by ';' in ascending "
+                                                       "order without overlap.", "Invalid segment table")
+                    return
+                apply_segments(vna_info)
+
+        #   Configure vna by the vna actor, the measurement is started once the PNA is set up
+        self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_start_button.setEnabled(False)
+        self.configure_vna_threaded(vna_info, lambda configured_vna_info: self.__auto_measurement_start_configured(
+            configured_vna_info, mesh_info, generic_file_path, file_type_json_flag, file_type_json_readable))
+        return
+
+    def __auto_measurement_start_configured(self, vna_info: dict, mesh_info: dict, generic_file_path: str,
+                                            file_type_json_flag: bool, file_type_json_readable: bool):
+        """
+        Second part of auto_measurement_start_handler, called once the vna actor has set up the PNA.
+        """
+        self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_start_button.setEnabled(True)
+        if vna_info is None:
+            self.gui_mainWindow.prompt_warning("VNA configuration failed!\n"
+                                               "Please check the .cst file path or the VNA connection and try again.",
+                                               "VNA configuration failed")
+            return
+        if 'vna_preset_from_file' in vna_info:
+            self.vna_preset_info_cache[vna_info['vna_preset_from_file']] = dict(vna_info)
+            self.gui_mainWindow.ui_auto_measurement_window.update_vna_measurement_config_entries(vna_info)
 
-            self.vna.pna_preset()   # clean up vna
-            self.vna.pna_add_measurement_detailed(meas_name=vna_info['meas_name'], parameter=vna_info['parameter'],
-                                                  freq_start=vna_info['freq_start'], freq_stop=vna_info['freq_stop'],
-                                                  if_bw=vna_info['if_bw'],
-                                                  sweep_num_points=vna_info['sweep_num_points'],
-                                                  output_power=vna_info['output_power'], trigger_manual=True,
-                                                  average_number=vna_info['avg_num'])
+        #   Check if adaptive averaging has a maximum number of averages
+        if self.check_adaptive_averaging(mesh_info['averaging'], vna_info) is not True:
+            return
 
         #   Checks done. Start auto measurement configuration & process
         self.gui_mainWindow.disable_chamber_control_window()
@@ -1141,18 +1187,13 @@ class ProcessController:
                                                         zero_position=zero_pos, file_location=generic_file_path,
                                                         move_pattern=mesh_info['move_pattern'],
                                                         file_type_json=file_type_json_flag,
-                                                        file_type_json_readable=file_type_json_readable)
-
-        self.auto_measurement_process.signals.update.connect(
-            self.gui_mainWindow.ui_config_window.append_message2console)
-        self.auto_measurement_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-        self.auto_measurement_process.signals.position_update.connect(self.chamber_control_update_live_position)
-
-        self.auto_measurement_process.signals.progress.connect(
-            self.gui_mainWindow.ui_auto_measurement_window.update_auto_measurement_progress_state)
+                                                        file_type_json_readable=file_type_json_readable,
+                                                        adaptive_config=mesh_info['adaptive'],
+                                                        roi=mesh_info['roi'],
+                                                        continuous_config=mesh_info['continuous'],
+                                                        averaging_config=mesh_info['averaging'])
 
-        self.auto_measurement_process.signals.finished.connect(self.auto_measurement_finished_handler)
+        self.__connect_auto_measurement_process_signals(vna_info, mesh_info['x_vec'], mesh_info['y_vec'], zero_pos)
         # Error handler to be implemented once error messages are more detailed
         # self.auto_measurement_process.signals.error.connect()
 
@@ -1170,26 +1211,114 @@ class ProcessController:
         #   Get vna config info
         vna_info = self.gui_mainWindow.ui_auto_measurement_window.get_vna_configuration()
         vna_info['meas_name'] = 'CheckMeasurement'  # default check-meas_name
+        if 'vna_preset_from_file' not in vna_info or self.__vna_configuring:
+            return
 
-        #   Configure vna by .cst file if selected
-        if 'vna_preset_from_file' in vna_info:
-            extra_info = self.vna.pna_preset_from_file(vna_info['vna_preset_from_file'], vna_info['meas_name'])
-            # error handling
-            if extra_info is None:
-                self.gui_mainWindow.prompt_warning("Invalid .cst file path given!\n"
-                                                   "Please check the path and try again.",
-                                                   "Invalid .cst file path")
-                return
+        #   Configure vna by .cst file, entries are updated once the vna actor has set up the PNA
+        self.gui_mainWindow.ui_auto_measurement_window.vna_config_filepath_check_button.setEnabled(False)
+        self.configure_vna_threaded(vna_info, self.__auto_measurement_vna_config_checked)
+        return
 
-            vna_info['parameter'] = extra_info['parameter']
-            vna_info['freq_start'] = extra_info['freq_start']
-            vna_info['freq_stop'] = extra_info['freq_stop']
-            vna_info['if_bw'] = extra_info['if_bw']
-            vna_info['sweep_num_points'] = extra_info['sweep_num_points']
-            vna_info['output_power'] = extra_info['output_power']
-            vna_info['avg_num'] = extra_info['avg_num']
-            self.gui_mainWindow.ui_auto_measurement_window.update_vna_measurement_config_entries(vna_info)
+    def __auto_measurement_vna_config_checked(self, vna_info: dict):
+        self.gui_mainWindow.ui_auto_measurement_window.vna_config_filepath_check_button.setEnabled(True)
+        if vna_info is None:
+            self.gui_mainWindow.prompt_warning("Invalid .cst file path given!\n"
+                                               "Please check the path and try again.",
+                                               "Invalid .cst file path")
+            return
+        self.vna_preset_info_cache[vna_info['vna_preset_from_file']] = dict(vna_info)
+        self.gui_mainWindow.ui_auto_measurement_window.update_vna_measurement_config_entries(vna_info)
+        return
+
+    def auto_measurement_dry_run_handler(self):
+        """
+        Callback for 'Dry Run' button in ui_auto_measurement_window.
+        Replays the configured measurement through timing models without touching chamber or PNA and prints the
+        expected duration and file size to the console.
+        """
+        if self.zero_pos_x is None or self.zero_pos_y is None or self.zero_pos_z is None:
+            self.gui_mainWindow.prompt_warning("Zero position is not known. Please home all axis and set a "
+                                               "zero position before the dry run.", "Unknown Zero Position")
+            return
+        spec = self.__get_auto_measurement_scan_spec()
+        if spec is None:
+            return
+        self.__run_dry_run(spec)
+        return
+
+    def body_scan_dry_run_handler(self):
+        """
+        Callback for 'Dry Run' button in ui_body_scan_window, see auto_measurement_dry_run_handler.
+        """
+        if self.origin_x is None or self.origin_y is None or self.origin_z is None:
+            self.gui_mainWindow.prompt_warning("Origin not set!\nPlease set origin before the dry run.",
+                                               "Origin not set")
+            return
+        self.__run_dry_run(self.__get_body_scan_scan_spec())
+        return
+
+    def __run_dry_run(self, spec: dict):
+        """
+        Simulates given scan spec and shows the report. The PNA settings of a .cst file are only known once the file
+        was applied in this session, otherwise the manual VNA inputs of the auto measurement tab are assumed.
+        """
+        assumption_note = ""
+        if 'preset_file' in spec['vna_config']:
+            vna_info = self.vna_preset_info_cache.get(spec['vna_config']['preset_file'])
+            if vna_info is None:
+                vna_info = self.gui_mainWindow.ui_auto_measurement_window.get_manual_vna_configuration()
+                assumption_note = ("\n.cst file was not applied in this session yet. PNA settings of the manual VNA "
+                                   "configuration of the Auto Measurement tab are assumed.")
+        else:
+            vna_info = spec['vna_config']
+        if len(vna_info['parameter']) == 0:
+            self.gui_mainWindow.prompt_warning("Please select at least one S-parameter for measurement.",
+                                               "No S-parameter selected")
+            return
 
+        x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+        if check_move_boundary(x_vec, y_vec, z_vec) is not True:
+            assumption_note += "\nWARNING: Configured mesh defines coordinates out of workspace boundaries!"
+        start_position = (self.__x_live, self.__y_live, self.__z_live)
+        report = format_dry_run_report(simulate_scan(spec, vna_info, start_position=start_position)) + assumption_note
+        self.gui_mainWindow.ui_config_window.append_message2console(report)
+        self.gui_mainWindow.prompt_info(report, "Dry Run Result")
+        return
+
+    def __connect_auto_measurement_process_signals(self, vna_info: dict, x_vec, y_vec, zero_pos: tuple):
+        """
+        Connects all signals of the current auto_measurement_process to the GUI and sets up its live view.
+        """
+        # DirectConnection: slots only buffer the message in the emitting thread, log bus flushes to GUI
+        self.auto_measurement_process.signals.update.connect(self.auto_measurement_log_bus.post_info,
+                                                             Qt.ConnectionType.DirectConnection)
+        self.auto_measurement_process.signals.log.connect(self.auto_measurement_log_bus.post,
+                                                          Qt.ConnectionType.DirectConnection)
+
+        self.auto_measurement_process.signals.position_update.connect(self.chamber_control_update_live_position)
+
+        self.auto_measurement_process.signals.progress.connect(
+            self.gui_mainWindow.ui_auto_measurement_window.update_auto_measurement_progress_state)
+
+        self.auto_measurement_process.signals.finished.connect(self.auto_measurement_finished_handler)
+
+        self.gui_mainWindow.ui_auto_measurement_window.configure_live_view(
+            parameters=vna_info['parameter'],
+            f_vec=get_frequency_vector(vna_info),
+            x_vec=np.array(x_vec) - zero_pos[0], y_vec=np.array(y_vec) - zero_pos[1])
+        self.auto_measurement_process.signals.field_update.connect(
+            self.gui_mainWindow.ui_auto_measurement_window.update_live_view)
+        self.auto_measurement_process.signals.timing_summary.connect(self.measurement_timing_summary_handler)
+        return
+
+    def auto_measurement_live_view_selection_handler(self):
+        """
+        Hands parameter and frequency selected for live field view in GUI to running auto measurement thread.
+        """
+        if self.auto_measurement_process is None:
+            return
+        parameter, freq_idx = self.gui_mainWindow.ui_auto_measurement_window.get_live_view_selection()
+        self.auto_measurement_process.set_live_view_selection(parameter, freq_idx)
         return
 
     def auto_measurement_check_move_boundary(self, x_vec: tuple[float], y_vec: tuple[float], z_vec: tuple[float]):
@@ -1205,17 +1334,68 @@ class ProcessController:
             return False
         return True
 
+    def check_roi_mask(self, x_vec: tuple[float], y_vec: tuple[float], z_vec: tuple[float], roi: dict,
+                       reference: tuple[float]):
+        """
+        Checks if the region of interest is valid and holds at least one point of the mesh. Prompts a warning if not.
+        :return: True >> no region of interest or valid // False >> invalid or empty region of interest
+        """
+        if roi is None:
+            return True
+        mask = calc_roi_mask(x_vec, y_vec, z_vec, roi, reference)
+        if mask is None:
+            self.gui_mainWindow.prompt_warning("Invalid region of interest configured.\n"
+                                               "Please check the inputs of the region of interest.",
+                                               "Invalid region of interest")
+            return False
+        if not np.any(mask):
+            self.gui_mainWindow.prompt_warning("No point of the mesh is inside of the region of interest.\n"
+                                               "Please modify mesh config or region of interest.",
+                                               "Empty region of interest")
+            return False
+        return True
+
+    def check_adaptive_averaging(self, averaging_config: dict, vna_info: dict):
+        """
+        Checks if adaptive averaging has a target and more than one average as maximum. Prompts a warning if not.
+        :return: True >> no adaptive averaging or valid // False >> invalid adaptive averaging
+        """
+        if averaging_config is None:
+            return True
+        if averaging_config['target_uncertainty'] <= 0:
+            self.gui_mainWindow.prompt_warning("Adaptive averaging needs a target uncertainty > 0 dB.",
+                                               "Invalid adaptive averaging")
+            return False
+        if vna_info['avg_num'] < 2:
+            self.gui_mainWindow.prompt_warning("Adaptive averaging uses the number of sweeps of the VNA configuration "
+                                               "as maximum.\nPlease enable averaging with more than 1 sweep.",
+                                               "Invalid adaptive averaging")
+            return False
+        return True
+
+    def measurement_timing_summary_handler(self, summary: dict):
+        """
+        Prints mean and p95 duration of each measurement phase per point to the console.
+        Connected to the timing_summary signal of AutoMeasurement and BodyScan threads.
+        """
+        self.gui_mainWindow.ui_config_window.append_message2console(format_timing_summary(summary))
+        return
+
     def auto_measurement_finished_handler(self, finished_info: dict):
         self.auto_measurement_process = None
-        self.gui_mainWindow.prompt_info(
-            info_msg="Auto Measurement process completed.\nData was saved to " + finished_info['file_location'] +
-                     '\nMeasurement took ' + finished_info['duration'] + '.',
-            window_title="Auto Measurement Completed")
+        self.auto_measurement_log_bus.flush()
+        if self.__job_queue_current_job_id is None:     # no blocking prompt while job queue runs unattended
+            self.gui_mainWindow.prompt_info(
+                info_msg="Auto Measurement process completed.\nData was saved to " + finished_info['file_location'] +
+                         '\nMeasurement took ' + finished_info['duration'] + '.',
+                window_title="Auto Measurement Completed")
         self.gui_mainWindow.ui_config_window.append_message2console("Auto Measurement Instance deleted.")
         self.gui_mainWindow.enable_chamber_control_window()
         self.gui_mainWindow.enable_vna_control_window()
         self.gui_mainWindow.enable_body_scan_window()
         self.gui_mainWindow.ui_auto_measurement_window.vna_config_filepath_check_button.setEnabled(True)
+        if self.__job_queue_current_job_id is not None:
+            self.__job_queue_job_finished(finished_info)
 
     def auto_measurement_goZero_button_handler(self):
         """
@@ -1233,32 +1413,16 @@ class ProcessController:
                                             "of AUT", "Zero Position unknown")
             return
 
-        if self.ui_chamber_control_process is None and self.auto_measurement_process is None:
-            jogspeed = float(self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_jogSpeed_lineEdit.text())
-            new_x = self.zero_pos_x
-            new_y = self.zero_pos_y
-            new_z = self.zero_pos_z
-
-            safe_z_move = new_z + 10  # 10mm offset to avoid collision of antennas
-
-            if self.check_movement_valid({'abs_x': new_x, 'abs_y': new_y, 'abs_z': safe_z_move}):
-                self.ui_chamber_control_process = Worker(self.chamber_control_jog_to_abs_coor_routine,
-                                                         self.chamber, new_x, new_y, safe_z_move, jogspeed)
-
-                self.ui_chamber_control_process.signals.update.connect(
-                    self.gui_mainWindow.ui_chamber_control_window.append_message2console)
-                self.ui_chamber_control_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-
-                self.ui_chamber_control_process.signals.position_update.connect(
-                    self.chamber_control_update_live_position)
-
-                self.ui_chamber_control_process.signals.finished.connect(self.chamber_control_thread_finished_handler)
-
-                self.threadpool.start(self.ui_chamber_control_process)
-        else:
+        if self.auto_measurement_process is not None:
             self.gui_mainWindow.prompt_warning(
                 "Another chamber control request or auto measurement process is currently running!\nPlease wait until it is finished.",
                 "Too many Requests")
+            return
+
+        jogspeed = float(self.gui_mainWindow.ui_auto_measurement_window.auto_measurement_jogSpeed_lineEdit.text())
+        safe_z_move = self.zero_pos_z + 10  # 10mm offset to avoid collision of antennas
+        self.chamber_control_queue_jog({'abs_x': self.zero_pos_x, 'abs_y': self.zero_pos_y, 'abs_z': safe_z_move},
+                                       jogspeed)
         return
 
     def auto_measurement_setZero_button_handler(self):
@@ -1366,24 +1530,24 @@ class ProcessController:
         #   Get vna config info
         vna_info = self.gui_mainWindow.ui_body_scan_window.get_vna_configuration()
         vna_info['meas_name'] = 'CheckMeasurement'
+        if self.__vna_configuring:
+            return
 
-        extra_info = self.vna.pna_preset_from_file(vna_info['vna_preset_from_file'], vna_info['meas_name'])
-        # error handling
-        if extra_info is None:
+        #   Configure vna by .cst file, text is updated once the vna actor has set up the PNA
+        self.gui_mainWindow.ui_body_scan_window.vna_config_filepath_check_button.setEnabled(False)
+        self.configure_vna_threaded(vna_info, self.__body_scan_vna_config_checked)
+        return
+
+    def __body_scan_vna_config_checked(self, vna_info: dict):
+        self.gui_mainWindow.ui_body_scan_window.vna_config_filepath_check_button.setEnabled(True)
+        if vna_info is None:
             self.gui_mainWindow.ui_body_scan_window.vna_config_info_textEdit.setText("Invalid .cst file path given!")
             self.gui_mainWindow.ui_body_scan_window.append_message2log("Invalid .cst file path given!")
             self.gui_mainWindow.prompt_warning("Invalid .cst file path given!\n"
                                                "Please check the path and try again.",
                                                "Invalid .cst file path")
             return
-
-        vna_info['parameter'] = extra_info['parameter']
-        vna_info['freq_start'] = extra_info['freq_start']
-        vna_info['freq_stop'] = extra_info['freq_stop']
-        vna_info['if_bw'] = extra_info['if_bw']
-        vna_info['sweep_num_points'] = extra_info['sweep_num_points']
-        vna_info['output_power'] = extra_info['output_power']
-        vna_info['avg_num'] = extra_info['avg_num']
+        self.vna_preset_info_cache[vna_info['vna_preset_from_file']] = dict(vna_info)
         self.gui_mainWindow.ui_body_scan_window.update_vna_measurement_config_textEdit(vna_info)
         return
 
@@ -1432,26 +1596,16 @@ class ProcessController:
                                                "Invalid mesh configuration")
             return
 
-        #   Check if VNA config is valid
-        """ Same procedure as in AutoMeasurement start_handler """
-        vna_info = self.gui_mainWindow.ui_body_scan_window.get_vna_configuration()
-        vna_info['meas_name'] = 'BodyScan'   # default BodyScan meas_name
-        # Configure vna by .cst file if selected
-        extra_info = self.vna.pna_preset_from_file(vna_info['vna_preset_from_file'], vna_info['meas_name'])
-        # error handling
-        if extra_info is None:
-            self.gui_mainWindow.prompt_warning("Invalid .cst file path given!\n"
-                                               "Please check the path and try again.",
-                                               "Invalid .cst file path")
+        #   Check if region of interest holds points of the mesh
+        if self.check_roi_mask(mesh_info['x_vec'], mesh_info['y_vec'], mesh_info['z_vec'], mesh_info['roi'],
+                               (self.origin_x, self.origin_y, self.origin_z)) is not True:
+            return
+
+        #   Check if adaptive settling has a timeout
+        if mesh_info['settling'] is not None and mesh_info['z_move_sleep_time'] <= 0:
+            self.gui_mainWindow.prompt_warning("Adaptive settling uses the sleep time as timeout.\n"
+                                               "Please set a sleep time > 0.", "Invalid mesh configuration")
             return
-        vna_info['parameter'] = extra_info['parameter']
-        vna_info['freq_start'] = extra_info['freq_start']
-        vna_info['freq_stop'] = extra_info['freq_stop']
-        vna_info['if_bw'] = extra_info['if_bw']
-        vna_info['sweep_num_points'] = extra_info['sweep_num_points']
-        vna_info['output_power'] = extra_info['output_power']
-        vna_info['avg_num'] = extra_info['avg_num']
-        self.gui_mainWindow.ui_body_scan_window.update_vna_measurement_config_textEdit(vna_info)
 
         #   Setup results directory
         path_workdirectory = os.path.dirname(os.getcwd())
@@ -1467,22 +1621,43 @@ class ProcessController:
                                                "Duplicate json Filename")
             return
 
+        #   Configure vna by .cst file in the vna actor, the scan is started once the PNA is set up
+        """ Same procedure as in AutoMeasurement start_handler """
+        vna_info = self.gui_mainWindow.ui_body_scan_window.get_vna_configuration()
+        vna_info['meas_name'] = 'BodyScan'   # default BodyScan meas_name
+        self.gui_mainWindow.ui_body_scan_window.body_scan_start_button.setEnabled(False)
+        self.configure_vna_threaded(vna_info, lambda configured_vna_info: self.__body_scan_start_configured(
+            configured_vna_info, mesh_info, new_file_path))
+        return
+
+    def __body_scan_start_configured(self, vna_info: dict, mesh_info: dict, new_file_path: str):
+        """
+        Second part of body_scan_start_button_handler, called once the vna actor has set up the PNA.
+        """
+        self.gui_mainWindow.ui_body_scan_window.body_scan_start_button.setEnabled(True)
+        if vna_info is None:
+            self.gui_mainWindow.prompt_warning("Invalid .cst file path given!\n"
+                                               "Please check the path and try again.",
+                                               "Invalid .cst file path")
+            return
+        self.vna_preset_info_cache[vna_info['vna_preset_from_file']] = dict(vna_info)
+        self.gui_mainWindow.ui_body_scan_window.update_vna_measurement_config_textEdit(vna_info)
+
+        #   Check if adaptive averaging has a maximum number of averages
+        if self.check_adaptive_averaging(mesh_info['averaging'], vna_info) is not True:
+            return
+
         #   initialize BodyScan thread
         self.body_scan_process = BodyScan(chamber=self.chamber, vna=self.vna, vna_info=vna_info,
                                           x_vec=mesh_info['x_vec'], y_vec=mesh_info['y_vec'], z_vec=mesh_info['z_vec'],
                                           mov_speed=mesh_info['jog_speed'],
                                           origin=(self.origin_x, self.origin_y, self.origin_z),
                                           file_location=new_file_path, move_pattern=mesh_info['move_pattern'],
-                                          z_move_sleep_time=mesh_info['z_move_sleep_time'])
+                                          z_move_sleep_time=mesh_info['z_move_sleep_time'], roi=mesh_info['roi'],
+                                          settling_config=mesh_info['settling'],
+                                          averaging_config=mesh_info['averaging'])
 
-        #   connect update signal / position update signal to handlers
-        self.body_scan_process.signals.update.connect(self.gui_mainWindow.ui_body_scan_window.append_message2log)
-        self.body_scan_process.signals.update.connect(self.gui_mainWindow.update_status_bar)
-        self.body_scan_process.signals.position_update.connect(self.chamber_control_update_live_position)
-        self.body_scan_process.signals.progress.connect(self.gui_mainWindow.ui_body_scan_window.update_body_scan_progress_state)
-
-        #   connect finished signal to handler
-        self.body_scan_process.signals.finished.connect(self.body_scan_finished_handler)
+        self.__connect_body_scan_process_signals()
 
         #   disable conflicting functionalities in the GUI
         self.gui_mainWindow.disable_chamber_control_window()
@@ -1494,16 +1669,36 @@ class ProcessController:
         self.threadpool.start(self.body_scan_process)
         return
 
-    def body_scan_finished_handler(self):
+    def __connect_body_scan_process_signals(self):
+        """
+        Connects all signals of the current body_scan_process to the GUI.
+        """
+        #   connect update signal / position update signal to handlers
+        self.body_scan_process.signals.update.connect(self.body_scan_log_bus.post_info,
+                                                      Qt.ConnectionType.DirectConnection)
+        self.body_scan_process.signals.log.connect(self.body_scan_log_bus.post, Qt.ConnectionType.DirectConnection)
+        self.body_scan_process.signals.position_update.connect(self.chamber_control_update_live_position)
+        self.body_scan_process.signals.progress.connect(self.gui_mainWindow.ui_body_scan_window.update_body_scan_progress_state)
+        self.body_scan_process.signals.timing_summary.connect(self.measurement_timing_summary_handler)
+
+        #   connect finished signal to handler
+        self.body_scan_process.signals.finished.connect(self.body_scan_finished_handler)
+        return
+
+    def body_scan_finished_handler(self, finished_info: dict):
         """
         Callback that is called once the body scan process is finished.
         Re-enables all functionalities in the GUI.
         """
+        self.body_scan_process = None
+        self.body_scan_log_bus.flush()
         # re-enable all functionalities previously disabled by start-handler
         self.gui_mainWindow.enable_chamber_control_window()
         self.gui_mainWindow.enable_vna_control_window()
         self.gui_mainWindow.enable_auto_measurement_window()
         self.gui_mainWindow.ui_body_scan_window.enable_inputs()
+        if self.__job_queue_current_job_id is not None:
+            self.__job_queue_job_finished(finished_info)
         return
 
     def body_scan_terminate_thread_handler(self):
@@ -1515,6 +1710,306 @@ class ProcessController:
                 self.body_scan_process.stop()
 
 
+    # **UI_job_queue_window Callbacks** ################################################
+    def job_queue_add_auto_measurement_handler(self):
+        """
+        Callback for 'Add to Queue' button in ui_auto_measurement_window.
+        Stores the current mesh, zero position, VNA configuration and filename of the auto measurement tab as new job.
+        Same checks as in auto_measurement_start_handler, but PNA and chamber are not touched.
+        """
+        if self.zero_pos_x is None or self.zero_pos_y is None or self.zero_pos_z is None:
+            self.gui_mainWindow.prompt_warning("Zero position is not known. Please home all axis and set a "
+                                               "zero position before adding the measurement to the queue.",
+                                               "Unknown Zero Position")
+            return
+        spec = self.__get_auto_measurement_scan_spec()
+        if spec is None:
+            return
+        self.__job_queue_add_job(spec)
+        return
+
+    def job_queue_add_body_scan_handler(self):
+        """
+        Callback for 'Add to Queue' button in ui_body_scan_window.
+        Stores the current mesh, origin, .cst file and filename of the body scan tab as new job.
+        """
+        if self.origin_x is None or self.origin_y is None or self.origin_z is None:
+            self.gui_mainWindow.prompt_warning("Origin not set!\nPlease set origin before adding the measurement to "
+                                               "the queue.", "Origin not set")
+            return
+        self.__job_queue_add_job(self.__get_body_scan_scan_spec())
+        return
+
+    def __get_auto_measurement_scan_spec(self):
+        """
+        Assembles scan spec (see measurement_routines/scan_spec.py) from the inputs of the auto measurement tab.
+
+        :return: spec dict or None if no S-parameter selected
+        """
+        mesh_info = self.gui_mainWindow.ui_auto_measurement_window.get_mesh_cubic_data()
+        vna_info = self.gui_mainWindow.ui_auto_measurement_window.get_vna_configuration()
+        if 'vna_preset_from_file' in vna_info:
+            vna_config = {'preset_file': vna_info['vna_preset_from_file']}
+        else:
+            vna_config = vna_info
+            if len(vna_config['parameter']) == 0:
+                self.gui_mainWindow.prompt_warning("Please select at least one S-parameter for measurement.",
+                                                   "No S-parameter selected")
+                return None
+        spec = {'type': 'auto_measurement',
+                'zero_position': [self.zero_pos_x, self.zero_pos_y, self.zero_pos_z],
+                'mesh': {'x_vec': [float(x) for x in mesh_info['x_vec']],
+                         'y_vec': [float(y) for y in mesh_info['y_vec']],
+                         'z_vec': [float(z) for z in mesh_info['z_vec']]},
+                'move_pattern': mesh_info['move_pattern'],
+                'jog_speed': self.gui_mainWindow.ui_auto_measurement_window.get_auto_measurement_jogspeed(),
+                'vna_config': vna_config,
+                'output_file': os.path.join(os.getcwd(), 'results',
+                                            self.gui_mainWindow.ui_auto_measurement_window.get_new_filename()),
+                'file_type_json_readable': self.gui_mainWindow.ui_auto_measurement_window.get_is_file_json_readable()}
+        if mesh_info['adaptive'] is not None:
+            spec['adaptive'] = mesh_info['adaptive']
+        if mesh_info['roi'] is not None:
+            spec['roi'] = mesh_info['roi']
+        if mesh_info['continuous'] is not None:
+            spec['continuous'] = mesh_info['continuous']
+        if mesh_info['averaging'] is not None:
+            spec['averaging'] = mesh_info['averaging']
+        return spec
+
+    def __get_body_scan_scan_spec(self):
+        """
+        Assembles scan spec (see measurement_routines/scan_spec.py) from the inputs of the body scan tab.
+        """
+        mesh_info = self.gui_mainWindow.ui_body_scan_window.get_mesh_data()
+        vna_info = self.gui_mainWindow.ui_body_scan_window.get_vna_configuration()
+        spec = {'type': 'body_scan',
+                'zero_position': [self.origin_x, self.origin_y, self.origin_z],
+                'mesh': {'x_vec': [float(x) for x in mesh_info['x_vec']],
+                         'y_vec': [float(y) for y in mesh_info['y_vec']],
+                         'z_vec': [float(z) for z in mesh_info['z_vec']],
+                         'z_move_sleep_time': mesh_info['z_move_sleep_time']},
+                'move_pattern': mesh_info['move_pattern'],
+                'jog_speed': mesh_info['jog_speed'],
+                'vna_config': {'preset_file': vna_info['vna_preset_from_file']},
+                'output_file': os.path.join(os.getcwd(), 'results',
+                                            self.gui_mainWindow.ui_body_scan_window.filename_lineEdit.text())}
+        if mesh_info['roi'] is not None:
+            spec['roi'] = mesh_info['roi']
+        if mesh_info['settling'] is not None:
+            spec['settling'] = mesh_info['settling']
+        if mesh_info['averaging'] is not None:
+            spec['averaging'] = mesh_info['averaging']
+        return spec
+
+    def __job_queue_add_job(self, spec: dict):
+        """
+        Checks boundaries and filename of given scan spec and appends it to the job queue.
+        """
+        x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+        if check_move_boundary(x_vec, y_vec, z_vec) is not True:
+            self.gui_mainWindow.prompt_warning("Configured mesh defines coordinates out of workspace "
+                                               "boundaries.\n Please modify mesh config.",
+                                               "Invalid mesh configuration")
+            return
+        if None not in spec['zero_position'] and \
+                self.check_roi_mask(x_vec, y_vec, z_vec, spec.get('roi'), tuple(spec['zero_position'])) is not True:
+            return
+        if os.path.isfile(spec['output_file'] + '.json') or \
+                self.measurement_job_queue.is_output_file_queued(spec['output_file']):
+            self.gui_mainWindow.prompt_warning("A json-measurement file with the given name is already stored or "
+                                               "queued.\nOverride is not permitted. Please change the desired file "
+                                               "name.", "Duplicate json Filename")
+            return
+        job_id = self.measurement_job_queue.add_job(spec)
+        if job_id is None:
+            self.gui_mainWindow.prompt_warning("Invalid measurement configuration, job not added.", "Invalid Job")
+            return
+        self.gui_mainWindow.ui_job_queue_window.update_job_table(self.measurement_job_queue.get_jobs())
+        msg = f"Added job {job_id} '{os.path.basename(spec['output_file'])}' to measurement job queue."
+        self.gui_mainWindow.ui_config_window.append_message2console(msg)
+        self.gui_mainWindow.update_status_bar(msg)
+        return
+
+    def job_queue_start_handler(self):
+        """
+        Callback for 'Start Queue' button. Runs all pending jobs one after another until the queue is empty or stopped.
+        """
+        busy_flag, busy_thread = self.check_if_busy()
+        if busy_flag is True:
+            self.gui_mainWindow.prompt_warning("Please wait until all other processes "
+                                               "finished before starting the job queue.\n"
+                                               "Found Processes:\n" + busy_thread,
+                                               "Busy Thread found")
+            return
+        if self.chamber is None or self.vna is None:
+            self.gui_mainWindow.prompt_warning("Chamber and VNA must be connected to run the job queue!",
+                                               "Devices not available")
+            return
+        if self.measurement_job_queue.get_next_pending_job() is None:
+            self.gui_mainWindow.prompt_info("There are no pending jobs in the queue.", "Job Queue empty")
+            return
+
+        self.job_queue_running = True
+        self.__job_queue_vna_config = None      # PNA might have been changed manually since last queue run
+        self.__job_queue_start_next_job()
+        return
+
+    def job_queue_stop_handler(self):
+        """
+        Callback for 'Stop Queue' button. The running job is finished, no further jobs are started.
+        """
+        self.job_queue_running = False
+        self.gui_mainWindow.ui_job_queue_window.set_queue_running(self.__job_queue_current_job_id is not None,
+                                                                  "Queue stops after current job...")
+        return
+
+    def job_queue_move_up_handler(self):
+        self.__job_queue_move_selected_job(-1)
+
+    def job_queue_move_down_handler(self):
+        self.__job_queue_move_selected_job(1)
+
+    def __job_queue_move_selected_job(self, offset: int):
+        job_id = self.gui_mainWindow.ui_job_queue_window.get_selected_job_id()
+        if job_id is None:
+            return
+        self.measurement_job_queue.move_job(job_id, offset)
+        self.gui_mainWindow.ui_job_queue_window.update_job_table(self.measurement_job_queue.get_jobs())
+        return
+
+    def job_queue_remove_handler(self):
+        job_id = self.gui_mainWindow.ui_job_queue_window.get_selected_job_id()
+        if job_id is None:
+            return
+        if self.measurement_job_queue.remove_job(job_id) is False:
+            self.gui_mainWindow.prompt_warning("Running jobs can not be removed from the queue.\n"
+                                               "Stop the measurement first.", "Job running")
+            return
+        self.gui_mainWindow.ui_job_queue_window.update_job_table(self.measurement_job_queue.get_jobs())
+        return
+
+    def job_queue_clear_finished_handler(self):
+        self.measurement_job_queue.clear_finished_jobs()
+        self.gui_mainWindow.ui_job_queue_window.update_job_table(self.measurement_job_queue.get_jobs())
+        return
+
+    def __job_queue_start_next_job(self):
+        """
+        Starts the next pending job of the queue as AutoMeasurement or BodyScan thread. Jobs that can not be started
+        are marked as failed and skipped, so the queue keeps running unattended.
+        The PNA is only reconfigured if the VNA configuration of the job differs from the previous job. Configurations
+        that were used before in this session are recalled from their PNA state snapshot in one step.
+        """
+        ui_queue = self.gui_mainWindow.ui_job_queue_window
+        while self.job_queue_running:
+            job = self.measurement_job_queue.get_next_pending_job()
+            if job is None:
+                break
+            spec = job['spec']
+            if os.path.isfile(spec['output_file'] + '.json'):
+                self.measurement_job_queue.set_job_status(job['id'], JOB_FAILED, "Measurement file already exists")
+                continue
+            x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+            if check_move_boundary(x_vec, y_vec, z_vec) is not True:
+                self.measurement_job_queue.set_job_status(job['id'], JOB_FAILED, "Mesh out of workspace boundaries")
+                continue
+
+            if spec['vna_config'] != self.__job_queue_vna_config:
+                # the vna actor configures the PNA, the job is started by __job_queue_vna_configured_handler
+                self.gui_mainWindow.ui_config_window.append_message2console(
+                    f"Job queue: configure PNA for job {job['id']}...")
+                self.__vna_configuring = True
+                vna_future = self.vna_actor.submit(configure_vna, self.vna_actor.device, spec['vna_config'],
+                                                   self.__job_queue_meas_name, state_cache=self.__job_queue_vna_states)
+                self.__on_device_result(vna_future, lambda future: self.__job_queue_vna_configured_handler(
+                    future, job['id'], spec['vna_config']))
+                return
+            vna_info = dict(self.__job_queue_vna_info)
+
+            os.makedirs(os.path.dirname(spec['output_file']), exist_ok=True)
+            zero_pos = tuple(spec['zero_position'])
+            if spec['type'] == 'auto_measurement':
+                self.auto_measurement_process = AutoMeasurement(
+                    chamber=self.chamber, vna=self.vna, vna_info=vna_info, x_vec=x_vec, y_vec=y_vec, z_vec=z_vec,
+                    mov_speed=spec['jog_speed'], zero_position=zero_pos, file_location=spec['output_file'],
+                    move_pattern=spec['move_pattern'],
+                    file_type_json_readable=spec.get('file_type_json_readable', True),
+                    adaptive_config=spec.get('adaptive'), roi=spec.get('roi'),
+                    continuous_config=spec.get('continuous'), recovery_config=spec.get('error_recovery'),
+                    averaging_config=spec.get('averaging'))
+                self.__connect_auto_measurement_process_signals(vna_info, x_vec, y_vec, zero_pos)
+                self.gui_mainWindow.disable_chamber_control_window()
+                self.gui_mainWindow.disable_vna_control_window()
+                self.gui_mainWindow.disable_body_scan_window()
+                self.gui_mainWindow.ui_auto_measurement_window.vna_config_filepath_check_button.setEnabled(False)
+                new_process = self.auto_measurement_process
+            else:
+                self.body_scan_process = BodyScan(
+                    chamber=self.chamber, vna=self.vna, vna_info=vna_info, x_vec=x_vec, y_vec=y_vec, z_vec=z_vec,
+                    mov_speed=spec['jog_speed'], origin=zero_pos, file_location=spec['output_file'],
+                    move_pattern=spec['move_pattern'], z_move_sleep_time=spec['mesh'].get('z_move_sleep_time', 0.0),
+                    roi=spec.get('roi'), settling_config=spec.get('settling'),
+                    recovery_config=spec.get('error_recovery'), averaging_config=spec.get('averaging'))
+                self.__connect_body_scan_process_signals()
+                self.gui_mainWindow.disable_chamber_control_window()
+                self.gui_mainWindow.disable_vna_control_window()
+                self.gui_mainWindow.disable_auto_measurement_window()
+                self.gui_mainWindow.ui_body_scan_window.disable_inputs()
+                new_process = self.body_scan_process
+
+            self.__job_queue_current_job_id = job['id']
+            self.measurement_job_queue.set_job_status(job['id'], JOB_RUNNING)
+            ui_queue.update_job_table(self.measurement_job_queue.get_jobs())
+            ui_queue.set_queue_running(True, f"Running job {job['id']}...")
+            self.gui_mainWindow.ui_config_window.append_message2console(
+                f"Job queue: started job {job['id']} '{os.path.basename(spec['output_file'])}'.")
+            self.threadpool.start(new_process)
+            return
+
+        # no job started >> queue finished or stopped
+        self.job_queue_running = False
+        ui_queue.update_job_table(self.measurement_job_queue.get_jobs())
+        ui_queue.set_queue_running(False, "Queue idle")
+        self.gui_mainWindow.ui_config_window.append_message2console("Job queue: no further jobs started.")
+        return
+
+    def __job_queue_vna_configured_handler(self, future, job_id: int, vna_config: dict):
+        """
+        Stores the PNA configuration of the job once the vna actor is done and continues the queue, which starts the
+        job now or marks it as failed.
+        """
+        self.__vna_configuring = False
+        vna_info = future.result() if future.exception() is None else None
+        if vna_info is None:
+            self.__job_queue_vna_config = None
+            self.measurement_job_queue.set_job_status(job_id, JOB_FAILED, "PNA configuration failed")
+        else:
+            self.__job_queue_vna_config = vna_config
+            self.__job_queue_vna_info = vna_info
+            if 'preset_file' in vna_config:
+                self.vna_preset_info_cache[vna_config['preset_file']] = dict(vna_info)
+        self.__job_queue_start_next_job()
+        return
+
+    def __job_queue_job_finished(self, finished_info: dict):
+        """
+        Called by the finished handlers of AutoMeasurement/BodyScan for jobs of the queue.
+        Stores the result of the job and starts the next one. A job stopped by the user also stops the queue, a job
+        that stopped itself (e.g. retry budget exhausted) failed and the queue goes on.
+        """
+        job_id = self.__job_queue_current_job_id
+        self.__job_queue_current_job_id = None
+        if finished_info.get('stop_reason') is not None:
+            self.measurement_job_queue.set_job_status(job_id, JOB_FAILED, finished_info['stop_reason'])
+        elif finished_info.get('stopped', False):
+            self.measurement_job_queue.set_job_status(job_id, JOB_STOPPED, "Stopped by user")
+            self.job_queue_running = False
+        else:
+            self.measurement_job_queue.set_job_status(job_id, JOB_DONE, f"Took {finished_info['duration']}")
+        self.__job_queue_start_next_job()
+        return
+
     # **UI_display_measurement_window Callbacks** ################################################
     def display_measurement_refresh_file_dropdown(self):
         """
@@ -1562,10 +2057,9 @@ class ProcessController:
             self.read_in_measurement_data_buffer = json.load(json_file)
 
         # add additional vector data to dict for coherent dataflow from processcontroller to sub-methods/windows
-        self.read_in_measurement_data_buffer['f_vec'] = np.linspace(
-            start=self.read_in_measurement_data_buffer['measurement_config']['freq_start'],
-            stop=self.read_in_measurement_data_buffer['measurement_config']['freq_stop'],
-            num=self.read_in_measurement_data_buffer['measurement_config']['sweep_num_points'])
+        # frequency axis is non-uniform for segment sweeps, see measurement_routines/segment_sweep.py
+        self.read_in_measurement_data_buffer['f_vec'] = get_frequency_vector(
+            self.read_in_measurement_data_buffer['measurement_config'])
         self.read_in_measurement_data_buffer['x_vec'] = np.linspace(
             start=self.read_in_measurement_data_buffer['measurement_config']['mesh_x_min'],
             stop=self.read_in_measurement_data_buffer['measurement_config']['mesh_x_max'],
@@ -1609,26 +2103,35 @@ class ProcessController:
 
         value_list = self.read_in_measurement_data_buffer['data']
         list_idx = 0
-        # value_list setup like [ [x0, y0, z0, f0, s11amp0, s11phase0, s12amp0, s12phase0, s22amp0, s22phase0], ...] runs through 1. frequency, 2. x-coor, 3. y-coor, 4. z-coor
-        # NOTE: This loop is the reason why the data must be sorted in that list by x > y > z
-        for z_idx in range(self.read_in_measurement_data_buffer['z_vec'].__len__()):
-            for y_idx in range(self.read_in_measurement_data_buffer['y_vec'].__len__()):
-                for x_idx in range(self.read_in_measurement_data_buffer['x_vec'].__len__()):
-                    for f_idx in range(self.read_in_measurement_data_buffer['f_vec'].__len__()):
-                        # For each list entry write all S parameter values to array in one go (this inner loop)
-                        parameter_idx = 0
-                        if s11_idx is not None:
-                            data_array[0, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s11_idx[0]]     # amplitude
-                            data_array[1, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s11_idx[1]]     # phase
-                            parameter_idx += 1
-                        if s12_idx is not None:
-                            data_array[0, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s12_idx[0]]
-                            data_array[1, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s12_idx[1]]
-                            parameter_idx += 1
-                        if s22_idx is not None:
-                            data_array[0, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s22_idx[0]]
-                            data_array[1, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s22_idx[1]]
-                        list_idx += 1
+        if self.read_in_measurement_data_buffer['measurement_config'].get('data_format') == 'continuous':
+            # continuous measurement lists the raw sweeps, resample them onto the mesh first
+            value_list = resample_continuous_data(self.read_in_measurement_data_buffer['measurement_config'],
+                                                  value_list)
+        if self.read_in_measurement_data_buffer['measurement_config'].get('data_format') == 'point_list':
+            # adaptive measurement lists the measured points only, all other points of the mesh are interpolated
+            data_array = read_point_list_data_array(self.read_in_measurement_data_buffer['measurement_config'],
+                                                    value_list)
+        else:
+            # value_list setup like [ [x0, y0, z0, f0, s11amp0, s11phase0, s12amp0, s12phase0, s22amp0, s22phase0], ...] runs through 1. frequency, 2. x-coor, 3. y-coor, 4. z-coor
+            # NOTE: This loop is the reason why the data must be sorted in that list by x > y > z
+            for z_idx in range(self.read_in_measurement_data_buffer['z_vec'].__len__()):
+                for y_idx in range(self.read_in_measurement_data_buffer['y_vec'].__len__()):
+                    for x_idx in range(self.read_in_measurement_data_buffer['x_vec'].__len__()):
+                        for f_idx in range(self.read_in_measurement_data_buffer['f_vec'].__len__()):
+                            # For each list entry write all S parameter values to array in one go (this inner loop)
+                            parameter_idx = 0
+                            if s11_idx is not None:
+                                data_array[0, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s11_idx[0]]     # amplitude
+                                data_array[1, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s11_idx[1]]     # phase
+                                parameter_idx += 1
+                            if s12_idx is not None:
+                                data_array[0, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s12_idx[0]]
+                                data_array[1, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s12_idx[1]]
+                                parameter_idx += 1
+                            if s22_idx is not None:
+                                data_array[0, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s22_idx[0]]
+                                data_array[1, parameter_idx, f_idx, x_idx, y_idx, z_idx] = value_list[list_idx][s22_idx[1]]
+                            list_idx += 1
 
 
 
@@ -1672,6 +2175,8 @@ class ProcessController:
                                                                                yz_phase_plane_data_from_array)
         self.gui_mainWindow.ui_display_measurement_window.update_xy_plane_plot(xy_amplitude_plane_data_from_array,
                                                                                xy_phase_plane_data_from_array)
+        self.gui_mainWindow.ui_display_measurement_window.reset_volume_plot()
+        self.display_measurement_update_volume_callback()
 
         self.gui_mainWindow.ui_display_measurement_window.enable_plot_interactions()
 
@@ -1747,6 +2252,30 @@ class ProcessController:
         self.gui_mainWindow.ui_display_measurement_window.update_xy_plane_plot(plane_amp_data, plane_phase_data)
         return
 
+    def display_measurement_update_volume_callback(self):
+        """
+        Reads all information from gui and sends volume-data of selected parameter and frequency to 3D view in Gui.
+        Must be connected to adequate signals.
+        """
+        if self.read_in_measurement_data_buffer is None:
+            return
+        if self.gui_mainWindow.ui_display_measurement_window.get_volume_display_enabled() is False:
+            self.gui_mainWindow.ui_display_measurement_window.update_volume_plot(None, None)
+            return
+        amplitude_select = 0
+        phase_select = 1
+        cur_parameter = self.gui_mainWindow.ui_display_measurement_window.get_selected_parameter()
+        parameter_idx = self.read_in_measurement_data_buffer['measurement_config']['parameter'].index(cur_parameter)
+        cur_freq_idx = self.gui_mainWindow.ui_display_measurement_window.get_selected_frequency_by_idx()
+
+        volume_amp_data = self.read_in_measurement_data_buffer['data_array'][amplitude_select, parameter_idx,
+                          cur_freq_idx, :, :, :]
+        volume_phase_data = self.read_in_measurement_data_buffer['data_array'][phase_select, parameter_idx,
+                            cur_freq_idx, :, :, :]
+
+        self.gui_mainWindow.ui_display_measurement_window.update_volume_plot(volume_amp_data, volume_phase_data)
+        return
+
     def display_measurement_update_coordinate_lineEdits(self):
         """
         Updates all values of lineEdits next to XYZ sliders
@@ -0,0 +1,328 @@
+"""
+Parallel acquisition on several rigs (chamber / VNA pairs) from one process without the userinterface.
+
+Each rig is a RigSession with its own chamber and VNA connection, its own worker thread and its own PNA state cache,
+so the rigs never wait for each other. All rigs take their jobs from one shared MeasurementJobQueue (see
+measurement_routines/job_queue.py), which is the index of all results: every job names the rig that ran it, its
+status, timestamps and output file. Jobs with a 'rig' entry in their scan spec only run on that rig, all other jobs are
+taken by the next free rig. The rigs stay busy as long as jobs are left, so the throughput scales with the number of
+rigs. Progress is printed per rig, the lines are prefixed with the rig name.
+
+Usage (from PythonChamberApp directory):
+    python rig_orchestrator.py <rigs.json> <scan_spec.json> [<scan_spec.json> ...] [--queue <file.json>] [--verbose]
+
+Rigs file (json-file):
+{
+    "rigs": {
+        "<rig name>":   {"chamber": {...}, "vna": {...}}, connection entries see headless_runner.py
+        ...
+    }
+}
+Scan specs (json-files): see doc-string of measurement_routines/scan_spec.py, connection entries are not needed.
+The zero position / origin of scan specs without 'rig' must be valid on every rig.
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+
+from chamber_net_interface import ChamberNetworkCommands
+from vna_net_interface import E8361RemoteGPIB
+from measurement_routines import MeasurementJobQueue, validate_scan_spec
+from measurement_routines.job_queue import JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_STOPPED
+from headless_runner import ConsolePrinter, connect_devices, prepare_output_file, build_routine, connect_printer
+
+WORKER_JOIN_INTERVAL = 0.5  # unit [s], main thread checks the workers periodically to stay responsive to Ctrl+C
+
+
+class RigSession:
+    """
+    One chamber / VNA pair with its own worker thread. The worker runs the jobs the orchestrator hands to the rig until
+    no job is left for it or the session is stopped.
+
+    :param name: unique name of the rig, used in the job queue and as prefix of the console output
+    :param connection: dict with the 'chamber' and 'vna' connection entries, see headless_runner.py
+    """
+    name: str = None
+    connection: dict = None
+    chamber: ChamberNetworkCommands = None
+    vna: E8361RemoteGPIB = None
+    verbose: bool = False
+    state_cache: dict = None    # PNA state cache of configure_vna(), jobs with the same VNA config skip the setup
+    routine = None      # measurement routine of the running job, None between jobs
+    job_id: int = None  # id of the running job, None between jobs
+    progress: dict = None   # last progress dict of the running job
+    num_jobs_done: int = 0
+    __thread: threading.Thread = None
+    __is_running: bool = False
+
+    def __init__(self, name: str, connection: dict, verbose: bool = False):
+        self.name = name
+        self.connection = connection
+        self.verbose = verbose
+        self.state_cache = {}
+        self.progress = {}
+        self.num_jobs_done = 0
+
+    def connect(self):
+        """
+        :return: True if chamber and VNA are connected, False otherwise
+        """
+        devices = connect_devices(self.connection)
+        if devices is None:
+            print(f"Error - Rig '{self.name}' not available.")
+            return False
+        self.chamber, self.vna = devices
+        return True
+
+    def disconnect(self):
+        if self.vna is not None:
+            self.vna.disconnect_pna()
+        return
+
+    def start(self, orchestrator):
+        """
+        Starts the worker thread that takes the jobs of the rig from the orchestrator.
+        """
+        self.__is_running = True
+        self.__thread = threading.Thread(target=self.__work, args=(orchestrator,), name=f"rig-{self.name}",
+                                         daemon=True)
+        self.__thread.start()
+        return
+
+    def stop(self):
+        """
+        Stops the running job at the next possible point. No further jobs are taken.
+        """
+        self.__is_running = False
+        routine = self.routine
+        if routine is not None:
+            routine.stop()
+        return
+
+    def join(self, timeout: float = None):
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+        return
+
+    def is_alive(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def run_job(self, job: dict) -> tuple:
+        """
+        Configures the VNA and runs the scan of the job on this rig.
+
+        :return: tuple (job status, message)
+        """
+        spec = job['spec']
+        output_file = prepare_output_file(spec)
+        if output_file is None:
+            return JOB_FAILED, "Mesh out of workspace or output file exists"
+        routine = build_routine(spec, self.chamber, self.vna, output_file, self.state_cache)
+        if routine is None:
+            return JOB_FAILED, "VNA configuration failed"
+
+        printer = ConsolePrinter(verbose=self.verbose, prefix=f"[{self.name}] ")
+        connect_printer(routine, printer)
+        routine.signals.progress.connect(self.__store_progress)
+        self.routine = routine
+        self.job_id = job['id']
+        try:
+            routine.run()
+        finally:
+            self.routine = None
+            self.job_id = None
+        if printer.stop_reason is not None:
+            return JOB_FAILED, printer.stop_reason
+        if printer.stopped:
+            return JOB_STOPPED, "Stopped"
+        return JOB_DONE, ''
+
+    def __store_progress(self, progress: dict):
+        self.progress = dict(progress)
+        return
+
+    def __work(self, orchestrator):
+        while self.__is_running:
+            job = orchestrator.take_next_job(self.name)
+            if job is None:
+                break
+            try:
+                status, message = self.run_job(job)
+            except Exception as e:
+                status, message = JOB_FAILED, f"{type(e).__name__}: {e}"
+            if status == JOB_DONE:
+                self.num_jobs_done += 1
+            print(f"[{self.name}] Job {job['id']} {status}. {message}", flush=True)
+            orchestrator.finish_job(job['id'], status, message)
+        return
+
+
+class RigOrchestrator:
+    """
+    Runs the jobs of one shared MeasurementJobQueue on several RigSessions in parallel, see module doc-string.
+
+    :param queue_file: json file of the shared job queue, loaded if it exists
+    """
+    job_queue: MeasurementJobQueue = None
+    rigs: dict = None   # {name: RigSession}
+    __lock: threading.Lock = None   # guards the job queue, which is shared by the worker threads
+
+    def __init__(self, queue_file: str):
+        self.job_queue = MeasurementJobQueue(queue_file)
+        self.rigs = {}
+        self.__lock = threading.Lock()
+
+    def add_rig(self, name: str, connection: dict, verbose: bool = False) -> RigSession:
+        """
+        Adds a rig. It is connected and started by start().
+        """
+        self.rigs[name] = RigSession(name, connection, verbose)
+        return self.rigs[name]
+
+    def submit(self, spec: dict):
+        """
+        Appends the scan spec as pending job to the shared queue.
+
+        :return: id of the new job or None if spec is invalid, the rig is unknown or the output file is already queued
+        """
+        if spec.get('rig') is not None and spec['rig'] not in self.rigs:
+            print(f"Error - scan spec names unknown rig '{spec['rig']}'!")
+            return None
+        with self.__lock:
+            if self.job_queue.is_output_file_queued(spec['output_file']):
+                print(f"Error - a queued job already writes to {spec['output_file']}!")
+                return None
+            return self.job_queue.add_job(spec)
+
+    def take_next_job(self, rig_name: str):
+        """
+        Hands the next pending job for the rig to its worker and marks it running. The rig is stored in the spec of the
+        job, so the queue file tells which rig measured which file.
+
+        :return: copy of the job dict or None if no job is left for the rig
+        """
+        with self.__lock:
+            job = self.job_queue.get_next_pending_job(rig_name)
+            if job is None:
+                return None
+            job['spec']['rig'] = rig_name
+            self.job_queue.set_job_status(job['id'], JOB_RUNNING)
+            return json.loads(json.dumps(job))
+
+    def finish_job(self, job_id: int, status: str, message: str = ''):
+        with self.__lock:
+            self.job_queue.set_job_status(job_id, status, message)
+        return
+
+    def start(self):
+        """
+        Connects all rigs in parallel and starts the workers of the connected rigs.
+
+        :return: number of started rigs
+        """
+        connected = {}
+        threads = [threading.Thread(target=lambda rig=rig: connected.__setitem__(rig.name, rig.connect()))
+                   for rig in self.rigs.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        num_started = 0
+        for rig in self.rigs.values():
+            if connected.get(rig.name):
+                rig.start(self)
+                num_started += 1
+        return num_started
+
+    def wait(self):
+        """
+        Blocks until all workers are finished and disconnects the rigs.
+        """
+        while any(rig.is_alive() for rig in self.rigs.values()):
+            for rig in self.rigs.values():
+                rig.join(WORKER_JOIN_INTERVAL)
+        for rig in self.rigs.values():
+            rig.disconnect()
+        return
+
+    def stop(self):
+        """
+        Stops the running jobs of all rigs at the next possible point. Pending jobs stay in the queue.
+        """
+        for rig in self.rigs.values():
+            rig.stop()
+        return
+
+    def get_status(self) -> dict:
+        """
+        :return: dict {rig name: {'job_id': int or None, 'progress': dict, 'num_jobs_done': int, 'running': bool}}
+        """
+        return {name: {'job_id': rig.job_id, 'progress': rig.progress, 'num_jobs_done': rig.num_jobs_done,
+                       'running': rig.is_alive()}
+                for name, rig in self.rigs.items()}
+
+
+def load_json(file_path: str):
+    """
+    :return: content of the json file or None if the file could not be read
+    """
+    try:
+        with open(file_path, 'r') as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error - {file_path} could not be read: {e}")
+        return None
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Run scans on several rigs in parallel without the userinterface.")
+    parser.add_argument('rigs', help="path to rigs json-file, see rig_orchestrator.py doc-string")
+    parser.add_argument('scan_specs', nargs='*', help="paths to scan spec json-files, appended to the queue")
+    parser.add_argument('--queue', default='rig_job_queue.json', help="json file of the shared job queue")
+    parser.add_argument('--verbose', action='store_true', help="print per-point messages and timing summaries")
+    args = parser.parse_args(argv)
+
+    rigs = load_json(args.rigs)
+    if rigs is None:
+        return 1
+    if len(rigs.get('rigs', {})) == 0:
+        print("Error - rigs file names no rig!")
+        return 1
+    orchestrator = RigOrchestrator(args.queue)
+    for name, connection in rigs['rigs'].items():
+        if 'chamber' not in connection or 'vna' not in connection:
+            print(f"Error - rig '{name}' misses 'chamber' or 'vna' connection entries!")
+            return 1
+        orchestrator.add_rig(name, connection, verbose=args.verbose)
+
+    job_ids = []
+    for file_path in args.scan_specs:
+        spec = load_json(file_path)
+        if spec is None or validate_scan_spec(spec) is not True:
+            return 1
+        job_id = orchestrator.submit(spec)
+        if job_id is None:
+            return 1
+        job_ids.append(job_id)
+        print(f"Job {job_id}: {file_path}")
+
+    if orchestrator.start() == 0:
+        print("Error - No rig available.")
+        return 1
+    # Ctrl+C stops the running scans at the next point, so their measurement files are still written
+    signal.signal(signal.SIGINT, lambda signum, frame: orchestrator.stop())
+    orchestrator.wait()
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    jobs = [orchestrator.job_queue.get_job(job_id) for job_id in job_ids]
+    for job in jobs:
+        print(f"Job {job['id']} [{job['spec'].get('rig', '-')}] {job['status']}: {job['spec']['output_file']}")
+    if any(job['status'] != JOB_DONE for job in jobs):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -148,69 +148,196 @@ class VisualizerPyqtGraph:
         new_scatter_mesh = gl.GLScatterPlotItem()
         color = (0.5,1,0,1)
         size = 3
-        point_list = []
-        for z in z_vec:
-            for y in y_vec:
-                for x in x_vec:
-                    point_list.append([x, y, z])
-        data = np.array(point_list)
+        data = VisualizerPyqtGraph.generate_point_list(x_vec, y_vec, z_vec)
         new_scatter_mesh.setData(pos=data, color=color, size=size)
         return new_scatter_mesh
 
-
-
     @staticmethod
     def generate_point_list(x_vec: tuple[float, ...], y_vec: tuple[float, ...], z_vec: tuple[float, ...]):
         """
         This function generates, given the outside vectors in x,y,z, a point list for a cubic mesh with all possible
-        points
+        points. Points are ordered z > y > x, so x runs fastest.
 
         :param x_vec: vector of x coordinates
         :param y_vec: vectors of y coordinates
         :param z_vec: vectors of z coordinates
-        :return: list of points as 3d vectors e.g. list: [ [x1, y1, z1],[x2, y1, z1],... ]
+        :return: np.ndarray of shape (N, 3) with points as 3d vectors e.g. [ [x1, y1, z1],[x2, y1, z1],... ]
         """
-        point_list = []
-        for z in z_vec:
-            for y in y_vec:
-                for x in x_vec:
-                    point_list.append([x, y, z])
-        return point_list
+        z_grid, y_grid, x_grid = np.meshgrid(np.asarray(z_vec, dtype=float), np.asarray(y_vec, dtype=float),
+                                             np.asarray(x_vec, dtype=float), indexing='ij')
+        return np.column_stack((x_grid.ravel(), y_grid.ravel(), z_grid.ravel()))
 
     @staticmethod
-    def generate_outline_point_list(x_vec: tuple[float, ...], y_vec: tuple[float, ...], z_vec: tuple[float, ...]):
+    def decimate_vector(vec: tuple[float, ...], stride: int):
+        """
+        Returns every stride-th entry of vec. The last entry is always kept, so the decimated vector spans the same
+        range as the original one.
         """
-        This function generates an alternative reduced point list when a mesh should be displayed that is too dense /
-        would consume too much memory
+        vec = np.asarray(vec, dtype=float)
+        if stride <= 1 or len(vec) <= 2:
+            return vec
+        idx = np.arange(0, len(vec), stride)
+        if idx[-1] != len(vec) - 1:
+            idx = np.append(idx, len(vec) - 1)
+        return vec[idx]
 
-        :param x_vec: vector of x coordinates
-        :param y_vec: vectors of y coordinates
-        :param z_vec: vectors of z coordinates
-        :return: list of points as 3d vectors that shows the outline of the describes volume
+    @staticmethod
+    def calc_lod_stride(axis_lengths: tuple[int, ...], max_points: int):
+        """
+        Calculates the smallest common stride for all axes so that the grid decimated by decimate_vector() holds at
+        most max_points points.
+
+        :param axis_lengths: number of points along each axis
+        :param max_points: upper bound of points in decimated grid
+        :return: stride as int, 1 if no decimation is necessary
+        """
+        def num_points(stride: int):
+            count = 1
+            for n in axis_lengths:
+                count *= n if n <= 2 else int(np.ceil((n - 1) / stride)) + 1
+            return count
+
+        if num_points(1) <= max_points:
+            return 1
+        stride = max(int((num_points(1) / max_points) ** (1 / len(axis_lengths))), 2)
+        while num_points(stride) > max_points and stride < max(axis_lengths):
+            stride += 1
+        return stride
+
+    @staticmethod
+    def generate_lod_point_list(x_vec: tuple[float, ...], y_vec: tuple[float, ...], z_vec: tuple[float, ...],
+                                max_points: int = 125000):
+        """
+        Level-of-detail version of generate_point_list(). If the mesh holds more than max_points points, every n-th
+        point along each axis is kept (stride decimation, borders always kept) so that display stays fluent for
+        dense meshes. Use together with generate_3d_bounding_box_vertices() to show the exact mesh extent.
+
+        :return: (np.ndarray of shape (N, 3), stride)
+        """
+        stride = VisualizerPyqtGraph.calc_lod_stride((len(x_vec), len(y_vec), len(z_vec)), max_points)
+        point_list = VisualizerPyqtGraph.generate_point_list(VisualizerPyqtGraph.decimate_vector(x_vec, stride),
+                                                             VisualizerPyqtGraph.decimate_vector(y_vec, stride),
+                                                             VisualizerPyqtGraph.decimate_vector(z_vec, stride))
+        return point_list, stride
+
+    @staticmethod
+    def generate_2d_lod_point_list(a_vec: tuple[float, ...], b_vec: tuple[float, ...], max_points: int = 20000):
+        """
+        Generates all points [a, b] of the 2D grid spanned by a_vec and b_vec, decimated by a common stride if the grid
+        holds more than max_points points. Used for 2D mesh previews (XY/XZ plane).
+
+        :return: np.ndarray of shape (N, 2)
         """
-        point_list = []
-        new_x_vec = np.linspace(x_vec[0], x_vec[-1], 30)
-        new_y_vec = np.linspace(y_vec[0], y_vec[-1], 30)
-        new_z_vec = np.linspace(z_vec[0], z_vec[-1], 30)
+        stride = VisualizerPyqtGraph.calc_lod_stride((len(a_vec), len(b_vec)), max_points)
+        a_grid, b_grid = np.meshgrid(VisualizerPyqtGraph.decimate_vector(a_vec, stride),
+                                     VisualizerPyqtGraph.decimate_vector(b_vec, stride), indexing='ij')
+        return np.column_stack((a_grid.ravel(), b_grid.ravel()))
 
-        for x in new_x_vec:
-            point_list.append([x, new_y_vec[0], new_z_vec[0]])
-            point_list.append([x, new_y_vec[-1], new_z_vec[0]])
-            point_list.append([x, new_y_vec[-1], new_z_vec[-1]])
-            point_list.append([x, new_y_vec[0], new_z_vec[-1]])
+    @staticmethod
+    def generate_3d_bounding_box_vertices(x_vec: tuple[float, ...], y_vec: tuple[float, ...],
+                                          z_vec: tuple[float, ...]):
+        """
+        Generates vertices of the 12 edges of the box that encloses the mesh described by x,y,z vectors.
+        Vertices are ordered pairwise, so they must be displayed by opengl.GLLinePlotItem with mode='lines'.
+
+        :return: np.ndarray of shape (24, 3)
+        """
+        x0, x1 = float(np.min(x_vec)), float(np.max(x_vec))
+        y0, y1 = float(np.min(y_vec)), float(np.max(y_vec))
+        z0, z1 = float(np.min(z_vec)), float(np.max(z_vec))
+        corners = np.array([[x0, y0, z0], [x1, y0, z0], [x1, y1, z0], [x0, y1, z0],
+                            [x0, y0, z1], [x1, y0, z1], [x1, y1, z1], [x0, y1, z1]])
+        edges = np.array([[0, 1], [1, 2], [2, 3], [3, 0],   # bottom rectangle
+                          [4, 5], [5, 6], [6, 7], [7, 4],   # top rectangle
+                          [0, 4], [1, 5], [2, 6], [3, 7]])  # vertical lines
+        return corners[edges.ravel()]
+
+    @staticmethod
+    def downsample_volume(volume: np.ndarray, max_voxels: int = 96**3):
+        """
+        Decimates a 3D array by a common integer stride along all axes until it holds at most max_voxels entries.
+        Used to keep texture size and GPU upload time of volume renderings bounded for very dense measurements.
+
+        :param volume: 3D array indexed [x, y, z]
+        :param max_voxels: upper bound for number of voxels in returned array
+        :return: (decimated volume, stride) with stride = 1 if no decimation was necessary
+        """
+        stride = 1
+        if volume.size > max_voxels:
+            stride = int(np.ceil((volume.size / max_voxels) ** (1 / 3)))
+            # cbrt estimate may be short by one when axes are unevenly long, so verify
+            while np.prod([np.ceil(n / stride) for n in volume.shape]) > max_voxels:
+                stride += 1
+        return volume[::stride, ::stride, ::stride], stride
+
+    @staticmethod
+    def generate_3d_volume_rgba(values: np.ndarray, cmap_name: str = 'Spectral_r', alpha_values: np.ndarray = None,
+                                alpha_max: int = 60):
+        """
+        Converts a 3D array of scalar values into a RGBA-uint8 texture that can be handed to opengl.GLVolumeItem.
+        Values are normalized to their own min/max range and colored by the given matplotlib colormap.
+        Opacity of each voxel scales with alpha_values (normalized the same way) or the values themselves if not given,
+        so that weak fields stay transparent and do not hide the strong ones.
 
-        for y in new_y_vec:
-            point_list.append([new_x_vec[0], y, new_z_vec[0]])
-            point_list.append([new_x_vec[-1], y, new_z_vec[0]])
-            point_list.append([new_x_vec[-1], y, new_z_vec[-1]])
-            point_list.append([new_x_vec[0], y, new_z_vec[-1]])
+        :param values: 3D array indexed [x, y, z]
+        :param cmap_name: name of matplotlib colormap, e.g. 'Spectral_r' for amplitude or 'hsv' for phase
+        :param alpha_values: optional 3D array with same shape as values to weight opacity
+        :param alpha_max: opacity of strongest voxel [0..255]
+        :return: np.ndarray of shape values.shape + (4,), dtype uint8
+        """
+        def normalize(arr: np.ndarray):
+            arr = np.nan_to_num(np.asarray(arr, dtype=np.float32), nan=0.0, posinf=0.0, neginf=0.0)
+            arr_min = arr.min()
+            arr_span = arr.max() - arr_min
+            if arr_span == 0:
+                return np.zeros(arr.shape, dtype=np.float32)
+            return (arr - arr_min) / arr_span
 
-        for z in new_z_vec:
-            point_list.append([new_x_vec[0], new_y_vec[0], z])
-            point_list.append([new_x_vec[-1], new_y_vec[0], z])
-            point_list.append([new_x_vec[-1], new_y_vec[-1], z])
-            point_list.append([new_x_vec[0], new_y_vec[-1], z])
+        norm_values = normalize(values)
+        cmap = pg.colormap.get(cmap_name, source='matplotlib')
+        lut = cmap.getLookupTable(nPts=256, alpha=False)
+        rgba = np.empty(values.shape + (4,), dtype=np.ubyte)
+        rgba[..., :3] = lut[(norm_values * 255).astype(np.intp)]
+        if alpha_values is None:
+            norm_alpha = norm_values
+        else:
+            norm_alpha = normalize(alpha_values)
+        rgba[..., 3] = (norm_alpha * alpha_max).astype(np.ubyte)
+        return rgba
+
+    @staticmethod
+    def generate_3d_volume_obj(rgba_data: np.ndarray, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray,
+                               stride: int = 1):
+        """
+        Generates an opengl.GLVolumeItem from a RGBA texture and places it at the given coordinates so that the
+        voxel [i, j, k] sits at (x_vec[i*stride], y_vec[j*stride], z_vec[k*stride]).
 
-        return point_list
+        :param rgba_data: texture as returned by generate_3d_volume_rgba()
+        :param x_vec: full (not decimated) vector of x coordinates the volume was measured at
+        :param y_vec: full vector of y coordinates
+        :param z_vec: full vector of z coordinates
+        :param stride: decimation stride as returned by downsample_volume()
+        :return: opengl.GLVolumeItem
+        """
+        volume_obj = gl.GLVolumeItem(rgba_data, smooth=True, glOptions='translucent')
+        VisualizerPyqtGraph.place_3d_volume_obj(volume_obj, x_vec, y_vec, z_vec, stride)
+        return volume_obj
 
+    @staticmethod
+    def place_3d_volume_obj(volume_obj: gl.GLVolumeItem, x_vec: np.ndarray, y_vec: np.ndarray, z_vec: np.ndarray,
+                            stride: int = 1):
+        """
+        Resets transform of given volume object and scales/translates it according to given coordinate vectors.
+        Only changes the transform, thus no new texture upload to GPU is triggered.
+        """
+        def step(vec: np.ndarray):
+            if len(vec) < 2:
+                return 1.0
+            return float(vec[1] - vec[0]) * stride
 
+        x_step, y_step, z_step = step(x_vec), step(y_vec), step(z_vec)
+        volume_obj.resetTransform()
+        volume_obj.scale(x_step, y_step, z_step)
+        # GLVolumeItem spans voxel i from i to i+1, shift by half a step to center voxels on measured points
+        volume_obj.translate(float(x_vec[0]) - x_step / 2, float(y_vec[0]) - y_step / 2, float(z_vec[0]) - z_step / 2)
+        return
@@ -1,12 +1,15 @@
 import sys
 from PyQt6.QtWidgets import QWidget, QLineEdit, QPushButton, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit, QGridLayout, \
-    QFrame, QComboBox, QStackedWidget, QProgressBar, QCheckBox
-from PyQt6.QtCore import QCoreApplication, Qt
+    QFrame, QComboBox, QStackedWidget, QProgressBar, QCheckBox, QSpinBox
+from PyQt6.QtCore import QCoreApplication, Qt, QRectF, QTimer
 from datetime import timedelta
 from .ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
+from .ui_mesh_preview import MeshPreviewScheduler
+from .ui_roi_mask_widget import UI_roi_mask_widget
 import pyqtgraph as pg
 import numpy as np
 import pyqtgraph.opengl as gl
+from measurement_routines.segment_sweep import parse_segment_string, format_segment_string
 
 
 class UI_auto_measurement_window(QWidget):
@@ -45,6 +48,14 @@ class UI_auto_measurement_window(QWidget):
     mesh_cubic_z_stop_lineEdit: QLineEdit = None
     mesh_cubic_z_max_distance_label: QLabel = None
     mesh_cubic_z_num_of_steps_lineEdit: QLineEdit = None
+    mesh_adaptive_checkbox: QCheckBox = None    # adaptive mesh refinement, see measurement_routines/adaptive_refinement.py
+    mesh_adaptive_coarse_step_lineEdit: QLineEdit = None
+    mesh_adaptive_amp_tolerance_lineEdit: QLineEdit = None
+    mesh_adaptive_phase_tolerance_lineEdit: QLineEdit = None
+    mesh_adaptive_max_points_lineEdit: QLineEdit = None
+    mesh_roi_widget: UI_roi_mask_widget = None  # region of interest, see measurement_routines/roi_mask.py
+    mesh_continuous_checkbox: QCheckBox = None  # continuous line scan, see measurement_routines/continuous_scan.py
+    mesh_continuous_line_speed_lineEdit: QLineEdit = None
     #   > cylindrical mesh [2]
     mesh_cylindrical_radius_lineEdit: QLineEdit = None
     mesh_cylindrical_radius_num_of_steps: QLineEdit = None
@@ -62,6 +73,9 @@ class UI_auto_measurement_window(QWidget):
     vna_S12_checkbox: QCheckBox = None  # AUT: Port2, Probe: Port1
     vna_S22_checkbox: QCheckBox = None
     vna_freq_start_lineEdit: QLineEdit = None
+    vna_segments_lineEdit: QLineEdit = None
+    vna_adaptive_averaging_checkbox: QCheckBox = None   # adaptive averaging, see measurement_routines/adaptive_averaging.py
+    vna_averaging_target_lineEdit: QLineEdit = None
     vna_freq_stop_lineEdit: QLineEdit = None
     vna_freq_num_steps_lineEdit: QLineEdit = None
     vna_if_bandwidth_lineEdit: QLineEdit = None
@@ -76,6 +90,8 @@ class UI_auto_measurement_window(QWidget):
 
     #   start auto measurement button
     auto_measurement_start_button: QPushButton = None
+    auto_measurement_add_to_queue_button: QPushButton = None
+    auto_measurement_dry_run_button: QPushButton = None
 
     #   auto measurement progress frame
     auto_measurement_stop_button = QPushButton = None
@@ -93,6 +109,7 @@ class UI_auto_measurement_window(QWidget):
     #   3d graph visualization of mesh
     graphic_bed_obj: gl.GLMeshItem = None
     graphic_measurement_mesh_obj: gl.GLScatterPlotItem = None
+    graphic_measurement_mesh_bbox_obj: gl.GLLinePlotItem = None
     graphic_probe_antenna_obj: gl.GLLinePlotItem = None
     __probe_antenna_obj_width: float = 20.0
     graphic_aut_obj: gl.GLLinePlotItem = None
@@ -107,9 +124,35 @@ class UI_auto_measurement_window(QWidget):
     plot_xz_zero_cos: pg.PlotDataItem = None
     plot_xz_mesh_points: pg.PlotDataItem = None
 
+    #   live field view during running measurement
+    live_view_parameter_comboBox: QComboBox = None
+    live_view_freq_spinBox: QSpinBox = None
+    live_view_freq_label: QLabel = None
+    live_view_value_comboBox: QComboBox = None
+    live_view_layer_label: QLabel = None
+    plot_2d_live: pg.PlotItem = None
+    live_view_image: pg.ImageItem = None
+    __live_view_f_vec: np.ndarray = None
+    __live_view_x_vec: np.ndarray = None
+    __live_view_y_vec: np.ndarray = None
+    __live_view_data: np.ndarray = None     # [amp [dB]/phase [deg], x, y] of current layer, NaN where not measured yet
+    __live_view_levels: np.ndarray = None   # [amp/phase, min/max] of the measured points in __live_view_data
+    __live_view_shown: tuple = None     # (parameter, freq_idx, layer_number) of data in __live_view_data
+    __live_view_colormaps: tuple = None     # (amplitude, phase) colormaps, loaded once
+    __live_view_timer: QTimer = None    # redraws the image at most every LIVE_VIEW_REDRAW_MS while points come in
+    LIVE_VIEW_REDRAW_MS = 100
+
+    #   debounced preview pipeline
+    mesh_preview_scheduler: MeshPreviewScheduler = None
+    __displayed_preview_keys: dict = None  # input-keys of displayed preview parts, to push only changed data
+
     def __init__(self, chamber_x_max_coor: float, chamber_y_max_coor: float, chamber_z_max_coor: float,
                  chamber_z_head_bed_offset: float):
         super().__init__()
+        self.__displayed_preview_keys = {}
+        self.mesh_preview_scheduler = MeshPreviewScheduler(collect_fn=self.__collect_mesh_preview_inputs,
+                                                           compute_fn=self.__compute_mesh_preview,
+                                                           apply_fn=self.__apply_mesh_preview)
         self.chamber_x_max_coor = chamber_x_max_coor
         self.chamber_y_max_coor = chamber_y_max_coor
         self.chamber_z_max_coor = chamber_z_max_coor
@@ -130,9 +173,15 @@ class UI_auto_measurement_window(QWidget):
         vna_measurement_config_widget = self.__init_vna_measurement_config_widget()
         measurement_data_config_widget = self.__init_measurement_data_config_widget()
         self.auto_measurement_start_button = QPushButton("Start Auto Measurement Process")
+        self.auto_measurement_add_to_queue_button = QPushButton("Add Auto Measurement to Job Queue")
+        self.auto_measurement_dry_run_button = QPushButton("Dry Run (estimate Duration and File Size)")
+        start_buttons_layout = QVBoxLayout()
+        start_buttons_layout.addWidget(self.auto_measurement_dry_run_button)
+        start_buttons_layout.addWidget(self.auto_measurement_add_to_queue_button)
+        start_buttons_layout.addWidget(self.auto_measurement_start_button)
         configs_field.addWidget(vna_measurement_config_widget,0,1,1,1, alignment=Qt.AlignmentFlag.AlignTop)
         configs_field.addWidget(measurement_data_config_widget,1,1,1,1, alignment=Qt.AlignmentFlag.AlignTop)
-        configs_field.addWidget(self.auto_measurement_start_button,2,1,1,1, alignment=Qt.AlignmentFlag.AlignBottom)
+        configs_field.addLayout(start_buttons_layout,2,1,1,1, alignment=Qt.AlignmentFlag.AlignBottom)
         # ...
 
         third_column = QVBoxLayout()
@@ -152,7 +201,8 @@ class UI_auto_measurement_window(QWidget):
         fourth_column = QVBoxLayout()
         self.plot_2d_layout_widget = self.__init_2d_plots()
         self.plot_2d_layout_widget.setMinimumWidth(300)
-        fourth_column.addWidget(self.plot_2d_layout_widget)
+        fourth_column.addWidget(self.plot_2d_layout_widget, stretch=2)
+        fourth_column.addWidget(self.__init_live_view_widget(), stretch=1)
 
         main_layout.addLayout(configs_field, stretch=0)
         main_layout.addLayout(third_column, stretch=1)
@@ -205,7 +255,6 @@ class UI_auto_measurement_window(QWidget):
         self.button_set_z_zero_from_antennas.setToolTip("Calculates theoretical Zero position by sum of both antenna\n"
                                                         "heights while considering the coordinate offset due to "
                                                         "z-homing-sensor")
-        self.button_set_z_zero_from_antennas.pressed.connect(self.update_2d_plots)
         self.button_set_z_zero_from_antennas.pressed.connect(self.update_mesh_display)
         frame_layout.addWidget(self.button_set_z_zero_from_antennas, 5, 0, 1, 3, Qt.AlignmentFlag.AlignCenter)
 
@@ -258,11 +307,13 @@ class UI_auto_measurement_window(QWidget):
         self.mesh_cubic_move_pattern_dropdown.setToolTip("Select movement pattern to go through measurement volume.")
         pattern_items = [
             "line-by-line",
-            "snake"
+            "snake",
+            "optimized"
         ]
         pattern_tooltips = [
             "Regular line-by-line movement. First X_min to X_max, then Y_min to Y_max, then Z_min to Z_max.\n(+)By sticking to one movement direction along X assures more systematic coax-cable position and cable error.",
-            "Snake-like movement. Probe moves always to next closest possible measurement position in mesh.\n(+)Faster measurement process, (-)Less systematic cable error due to changing movement directions through mesh."
+            "Snake-like movement. Probe moves always to next closest possible measurement position in mesh.\n(+)Faster measurement process, (-)Less systematic cable error due to changing movement directions through mesh.",
+            "Optimized order. Runs through the mesh along the axis order and direction pattern with the shortest predicted travel time.\nConsiders the slow Z-axis and its backlash. Predicted travel time is shown in the log at start and by the dry run."
         ]
         for i, item in enumerate(pattern_items):
             self.mesh_cubic_move_pattern_dropdown.addItem(item)
@@ -320,6 +371,61 @@ class UI_auto_measurement_window(QWidget):
         cubic_mesh_config_widget_layout.addWidget(self.mesh_cubic_z_max_distance_label, 6, 2, 1, 1)
         cubic_mesh_config_widget_layout.addWidget(cubic_z_num_of_steps_label, 7, 0, 1, 1)
         cubic_mesh_config_widget_layout.addWidget(self.mesh_cubic_z_num_of_steps_lineEdit, 7, 1, 1, 1)
+        #   adaptive refinement inputs
+        self.mesh_adaptive_checkbox = QCheckBox("adaptive mesh refinement")
+        self.mesh_adaptive_checkbox.setToolTip(
+            "Measure a coarse grid in each Z-layer first and add points of the mesh only where interpolation between\n"
+            "the measured points exceeds the tolerances. The measurement file lists the measured points only,\n"
+            "the display interpolates all other points of the mesh.")
+        self.mesh_adaptive_checkbox.stateChanged.connect(self.__enable_adaptive_inputs_callback)
+        adaptive_coarse_step_label = QLabel("Coarse step:")
+        self.mesh_adaptive_coarse_step_lineEdit = QLineEdit("4")
+        self.mesh_adaptive_coarse_step_lineEdit.setToolTip(
+            "Every n-th point of the mesh in X and Y is measured for the coarse grid (integer >= 1).\n"
+            "Keep the coarse spacing below a quarter wavelength, faster phase changes can not be detected.")
+        adaptive_amp_tolerance_label = QLabel("Amp. tolerance:")
+        self.mesh_adaptive_amp_tolerance_lineEdit = QLineEdit("0.5")
+        self.mesh_adaptive_amp_tolerance_lineEdit.setToolTip("Maximum expected amplitude error of interpolated "
+                                                             "points in [dB].")
+        adaptive_phase_tolerance_label = QLabel("Phase tolerance:")
+        self.mesh_adaptive_phase_tolerance_lineEdit = QLineEdit("5")
+        self.mesh_adaptive_phase_tolerance_lineEdit.setToolTip("Maximum expected phase error of interpolated "
+                                                               "points in [deg].")
+        adaptive_max_points_label = QLabel("Max points:")
+        self.mesh_adaptive_max_points_lineEdit = QLineEdit("")
+        self.mesh_adaptive_max_points_lineEdit.setToolTip("Point budget of the whole measurement.\n"
+                                                          "Leave empty for no limit.")
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_adaptive_checkbox, 8, 0, 1, 3)
+        cubic_mesh_config_widget_layout.addWidget(adaptive_coarse_step_label, 9, 0, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_adaptive_coarse_step_lineEdit, 9, 1, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(adaptive_amp_tolerance_label, 10, 0, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_adaptive_amp_tolerance_lineEdit, 10, 1, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(QLabel("dB"), 10, 2, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(adaptive_phase_tolerance_label, 11, 0, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_adaptive_phase_tolerance_lineEdit, 11, 1, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(QLabel("deg"), 11, 2, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(adaptive_max_points_label, 12, 0, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_adaptive_max_points_lineEdit, 12, 1, 1, 1)
+        self.__enable_adaptive_inputs_callback()
+        #   region of interest inputs
+        self.mesh_roi_widget = UI_roi_mask_widget()
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_roi_widget, 13, 0, 1, 3)
+        #   continuous scan inputs
+        self.mesh_continuous_checkbox = QCheckBox("continuous line scan")
+        self.mesh_continuous_checkbox.setToolTip(
+            "Measure each X-line on-the-fly while the chamber moves instead of stopping at every point.\n"
+            "Positions of the sweeps are interpolated by the motion model, the data is resampled onto the mesh.\n"
+            "Not combinable with adaptive refinement or region of interest.")
+        self.mesh_continuous_checkbox.stateChanged.connect(self.__enable_continuous_inputs_callback)
+        continuous_line_speed_label = QLabel("Line speed:")
+        self.mesh_continuous_line_speed_lineEdit = QLineEdit("")
+        self.mesh_continuous_line_speed_lineEdit.setToolTip("Speed of the X-line moves.\n"
+                                                            "Leave empty to take two sweeps per mesh step.")
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_continuous_checkbox, 14, 0, 1, 3)
+        cubic_mesh_config_widget_layout.addWidget(continuous_line_speed_label, 15, 0, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(self.mesh_continuous_line_speed_lineEdit, 15, 1, 1, 1)
+        cubic_mesh_config_widget_layout.addWidget(QLabel("mm/s"), 15, 2, 1, 1)
+        self.__enable_continuous_inputs_callback()
 
         #   cylindrical mesh [2]
         cylindrical_mesh_config_widget = QWidget()
@@ -351,27 +457,35 @@ class UI_auto_measurement_window(QWidget):
         frame_layout.addWidget(mesh_selection_dropdown)
         frame_layout.addWidget(self.stacked_mesh_config_widget)
 
-        #   Connect Signals & Slots to update 2d plots when mesh input changed
-        self.mesh_cubic_x_length_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_x_num_of_steps_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_y_length_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_y_num_of_steps_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_z_start_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_z_stop_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_z_num_of_steps_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_cubic_x_length_lineEdit.editingFinished.connect(self.update_mesh_display)
-        self.mesh_cubic_x_num_of_steps_lineEdit.editingFinished.connect(self.update_mesh_display)
-        self.mesh_cubic_y_length_lineEdit.editingFinished.connect(self.update_mesh_display)
-        self.mesh_cubic_y_num_of_steps_lineEdit.editingFinished.connect(self.update_mesh_display)
-        self.mesh_cubic_z_start_lineEdit.editingFinished.connect(self.update_mesh_display)
-        self.mesh_cubic_z_stop_lineEdit.editingFinished.connect(self.update_mesh_display)
-        self.mesh_cubic_z_num_of_steps_lineEdit.editingFinished.connect(self.update_mesh_display)
+        #   Connect Signals & Slots to update 2d plots and 3d graphic when mesh input changed, updates are debounced
+        for mesh_input_lineEdit in (self.mesh_cubic_x_length_lineEdit, self.mesh_cubic_x_num_of_steps_lineEdit,
+                                    self.mesh_cubic_y_length_lineEdit, self.mesh_cubic_y_num_of_steps_lineEdit,
+                                    self.mesh_cubic_z_start_lineEdit, self.mesh_cubic_z_stop_lineEdit,
+                                    self.mesh_cubic_z_num_of_steps_lineEdit):
+            mesh_input_lineEdit.textChanged.connect(self.update_mesh_display)
 
         return measurement_mesh_config_frame
 
     def __switch_mesh_config(self, index):
         self.stacked_mesh_config_widget.setCurrentIndex(index)
 
+    def __enable_adaptive_inputs_callback(self):
+        """
+        enables/disables textfields of the adaptive refinement dependend on checkbox.
+        """
+        enable = self.mesh_adaptive_checkbox.isChecked()
+        for adaptive_lineEdit in (self.mesh_adaptive_coarse_step_lineEdit, self.mesh_adaptive_amp_tolerance_lineEdit,
+                                  self.mesh_adaptive_phase_tolerance_lineEdit, self.mesh_adaptive_max_points_lineEdit):
+            adaptive_lineEdit.setEnabled(enable)
+        return
+
+    def __enable_continuous_inputs_callback(self):
+        """
+        enables/disables textfield of the continuous scan dependend on checkbox.
+        """
+        self.mesh_continuous_line_speed_lineEdit.setEnabled(self.mesh_continuous_checkbox.isChecked())
+        return
+
     def __init_vna_measurement_config_widget(self):
         vna_measurement_config_frame = QFrame()
         vna_measurement_config_frame.setFrameStyle(QFrame.Shape.StyledPanel)
@@ -445,6 +559,24 @@ class UI_auto_measurement_window(QWidget):
         self.vna_average_number_lineEdit = QLineEdit("10")
         self.vna_average_number_lineEdit.setToolTip("Number of sweeps that should be performed \nand averaged for the "
                                                     "measurement result.")
+        segments_label = QLabel("Segments:")
+        self.vna_segments_lineEdit = QLineEdit("")
+        self.vna_segments_lineEdit.setPlaceholderText("empty for linear sweep")
+        self.vna_segments_lineEdit.setToolTip("Optional segment sweep instead of the linear sweep from start- to stop-"
+                                              "frequency.\nOne segment as 'start:stop:points[:if_bw]', segments "
+                                              "separated by ';',\ne.g. '60e9:61e9:51; 64e9:65e9:101:100'. Segments "
+                                              "without if_bw use the IF Bandwidth above.")
+        self.vna_adaptive_averaging_checkbox = QCheckBox("adaptive averaging")
+        self.vna_adaptive_averaging_checkbox.setToolTip(
+            "Average each point only until the measured sweep-to-sweep noise meets the target uncertainty.\n"
+            "The number of sweeps of the PNA configuration is the maximum number of averages.\n"
+            "Not combinable with continuous line scan.")
+        self.vna_adaptive_averaging_checkbox.stateChanged.connect(self.__enable_adaptive_averaging_inputs_callback)
+        self.vna_averaging_target_lineEdit = QLineEdit("0.05")
+        self.vna_averaging_target_lineEdit.setToolTip("Standard uncertainty of the averaged amplitude to stop "
+                                                      "averaging at.")
+        averaging_target_unit_label = QLabel("[dB]")
+        self.__enable_adaptive_averaging_inputs_callback()
 
         inputs_layout.addWidget(self.vna_S11_checkbox,3,0,1,2,Qt.AlignmentFlag.AlignCenter)
         inputs_layout.addWidget(self.vna_S12_checkbox,3,2,1,2,Qt.AlignmentFlag.AlignCenter)
@@ -466,6 +598,11 @@ class UI_auto_measurement_window(QWidget):
         inputs_layout.addWidget(self.vna_enable_average_checkbox,9,0,1,5, Qt.AlignmentFlag.AlignLeft)
         inputs_layout.addWidget(average_label,10,0,1,2, Qt.AlignmentFlag.AlignLeft)
         inputs_layout.addWidget(self.vna_average_number_lineEdit,10,2,1,3, Qt.AlignmentFlag.AlignLeft)
+        inputs_layout.addWidget(segments_label,11,0,1,2, Qt.AlignmentFlag.AlignLeft)
+        inputs_layout.addWidget(self.vna_segments_lineEdit,11,2,1,4, Qt.AlignmentFlag.AlignLeft)
+        inputs_layout.addWidget(self.vna_adaptive_averaging_checkbox,12,0,1,2, Qt.AlignmentFlag.AlignLeft)
+        inputs_layout.addWidget(self.vna_averaging_target_lineEdit,12,2,1,3, Qt.AlignmentFlag.AlignLeft)
+        inputs_layout.addWidget(averaging_target_unit_label,12,5,1,1, Qt.AlignmentFlag.AlignLeft)
 
         frame_layout.addLayout(inputs_layout)
 
@@ -491,6 +628,13 @@ class UI_auto_measurement_window(QWidget):
             self.vna_average_number_lineEdit.setEnabled((False))
         return
 
+    def __enable_adaptive_averaging_inputs_callback(self):
+        """
+        enables/disables textfield of the adaptive averaging dependend on checkbox.
+        """
+        self.vna_averaging_target_lineEdit.setEnabled(self.vna_adaptive_averaging_checkbox.isChecked())
+        return
+
     def __update_vna_measurement_config_modus_callback(self):
         """
         updates the vna measurement config modus by disabling/enabling corresponding input fields
@@ -510,6 +654,7 @@ class UI_auto_measurement_window(QWidget):
             self.vna_output_power_lineEdit.setEnabled(True)
             self.vna_enable_average_checkbox.setEnabled(True)
             self.vna_average_number_lineEdit.setEnabled(True)
+            self.vna_segments_lineEdit.setEnabled(True)
         else:
             self.vna_config_filepath_lineEdit.setEnabled(True)
             self.vna_config_filepath_check_button.setEnabled(True)
@@ -523,6 +668,7 @@ class UI_auto_measurement_window(QWidget):
             self.vna_output_power_lineEdit.setEnabled(False)
             self.vna_enable_average_checkbox.setEnabled(False)
             self.vna_average_number_lineEdit.setEnabled(False)
+            self.vna_segments_lineEdit.setEnabled(False)
         return
     def __init_measurement_data_config_widget(self):
         measurement_data_config_frame = QFrame()
@@ -683,6 +829,10 @@ class UI_auto_measurement_window(QWidget):
         z_vec = np.array([-100])
         self.graphic_measurement_mesh_obj = Visualizer.generate_3d_mesh_scatter_plot(x_vec, y_vec, z_vec)
         view_widget.addItem(self.graphic_measurement_mesh_obj)
+        self.graphic_measurement_mesh_bbox_obj = gl.GLLinePlotItem(
+            pos=Visualizer.generate_3d_bounding_box_vertices(x_vec, y_vec, z_vec), color=(0.5, 1, 0, 0.6), width=1.0,
+            mode='lines')
+        view_widget.addItem(self.graphic_measurement_mesh_bbox_obj)
 
         # set view point roughly
         view_widget.pan(self.chamber_x_max_coor / 2, self.chamber_y_max_coor / 2, -self.chamber_z_max_coor / 3)
@@ -769,34 +919,153 @@ class UI_auto_measurement_window(QWidget):
 
 
 
-    def update_2d_plots(self):
+    def __init_live_view_widget(self):
+        frame_widget = QFrame()
+        frame_widget.setFrameStyle(QFrame.Shape.StyledPanel)
+        frame_layout = QGridLayout()
+        frame_widget.setLayout(frame_layout)
+
+        title = QLabel("Live Field View - current XY-Layer")
+        title.setStyleSheet("text-decoration: underline; font-size: 16px;")
+        self.live_view_parameter_comboBox = QComboBox()
+        self.live_view_value_comboBox = QComboBox()
+        self.live_view_value_comboBox.addItems(["Amplitude [dB]", "Phase [deg]"])
+        self.live_view_freq_spinBox = QSpinBox()
+        self.live_view_freq_spinBox.setToolTip("Index of frequency point that is displayed")
+        self.live_view_freq_label = QLabel("... Hz")
+        self.live_view_layer_label = QLabel("No measurement running")
+
+        live_view_plot_widget = pg.PlotWidget()
+        live_view_plot_widget.setBackground(background=(255, 255, 255))
+        self.plot_2d_live = live_view_plot_widget.getPlotItem()
+        self.plot_2d_live.setLabel('bottom', 'X [mm] (AUT)')
+        self.plot_2d_live.setLabel('left', 'Y [mm] (AUT)')
+        self.plot_2d_live.getViewBox().setAspectLocked(lock=True, ratio=1)
+        self.live_view_image = pg.ImageItem()
+        self.__live_view_colormaps = (pg.colormap.get('Spectral_r', source='matplotlib'),
+                                      pg.colormap.get('hsv', source='matplotlib'))
+        self.live_view_image.setColorMap(self.__live_view_colormaps[0])
+        self.plot_2d_live.addItem(self.live_view_image)
+        self.__live_view_timer = QTimer()
+        self.__live_view_timer.setSingleShot(True)
+        self.__live_view_timer.setInterval(self.LIVE_VIEW_REDRAW_MS)
+        self.__live_view_timer.timeout.connect(self.__refresh_live_view_image)
+
+        frame_layout.addWidget(title, 0, 0, 1, 4, alignment=Qt.AlignmentFlag.AlignLeft)
+        frame_layout.addWidget(self.live_view_parameter_comboBox, 1, 0, 1, 1)
+        frame_layout.addWidget(self.live_view_value_comboBox, 1, 1, 1, 1)
+        frame_layout.addWidget(self.live_view_freq_spinBox, 1, 2, 1, 1)
+        frame_layout.addWidget(self.live_view_freq_label, 1, 3, 1, 1, alignment=Qt.AlignmentFlag.AlignLeft)
+        frame_layout.addWidget(live_view_plot_widget, 2, 0, 1, 4)
+        frame_layout.addWidget(self.live_view_layer_label, 3, 0, 1, 4, alignment=Qt.AlignmentFlag.AlignLeft)
+
+        self.live_view_freq_spinBox.valueChanged.connect(self.__update_live_view_freq_label)
+        self.live_view_value_comboBox.currentIndexChanged.connect(self.__change_live_view_value)
+        return frame_widget
+
+    def __change_live_view_value(self):
+        self.live_view_image.setColorMap(self.__live_view_colormaps[self.live_view_value_comboBox.currentIndex()])
+        self.__refresh_live_view_image()
+        return
+
+    def __update_live_view_freq_label(self):
+        if self.__live_view_f_vec is None:
+            return
+        self.live_view_freq_label.setText(f"{self.__live_view_f_vec[self.live_view_freq_spinBox.value()] / 1e9} GHz")
+        return
+
+    def configure_live_view(self, parameters: list[str], f_vec: np.ndarray, x_vec: np.ndarray, y_vec: np.ndarray):
         """
-        Updates mesh points according to given mesh inputs
-        > So far only cubic supported
-        > skips update if no zero position is logged completely
+        Sets up selectable parameters/frequencies and the image geometry of the live field view for a new measurement.
+
+        :param parameters: measured S-parameters e.g. ['S11', 'S12']
+        :param f_vec: measured frequency points [Hz]
+        :param x_vec: x coordinates of mesh in AUT coordinates [mm]
+        :param y_vec: y coordinates of mesh in AUT coordinates [mm]
         """
-        #   skip update if no zero position logged
-        if self.current_zero_x is None or self.current_zero_y is None or self.current_zero_z is None:
+        self.__live_view_f_vec = np.asarray(f_vec, dtype=float)
+        self.__live_view_x_vec = np.asarray(x_vec, dtype=float)
+        self.__live_view_y_vec = np.asarray(y_vec, dtype=float)
+        self.live_view_parameter_comboBox.blockSignals(True)
+        self.live_view_parameter_comboBox.clear()
+        self.live_view_parameter_comboBox.addItems(parameters)
+        self.live_view_parameter_comboBox.blockSignals(False)
+        self.live_view_freq_spinBox.blockSignals(True)
+        self.live_view_freq_spinBox.setRange(0, len(self.__live_view_f_vec) - 1)
+        self.live_view_freq_spinBox.setValue(0)
+        self.live_view_freq_spinBox.blockSignals(False)
+        self.__update_live_view_freq_label()
+
+        # place image so that pixel centers match mesh points
+        x_step = self.__live_view_x_vec[1] - self.__live_view_x_vec[0] if len(self.__live_view_x_vec) > 1 else 1.0
+        y_step = self.__live_view_y_vec[1] - self.__live_view_y_vec[0] if len(self.__live_view_y_vec) > 1 else 1.0
+        self.__live_view_data = np.full((2, len(self.__live_view_x_vec), len(self.__live_view_y_vec)), np.nan)
+        self.__live_view_levels = np.array([[np.inf, -np.inf], [np.inf, -np.inf]])
+        self.__live_view_shown = None
+        self.__live_view_timer.stop()
+        self.live_view_image.clear()
+        self.live_view_image.setRect(QRectF(self.__live_view_x_vec[0] - x_step / 2,
+                                            self.__live_view_y_vec[0] - y_step / 2,
+                                            len(self.__live_view_x_vec) * x_step,
+                                            len(self.__live_view_y_vec) * y_step))
+        self.live_view_layer_label.setText("Waiting for first measured points...")
+        return
+
+    def get_live_view_selection(self):
+        """
+        Returns tuple (parameter: str, freq_idx: int) currently selected for live field view
+        """
+        return self.live_view_parameter_comboBox.currentText(), self.live_view_freq_spinBox.value()
+
+    def update_live_view(self, field_info: dict):
+        """
+        Writes newly measured points to the live field view. Must be connected to AutoMeasurement field_update signal.
+        The layer buffer is cleared when a new layer starts or the displayed parameter/frequency changed.
+        field_info holds numpy arrays 'x_idx', 'y_idx', 'amplitude' and 'phase' of all points measured since the last
+        emit. Only their pixels and the levels are updated here, the image is redrawn by a timer at most every
+        LIVE_VIEW_REDRAW_MS.
+        """
+        if self.__live_view_data is None:
             return
-        #   update zero positions in plot
-        xy_zero = np.array([[self.current_zero_x, self.current_zero_y]])
-        xz_zero = np.array([[self.current_zero_x, self.current_zero_z]])
-        self.plot_xy_zero_cos.setData(xy_zero)
-        self.plot_xz_zero_cos.setData(xz_zero)
-        #   update mesh points
-        mesh_info = self.get_mesh_cubic_data()
-        xy_mesh_points_list = []
-        for x in mesh_info['x_vec']:
-            for y in mesh_info['y_vec']:
-                xy_mesh_points_list.append([x, y])
-        xy_mesh_points_array = np.array(xy_mesh_points_list)
-        xz_mesh_points_list = []
-        for x in mesh_info['x_vec']:
-            for z in mesh_info['z_vec']:
-                xz_mesh_points_list.append([x, z - self.get_aut_height()]) # correcting by head bed offset since bed coordinates are stored in z_vec
-        xz_mesh_points_array = np.array(xz_mesh_points_list)
-        self.plot_xy_mesh_points.setData(xy_mesh_points_array)
-        self.plot_xz_mesh_points.setData(xz_mesh_points_array)
+        shown = (field_info['parameter'], field_info['freq_idx'], field_info['layer_number'])
+        if shown != self.__live_view_shown:
+            self.__live_view_data[:] = np.nan
+            self.__live_view_levels[:] = [np.inf, -np.inf]
+            self.__live_view_shown = shown
+        with np.errstate(divide='ignore'):
+            values = (20 * np.log10(np.asarray(field_info['amplitude'], dtype=float)),
+                      np.asarray(field_info['phase'], dtype=float))
+        for value_idx, value in enumerate(values):
+            self.__live_view_data[value_idx, field_info['x_idx'], field_info['y_idx']] = value
+            finite = value[np.isfinite(value)]
+            if finite.size > 0:
+                self.__live_view_levels[value_idx] = (min(self.__live_view_levels[value_idx, 0], finite.min()),
+                                                      max(self.__live_view_levels[value_idx, 1], finite.max()))
+        self.live_view_layer_label.setText(f"Layer {field_info['layer_number']} at Z: {round(field_info['z_coor'], 3)} mm"
+                                           f", {field_info['parameter']} @ {field_info['frequency'] / 1e9} GHz")
+        if not self.__live_view_timer.isActive():
+            self.__live_view_timer.start()
+        return
+
+    def __refresh_live_view_image(self):
+        if self.__live_view_shown is None:
+            return
+        value_idx = self.live_view_value_comboBox.currentIndex()
+        levels = (float(self.__live_view_levels[value_idx, 0]), float(self.__live_view_levels[value_idx, 1]))
+        if levels[0] > levels[1]:   # no valid point measured yet
+            return
+        if levels[0] == levels[1]:
+            levels = (levels[0] - 1, levels[1] + 1)
+        self.live_view_image.setImage(self.__live_view_data[value_idx], autoLevels=False, levels=levels)
+        return
+
+    def update_2d_plots(self):
+        """
+        Requests update of mesh points in 2d plots according to given mesh inputs.
+        Same debounced pipeline as update_mesh_display(), kept for existing connections.
+        """
+        self.mesh_preview_scheduler.request_update()
+        return
 
     def update_live_coor_display(self, new_x: float, new_y: float, new_z: float):
         """
@@ -850,53 +1119,120 @@ class UI_auto_measurement_window(QWidget):
 
     def update_mesh_display(self):
         """
-        Callback that updates displayed mesh in graph-visualization dependent on configuration
+        Callback that requests an update of displayed mesh in 3d graphic and 2d plots dependent on configuration.
 
+        Rapid calls (e.g. typing) are coalesced by a short timer, the geometry is computed in a background thread and
+        only changed parts are pushed to the graphic objects afterwards.
         > skips update if no zero position is logged completely
         """
-        #   skip update if no zero position logged
+        self.mesh_preview_scheduler.request_update()
+        return
+
+    def __collect_mesh_preview_inputs(self):
+        """
+        Reads all inputs relevant for mesh preview on the GUI thread.
+        Returns None if no zero position is logged or inputs are incomplete while typing.
+        """
         if self.current_zero_x is None or self.current_zero_y is None or self.current_zero_z is None:
-            return
+            return None
+        try:
+            mesh_info = self.get_mesh_cubic_data()
+            aut_height = self.get_aut_height()
+            probe_length = self.get_probe_antenna_length()
+        except ValueError:
+            return None
+        if 0 in (mesh_info['num_steps_x'], mesh_info['num_steps_y'], mesh_info['num_steps_z']):
+            return None
+        return (mesh_info['x_vec'], mesh_info['y_vec'], mesh_info['z_vec'], aut_height, probe_length,
+                (self.current_zero_x, self.current_zero_y, self.current_zero_z), dict(self.__displayed_preview_keys))
+
+    @staticmethod
+    def __compute_mesh_preview(x_vec: tuple, y_vec: tuple, z_vec: tuple, aut_height: float, probe_length: float,
+                               zero_pos: tuple, displayed_keys: dict):
+        """
+        Computes geometry of all preview parts whose inputs differ from the displayed ones. Runs in worker thread.
+        Each part is returned as (key, data) or None if unchanged.
+        """
+        def vec_key(vec: tuple):
+            return len(vec), vec[0], vec[-1]
 
-        mesh_info = self.get_mesh_cubic_data()
-        new_z_coor_chamber_movement = []
-        real_z_measurement_mesh = []
+        preview = {'zero': None, 'mesh_3d': None, 'xy': None, 'xz': None, 'objects': None}
 
-        # flip z orientation for graph
-        for nz in mesh_info['z_vec']:
-            new_z_coor_chamber_movement.append(-nz)
-        for nz in new_z_coor_chamber_movement:
-            real_z_measurement_mesh.append(nz + self.get_aut_height())
+        zero_key = zero_pos
+        if displayed_keys.get('zero') != zero_key:
+            preview['zero'] = (zero_key, (np.array([[zero_pos[0], zero_pos[1]]]),
+                                          np.array([[zero_pos[0], zero_pos[2]]])))
 
-        if mesh_info['tot_num_of_points'] < (51*51*51):
-            # standard routine to display all points
-            new_data = Visualizer.generate_point_list(mesh_info['x_vec'], mesh_info['y_vec'],
-                                                      tuple(real_z_measurement_mesh))
-        else:   # routine if too many points to display
-            new_data = Visualizer.generate_outline_point_list(mesh_info['x_vec'], mesh_info['y_vec'],
-                                                              tuple(real_z_measurement_mesh))
+        mesh_3d_key = (vec_key(x_vec), vec_key(y_vec), vec_key(z_vec), aut_height)
+        if displayed_keys.get('mesh_3d') != mesh_3d_key:
+            # flip z orientation for graph
+            real_z_measurement_mesh = -np.asarray(z_vec) + aut_height
+            # dense meshes are decimated by stride, bounding box always shows the exact mesh extent
+            points, stride = Visualizer.generate_lod_point_list(x_vec, y_vec, real_z_measurement_mesh)
+            bbox = Visualizer.generate_3d_bounding_box_vertices(x_vec, y_vec, real_z_measurement_mesh)
+            preview['mesh_3d'] = (mesh_3d_key, (points, bbox, stride, len(x_vec) * len(y_vec) * len(z_vec)))
 
-        self.graphic_measurement_mesh_obj.setData(pos=new_data)
+        xy_key = (vec_key(x_vec), vec_key(y_vec))
+        if displayed_keys.get('xy') != xy_key:
+            preview['xy'] = (xy_key, Visualizer.generate_2d_lod_point_list(x_vec, y_vec))
 
+        xz_key = (vec_key(x_vec), vec_key(z_vec), aut_height)
+        if displayed_keys.get('xz') != xz_key:
+            # correcting by head bed offset since bed coordinates are stored in z_vec
+            preview['xz'] = (xz_key, Visualizer.generate_2d_lod_point_list(x_vec, np.asarray(z_vec) - aut_height))
 
+        objects_key = (z_vec[-1], aut_height, probe_length, zero_pos)
+        if displayed_keys.get('objects') != objects_key:
+            preview['objects'] = (objects_key, (-1 * z_vec[-1], aut_height, probe_length))
 
-        # set bed to lowest position for mesh
-        lowest_z_mesh = -1*mesh_info['z_vec'][-1]
-        self.graphic_bed_object.resetTransform()
-        self.graphic_bed_object.translate(dx=0, dy=0, dz=lowest_z_mesh)
+        return preview
 
-        probe_obj_vertices = Visualizer.generate_3d_antenna_object_vertices(self.get_probe_antenna_length(),
-                                                                            self.__probe_antenna_obj_width, False)
-        self.graphic_probe_antenna_obj.setData(pos=probe_obj_vertices)
-        self.graphic_probe_antenna_obj.resetTransform()
-        self.graphic_probe_antenna_obj.translate(dx=self.current_zero_x, dy=self.current_zero_y,
-                                                 dz=self.chamber_z_head_bed_offset)
-
-        aut_obj_vertices = Visualizer.generate_3d_antenna_object_vertices(self.get_aut_height(), self.__aut_obj_width,
-                                                                          True)
-        self.graphic_aut_obj.setData(pos=aut_obj_vertices)
-        self.graphic_aut_obj.resetTransform()
-        self.graphic_aut_obj.translate(dx=self.current_zero_x, dy=self.current_zero_y, dz=lowest_z_mesh)
+    def __apply_mesh_preview(self, preview: dict):
+        """
+        Pushes computed preview parts to 3d graphic and 2d plots. Unchanged parts (None) are not touched.
+        """
+        if preview['zero'] is not None:
+            xy_zero, xz_zero = preview['zero'][1]
+            self.plot_xy_zero_cos.setData(xy_zero)
+            self.plot_xz_zero_cos.setData(xz_zero)
+
+        if preview['mesh_3d'] is not None:
+            points, bbox, stride, tot_num_of_points = preview['mesh_3d'][1]
+            self.graphic_measurement_mesh_obj.setData(pos=points)
+            self.graphic_measurement_mesh_bbox_obj.setData(pos=bbox)
+            status_string = f"Mesh-display: {tot_num_of_points} points"
+            if stride > 1:
+                status_string += f", showing every {stride}. point per axis"
+            self.view_widget_status_label.setText(status_string)
+
+        if preview['xy'] is not None:
+            self.plot_xy_mesh_points.setData(preview['xy'][1])
+
+        if preview['xz'] is not None:
+            self.plot_xz_mesh_points.setData(preview['xz'][1])
+
+        if preview['objects'] is not None:
+            # set bed to lowest position for mesh
+            lowest_z_mesh, aut_height, probe_length = preview['objects'][1]
+            self.graphic_bed_object.resetTransform()
+            self.graphic_bed_object.translate(dx=0, dy=0, dz=lowest_z_mesh)
+
+            probe_obj_vertices = Visualizer.generate_3d_antenna_object_vertices(probe_length,
+                                                                                self.__probe_antenna_obj_width, False)
+            self.graphic_probe_antenna_obj.setData(pos=probe_obj_vertices)
+            self.graphic_probe_antenna_obj.resetTransform()
+            self.graphic_probe_antenna_obj.translate(dx=self.current_zero_x, dy=self.current_zero_y,
+                                                     dz=self.chamber_z_head_bed_offset)
+
+            aut_obj_vertices = Visualizer.generate_3d_antenna_object_vertices(aut_height, self.__aut_obj_width, True)
+            self.graphic_aut_obj.setData(pos=aut_obj_vertices)
+            self.graphic_aut_obj.resetTransform()
+            self.graphic_aut_obj.translate(dx=self.current_zero_x, dy=self.current_zero_y, dz=lowest_z_mesh)
+
+        for part_name, part in preview.items():
+            if part is not None:
+                self.__displayed_preview_keys[part_name] = part[0]
+        return
 
     def update_vna_measurement_config_entries(self, vna_info: dict):
         """
@@ -911,6 +1247,7 @@ class UI_auto_measurement_window(QWidget):
                 'if_bw': float
                 'output_power': float
                 'avg_num': int
+                'segments': list[dict] (optional)
             }
         """
 
@@ -924,6 +1261,7 @@ class UI_auto_measurement_window(QWidget):
         self.vna_output_power_lineEdit.setText(str(vna_info['output_power']))
         self.vna_enable_average_checkbox.setChecked(bool(vna_info['avg_num'] > 1))
         self.vna_average_number_lineEdit.setText(str(vna_info['avg_num']))
+        self.vna_segments_lineEdit.setText(format_segment_string(vna_info.get('segments')))
 
     def update_auto_measurement_progress_state(self, state_info: dict):
         """
@@ -988,7 +1326,7 @@ class UI_auto_measurement_window(QWidget):
         The x,y,z vectors describe the necessary points to move to by the chamber, to do the measurement.
         dict:
             {
-            'move_pattern' : string, 'line-by-line' or 'snake'
+            'move_pattern' : string, 'line-by-line', 'snake' or 'optimized'
             'tot_num_of_points' : int
             'num_steps_x' : int
             'num_steps_y' : int
@@ -996,6 +1334,10 @@ class UI_auto_measurement_window(QWidget):
             'x_vec' : tuple(float,...) , vector that stores all x coordinates for chamber movement in growing order
             'y_vec' : tuple(float,...) , vector that stores all y coordinates for chamber movement in growing order
             'z_vec' : tuple(float,...) , vector that stores all z coordinates for chamber movement in growing order
+            'adaptive' : dict or None, adaptive refinement config (see get_adaptive_refinement_config())
+            'roi' : dict or None, region of interest relative to zero position (see UI_roi_mask_widget)
+            'continuous' : dict or None, continuous scan config (see get_continuous_scan_config())
+            'averaging' : dict or None, adaptive averaging config (see get_adaptive_averaging_config())
             }
 
         *Coordinates are already transferred to chamber-movement coordinate system based on set zero!*
@@ -1022,15 +1364,9 @@ class UI_auto_measurement_window(QWidget):
         y_linspace = np.linspace(-y_length / 2, y_length / 2, y_num_steps)
         z_linspace = np.linspace(z_start, z_stop, z_num_steps)
 
-        x_vec = []
-        for i in x_linspace:
-            x_vec.append(i + x_offset)
-        y_vec = []
-        for i in y_linspace:
-            y_vec.append(i + y_offset)
-        z_vec = []
-        for i in z_linspace:
-            z_vec.append(i + z_offset)
+        x_vec = x_linspace + x_offset
+        y_vec = y_linspace + y_offset
+        z_vec = z_linspace + z_offset
 
         #   fill info dict
         info_dict['move_pattern'] = move_pattern
@@ -1041,9 +1377,43 @@ class UI_auto_measurement_window(QWidget):
         info_dict['x_vec'] = tuple(x_vec)
         info_dict['y_vec'] = tuple(y_vec)
         info_dict['z_vec'] = tuple(z_vec)
+        info_dict['adaptive'] = self.get_adaptive_refinement_config()
+        info_dict['roi'] = self.mesh_roi_widget.get_roi_config()
+        info_dict['continuous'] = self.get_continuous_scan_config()
+        info_dict['averaging'] = self.get_adaptive_averaging_config()
 
         return info_dict
 
+    def get_adaptive_refinement_config(self):
+        """
+        :return: None if adaptive refinement is disabled, otherwise dict
+            {'coarse_step': int, 'amp_tolerance': float [dB], 'phase_tolerance': float [deg], 'max_points': int or None}
+        """
+        if not self.mesh_adaptive_checkbox.isChecked():
+            return None
+        max_points = self.mesh_adaptive_max_points_lineEdit.text().strip()
+        return {'coarse_step': int(self.mesh_adaptive_coarse_step_lineEdit.text()),
+                'amp_tolerance': float(self.mesh_adaptive_amp_tolerance_lineEdit.text()),
+                'phase_tolerance': float(self.mesh_adaptive_phase_tolerance_lineEdit.text()),
+                'max_points': int(max_points) if max_points != '' else None}
+
+    def get_continuous_scan_config(self):
+        """
+        :return: None if continuous scanning is disabled, otherwise dict {'line_speed': float [mm/s] or None}
+        """
+        if not self.mesh_continuous_checkbox.isChecked():
+            return None
+        line_speed = self.mesh_continuous_line_speed_lineEdit.text().strip()
+        return {'line_speed': float(line_speed) if line_speed != '' else None}
+
+    def get_adaptive_averaging_config(self):
+        """
+        :return: None if adaptive averaging is disabled, otherwise dict {'target_uncertainty': float [dB]}
+        """
+        if not self.vna_adaptive_averaging_checkbox.isChecked():
+            return None
+        return {'target_uncertainty': float(self.vna_averaging_target_lineEdit.text())}
+
     def get_probe_antenna_length(self):
         return float(self.probe_antenna_length_lineEdit.text())
 
@@ -1093,6 +1463,8 @@ class UI_auto_measurement_window(QWidget):
             'sweep_num_points': int, [], number of frequency points stimulated while sweep
             'output_power':     float, [dBm], RF-output power for measurement
             'average_number':   int, [], number of sweeps that should be averaged (1 - 65536)
+            'segments':         list[dict], only if segments are given, segment sweep (see segment_sweep.py).
+                                None if the segment input is invalid.
             }
 
         In case of 'Setup from .cst file' selected, the vna_info dict as follows
@@ -1110,6 +1482,14 @@ class UI_auto_measurement_window(QWidget):
             return vna_info
 
         """ Configuration manually by given inputs on UI """
+        return self.get_manual_vna_configuration()
+
+    def get_manual_vna_configuration(self):
+        """
+        Returns vna_info dict of the manual inputs on UI (see get_vna_configuration), independent of the selected
+        configuration type. After a .cst file was checked or used, the inputs show the values of the file.
+        """
+        vna_info = {}
         parameter_list = []
         if self.vna_S11_checkbox.isChecked():
             parameter_list.append('S11')
@@ -1130,6 +1510,9 @@ class UI_auto_measurement_window(QWidget):
         else:
             vna_info['avg_num'] = 1
 
+        if self.vna_segments_lineEdit.text().strip() != '':
+            vna_info['segments'] = parse_segment_string(self.vna_segments_lineEdit.text())
+
         return vna_info
 
     def get_is_file_json(self):
@@ -1,11 +1,15 @@
 import os
 from PyQt6.QtWidgets import QWidget, QLineEdit, QPushButton, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout, QTextEdit, \
-    QProgressBar, QFrame, QCheckBox, QComboBox
+    QProgressBar, QFrame, QCheckBox, QComboBox, QPlainTextEdit
 from PyQt6.QtCore import Qt
 from PyQt6.QtSvgWidgets import QSvgWidget
 from PyQt6.QtGui import QPixmap
 import pyqtgraph as pg
 import numpy as np
+import logging
+from .ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
+from .ui_mesh_preview import MeshPreviewScheduler
+from .ui_roi_mask_widget import UI_roi_mask_widget
 from datetime import datetime, timedelta
 
 
@@ -35,7 +39,13 @@ class UI_body_scan_measurement_window(QWidget):
     mesh_z_length_lineEdit: QLineEdit = None
     mesh_z_max_length_label: QLabel = None
     mesh_z_num_of_steps_lineEdit: QLineEdit = None
+    mesh_roi_widget: UI_roi_mask_widget = None  # region of interest, see measurement_routines/roi_mask.py
     z_move_sleepTime_lineEdit: QLineEdit = None  # input sleep time as float [s] - after each movement in z-direction wait shortly because of vibration in body model
+    settling_checkbox: QCheckBox = None     # adaptive settling, see measurement_routines/settling.py
+    settling_amp_tolerance_lineEdit: QLineEdit = None
+    settling_phase_tolerance_lineEdit: QLineEdit = None
+    averaging_checkbox: QCheckBox = None    # adaptive averaging, see measurement_routines/adaptive_averaging.py
+    averaging_target_lineEdit: QLineEdit = None
 
     # VNA config inputs
     vna_config_filepath_lineEdit: QLineEdit = None  # filepath to .cst config file
@@ -47,6 +57,8 @@ class UI_body_scan_measurement_window(QWidget):
 
     #   start body scan button
     body_scan_start_button: QPushButton = None
+    body_scan_add_to_queue_button: QPushButton = None
+    body_scan_dry_run_button: QPushButton = None
 
     #   body scan progress frame
     body_scan_stop_button = QPushButton = None
@@ -62,7 +74,8 @@ class UI_body_scan_measurement_window(QWidget):
     meas_progress_status_label: QLabel = None
 
     #   Process Log
-    meas_progress_log_textEdit: QTextEdit = None
+    meas_progress_log_textEdit: QPlainTextEdit = None
+    __log_max_lines: int = 5000     # ring buffer, oldest lines are removed when exceeded
 
     #   2d graph visualization of mesh
     plot_2d_layout_widget: pg.GraphicsLayoutWidget = None
@@ -73,9 +86,17 @@ class UI_body_scan_measurement_window(QWidget):
     plot_xz_origin_cos: pg.PlotDataItem = None  # use 'origin' instead 'zero'!
     plot_xz_mesh_points: pg.PlotDataItem = None
 
+    #   debounced preview pipeline
+    mesh_preview_scheduler: MeshPreviewScheduler = None
+    __displayed_preview_keys: dict = None  # input-keys of displayed preview parts, to push only changed data
+
     def __init__(self, chamber_x_max_coor: float, chamber_y_max_coor: float, chamber_z_max_coor: float,
                  chamber_z_head_bed_offset: float):
         super().__init__()
+        self.__displayed_preview_keys = {}
+        self.mesh_preview_scheduler = MeshPreviewScheduler(collect_fn=self.__collect_mesh_preview_inputs,
+                                                           compute_fn=self.__compute_mesh_preview,
+                                                           apply_fn=self.__apply_mesh_preview)
 
         self.chamber_x_max_coor = chamber_x_max_coor
         self.chamber_y_max_coor = chamber_y_max_coor
@@ -100,9 +121,13 @@ class UI_body_scan_measurement_window(QWidget):
         vna_config_widget = self.__init_vna_config_widget()
         data_management_widget = self.__init_data_management_widget()
         self.body_scan_start_button = QPushButton("Start Body Scan Process")
+        self.body_scan_add_to_queue_button = QPushButton("Add Body Scan to Job Queue")
+        self.body_scan_dry_run_button = QPushButton("Dry Run (estimate Duration and File Size)")
         second_column.addWidget(vna_config_widget, stretch=0)
         second_column.addWidget(data_management_widget, stretch=0)
         second_column.addStretch(1)
+        second_column.addWidget(self.body_scan_dry_run_button, Qt.AlignmentFlag.AlignBottom)
+        second_column.addWidget(self.body_scan_add_to_queue_button, Qt.AlignmentFlag.AlignBottom)
         second_column.addWidget(self.body_scan_start_button, Qt.AlignmentFlag.AlignBottom)
 
         # Column 3
@@ -155,11 +180,13 @@ class UI_body_scan_measurement_window(QWidget):
         self.mesh_move_pattern_dropdown.setToolTip("Select movement pattern to go through measurement volume.\nBodyScan always cycles through all Z-coordinates per position first.")
         pattern_items = [
             "line-by-line",
-            "snake"
+            "snake",
+            "optimized"
         ]
         pattern_tooltips = [
             "Regular line-by-line movement. BodyScan always cycles through all Z-coordinates per position first, but line-by-line sticks to X_min -> X_max movement direction.",
-            "Snake-like movement. Probe moves always to next closest possible measurement position in XY-mesh.\n(+)Faster measurement process, (-)Less systematic cable error due to changing movement directions through mesh."
+            "Snake-like movement. Probe moves always to next closest possible measurement position in XY-mesh.\n(+)Faster measurement process, (-)Less systematic cable error due to changing movement directions through mesh.",
+            "Optimized order of XY-positions. Runs X-first or Y-first as line-by-line or snake, whichever has the shortest predicted travel time.\nPredicted travel time is shown in the log at start and by the dry run."
         ]
         for i, item in enumerate(pattern_items):
             self.mesh_move_pattern_dropdown.addItem(item)
@@ -185,6 +212,22 @@ class UI_body_scan_measurement_window(QWidget):
         self.mesh_z_max_length_label = QLabel("< max 0 mm")
         self.mesh_z_num_of_steps_lineEdit = QLineEdit("0")
         self.z_move_sleepTime_lineEdit = QLineEdit("0.0")
+        self.settling_checkbox = QCheckBox("adaptive")
+        self.settling_checkbox.setToolTip("Proceed as soon as fast PNA readings after the move agree within the\n"
+                                          "tolerances instead of sleeping. The sleep time is the timeout then.")
+        self.settling_checkbox.stateChanged.connect(self.__enable_settling_inputs_callback)
+        label_settling_tolerance = QLabel("Settle tol. [dB/deg]:")
+        self.settling_amp_tolerance_lineEdit = QLineEdit("0.1")
+        self.settling_phase_tolerance_lineEdit = QLineEdit("1.0")
+        self.__enable_settling_inputs_callback()
+        self.averaging_checkbox = QCheckBox("adaptive avg.")
+        self.averaging_checkbox.setToolTip("Average each point only until the measured sweep-to-sweep noise meets the\n"
+                                           "target uncertainty [dB]. The average number of the .cst file is the\n"
+                                           "maximum number of averages.")
+        self.averaging_checkbox.stateChanged.connect(self.__enable_averaging_inputs_callback)
+        label_averaging_target = QLabel("Avg. target [dB]:")
+        self.averaging_target_lineEdit = QLineEdit("0.05")
+        self.__enable_averaging_inputs_callback()
         # Assemble layout
         sub_layout.addWidget(move_pattern_label, 0, 0, 1, 1)
         sub_layout.addWidget(self.mesh_move_pattern_dropdown, 0, 1, 1, 2)
@@ -207,14 +250,21 @@ class UI_body_scan_measurement_window(QWidget):
         sub_layout.addWidget(self.mesh_z_num_of_steps_lineEdit, 7, 1, 1, 1)
         sub_layout.addWidget(label_sleep_time, 8, 0, 1, 1)
         sub_layout.addWidget(self.z_move_sleepTime_lineEdit, 8, 1, 1, 1)
-
-        # connect callbacks for plot updates when mesh changed
-        self.mesh_x_length_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_x_num_of_steps_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_y_length_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_y_num_of_steps_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_z_length_lineEdit.editingFinished.connect(self.update_2d_plots)
-        self.mesh_z_num_of_steps_lineEdit.editingFinished.connect(self.update_2d_plots)
+        sub_layout.addWidget(self.settling_checkbox, 8, 2, 1, 1)
+        sub_layout.addWidget(label_settling_tolerance, 9, 0, 1, 1)
+        sub_layout.addWidget(self.settling_amp_tolerance_lineEdit, 9, 1, 1, 1)
+        sub_layout.addWidget(self.settling_phase_tolerance_lineEdit, 9, 2, 1, 1)
+        self.mesh_roi_widget = UI_roi_mask_widget()
+        sub_layout.addWidget(label_averaging_target, 10, 0, 1, 1)
+        sub_layout.addWidget(self.averaging_target_lineEdit, 10, 1, 1, 1)
+        sub_layout.addWidget(self.averaging_checkbox, 10, 2, 1, 1)
+        sub_layout.addWidget(self.mesh_roi_widget, 11, 0, 1, 3)
+
+        # connect callbacks for plot updates when mesh changed, updates are debounced
+        for mesh_input_lineEdit in (self.mesh_x_length_lineEdit, self.mesh_x_num_of_steps_lineEdit,
+                                    self.mesh_y_length_lineEdit, self.mesh_y_num_of_steps_lineEdit,
+                                    self.mesh_z_length_lineEdit, self.mesh_z_num_of_steps_lineEdit):
+            mesh_input_lineEdit.textChanged.connect(self.update_2d_plots)
 
         return mesh_config_frame
 
@@ -402,9 +452,10 @@ class UI_body_scan_measurement_window(QWidget):
         progress_log_frame.setLayout(main_layout)
         main_layout.addWidget(main_label, alignment=Qt.AlignmentFlag.AlignLeft)
 
-        self.meas_progress_log_textEdit = QTextEdit()
+        self.meas_progress_log_textEdit = QPlainTextEdit()
         self.meas_progress_log_textEdit.setReadOnly(True)
-        self.meas_progress_log_textEdit.setText("No notifications yet...\n")
+        self.meas_progress_log_textEdit.setMaximumBlockCount(self.__log_max_lines)
+        self.meas_progress_log_textEdit.setPlainText("No notifications yet...\n")
         main_layout.addWidget(self.meas_progress_log_textEdit)
 
         return progress_log_frame
@@ -490,32 +541,72 @@ class UI_body_scan_measurement_window(QWidget):
 
     def update_2d_plots(self):
         """
-        Updates mesh points according to given mesh inputs
+        Requests update of mesh points according to given mesh inputs
         > So far only cubic supported
         > skips update if no zero position is logged completely
+
+        Rapid calls (e.g. typing) are coalesced by a short timer, the points are computed in a background thread and
+        only changed plots are updated afterwards.
+        """
+        self.mesh_preview_scheduler.request_update()
+        return
+
+    def __collect_mesh_preview_inputs(self):
+        """
+        Reads all inputs relevant for mesh preview on the GUI thread.
+        Returns None if no origin is logged or inputs are incomplete while typing.
         """
-        #   skip update if no zero position logged
         if self.current_origin_x is None or self.current_origin_y is None or self.current_origin_z is None:
-            return
-        #   update origin position in plot
-        xy_origin = np.array([[self.current_origin_x, self.current_origin_y]])
-        xz_origin = np.array([[self.current_origin_x, self.current_origin_z]])
-        self.plot_xy_zero_cos.setData(xy_origin)
-        self.plot_xz_zero_cos.setData(xz_origin)
-        #   update mesh points
-        mesh_info = self.get_mesh_data()
-        xy_mesh_points_list = []
-        for x in mesh_info['x_vec']:
-            for y in mesh_info['y_vec']:
-                xy_mesh_points_list.append([x, y])
-        xy_mesh_points_array = np.array(xy_mesh_points_list)
-        xz_mesh_points_list = []
-        for x in mesh_info['x_vec']:
-            for z in mesh_info['z_vec']:
-                xz_mesh_points_list.append([x, z])
-        xz_mesh_points_array = np.array(xz_mesh_points_list)
-        self.plot_xy_mesh_points.setData(xy_mesh_points_array)
-        self.plot_xz_mesh_points.setData(xz_mesh_points_array)
+            return None
+        try:
+            mesh_info = self.get_mesh_data()
+        except ValueError:
+            return None
+        if 0 in (mesh_info['num_steps_x'], mesh_info['num_steps_y'], mesh_info['num_steps_z']):
+            return None
+        return (mesh_info['x_vec'], mesh_info['y_vec'], mesh_info['z_vec'],
+                (self.current_origin_x, self.current_origin_y, self.current_origin_z),
+                dict(self.__displayed_preview_keys))
+
+    @staticmethod
+    def __compute_mesh_preview(x_vec: tuple, y_vec: tuple, z_vec: tuple, origin: tuple, displayed_keys: dict):
+        """
+        Computes points of all preview parts whose inputs differ from the displayed ones. Runs in worker thread.
+        Each part is returned as (key, data) or None if unchanged.
+        """
+        def vec_key(vec: tuple):
+            return len(vec), vec[0], vec[-1]
+
+        preview = {'origin': None, 'xy': None, 'xz': None}
+        if displayed_keys.get('origin') != origin:
+            preview['origin'] = (origin, (np.array([[origin[0], origin[1]]]), np.array([[origin[0], origin[2]]])))
+
+        xy_key = (vec_key(x_vec), vec_key(y_vec))
+        if displayed_keys.get('xy') != xy_key:
+            preview['xy'] = (xy_key, Visualizer.generate_2d_lod_point_list(x_vec, y_vec))
+
+        xz_key = (vec_key(x_vec), vec_key(z_vec))
+        if displayed_keys.get('xz') != xz_key:
+            preview['xz'] = (xz_key, Visualizer.generate_2d_lod_point_list(x_vec, z_vec))
+        return preview
+
+    def __apply_mesh_preview(self, preview: dict):
+        """
+        Pushes computed preview parts to 2d plots. Unchanged parts (None) are not touched.
+        """
+        if preview['origin'] is not None:
+            xy_origin, xz_origin = preview['origin'][1]
+            self.plot_xy_zero_cos.setData(xy_origin)
+            self.plot_xz_zero_cos.setData(xz_origin)
+        if preview['xy'] is not None:
+            self.plot_xy_mesh_points.setData(preview['xy'][1])
+        if preview['xz'] is not None:
+            self.plot_xz_mesh_points.setData(preview['xz'][1])
+
+        for part_name, part in preview.items():
+            if part is not None:
+                self.__displayed_preview_keys[part_name] = part[0]
+        return
 
     def update_live_coor_display(self, new_x: float, new_y: float, new_z: float):
         """
@@ -583,6 +674,8 @@ class UI_body_scan_measurement_window(QWidget):
         info_string += "IF Bandwidth: " + str(vna_info['if_bw']) + " Hz\n"
         info_string += "Output Power: " + str(vna_info['output_power']) + " dBm\n"
         info_string += "Number of Averages: " + str(vna_info['avg_num']) + "\n"
+        if vna_info.get('segments'):
+            info_string += "Segment Sweep: " + str(len(vna_info['segments'])) + " segments\n"
         self.vna_config_info_textEdit.setText(info_string)
 
     def update_body_scan_progress_state(self, state_info: dict):
@@ -647,7 +740,24 @@ class UI_body_scan_measurement_window(QWidget):
         time_now = datetime.now()
         timestamp = time_now.strftime("%H:%M:%S")
         new_text = '[' + timestamp + ']: ' + message
-        self.meas_progress_log_textEdit.append(new_text)
+        self.meas_progress_log_textEdit.appendPlainText(new_text)
+        return
+
+    def append_messages2log(self, messages: list[tuple[str, int, str]]):
+        """
+        Adds a batch of messages [(timestamp: str, level: int, message: str), ...] to the log field in one go.
+        Debug messages are skipped.
+        """
+        lines = []
+        for timestamp, level, message in messages:
+            if level < logging.INFO:
+                continue
+            if level >= logging.WARNING:
+                lines.append('[' + timestamp + '] ' + logging.getLevelName(level) + ': ' + message)
+            else:
+                lines.append('[' + timestamp + ']: ' + message)
+        if lines.__len__() > 0:
+            self.meas_progress_log_textEdit.appendPlainText('\n'.join(lines))
         return
 
     def get_mesh_data(self):
@@ -657,7 +767,7 @@ class UI_body_scan_measurement_window(QWidget):
                 dict:
                     {
                     'tot_num_of_points' : int
-                    'move_pattern' : str, either 'line-by-line' or 'snake'
+                    'move_pattern' : str, 'line-by-line', 'snake' or 'optimized'
                     'num_steps_x' : int
                     'num_steps_y' : int
                     'num_steps_z' : int
@@ -666,6 +776,9 @@ class UI_body_scan_measurement_window(QWidget):
                     'z_vec' : tuple(float,...) , vector that stores all z coordinates for chamber movement in growing order
                     'jog_speed' : float , speed in [mm/s] for chamber movement
                     'z_move_sleep_time' : float , sleep time in [s] after each z-movement
+                    'roi' : dict or None, region of interest relative to origin (see UI_roi_mask_widget)
+                    'settling' : dict or None, adaptive settling config (see get_settling_config())
+                    'averaging' : dict or None, adaptive averaging config (see get_averaging_config())
                     }
 
                 *Coordinates are already transferred to chamber-movement coordinate system based on set origin!*
@@ -690,30 +803,57 @@ class UI_body_scan_measurement_window(QWidget):
         y_linspace = np.linspace(y_origin, y_origin + y_length, y_num_steps)
         z_linspace = np.linspace(z_origin, z_origin + z_length, z_num_steps)
 
-        x_vec = []
-        for i in x_linspace:
-            x_vec.append(i)
-        y_vec = []
-        for i in y_linspace:
-            y_vec.append(i)
-        z_vec = []
-        for i in z_linspace:
-            z_vec.append(i)
-
         #   fill info dict
         info_dict['tot_num_of_points'] = x_num_steps * y_num_steps * z_num_steps
         info_dict['num_steps_x'] = x_num_steps
         info_dict['num_steps_y'] = y_num_steps
         info_dict['num_steps_z'] = z_num_steps
-        info_dict['x_vec'] = tuple(x_vec)
-        info_dict['y_vec'] = tuple(y_vec)
-        info_dict['z_vec'] = tuple(z_vec)
+        info_dict['x_vec'] = tuple(x_linspace)
+        info_dict['y_vec'] = tuple(y_linspace)
+        info_dict['z_vec'] = tuple(z_linspace)
         info_dict['jog_speed'] = float(self.body_scan_jogSpeed_LineEdit.text())
         info_dict['z_move_sleep_time'] = float(self.z_move_sleepTime_lineEdit.text())
         info_dict['move_pattern'] = move_pattern
+        info_dict['roi'] = self.mesh_roi_widget.get_roi_config()
+        info_dict['settling'] = self.get_settling_config()
+        info_dict['averaging'] = self.get_averaging_config()
 
         return info_dict
 
+    def get_settling_config(self):
+        """
+        :return: None if adaptive settling is disabled, otherwise dict
+            {'amp_tolerance': float [dB], 'phase_tolerance': float [deg]}, timeout is the sleep time of the mesh
+        """
+        if not self.settling_checkbox.isChecked():
+            return None
+        return {'amp_tolerance': float(self.settling_amp_tolerance_lineEdit.text()),
+                'phase_tolerance': float(self.settling_phase_tolerance_lineEdit.text())}
+
+    def __enable_settling_inputs_callback(self):
+        """
+        enables/disables textfields of the adaptive settling dependend on checkbox.
+        """
+        enable = self.settling_checkbox.isChecked()
+        self.settling_amp_tolerance_lineEdit.setEnabled(enable)
+        self.settling_phase_tolerance_lineEdit.setEnabled(enable)
+        return
+
+    def get_averaging_config(self):
+        """
+        :return: None if adaptive averaging is disabled, otherwise dict {'target_uncertainty': float [dB]}
+        """
+        if not self.averaging_checkbox.isChecked():
+            return None
+        return {'target_uncertainty': float(self.averaging_target_lineEdit.text())}
+
+    def __enable_averaging_inputs_callback(self):
+        """
+        enables/disables textfield of the adaptive averaging dependend on checkbox.
+        """
+        self.averaging_target_lineEdit.setEnabled(self.averaging_checkbox.isChecked())
+        return
+
     def get_vna_configuration(self):
         """
         Returns dict with all info necessary to configure the measurement routine.
@@ -738,6 +878,12 @@ class UI_body_scan_measurement_window(QWidget):
         self.mesh_z_length_lineEdit.setEnabled(False)
         self.mesh_z_num_of_steps_lineEdit.setEnabled(False)
         self.z_move_sleepTime_lineEdit.setEnabled(False)
+        self.settling_checkbox.setEnabled(False)
+        self.settling_amp_tolerance_lineEdit.setEnabled(False)
+        self.settling_phase_tolerance_lineEdit.setEnabled(False)
+        self.averaging_checkbox.setEnabled(False)
+        self.averaging_target_lineEdit.setEnabled(False)
+        self.mesh_roi_widget.setEnabled(False)
         self.vna_config_filepath_lineEdit.setEnabled(False)
         self.vna_config_filepath_check_button.setEnabled(False)
         self.filename_lineEdit.setEnabled(False)
@@ -756,6 +902,11 @@ class UI_body_scan_measurement_window(QWidget):
         self.mesh_z_length_lineEdit.setEnabled(True)
         self.mesh_z_num_of_steps_lineEdit.setEnabled(True)
         self.z_move_sleepTime_lineEdit.setEnabled(True)
+        self.settling_checkbox.setEnabled(True)
+        self.__enable_settling_inputs_callback()
+        self.averaging_checkbox.setEnabled(True)
+        self.__enable_averaging_inputs_callback()
+        self.mesh_roi_widget.setEnabled(True)
         self.vna_config_filepath_lineEdit.setEnabled(True)
         self.vna_config_filepath_check_button.setEnabled(True)
         self.filename_lineEdit.setEnabled(True)
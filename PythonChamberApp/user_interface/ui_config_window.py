@@ -1,8 +1,9 @@
 import sys
-from PyQt6.QtWidgets import QWidget, QLineEdit, QPushButton, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit, QGridLayout, \
-    QCheckBox, QComboBox
+from PyQt6.QtWidgets import QWidget, QLineEdit, QPushButton, QLabel, QVBoxLayout, QHBoxLayout, QPlainTextEdit, \
+    QGridLayout, QCheckBox, QComboBox
 from PyQt6.QtCore import QCoreApplication, Qt
 from datetime import datetime
+import logging
 
 
 class UI_config_window(QWidget):
@@ -18,8 +19,11 @@ class UI_config_window(QWidget):
     vna_connection_status_label: QLabel = None
     vna_connect_button: QPushButton = None
     vna_keysight_checkbox: QCheckBox = None
+    vna_command_optimization_checkbox: QCheckBox = None
 
-    config_console_textbox: QTextEdit = None
+    config_console_textbox: QPlainTextEdit = None
+    config_console_level_comboBox: QComboBox = None
+    __console_max_lines: int = 5000     # ring buffer, oldest lines are removed when exceeded
 
     def __init__(self):
         super().__init__()
@@ -89,6 +93,10 @@ class UI_config_window(QWidget):
         self.vna_connection_status_label = QLabel("Status: Not Connected")
         self.vna_connection_status_label.setStyleSheet("color : red;")
         self.vna_keysight_checkbox = QCheckBox("Use Keysight Hardware")
+        self.vna_command_optimization_checkbox = QCheckBox("Batch SCPI commands and cache settings")
+        self.vna_command_optimization_checkbox.setToolTip("Concatenates PNA commands to fewer GPIB transactions and skips "
+                                                          "writes of unchanged settings.\nDo not change settings at the "
+                                                          "PNA itself while connected!")
 
         vna_connect_layout.addWidget(title_label, 0,0,1,4, Qt.AlignmentFlag.AlignLeft)
         vna_connect_layout.addWidget(self.vna_list_ressources_button, 1,0,1,4, Qt.AlignmentFlag.AlignLeft)
@@ -97,6 +105,7 @@ class UI_config_window(QWidget):
         vna_connect_layout.addWidget(self.vna_connect_button,3,0,1,2)
         vna_connect_layout.addWidget(self.vna_connection_status_label,3,2,1,2,Qt.AlignmentFlag.AlignRight)
         vna_connect_layout.addWidget(self.vna_keysight_checkbox,4,0,1,4,Qt.AlignmentFlag.AlignLeft)
+        vna_connect_layout.addWidget(self.vna_command_optimization_checkbox,5,0,1,4,Qt.AlignmentFlag.AlignLeft)
         return vna_connect_widget
 
     def __init_console_field(self):
@@ -104,17 +113,27 @@ class UI_config_window(QWidget):
         console_widget = QWidget()
         console_widget.setLayout(console_layout)
 
-        self.config_console_textbox = QTextEdit()
+        self.config_console_textbox = QPlainTextEdit()
         self.config_console_textbox.setReadOnly(True)
+        self.config_console_textbox.setMaximumBlockCount(self.__console_max_lines)
         self.config_console_textbox.setPlainText("Here are all logged messages displayed the process controller "
                                                  "receives...\nPlease input your network device's network parameters "
                                                  "on the left and click 'Connect' to enable more functionality!")
 
         console_clear_button = QPushButton("Clear Console")
         console_clear_button.pressed.connect(self.clear_console)
+        console_level_label = QLabel("Show messages from level:")
+        self.config_console_level_comboBox = QComboBox()
+        self.config_console_level_comboBox.addItem("Debug", logging.DEBUG)
+        self.config_console_level_comboBox.addItem("Info", logging.INFO)
+        self.config_console_level_comboBox.addItem("Warning", logging.WARNING)
+        self.config_console_level_comboBox.addItem("Error", logging.ERROR)
+        self.config_console_level_comboBox.setCurrentIndex(1)
         mini_layout = QHBoxLayout()
         mini_layout.addWidget(console_clear_button)
         mini_layout.addStretch()
+        mini_layout.addWidget(console_level_label)
+        mini_layout.addWidget(self.config_console_level_comboBox)
 
         console_layout.addWidget(self.config_console_textbox)
         console_layout.addLayout(mini_layout)
@@ -128,7 +147,25 @@ class UI_config_window(QWidget):
         time_now = datetime.now()
         timestamp = time_now.strftime("%H:%M:%S")
         new_text = '[' + timestamp + ']: ' + message
-        self.config_console_textbox.append(new_text)
+        self.config_console_textbox.appendPlainText(new_text)
+        return
+
+    def append_messages2console(self, messages: list[tuple[str, int, str]]):
+        """
+        Adds a batch of messages [(timestamp: str, level: int, message: str), ...] to the console field in one go.
+        Messages below the level selected in the console dropdown are skipped.
+        """
+        min_level = self.config_console_level_comboBox.currentData()
+        lines = []
+        for timestamp, level, message in messages:
+            if level < min_level:
+                continue
+            if level >= logging.WARNING:
+                lines.append('[' + timestamp + '] ' + logging.getLevelName(level) + ': ' + message)
+            else:
+                lines.append('[' + timestamp + ']: ' + message)
+        if lines.__len__() > 0:
+            self.config_console_textbox.appendPlainText('\n'.join(lines))
         return
 
     def clear_console(self):
@@ -198,6 +235,12 @@ class UI_config_window(QWidget):
         """
         return self.vna_keysight_checkbox.isChecked()
 
+    def get_use_command_optimization(self):
+        """
+        :return: True >> batch SCPI commands and cache settings of the PNA, see E8361RemoteGPIB.pna_set_command_optimization()
+        """
+        return self.vna_command_optimization_checkbox.isChecked()
+
     def dummy_function(self):
         print("Dummy_function activated!")
         self.append_message2console("button pressed! Dummy_function activated!")
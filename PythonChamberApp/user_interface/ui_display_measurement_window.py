@@ -2,7 +2,9 @@ from PyQt6.QtWidgets import (QWidget, QLineEdit, QLabel, QBoxLayout, QComboBox,
                              QSlider, QVBoxLayout, QHBoxLayout, QFrame, QCheckBox)
 from PyQt6.QtCore import Qt
 import pyqtgraph as pg
+import pyqtgraph.opengl as gl
 import numpy as np
+from .ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
 from datetime import datetime
 # Modules to embed matplotlib canvas // Ignore unrecognized references!
 import matplotlib.axes
@@ -70,6 +72,17 @@ class UI_display_measurement_window(QWidget):
     xy_axes: matplotlib.axes.Axes = None
     xy_phase_axes: matplotlib.axes.Axes = None
 
+    # 3D volume widget
+    volume_enable_checkBox: QCheckBox = None
+    volume_mode_comboBox: QComboBox = None
+    volume_info_label: QLabel = None
+    volume_view_widget: gl.GLViewWidget = None
+    graphic_volume_obj: gl.GLVolumeItem = None
+    __volume_max_voxels: int = 96**3    # ~0.9M voxels, keeps texture upload fluent, 51^3 is displayed w/o decimation
+    __volume_displayed_key: tuple = None    # (parameter, freq idx, mode, unit) of texture that is currently uploaded
+    __volume_stride: int = 1
+    __volume_center: tuple = None
+
     def __init__(self):
         super().__init__()
 
@@ -81,6 +94,7 @@ class UI_display_measurement_window(QWidget):
 
         left_column = QVBoxLayout()
         left_column.addWidget(data_selection_widget, alignment=Qt.AlignmentFlag.AlignLeft)
+        left_column.addWidget(self.__init_volume_widget(), stretch=1)
         main_layout.addLayout(left_column, stretch=0)
 
         right_column = QVBoxLayout()
@@ -142,6 +156,37 @@ class UI_display_measurement_window(QWidget):
 
         return main_widget
 
+    def __init_volume_widget(self):
+        main_widget = QFrame()
+        main_widget.setFrameStyle(QFrame.Shape.StyledPanel)
+        main_widget.setContentsMargins(5, 5, 5, 5)
+        main_layout = QGridLayout()
+        main_widget.setLayout(main_layout)
+
+        header = QLabel("3D View")
+        header.setStyleSheet("text-decoration: underline; font-size: 16px; font-weight: bold;")
+        self.volume_enable_checkBox = QCheckBox("Show Volume")
+        self.volume_enable_checkBox.setChecked(False)
+        self.volume_mode_comboBox = QComboBox()
+        self.volume_mode_comboBox.addItems(["Amplitude", "Phase"])
+        self.volume_info_label = QLabel("No volume displayed")
+
+        self.volume_view_widget = gl.GLViewWidget()
+        self.volume_view_widget.setBackgroundColor("d")
+        self.volume_view_widget.setMinimumSize(300, 300)
+        cos = gl.GLAxisItem()
+        cos.setSize(x=50, y=50, z=50)
+        self.volume_view_widget.addItem(cos)
+
+        main_layout.addWidget(header, 0, 0, 1, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+        main_layout.addWidget(self.volume_enable_checkBox, 1, 0, 1, 1, alignment=Qt.AlignmentFlag.AlignLeft)
+        main_layout.addWidget(self.volume_mode_comboBox, 1, 1, 1, 1, alignment=Qt.AlignmentFlag.AlignRight)
+        main_layout.addWidget(self.volume_view_widget, 2, 0, 1, 2)
+        main_layout.addWidget(self.volume_info_label, 3, 0, 1, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+        main_layout.setRowStretch(2, 10)
+
+        return main_widget
+
     def __init_data_plot_widget(self):
         main_widget = QFrame()
         main_widget.setFrameStyle(QFrame.Shape.StyledPanel)
@@ -285,11 +330,28 @@ class UI_display_measurement_window(QWidget):
             f"X:[{measurement_config['mesh_x_min']} : {measurement_config['mesh_x_steps']} :  {measurement_config['mesh_x_max']}]\n"
             f"Y:[{measurement_config['mesh_y_min']} : {measurement_config['mesh_y_steps']} : {measurement_config['mesh_y_max']}]\n"
             f"Z:[{measurement_config['mesh_z_min']} : {measurement_config['mesh_z_steps']} : {measurement_config['mesh_z_max']}]\n")
+        if 'adaptive_refinement' in measurement_config:
+            info_string += (f"Adaptive refinement: {measurement_config['adaptive_refinement']['num_points_measured']} "
+                            f"points measured, others interpolated\n")
+        if 'roi' in measurement_config:
+            info_string += f"Region of interest: {measurement_config['roi']['shape']}, points outside are zero\n"
+        if 'continuous' in measurement_config:
+            info_string += (f"Continuous line scan: {measurement_config['continuous'].get('num_sweeps')} sweeps at "
+                            f"{round(measurement_config['continuous']['line_speed'], 2)} mm/s, resampled onto mesh\n")
+        if 'settling' in measurement_config:
+            info_string += (f"Adaptive settling: mean {round(measurement_config['settling'].get('mean_settle_time', 0), 3)}s, "
+                            f"{measurement_config['settling'].get('num_timeouts', 0)} timeouts\n")
+        if 'adaptive_averaging' in measurement_config:
+            info_string += (f"Adaptive averaging: mean {round(measurement_config['adaptive_averaging'].get('mean_averages', 0), 1)} "
+                            f"of max {measurement_config['adaptive_averaging']['max_averages']} averages, "
+                            f"target {measurement_config['adaptive_averaging']['target_uncertainty']} dB\n")
         info_string += f"Zero position: {measurement_config['zero_position']}\n"
         info_string += f"Movementspeed: {measurement_config['movespeed']} mm/s\n"
         info_string += f"*VNA Configuration:\n"
         info_string += f"Measured parameters: {measurement_config['parameter']}\n"
         info_string += f"Frequency: [{measurement_config['freq_start']} : {measurement_config['freq_stop']}] [Hz] with {measurement_config['sweep_num_points']} points\n"
+        if measurement_config.get('segments'):
+            info_string += f"Segment sweep: {len(measurement_config['segments'])} segments, non-uniform frequency axis\n"
         info_string += f"IF Bandwidth: {measurement_config['if_bw']} [Hz]\n"
         info_string += f"RF Output Power: {measurement_config['output_power']} [dBm]\n"
         info_string += f"Averaged over {measurement_config['average_number']} sweeps for each point"
@@ -377,6 +439,8 @@ class UI_display_measurement_window(QWidget):
         self.yz_plot_x_select_lineEdit.setEnabled(True)
         self.xy_plot_z_select_slider.setEnabled(True)
         self.xy_plot_z_select_lineEdit.setEnabled(True)
+        self.volume_enable_checkBox.setEnabled(True)
+        self.volume_mode_comboBox.setEnabled(True)
         return
 
     def disable_plot_interactions(self):
@@ -394,6 +458,8 @@ class UI_display_measurement_window(QWidget):
         self.yz_plot_x_select_lineEdit.setEnabled(False)
         self.xy_plot_z_select_slider.setEnabled(False)
         self.xy_plot_z_select_lineEdit.setEnabled(False)
+        self.volume_enable_checkBox.setEnabled(False)
+        self.volume_mode_comboBox.setEnabled(False)
         return
 
     def get_selected_measurement_file(self):
@@ -689,6 +755,86 @@ class UI_display_measurement_window(QWidget):
         return
 
 
+    def get_volume_display_enabled(self):
+        """
+        Returns True if 3D volume display is checked in GUI
+        """
+        return self.volume_enable_checkBox.isChecked()
+
+    def reset_volume_plot(self):
+        """
+        Removes the current volume from 3D view and forgets which texture was uploaded.
+        Must be called when a new measurement file is read.
+        """
+        if self.graphic_volume_obj is not None:
+            self.volume_view_widget.removeItem(self.graphic_volume_obj)
+            self.graphic_volume_obj = None
+        self.__volume_displayed_key = None
+        self.__volume_stride = 1
+        self.__volume_center = None
+        self.volume_info_label.setText("No volume displayed")
+        return
+
+    def update_volume_plot(self, data_amp_volume: np.ndarray, data_phase_volume: np.ndarray):
+        """
+        Receives 3d arrays with amplitude and phase values of the selected parameter and frequency, indexed
+        [x, y, z] like the coordinate vectors. Displays amplitude (dBmax or linear like 2D plots) or phase (opacity
+        weighted by amplitude) as volume in 3D view.
+
+        The volume texture is only rebuilt and uploaded to the GPU if parameter, frequency, volume mode or display unit
+        changed since the last call. Otherwise, only the placement in AUT/chamber coordinates is updated.
+        Dense measurements are decimated automatically to at most __volume_max_voxels voxels.
+        """
+        if self.volume_enable_checkBox.isChecked() is False:
+            if self.graphic_volume_obj is not None:
+                self.graphic_volume_obj.setVisible(False)
+            return
+
+        if self.coor_AUT_checkBox.isChecked() is True:
+            x_vec = self.x_vector.__sub__(self.x_zero_pos)
+            y_vec = self.y_vector.__sub__(self.y_zero_pos)
+            z_vec = self.z_vector.__sub__(self.z_zero_pos)
+        else:
+            x_vec, y_vec, z_vec = self.x_vector, self.y_vector, self.z_vector
+
+        volume_key = (self.get_selected_parameter(), self.get_selected_frequency_by_idx(),
+                      self.volume_mode_comboBox.currentText(), self.unit_display_comboBox.currentText())
+        if volume_key != self.__volume_displayed_key:
+            amp_volume, self.__volume_stride = Visualizer.downsample_volume(data_amp_volume, self.__volume_max_voxels)
+            if self.unit_display_comboBox.currentText() == "dBmax":
+                # floor to avoid log10(0) of unmeasured points
+                amp_volume = 10 * np.log10(np.maximum(amp_volume / amp_volume.max(), 1e-12))
+            if self.volume_mode_comboBox.currentText() == "Phase":
+                phase_volume, _ = Visualizer.downsample_volume(data_phase_volume, self.__volume_max_voxels)
+                rgba_data = Visualizer.generate_3d_volume_rgba(phase_volume, cmap_name='hsv', alpha_values=amp_volume)
+            else:
+                rgba_data = Visualizer.generate_3d_volume_rgba(amp_volume, cmap_name='Spectral_r')
+
+            if self.graphic_volume_obj is None:
+                self.graphic_volume_obj = Visualizer.generate_3d_volume_obj(rgba_data, x_vec, y_vec, z_vec,
+                                                                            self.__volume_stride)
+                self.volume_view_widget.addItem(self.graphic_volume_obj)
+            else:
+                self.graphic_volume_obj.setData(rgba_data)
+            self.__volume_displayed_key = volume_key
+
+            displayed_shape = rgba_data.shape[:3]
+            info_string = f"Displayed grid: {displayed_shape[0]} x {displayed_shape[1]} x {displayed_shape[2]}"
+            if self.__volume_stride > 1:
+                info_string += f" (every {self.__volume_stride}. point)"
+            self.volume_info_label.setText(info_string)
+
+        Visualizer.place_3d_volume_obj(self.graphic_volume_obj, x_vec, y_vec, z_vec, self.__volume_stride)
+        self.graphic_volume_obj.setVisible(True)
+        # only move camera when volume moved (new file or coordinate system toggled) to keep user's view otherwise
+        volume_center = ((x_vec[0] + x_vec[-1]) / 2, (y_vec[0] + y_vec[-1]) / 2, (z_vec[0] + z_vec[-1]) / 2)
+        if volume_center != self.__volume_center:
+            self.__volume_center = volume_center
+            self.volume_view_widget.setCameraPosition(pos=pg.Vector(*volume_center),
+                                                      distance=2 * max(abs(x_vec[-1] - x_vec[0]),
+                                                                       abs(y_vec[-1] - y_vec[0]),
+                                                                       abs(z_vec[-1] - z_vec[0]), 10.0))
+        return
 
     @staticmethod
     def gen_meshgrid_from_meas_points(x_vec: np.ndarray, y_vec: np.ndarray):
@@ -0,0 +1,140 @@
+from PyQt6.QtWidgets import QWidget, QPushButton, QLabel, QVBoxLayout, QHBoxLayout, QTableWidget, \
+    QTableWidgetItem, QAbstractItemView, QHeaderView, QFrame
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+import os
+
+
+class UI_job_queue_window(QWidget):
+    """
+    Tab that lists the queued measurement jobs and controls the unattended execution of the queue.
+    Jobs are added by the 'Add to Queue' buttons of the auto measurement and body scan tab.
+    """
+    # Properties
+    job_table: QTableWidget = None
+    job_queue_start_button: QPushButton = None
+    job_queue_stop_button: QPushButton = None
+    job_move_up_button: QPushButton = None
+    job_move_down_button: QPushButton = None
+    job_remove_button: QPushButton = None
+    job_clear_finished_button: QPushButton = None
+    job_queue_status_label: QLabel = None
+
+    __column_names = ['ID', 'Type', 'File', 'Points', 'VNA Config', 'Status', 'Started', 'Finished', 'Message']
+    __status_colors = {'pending': None, 'running': QColor(180, 220, 255), 'done': QColor(190, 240, 190),
+                       'failed': QColor(255, 190, 190), 'stopped': QColor(255, 230, 170),
+                       'interrupted': QColor(255, 230, 170)}
+
+    def __init__(self):
+        super().__init__()
+
+        main_layout = QHBoxLayout()
+        control_widget = self.__init_queue_control_widget()
+        self.job_table = QTableWidget(0, len(self.__column_names))
+        self.job_table.setHorizontalHeaderLabels(self.__column_names)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.job_table.horizontalHeader().setStretchLastSection(True)
+
+        main_layout.addWidget(control_widget, stretch=0, alignment=Qt.AlignmentFlag.AlignTop)
+        main_layout.addWidget(self.job_table, stretch=1)
+        self.setLayout(main_layout)
+
+    def __init_queue_control_widget(self):
+        """
+        Initialize 'Job Queue' control frame and return it
+        """
+        control_frame = QFrame()
+        control_frame.setFrameStyle(QFrame.Shape.StyledPanel)
+        control_frame.setContentsMargins(5, 5, 5, 5)
+        control_frame.setFixedWidth(300)
+        frame_layout = QVBoxLayout()
+        control_frame.setLayout(frame_layout)
+
+        main_label = QLabel("Measurement Job Queue")
+        main_label.setStyleSheet("text-decoration: underline; font-size: 16px; font-weight: bold;")
+        info_label = QLabel("* Add jobs via 'Add to Queue' in the Auto Measurement\nor Body Scan tab. Jobs are run one "
+                            "after another.\nThe PNA is only reconfigured if the config changes.\nThe queue is kept "
+                            "when the app is closed.")
+        info_label.setStyleSheet("font: italic")
+        self.job_queue_start_button = QPushButton("Start Queue")
+        self.job_queue_stop_button = QPushButton("Stop Queue after current Job")
+        self.job_queue_stop_button.setEnabled(False)
+        self.job_move_up_button = QPushButton("Move Job up")
+        self.job_move_down_button = QPushButton("Move Job down")
+        self.job_remove_button = QPushButton("Remove Job")
+        self.job_clear_finished_button = QPushButton("Clear finished Jobs")
+        self.job_queue_status_label = QLabel("Queue idle")
+
+        frame_layout.addWidget(main_label, alignment=Qt.AlignmentFlag.AlignCenter)
+        frame_layout.addWidget(info_label)
+        frame_layout.addWidget(self.job_queue_start_button)
+        frame_layout.addWidget(self.job_queue_stop_button)
+        line_layout = QHBoxLayout()
+        line_layout.addWidget(self.job_move_up_button)
+        line_layout.addWidget(self.job_move_down_button)
+        frame_layout.addLayout(line_layout)
+        frame_layout.addWidget(self.job_remove_button)
+        frame_layout.addWidget(self.job_clear_finished_button)
+        frame_layout.addWidget(self.job_queue_status_label)
+
+        return control_frame
+
+    def update_job_table(self, jobs: list[dict]):
+        """
+        Shows given jobs of the MeasurementJobQueue in the table. Keeps the selection if the job is still listed.
+        """
+        selected_id = self.get_selected_job_id()
+        self.job_table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            spec = job['spec']
+            mesh = spec['mesh']
+            if 'x_vec' in mesh:
+                num_points = len(mesh['x_vec']) * len(mesh['y_vec']) * len(mesh['z_vec'])
+            else:
+                num_points = mesh['x_num_steps'] * mesh['y_num_steps'] * mesh['z_num_steps']
+            if 'preset_file' in spec['vna_config']:
+                vna_text = os.path.basename(spec['vna_config']['preset_file'])
+            elif spec['vna_config'].get('segments'):
+                segments = spec['vna_config']['segments']
+                vna_text = (f"{'/'.join(spec['vna_config']['parameter'])}, {len(segments)} segments, "
+                            f"{sum(segment['sweep_num_points'] for segment in segments)} pts")
+            else:
+                vna_text = (f"{'/'.join(spec['vna_config']['parameter'])}, {spec['vna_config']['freq_start'] / 1e9:g}-"
+                            f"{spec['vna_config']['freq_stop'] / 1e9:g} GHz, {spec['vna_config']['sweep_num_points']} pts")
+            texts = [str(job['id']), 'Auto Measurement' if spec['type'] == 'auto_measurement' else 'Body Scan',
+                     os.path.basename(spec['output_file']), str(num_points), vna_text, job['status'], job['started'],
+                     job['finished'], job['message']]
+            color = self.__status_colors.get(job['status'])
+            for column, text in enumerate(texts):
+                item = QTableWidgetItem(text)
+                if color is not None:
+                    item.setBackground(color)
+                self.job_table.setItem(row, column, item)
+            if job['id'] == selected_id:
+                self.job_table.selectRow(row)
+        return
+
+    def get_selected_job_id(self):
+        """
+        :return: id of the selected job as int or None if no job selected
+        """
+        rows = self.job_table.selectionModel().selectedRows()
+        if len(rows) == 0:
+            return None
+        item = self.job_table.item(rows[0].row(), 0)
+        if item is None:
+            return None
+        return int(item.text())
+
+    def set_queue_running(self, running: bool, status_msg: str):
+        """
+        Switches start/stop button and shows given status message.
+        """
+        self.job_queue_start_button.setEnabled(not running)
+        self.job_queue_stop_button.setEnabled(running)
+        self.job_queue_status_label.setText(status_msg)
+        return
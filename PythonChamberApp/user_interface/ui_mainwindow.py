@@ -10,6 +10,7 @@ from .ui_vna_control_window import UI_vna_control_window
 from .ui_auto_measurement import UI_auto_measurement_window
 from .ui_display_measurement_window import UI_display_measurement_window
 from .ui_body_scan_measurement import UI_body_scan_measurement_window
+from .ui_job_queue_window import UI_job_queue_window
 
 
 class MainWindow(QMainWindow):
@@ -27,6 +28,7 @@ class MainWindow(QMainWindow):
     ui_auto_measurement_window: UI_auto_measurement_window = None
     ui_display_measurement_window: UI_display_measurement_window = None
     ui_body_scan_window: UI_body_scan_measurement_window = None
+    ui_job_queue_window: UI_job_queue_window = None
 
     main_status_bar: QStatusBar = None
 
@@ -53,6 +55,7 @@ class MainWindow(QMainWindow):
         self.ui_auto_measurement_window = UI_auto_measurement_window(chamber_x_max_coor, chamber_y_max_coor, chamber_z_max_coor, chamber_z_head_bed_offset)
         self.ui_display_measurement_window = UI_display_measurement_window()
         self.ui_body_scan_window = UI_body_scan_measurement_window(chamber_x_max_coor, chamber_y_max_coor, chamber_z_max_coor, chamber_z_head_bed_offset)
+        self.ui_job_queue_window = UI_job_queue_window()
 
         self.tabs.addTab(self.ui_config_window, 'Config')  # Tab 0
         self.tabs.addTab(self.ui_chamber_control_window, 'Chamber control')  # Tab 1
@@ -60,12 +63,14 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.ui_auto_measurement_window, 'Auto Measurement')   # Tab 3
         self.tabs.addTab(self.ui_body_scan_window, 'Body Scan')     # Tab 4
         self.tabs.addTab(self.ui_display_measurement_window, 'Display Measurements')    # Tab 5
+        self.tabs.addTab(self.ui_job_queue_window, 'Job Queue')     # Tab 6
         self.tabs.setTabEnabled(0, True)
         self.tabs.setTabEnabled(1, False)       # Modify here when testing GUI elements without valid app config
         self.tabs.setTabEnabled(2, False)
         self.tabs.setTabEnabled(3, False)
         self.tabs.setTabEnabled(4, False)
         self.tabs.setTabEnabled(5, True)        # always enable!
+        self.tabs.setTabEnabled(6, True)        # always enable, queue can be edited without connection
 
         self.setCentralWidget(self.tabs)
         return
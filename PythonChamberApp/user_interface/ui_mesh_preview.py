@@ -0,0 +1,97 @@
+"""
+Helper to compute mesh-preview geometry for the measurement tabs off the GUI thread.
+
+Mesh inputs are edited key by key. Each edit (re)starts a short single-shot timer so rapid edits are coalesced into
+one request. The geometry of the request is computed by a MeshPreviewWorker in the global QThreadPool and handed back
+to the GUI thread via signal. Results of outdated requests are dropped by comparing the request id.
+"""
+import sys
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QTimer, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class MeshPreviewSignals(QObject):
+    """
+    Defines the signals available from a running MeshPreviewWorker.
+
+    result
+        tuple (request_id: int, data: dict) returned by the compute function
+
+    error
+        tuple (exctype, value, traceback.format_exc() )
+    """
+    result = pyqtSignal(tuple)
+    error = pyqtSignal(tuple)
+
+
+class MeshPreviewWorker(QRunnable):
+    """
+    Runs compute_fn(*args) in a thread of the QThreadPool and emits its return value tagged with request_id.
+
+    :param request_id: id of the preview request, used by the receiver to discard outdated results
+    :param compute_fn: function that calculates the preview geometry. Must not touch any Qt widgets!
+    """
+    def __init__(self, request_id: int, compute_fn, *args):
+        super(MeshPreviewWorker, self).__init__()
+        self.request_id = request_id
+        self.compute_fn = compute_fn
+        self.args = args
+        self.signals = MeshPreviewSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            data = self.compute_fn(*self.args)
+        except:
+            traceback.print_exc()
+            exctype, value = sys.exc_info()[:2]
+            self.signals.error.emit((exctype, value, traceback.format_exc()))
+        else:
+            self.signals.result.emit((self.request_id, data))
+
+
+class MeshPreviewScheduler(QObject):
+    """
+    Coalesces preview requests of one measurement tab and runs the latest one in the background.
+
+    :param collect_fn: called on the GUI thread when the timer fires. Returns tuple of arguments for compute_fn or
+        None if current inputs are incomplete/invalid and no update should be done.
+    :param compute_fn: called in worker thread with arguments from collect_fn, returns dict with preview data.
+    :param apply_fn: called on the GUI thread with the dict of the latest request.
+    :param delay_ms: time without new request before the computation is started
+    """
+    def __init__(self, collect_fn, compute_fn, apply_fn, delay_ms: int = 150):
+        super().__init__()
+        self.__collect_fn = collect_fn
+        self.__compute_fn = compute_fn
+        self.__apply_fn = apply_fn
+        self.__request_id = 0
+        self.__timer = QTimer()
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(delay_ms)
+        self.__timer.timeout.connect(self.__start_worker)
+
+    def request_update(self):
+        """
+        (Re)starts the coalescing timer. Can be connected to any signal of the mesh inputs.
+        """
+        self.__timer.start()
+        return
+
+    def __start_worker(self):
+        args = self.__collect_fn()
+        if args is None:
+            return
+        self.__request_id += 1
+        worker = MeshPreviewWorker(self.__request_id, self.__compute_fn, *args)
+        worker.signals.result.connect(self.__receive_result)
+        QThreadPool.globalInstance().start(worker)
+        return
+
+    def __receive_result(self, result: tuple):
+        request_id, data = result
+        # drop outdated results when inputs changed again while computing
+        if request_id != self.__request_id or self.__timer.isActive():
+            return
+        self.__apply_fn(data)
+        return
@@ -0,0 +1,176 @@
+"""
+Inputs of the region of interest mask, shared by the auto measurement and body scan tab.
+See measurement_routines/roi_mask.py for the meaning of the ROI config.
+"""
+from PyQt6.QtWidgets import QWidget, QLineEdit, QLabel, QGridLayout, QComboBox, QStackedWidget, QCheckBox, \
+    QPushButton, QFileDialog
+
+
+class UI_roi_mask_widget(QWidget):
+    """
+    Dropdown to select the ROI shape and the inputs of the selected shape.
+    All coordinates are relative to the zero position (auto measurement) or origin (body scan) in [mm].
+    """
+    roi_shape_dropdown: QComboBox = None
+    roi_invert_checkbox: QCheckBox = None
+    stacked_roi_inputs_widget: QStackedWidget = None
+
+    cylinder_center_x_lineEdit: QLineEdit = None
+    cylinder_center_y_lineEdit: QLineEdit = None
+    cylinder_radius_lineEdit: QLineEdit = None
+
+    sphere_center_x_lineEdit: QLineEdit = None
+    sphere_center_y_lineEdit: QLineEdit = None
+    sphere_center_z_lineEdit: QLineEdit = None
+    sphere_radius_lineEdit: QLineEdit = None
+
+    polygon_points_lineEdit: QLineEdit = None   # 'x0,y0; x1,y1; ...'
+
+    image_path_lineEdit: QLineEdit = None
+    image_x_min_lineEdit: QLineEdit = None
+    image_x_max_lineEdit: QLineEdit = None
+    image_y_min_lineEdit: QLineEdit = None
+    image_y_max_lineEdit: QLineEdit = None
+    image_threshold_lineEdit: QLineEdit = None
+
+    def __init__(self):
+        super().__init__()
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        roi_shape_label = QLabel("Region of interest:")
+        self.roi_shape_dropdown = QComboBox()
+        self.roi_shape_dropdown.addItems(['whole mesh', 'cylinder', 'sphere', 'polygon', 'image'])
+        self.roi_shape_dropdown.setToolTip("Only points of the mesh inside of the region are measured.\n"
+                                           "Coordinates relative to zero position / origin in [mm].")
+        self.roi_invert_checkbox = QCheckBox("invert")
+        self.roi_invert_checkbox.setToolTip("Measure the points outside of the region instead.")
+
+        self.stacked_roi_inputs_widget = QStackedWidget()
+        self.stacked_roi_inputs_widget.addWidget(QWidget())     # [0] whole mesh
+        self.stacked_roi_inputs_widget.addWidget(self.__init_cylinder_inputs())  # [1]
+        self.stacked_roi_inputs_widget.addWidget(self.__init_sphere_inputs())    # [2]
+        self.stacked_roi_inputs_widget.addWidget(self.__init_polygon_inputs())   # [3]
+        self.stacked_roi_inputs_widget.addWidget(self.__init_image_inputs())     # [4] end!
+        self.roi_shape_dropdown.currentIndexChanged.connect(self.__switch_roi_inputs)
+        self.__switch_roi_inputs(0)
+
+        layout.addWidget(roi_shape_label, 0, 0, 1, 1)
+        layout.addWidget(self.roi_shape_dropdown, 0, 1, 1, 1)
+        layout.addWidget(self.roi_invert_checkbox, 0, 2, 1, 1)
+        layout.addWidget(self.stacked_roi_inputs_widget, 1, 0, 1, 3)
+
+    def __init_cylinder_inputs(self):
+        widget = QWidget()
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(layout)
+        self.cylinder_center_x_lineEdit = QLineEdit("0")
+        self.cylinder_center_y_lineEdit = QLineEdit("0")
+        self.cylinder_radius_lineEdit = QLineEdit("50")
+        layout.addWidget(QLabel("Center X/Y:"), 0, 0, 1, 1)
+        layout.addWidget(self.cylinder_center_x_lineEdit, 0, 1, 1, 1)
+        layout.addWidget(self.cylinder_center_y_lineEdit, 0, 2, 1, 1)
+        layout.addWidget(QLabel("Radius:"), 1, 0, 1, 1)
+        layout.addWidget(self.cylinder_radius_lineEdit, 1, 1, 1, 1)
+        layout.addWidget(QLabel("mm"), 1, 2, 1, 1)
+        return widget
+
+    def __init_sphere_inputs(self):
+        widget = QWidget()
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(layout)
+        self.sphere_center_x_lineEdit = QLineEdit("0")
+        self.sphere_center_y_lineEdit = QLineEdit("0")
+        self.sphere_center_z_lineEdit = QLineEdit("0")
+        self.sphere_radius_lineEdit = QLineEdit("50")
+        layout.addWidget(QLabel("Center X/Y/Z:"), 0, 0, 1, 1)
+        layout.addWidget(self.sphere_center_x_lineEdit, 0, 1, 1, 1)
+        layout.addWidget(self.sphere_center_y_lineEdit, 0, 2, 1, 1)
+        layout.addWidget(self.sphere_center_z_lineEdit, 0, 3, 1, 1)
+        layout.addWidget(QLabel("Radius:"), 1, 0, 1, 1)
+        layout.addWidget(self.sphere_radius_lineEdit, 1, 1, 1, 1)
+        layout.addWidget(QLabel("mm"), 1, 2, 1, 1)
+        return widget
+
+    def __init_polygon_inputs(self):
+        widget = QWidget()
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(layout)
+        self.polygon_points_lineEdit = QLineEdit("-50,-50; 50,-50; 0,50")
+        self.polygon_points_lineEdit.setToolTip("Corners of the XY-outline as 'x0,y0; x1,y1; ...' in [mm],\n"
+                                                "the outline is used for all Z-coordinates.")
+        layout.addWidget(QLabel("Corners:"), 0, 0, 1, 1)
+        layout.addWidget(self.polygon_points_lineEdit, 0, 1, 1, 1)
+        return widget
+
+    def __init_image_inputs(self):
+        widget = QWidget()
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(layout)
+        self.image_path_lineEdit = QLineEdit("")
+        self.image_path_lineEdit.setToolTip("Mask image (.png or .npy) of the XY-plane, bright pixels are inside.")
+        image_browse_button = QPushButton("...")
+        image_browse_button.setFixedWidth(30)
+        image_browse_button.clicked.connect(self.__browse_image_callback)
+        self.image_x_min_lineEdit = QLineEdit("-100")
+        self.image_x_max_lineEdit = QLineEdit("100")
+        self.image_y_min_lineEdit = QLineEdit("-100")
+        self.image_y_max_lineEdit = QLineEdit("100")
+        self.image_threshold_lineEdit = QLineEdit("0.5")
+        self.image_threshold_lineEdit.setToolTip("Pixels brighter than threshold (0...1) are inside.")
+        layout.addWidget(QLabel("Image:"), 0, 0, 1, 1)
+        layout.addWidget(self.image_path_lineEdit, 0, 1, 1, 2)
+        layout.addWidget(image_browse_button, 0, 3, 1, 1)
+        layout.addWidget(QLabel("X min/max:"), 1, 0, 1, 1)
+        layout.addWidget(self.image_x_min_lineEdit, 1, 1, 1, 1)
+        layout.addWidget(self.image_x_max_lineEdit, 1, 2, 1, 1)
+        layout.addWidget(QLabel("Y min/max:"), 2, 0, 1, 1)
+        layout.addWidget(self.image_y_min_lineEdit, 2, 1, 1, 1)
+        layout.addWidget(self.image_y_max_lineEdit, 2, 2, 1, 1)
+        layout.addWidget(QLabel("Threshold:"), 3, 0, 1, 1)
+        layout.addWidget(self.image_threshold_lineEdit, 3, 1, 1, 1)
+        return widget
+
+    def __switch_roi_inputs(self, index):
+        self.stacked_roi_inputs_widget.setCurrentIndex(index)
+        self.roi_invert_checkbox.setEnabled(index > 0)
+
+    def __browse_image_callback(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select mask image", "", "Mask images (*.png *.npy)")
+        if file_path != '':
+            self.image_path_lineEdit.setText(file_path)
+
+    def get_roi_config(self):
+        """
+        :return: None if the whole mesh is measured, otherwise ROI config dict (see measurement_routines/roi_mask.py)
+        """
+        shape = self.roi_shape_dropdown.currentText()
+        if shape == 'cylinder':
+            roi = {'shape': 'cylinder',
+                   'center': [float(self.cylinder_center_x_lineEdit.text()),
+                              float(self.cylinder_center_y_lineEdit.text())],
+                   'radius': float(self.cylinder_radius_lineEdit.text())}
+        elif shape == 'sphere':
+            roi = {'shape': 'sphere',
+                   'center': [float(self.sphere_center_x_lineEdit.text()), float(self.sphere_center_y_lineEdit.text()),
+                              float(self.sphere_center_z_lineEdit.text())],
+                   'radius': float(self.sphere_radius_lineEdit.text())}
+        elif shape == 'polygon':
+            roi = {'shape': 'polygon',
+                   'points': [[float(coor) for coor in point.split(',')]
+                              for point in self.polygon_points_lineEdit.text().split(';') if point.strip() != '']}
+        elif shape == 'image':
+            roi = {'shape': 'image', 'path': self.image_path_lineEdit.text(),
+                   'x_range': [float(self.image_x_min_lineEdit.text()), float(self.image_x_max_lineEdit.text())],
+                   'y_range': [float(self.image_y_min_lineEdit.text()), float(self.image_y_max_lineEdit.text())],
+                   'threshold': float(self.image_threshold_lineEdit.text())}
+        else:
+            return None
+        if self.roi_invert_checkbox.isChecked():
+            roi['invert'] = True
+        return roi
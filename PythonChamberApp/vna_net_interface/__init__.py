@@ -2,4 +2,5 @@
 _summary_
 """
 
-from .vna_net_interface import E8361RemoteGPIB
\ No newline at end of file
+from .vna_net_interface import E8361RemoteGPIB, PnaMeasurement, TRANSPORT_SETTINGS, get_transport
+from .async_vna_net_interface import AsyncE8361RemoteGPIB
@@ -0,0 +1,43 @@
+"""
+Asyncio variant of E8361RemoteGPIB.
+
+VISA I/O of pyvisa is blocking, so AsyncE8361RemoteGPIB hands every call to the DeviceActor of the PNA (see
+connection_handler/device_actor.py) and awaits its future. The event loop keeps running while the PNA sweeps or the
+data is transferred, and all coroutines, threads and proxies that share the actor reach the PNA one after another.
+Every method of E8361RemoteGPIB is available as coroutine with the same arguments:
+
+    vna = AsyncE8361RemoteGPIB(E8361RemoteGPIB())
+    await vna.connect_pna('GPIB0::16::INSTR')
+    await asyncio.wait_for(vna.pna_trigger_measurement('AutoMeasurement'), timeout=30)
+    data = await vna.pna_read_meas_data('AutoMeasurement', 'S11')
+
+Sequences that must not be interleaved with other commands (e.g. configure_vna()) are executed in one step by run().
+"""
+import asyncio
+
+from connection_handler import DeviceActor, AsyncDeviceProxy
+from .vna_net_interface import E8361RemoteGPIB
+
+
+class AsyncE8361RemoteGPIB(AsyncDeviceProxy):
+    """
+    See module doc-string.
+
+    :param vna: PNA interface, connected or not
+    :param actor: actor that owns the PNA already, e.g. the one of the GUI. A new actor is started if not given.
+    """
+    device: E8361RemoteGPIB = None
+
+    def __init__(self, vna: E8361RemoteGPIB = None, actor: DeviceActor = None):
+        if actor is None:
+            actor = DeviceActor(vna if vna is not None else E8361RemoteGPIB(), 'vna')
+        super().__init__(actor)
+        self.device = actor.device
+
+    async def close(self):
+        """
+        Disconnects the PNA and stops the actor once all queued commands are done.
+        """
+        await self.disconnect_pna()
+        await asyncio.to_thread(self.get_actor().stop)
+        return
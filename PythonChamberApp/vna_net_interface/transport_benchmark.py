@@ -0,0 +1,183 @@
+"""
+Benchmark of the PNA transports (GPIB, VXI-11, HiSLIP, raw SCPI socket).
+
+For every given VISA resource the PNA is connected by E8361RemoteGPIB.connect_pna(), so the benchmark uses the same
+terminations, timeouts and chunk sizes as the measurements. Reported are the round trip latency of '*OPC?' and the
+throughput of trace transfers ('CALC<cnum>:DATA? SDATA' of the configured trace).
+
+Without a PNA, the ScpiSocketStandIn answers on a local raw socket like a PNA with one configured trace, so the
+harness itself and the socket transport of the VISA library can be checked.
+
+Usage (from PythonChamberApp directory):
+    python -m vna_net_interface.transport_benchmark [resource_name ...] [--stand-in] [--visa-library @py]
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+import numpy as np
+
+from .vna_net_interface import E8361RemoteGPIB, get_transport
+
+
+class ScpiSocketStandIn:
+    """
+    Local raw SCPI socket server standing in for the PNA. Commands are read line by line, concatenated commands
+    (';') are answered by the response of their last query. Writes are ignored.
+
+    :param num_points: number of stimulus points of the trace returned by 'DATA?' and 'X?' queries
+    :param response_delay: unit [s], processing time of the stand-in before each response
+    :param port: TCP port, 0 for any free port
+    """
+    num_points: int = 201
+    response_delay: float = 0.0
+    server: socketserver.ThreadingTCPServer = None
+    __thread: threading.Thread = None
+
+    def __init__(self, num_points: int = 201, response_delay: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        self.num_points = num_points
+        self.response_delay = response_delay
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = stand_in.respond(line.decode('ascii').strip())
+                    if response is not None:
+                        if stand_in.response_delay > 0:
+                            time.sleep(stand_in.response_delay)
+                        self.wfile.write(response.encode('ascii') + b'\n')
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def resource_name(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"TCPIP0::{host}::{port}::SOCKET"
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.__thread.start()
+        return
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        return
+
+    def respond(self, message: str):
+        """
+        :return: response to the message, None if the message contains no query
+        """
+        response = None
+        for command in message.split(';'):
+            command = command.lstrip(':').upper()
+            if '?' not in command:
+                continue
+            if command.startswith('*IDN'):
+                response = "Stand-in,E8361A,0,A.00.00"
+            elif command.startswith('*OPC'):
+                response = "+1"
+            elif command.startswith('SYST:ERR'):
+                response = '+0,"No error"'
+            elif 'DATA?' in command:
+                response = ','.join(f"{value:+.12E}" for value in np.full(2 * self.num_points, 0.5))
+            elif ':X?' in command:
+                response = ','.join(f"{value:+.12E}" for value in np.linspace(1e9, 2e9, self.num_points))
+            else:
+                response = "0"
+        return response
+
+
+def benchmark_transport(vna: E8361RemoteGPIB, resource_name: str, num_latency: int = 100, num_transfers: int = 20,
+                        data_query: str = 'CALC1:DATA? SDATA'):
+    """
+    Connects the PNA by the given resource and measures latency and throughput. The trace of the data query must be
+    selected on the PNA already.
+
+    :return: dict {'resource_name', 'transport', 'latency_mean', 'latency_p95' [ms], 'transfer_bytes',
+        'transfer_time' [ms], 'throughput' [MB/s]}, None if the resource could not be opened or a query failed
+    """
+    if vna.connect_pna(resource_name) is False:
+        return None
+    try:
+        latencies = []
+        for i in range(num_latency):
+            start = time.perf_counter()
+            vna.pna_device.query('*OPC?')
+            latencies.append(time.perf_counter() - start)
+        transfer_times = []
+        transfer_bytes = 0
+        for i in range(num_transfers):
+            start = time.perf_counter()
+            response = vna.pna_device.query(data_query)
+            transfer_times.append(time.perf_counter() - start)
+            transfer_bytes = len(response) + 1  # termination
+    except Exception as e:
+        print(f"Error - Benchmark of {resource_name} failed: {e}")
+        return None
+    finally:
+        vna.disconnect_pna()
+
+    transfer_time = float(np.mean(transfer_times))
+    return {'resource_name': resource_name, 'transport': get_transport(resource_name),
+            'latency_mean': float(np.mean(latencies)) * 1e3, 'latency_p95': float(np.percentile(latencies, 95)) * 1e3,
+            'transfer_bytes': transfer_bytes, 'transfer_time': transfer_time * 1e3,
+            'throughput': transfer_bytes / transfer_time / 1e6 if transfer_time > 0 else 0.0}
+
+
+def format_benchmark_report(results: list) -> str:
+    """
+    :param results: list of result dicts of benchmark_transport()
+    :return: table with one line per resource
+    """
+    lines = [f"{'transport':<8} {'latency [ms]':>13} {'p95 [ms]':>9} {'trace [kB]':>11} {'transfer [ms]':>14} "
+             f"{'MB/s':>8}  resource"]
+    for result in results:
+        lines.append(f"{result['transport']:<8} {result['latency_mean']:>13.3f} {result['latency_p95']:>9.3f} "
+                     f"{result['transfer_bytes'] / 1e3:>11.1f} {result['transfer_time']:>14.3f} "
+                     f"{result['throughput']:>8.2f}  {result['resource_name']}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark latency and throughput of the PNA transports.")
+    parser.add_argument('resource_names', nargs='*', help="VISA resource names, e.g. GPIB0::16::INSTR, "
+                                                          "TCPIP0::<ip>::hislip0::INSTR, TCPIP0::<ip>::5025::SOCKET")
+    parser.add_argument('--stand-in', action='store_true', help="benchmark a local raw socket stand-in of the PNA")
+    parser.add_argument('--num-points', type=int, default=201, help="stimulus points of the stand-in trace")
+    parser.add_argument('--num-latency', type=int, default=100, help="number of '*OPC?' round trips")
+    parser.add_argument('--num-transfers', type=int, default=20, help="number of trace transfers")
+    parser.add_argument('--data-query', default='CALC1:DATA? SDATA', help="query of the trace transfer")
+    parser.add_argument('--visa-library', default=None, help="VISA library, e.g. '@py' for pyvisa-py")
+    parser.add_argument('--use-keysight', action='store_true', help="use the keysight VISA library")
+    args = parser.parse_args(argv)
+
+    stand_in = None
+    resource_names = list(args.resource_names)
+    if args.stand_in:
+        stand_in = ScpiSocketStandIn(num_points=args.num_points)
+        stand_in.start()
+        resource_names.append(stand_in.resource_name)
+    if len(resource_names) == 0:
+        parser.error("no resource given, use --stand-in to benchmark the local stand-in")
+
+    vna = E8361RemoteGPIB(use_keysight=args.use_keysight, visa_library=args.visa_library)
+    results = []
+    for resource_name in resource_names:
+        result = benchmark_transport(vna, resource_name, num_latency=args.num_latency,
+                                     num_transfers=args.num_transfers, data_query=args.data_query)
+        if result is not None:
+            results.append(result)
+    if stand_in is not None:
+        stand_in.stop()
+
+    print(format_benchmark_report(results))
+    return 0 if len(results) == len(resource_names) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
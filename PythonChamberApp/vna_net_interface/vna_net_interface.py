@@ -1,10 +1,80 @@
 import importlib
 import os
+import copy
+import contextlib
 
 import numpy as np
 import pyvisa
 import time
 
+# Connection settings per transport of the PNA, selected by the resource name in connect_pna()
+#   gpib    GPIB0::16::INSTR            GPIB interface, throughput is limited by the bus (~1 MB/s at best)
+#   vxi11   TCPIP0::<ip>::inst0::INSTR  VXI-11 over LAN
+#   hislip  TCPIP0::<ip>::hislip0::INSTR  HiSLIP over LAN, needs a PNA firmware with HiSLIP server
+#   socket  TCPIP0::<ip>::5025::SOCKET  raw SCPI socket, no END indicator, so the read termination is mandatory
+TRANSPORT_SETTINGS = {
+    'gpib': {'read_termination': '\n', 'write_termination': '\n', 'timeout': 2000, 'chunk_size': 20 * 1024},
+    'vxi11': {'read_termination': '\n', 'write_termination': '\n', 'timeout': 2000, 'chunk_size': 1024 * 1024},
+    'hislip': {'read_termination': '\n', 'write_termination': '\n', 'timeout': 2000, 'chunk_size': 1024 * 1024},
+    'socket': {'read_termination': '\n', 'write_termination': '\n', 'timeout': 2000, 'chunk_size': 1024 * 1024},
+}
+
+
+def get_transport(resource_name: str) -> str:
+    """
+    :return: transport of the given VISA resource name as key of TRANSPORT_SETTINGS. Resources other than LAN are
+        treated as 'gpib'.
+    """
+    parts = resource_name.upper().split('::')
+    if not parts[0].startswith('TCPIP'):
+        return 'gpib'
+    if parts[-1] == 'SOCKET':
+        return 'socket'
+    if len(parts) > 2 and parts[2].startswith('HISLIP'):
+        return 'hislip'
+    return 'vxi11'
+
+
+class PnaMeasurement:
+    """
+    Record of one measurement configured on the PNA, entry of the measurements registry of E8361RemoteGPIB.
+    The SCPI strings of the trigger and readout paths are resolved once on construction, so the hot path of a
+    measurement only needs a dict lookup by measurement name.
+
+    :param meas_name: unique name of measurement
+    :param cnum: channel number of the measurement on the PNA
+    :param parameter: list of measured S-parameters
+    :param trace_names: list of PNA measurement (trace) names, same order as parameter
+    :param index: position of the measurement in order of configuration (0 for the first one)
+    """
+    __slots__ = ('meas_name', 'cnum', 'parameter', 'trace_names', 'index', 'avg_num', 'trigger', 'freq_start',
+                 'freq_stop', 'if_bw', 'sweep_num_points', 'output_power', 'segments', 'stimulus', 'trigger_command',
+                 'average_clear_command', 'select_header', 'select_values', 'x_query', 'data_query')
+
+    def __init__(self, meas_name: str, cnum: int, parameter: list, trace_names: list, index: int):
+        self.meas_name = meas_name
+        self.cnum = cnum
+        self.parameter = list(parameter)
+        self.trace_names = dict(zip(parameter, trace_names))   # {S-param: PNA measurement name}
+        self.index = index
+        self.avg_num = 1
+        self.trigger = 'continuous'
+        self.freq_start = None
+        self.freq_stop = None
+        self.if_bw = None
+        self.sweep_num_points = None
+        self.output_power = None
+        self.segments = None    # segment table if the channel sweeps segments, None for linear sweep
+        self.stimulus = None    # parsed stimulus points [Hz], reset whenever frequency range or points change
+        # resolved SCPI strings
+        self.trigger_command = f"INIT{cnum}:IMM"
+        self.average_clear_command = f"SENS{cnum}:AVER:CLE"
+        self.select_header = f"CALC{cnum}:PAR:SEL"
+        self.select_values = {param: f"'{name}'" for param, name in self.trace_names.items()}
+        self.x_query = f"SENS{cnum}:X?"
+        self.data_query = f"CALC{cnum}:DATA? SDATA"
+
+
 class E8361RemoteGPIB:
     """
     This object implements a pyvisa interface that communicates with the E8361A PNA of Agilent / Keysight.
@@ -12,12 +82,31 @@ class E8361RemoteGPIB:
     """
     # private properties
     resource_manager: pyvisa.ResourceManager = None
-    pna_device: pyvisa.resources.gpib.GPIBInstrument = None
-    running_measurements: list = None   # stores all configured measurements as dict with measurement infos {'meas_name', 'cnum', 'parameter' (S-param), 'avg_num', 'trigger': 'continuous'}
+    pna_device: pyvisa.resources.MessageBasedResource = None
+    transport: str = None       # transport of the connected PNA, key of TRANSPORT_SETTINGS
+    measurements: dict = None   # registry of all configured measurements {meas_name: PnaMeasurement}
     __busy_wait_timeout = 0.3
-
-    def __init__(self, use_keysight: bool = False):
-        if use_keysight:
+    __state_load_timeout = 30000    # unit [ms], VISA timeout while the PNA stores or loads a state file
+    __default_pna_rootpath = "C:/Program Files/Agilent/Network Analyzer/Documents/"   # specific to keysight PNA
+
+    # SCPI traffic optimization, opt-in by pna_set_command_optimization()
+    batching_enabled: bool = False      # concatenate writes inside of pna_batch() blocks to one transaction
+    shadow_cache_enabled: bool = False  # skip writes of unchanged settings and answer getters from the shadow copy
+    num_transactions: int = 0           # number of GPIB transactions (write or query) sent so far
+    __batch_depth: int = 0
+    __batch_buffer: list = None         # writes collected in pna_batch() blocks, not sent yet
+    __shadow: dict = None               # {query: response} of settings known to be set on the PNA
+    __max_batch_length = 1000           # unit [chars], longer batches are sent in several transactions
+    __unbatched_headers = ('SYST', 'MMEM')  # preset and file operations are always sent alone
+
+    def __init__(self, use_keysight: bool = False, visa_library: str = None, resource_manager=None):
+        if resource_manager is not None:
+            # explicit resource manager, e.g. recording or replay of a connection_handler.Transcript
+            self.resource_manager = resource_manager
+        elif visa_library is not None:
+            # explicit VISA library, e.g. '@py' for the pure python backend pyvisa-py (LAN transports only)
+            self.resource_manager = pyvisa.ResourceManager(visa_library)
+        elif use_keysight:
             # Import and path adaptation on the fly not necessary since python 3.11 by default uses NI and keysight
             # if stated explicitly by 'ktvisa32' >> Not sure if that is true... but NI and agilent hardware works fine
             # dependent on ressource-manager library-path declaration!
@@ -30,12 +119,146 @@ class E8361RemoteGPIB:
             #  Keysight implementation is always used with extra dll-paths?! >> Fix when deployed on institut PC.
         else:
             self.resource_manager = pyvisa.ResourceManager() # default path seems to find NI visa lib. Adapter works 06.06.2024.
-        self.running_measurements = []
+        self.measurements = {}
+        self.__batch_buffer = []
+        self.__shadow = {}
 
     # private / internal
+    def __write(self, command: str):
+        """
+        Sends command to the PNA. Inside of pna_batch() blocks the command is only collected if batching is enabled.
+        """
+        if self.batching_enabled and self.__batch_depth > 0 and \
+                not command.upper().startswith(self.__unbatched_headers):
+            if sum(len(cmd) + 2 for cmd in self.__batch_buffer) + len(command) > self.__max_batch_length:
+                self.__flush_batch()
+            self.__batch_buffer.append(command)
+            return
+        self.__flush_batch()
+        self.__send(command)
+        return
+
+    def __query(self, query: str) -> str:
+        """
+        Sends query to the PNA together with all collected writes of the batch and returns the response.
+        """
+        message = self.__join_commands(self.__batch_buffer + [query])
+        self.__batch_buffer = []
+        self.num_transactions += 1
+        try:
+            return self.pna_device.query(message)
+        except pyvisa.VisaIOError:
+            self.__clear_shadow()   # unknown which commands of the message reached the PNA
+            raise
+
+    def __flush_batch(self):
+        """
+        Sends all collected writes of the batch as one transaction.
+        """
+        if len(self.__batch_buffer) > 0:
+            message = self.__join_commands(self.__batch_buffer)
+            self.__batch_buffer = []
+            self.__send(message)
+        return
+
+    def __send(self, message: str):
+        self.num_transactions += 1
+        try:
+            self.pna_device.write(message)
+        except pyvisa.VisaIOError:
+            self.__clear_shadow()   # unknown which commands of the message reached the PNA
+            raise
+        return
+
+    @staticmethod
+    def __join_commands(commands: list) -> str:
+        """
+        :return: commands concatenated to one SCPI message, each command starts at the root of the command tree
+        """
+        message = commands[0]
+        for command in commands[1:]:
+            message += ';' + command if command.startswith('*') else ';:' + command
+        return message
+
+    def __write_setting(self, header: str, value):
+        """
+        Writes 'header value' to the PNA. With shadow cache, writes of the value that is already set are skipped and
+        the value is stored as response of the 'header?' query. ON / OFF are stored as the PNA answers them (1 / 0).
+        """
+        value = str(value)
+        cached_value = {'ON': '1', 'OFF': '0'}.get(value.upper(), value)
+        if self.shadow_cache_enabled:
+            if self.__shadow.get(header + '?') == cached_value:
+                return
+            if header.upper().startswith('SENS'):
+                # stimulus axis of the channel follows from frequency and sweep settings
+                self.__shadow.pop(header.split(':')[0] + ':X?', None)
+            self.__shadow[header + '?'] = cached_value
+        self.__write(f"{header} {value}")
+        return
+
+    def __query_cached(self, query: str) -> str:
+        """
+        :return: response of the query, from the shadow copy if known and shadow cache is enabled
+        """
+        if not self.shadow_cache_enabled:
+            return self.__query(query)
+        if query not in self.__shadow:
+            self.__shadow[query] = self.__query(query)
+        return self.__shadow[query]
+
+    def __clear_shadow(self):
+        """
+        Forgets all settings of the shadow copy, e.g. after preset or loading a state.
+        """
+        if self.__shadow is not None:
+            self.__shadow.clear()
+        if self.measurements is not None:
+            for meas in self.measurements.values():
+                meas.stimulus = None
+        return
+
+    def __pna_file_path(self, file_name: str):
+        """
+        :return: file_name in the default documents folder of the PNA if only a file name without folder is given
+        """
+        if file_name.split('\\').__len__() == 1 and file_name.split('/').__len__() == 1:
+            return self.__default_pna_rootpath + file_name
+        return file_name
 
 
     # public
+    def pna_set_command_optimization(self, batching: bool = False, shadow_cache: bool = False):
+        """
+        Opt-in optimization of the SCPI traffic, both disabled by default.
+
+        batching: Configuration methods and data readout collect their writes in pna_batch() blocks and send them
+            concatenated by ';' in one transaction, together with the next query if there is one.
+        shadow_cache: A shadow copy of the settings written by this object is kept. Writes of unchanged settings are
+            skipped and getters answer from the shadow copy. Preset, loading a state and custom strings clear it.
+            Only valid as long as the settings are not changed at the PNA itself!
+        """
+        self.__flush_batch()
+        self.__clear_shadow()
+        self.batching_enabled = batching
+        self.shadow_cache_enabled = shadow_cache
+        return
+
+    @contextlib.contextmanager
+    def pna_batch(self):
+        """
+        Context manager that collects the writes of the block if batching is enabled and sends them in as few
+        transactions as possible. Queries inside of the block are sent together with the collected writes.
+        Without batching the block has no effect.
+        """
+        self.__batch_depth += 1
+        try:
+            yield
+        finally:
+            self.__batch_depth -= 1
+            if self.__batch_depth == 0:
+                self.__flush_batch()
+
     def list_resources(self):
         """
         Returns tuple(str, ...) of available devices that fit '?*::INSTR' naming-scheme.
@@ -48,31 +271,84 @@ class E8361RemoteGPIB:
         """
         return tuple(self.resource_manager.list_resources('?*'))
 
-    def connect_pna(self, resource_name: str):
+    def connect_pna(self, resource_name: str, timeout: int = None):
         """
         Opens the pyvisa resource with the given name.
         Stores the opened resource in pna_device object property for use with functions.
-        configures terminations as '\n' and sets timeout to 2sec.
+        Terminations, timeout and chunk size are configured according to the transport of the resource name,
+        see TRANSPORT_SETTINGS (GPIB, VXI-11 or HiSLIP over LAN, raw SCPI socket).
 
+        :param timeout: unit [ms], VISA timeout, None for the default of the transport
         :return: open successful >> true, open failed >> false
         """
+        transport = get_transport(resource_name)
+        settings = TRANSPORT_SETTINGS[transport]
         try:
             self.pna_device = self.resource_manager.open_resource(resource_name=resource_name)
-        except pyvisa.VisaIOError as ex:
+        except (pyvisa.VisaIOError, ValueError) as ex:   # ValueError if the VISA library does not support the transport
             print(f'VISA ERROR - Resources could not be opened!\nMSG: {ex}')
             return False
 
-        self.pna_device.read_termination = '\n'
-        self.pna_device.write_termination = '\n'
-        self.pna_device.timeout = 2000
+        self.transport = transport
+        self.pna_device.read_termination = settings['read_termination']
+        self.pna_device.write_termination = settings['write_termination']
+        self.pna_device.timeout = settings['timeout'] if timeout is None else timeout
+        self.pna_device.chunk_size = settings['chunk_size']
+        self.__batch_buffer = []
+        self.__clear_shadow()
         return True
 
     def disconnect_pna(self):
         if self.pna_device is not None:
             self.pna_device.close()
             self.pna_device = None
+            self.transport = None
         return
 
+    def pna_clear_status(self):
+        """
+        Sends a device clear to abort pending operations and empty the output buffer, then clears the status and error
+        queue of the PNA by '*CLS'. The measurement configuration stays untouched.
+
+        :return: successful >> True, Failed >> False
+        """
+        if self.pna_device is None:
+            return False
+        self.__batch_buffer = []    # device clear discards pending commands anyway
+        try:
+            if self.transport != 'socket':  # raw sockets have no device clear
+                self.pna_device.clear()
+            self.__write("*CLS")
+        except pyvisa.VisaIOError as ex:
+            print(f'VISA ERROR - Clear status failed!\nMSG: {ex}')
+            return False
+        return True
+
+    def pna_reset_interface(self):
+        """
+        Sends an interface clear (IFC) on the GPIB interface of the connected PNA, so this controller is in charge of
+        the bus again, and reopens the connection. The measurement configuration of the PNA stays untouched.
+        LAN transports have no interface clear, the connection is only reopened.
+
+        :return: successful >> True, Failed >> False
+        """
+        if self.pna_device is None:
+            return False
+        vna_resource_name = self.pna_device.resource_name
+        vna_timeout = self.pna_device.timeout
+        interface_str = vna_resource_name.split('::')[0]
+        transport = self.transport
+        self.disconnect_pna()   # close GPIBx interface
+        if transport != 'gpib':
+            return self.connect_pna(vna_resource_name, vna_timeout)
+        try:
+            interface = self.resource_manager.open_resource(interface_str + '::INTFC')
+            interface.send_ifc()    # set GPIBx as controller in charge
+            interface.close()
+        except pyvisa.VisaIOError as ex:
+            print(f'VISA ERROR - Interface clear failed!\nMSG: {ex}')
+        return self.connect_pna(vna_resource_name, vna_timeout)  # reopen pna connection on GPIBx (now in charge!)
+
     def pna_read_idn(self):
         """
         :return: str of pna-response. returns error message if error occurs.
@@ -100,14 +376,15 @@ class E8361RemoteGPIB:
         if self.pna_device is None:
             return False
 
-        self.pna_device.write("SYSTem:PRESet")
-        self.pna_device.write("CALC:PAR:DEL:ALL")
-        self.running_measurements = []
+        self.__write("SYSTem:PRESet")
+        self.__write("CALC:PAR:DEL:ALL")
+        self.__clear_shadow()
+        self.measurements = {}
         return True
 
     def pna_add_measurement(self, meas_name: str, parameter: list[str]):
         """
-        Adds measurement with given 'meas_name' to internal list of active measurements.
+        Adds measurement with given 'meas_name' to the measurements registry.
         Once added, configuration commands can be used in combination with 'meas_name' to configure the right measurement on pna.
 
         :param meas_name: Unique name of measurement to find measurement later
@@ -115,39 +392,44 @@ class E8361RemoteGPIB:
         :return: int, Number of stored/active measurements // -1 if duplicate meas-name
         """
         # check for availability of meas-name
-        for meas in self.running_measurements:
-            if meas['meas_name'] == meas_name:
-                return -1
+        if meas_name in self.measurements:
+            return -1
 
         # add new measurement with next cnum
-        new_cnum = self.running_measurements.__len__() + 1  # returns next available index - PNA starts count at 1, thus '+1' offset
-        self.running_measurements.append({'meas_name': meas_name, 'cnum': new_cnum, 'parameter': parameter, 'avg_num': 1, 'trigger': 'continuous'})
+        new_cnum = len(self.measurements) + 1  # returns next available index - PNA starts count at 1, thus '+1' offset
+        self.measurements[meas_name] = PnaMeasurement(meas_name, new_cnum, parameter,
+                                                      [meas_name + '_' + param for param in parameter],
+                                                      len(self.measurements))
 
-        self.pna_device.write(f"DISPlay:WINDow{new_cnum}:STATE ON") # creates window with cnum as identifier
+        self.__write(f"DISPlay:WINDow{new_cnum}:STATE ON") # creates window with cnum as identifier
         tnum = 0
         for param in parameter:
             tnum +=1
             new_meas_name = meas_name + '_' + param
-            self.pna_device.write(f"CALC{new_cnum}:PAR:DEF:EXT '{new_meas_name}',{param}") # Calculate:Parameter:Define:Extended - creates new measurement
-            self.pna_device.write(f"DISPlay:WINDow{new_cnum}:TRACe{tnum}:FEED '{new_meas_name}'") # creates measurement trace to window (for each S-param)
+            self.__write(f"CALC{new_cnum}:PAR:DEF:EXT '{new_meas_name}',{param}") # Calculate:Parameter:Define:Extended - creates new measurement
+            self.__write(f"DISPlay:WINDow{new_cnum}:TRACe{tnum}:FEED '{new_meas_name}'") # creates measurement trace to window (for each S-param)
+        self.__shadow.pop(f"CALC{new_cnum}:PAR:SEL?", None)   # selection of the channel unknown after definition
+
+    def get_measurement(self, meas_name: str):
+        """
+        Returns the PnaMeasurement record of the given 'meas_name' from the measurements registry.
+        Returns None if given 'meas_name' not found.
+        """
+        return self.measurements.get(meas_name)
 
     def get_idx_of_meas(self, meas_name: str):
         """
-        Returns index of measurement in local running_measurements-list as int.
+        Returns index of measurement in order of configuration as int.
         Returns -1 if given 'meas_name' not found.
         """
-        idx = 0
-
-        for meas in self.running_measurements:
-            if meas['meas_name'] == meas_name:
-                return idx
-            idx += 1
-
-        return -1
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            return -1
+        return meas.index
 
     def pna_set_freq_start(self, meas_name: str, freq_start: float):
         """
-        Stores given start frequency in measurement-dict in running_measurements-list as 'freq_start'
+        Stores given start frequency in the measurement record of the registry as 'freq_start'
         and sends start frequency to pna.
         If measurement name not found or other error, returns False.
 
@@ -155,15 +437,16 @@ class E8361RemoteGPIB:
         :param freq_start: start frequency in Hz
         :return: successful >> True, Failed >> False
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.running_measurements[meas_idx]['freq_start'] = freq_start
-        self.pna_device.write(f"SENS{meas_cnum}:FREQ:STAR {freq_start}")
+        meas.freq_start = freq_start
+        meas.stimulus = None
+        self.__write_setting(f"SENS{meas_cnum}:FREQ:STAR", freq_start)
         return True
 
     def pna_get_freq_start(self, meas_name: str):
@@ -174,19 +457,19 @@ class E8361RemoteGPIB:
         :param meas_name: unique name of measurement
         :return: start frequency in Hz as float, False if error
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        response = self.pna_device.query(f"SENS{meas_cnum}:FREQ:STAR?")
+        response = self.__query_cached(f"SENS{meas_cnum}:FREQ:STAR?")
         return float(response)
 
     def pna_set_freq_stop(self, meas_name: str, freq_stop: float):
         """
-        Stores given stop frequency in measurement-dict in running_measurements-list as 'freq_stop'
+        Stores given stop frequency in the measurement record of the registry as 'freq_stop'
         and sends stop frequency to pna.
         If measurement name not found or other error, returns False.
 
@@ -194,15 +477,16 @@ class E8361RemoteGPIB:
         :param freq_stop: stop frequency in Hz
         :return: successful >> True, Failed >> False
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.running_measurements[meas_idx]['freq_stop'] = freq_stop
-        self.pna_device.write(f"SENS{meas_cnum}:FREQ:STOP {freq_stop}")
+        meas.freq_stop = freq_stop
+        meas.stimulus = None
+        self.__write_setting(f"SENS{meas_cnum}:FREQ:STOP", freq_stop)
         return True
 
     def pna_get_freq_stop(self, meas_name: str):
@@ -213,19 +497,19 @@ class E8361RemoteGPIB:
         :param meas_name: unique name of measurement
         :return: stop frequency in Hz as float, False if error
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        response = self.pna_device.query(f"SENS{meas_cnum}:FREQ:STOP?")
+        response = self.__query_cached(f"SENS{meas_cnum}:FREQ:STOP?")
         return float(response)
 
     def pna_set_IF_BW(self, meas_name: str, if_bw: float):
         """
-        Stores given IF Bandwidth in measurement-dict in running_measurements-list as 'IF_BW'
+        Stores given IF Bandwidth in the measurement record of the registry as 'IF_BW'
         and sends IF Bandwidth to pna.
         If measurement name not found or other error, returns False.
 
@@ -233,15 +517,15 @@ class E8361RemoteGPIB:
         :param if_bw: IF Bandwidth in Hz
         :return: successful >> True, Failed >> False
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.running_measurements[meas_idx]['if_bw'] = if_bw
-        self.pna_device.write(f"SENSe{meas_cnum}:BAND:RES {if_bw}")
+        meas.if_bw = if_bw
+        self.__write_setting(f"SENSe{meas_cnum}:BAND:RES", if_bw)
         return True
 
     def pna_get_IF_BW(self, meas_name: str):
@@ -252,34 +536,35 @@ class E8361RemoteGPIB:
         :param meas_name: unique name of measurement
         :return: IF Bandwidth in Hz as float, False if error
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        response = self.pna_device.query(f"SENSe{meas_cnum}:BAND:RES?")
+        response = self.__query_cached(f"SENSe{meas_cnum}:BAND:RES?")
         return float(response)
 
     def pna_set_sweep_num_points(self, meas_name: str, num_of_points: int):
         """
-        Stores given num_of_points in measurement-dict in running_measurements-list as 'sweep_num_of_points'
+        Stores given num_of_points in the measurement record of the registry as 'sweep_num_of_points'
         and sends sweep number of points to pna.
 
         :param meas_name: unique name of measurement
         :param num_of_points: number of points to measure throughout frequency sweep
         :return: successful >> True, Failed >> False
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.running_measurements[meas_idx]['sweep_num_points'] = num_of_points
-        self.pna_device.write(f"SENS{meas_cnum}:SWE:POIN {num_of_points}")
+        meas.sweep_num_points = num_of_points
+        meas.stimulus = None
+        self.__write_setting(f"SENS{meas_cnum}:SWE:POIN", num_of_points)
         return True
 
     def pna_get_sweep_num_points(self, meas_name: str):
@@ -290,34 +575,135 @@ class E8361RemoteGPIB:
         :param meas_name: unique name of measurement
         :return: number of sweep points as int, False if error
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        response = self.pna_device.query(f"SENS{meas_cnum}:SWE:POIN?")
+        response = self.__query_cached(f"SENS{meas_cnum}:SWE:POIN?")
         return int(response)
 
+    def pna_set_segment_sweep(self, meas_name: str, segments: list[dict]):
+        """
+        Replaces the segment table of the measurement's channel and switches the channel to segment sweep.
+        Each segment is measured with its own number of points and, if given, its own IF bandwidth. Segments without
+        'if_bw' use the IF bandwidth of the channel. Stores the table in the measurement record as 'segments'.
+
+        segments = [{'freq_start': float [Hz], 'freq_stop': float [Hz], 'sweep_num_points': int,
+                     'if_bw': float [Hz] (optional)}, ...]
+
+        :param meas_name: unique name of measurement
+        :param segments: list of segment dicts in ascending frequency order
+        :return: successful >> True, Failed >> False
+        """
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
+            return False
+        if len(segments) == 0:
+            print("Error - Segment sweep needs at least one segment!")
+            return False
+
+        meas_cnum = meas.cnum
+
+        per_segment_if_bw = any('if_bw' in segment for segment in segments)
+        with self.pna_batch():
+            self.__write(f"SENS{meas_cnum}:SEGM:DEL:ALL")
+            for snum, segment in enumerate(segments, start=1):
+                self.__write(f"SENS{meas_cnum}:SEGM{snum}:ADD")
+                self.__write(f"SENS{meas_cnum}:SEGM{snum}:FREQ:STAR {segment['freq_start']}")
+                self.__write(f"SENS{meas_cnum}:SEGM{snum}:FREQ:STOP {segment['freq_stop']}")
+                self.__write(f"SENS{meas_cnum}:SEGM{snum}:SWE:POIN {segment['sweep_num_points']}")
+                segment_if_bw = segment.get('if_bw', meas.if_bw)
+                if per_segment_if_bw and segment_if_bw is not None:
+                    self.__write(f"SENS{meas_cnum}:SEGM{snum}:BWID {segment_if_bw}")
+                self.__write(f"SENS{meas_cnum}:SEGM{snum}:STAT ON")
+            self.__write(f"SENS{meas_cnum}:SEGM:BWID:CONT {'ON' if per_segment_if_bw else 'OFF'}")
+            self.__write_setting(f"SENS{meas_cnum}:SWE:TYPE", "SEGM")
+        if self.__shadow is not None:
+            self.__shadow.pop(f"SENS{meas_cnum}:X?", None)
+            self.__shadow.pop(f"SENS{meas_cnum}:SWE:POIN?", None)
+        meas.segments = [dict(segment) for segment in segments]
+        meas.stimulus = None
+        return True
+
+    def pna_set_sweep_type(self, meas_name: str, sweep_type: str):
+        """
+        Switches the channel of the measurement between linear sweep ('LIN') and the segment table ('SEGM') without
+        changing the table, e.g. for short linear sweeps in between segment sweeps.
+
+        :param meas_name: unique name of measurement
+        :param sweep_type: 'LIN' or 'SEGM'
+        :return: successful >> True, Failed >> False
+        """
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
+            return False
+        if sweep_type not in ('LIN', 'SEGM'):
+            print("Error - Sweep type must be 'LIN' or 'SEGM'!")
+            return False
+
+        meas_cnum = meas.cnum
+
+        self.__write_setting(f"SENS{meas_cnum}:SWE:TYPE", sweep_type)
+        if self.__shadow is not None:
+            self.__shadow.pop(f"SENS{meas_cnum}:SWE:POIN?", None)
+        meas.stimulus = None
+        return True
+
+    def pna_get_segment_sweep(self, meas_name: str):
+        """
+        Reads the segment table of the measurement's channel from PNA. Only enabled segments are returned, 'if_bw' only
+        if the segments have their own IF bandwidth.
+
+        :param meas_name: unique name of measurement
+        :return: list of segment dicts (see pna_set_segment_sweep), None if the channel sweeps linear, False if error
+        """
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
+            return False
+
+        meas_cnum = meas.cnum
+
+        if not self.__query_cached(f"SENS{meas_cnum}:SWE:TYPE?").upper().startswith('SEGM'):
+            return None
+        num_segments = int(self.__query(f"SENS{meas_cnum}:SEGM:COUN?"))
+        per_segment_if_bw = self.__query(f"SENS{meas_cnum}:SEGM:BWID:CONT?").strip() in ('1', 'ON')
+        segments = []
+        for snum in range(1, num_segments + 1):
+            if self.__query(f"SENS{meas_cnum}:SEGM{snum}:STAT?").strip() not in ('1', 'ON'):
+                continue
+            segment = {'freq_start': float(self.__query(f"SENS{meas_cnum}:SEGM{snum}:FREQ:STAR?")),
+                       'freq_stop': float(self.__query(f"SENS{meas_cnum}:SEGM{snum}:FREQ:STOP?")),
+                       'sweep_num_points': int(self.__query(f"SENS{meas_cnum}:SEGM{snum}:SWE:POIN?"))}
+            if per_segment_if_bw:
+                segment['if_bw'] = float(self.__query(f"SENS{meas_cnum}:SEGM{snum}:BWID?"))
+            segments.append(segment)
+        meas.segments = segments
+        return segments
+
     def pna_set_output_power(self, meas_name: str, power_dbm: float):
         """
-        Stores given power_dbm in measurement-dict in running_measurements-list as 'output_power'
+        Stores given power_dbm in the measurement record of the registry as 'output_power'
         and sends the dbm value to the PNA.
 
         :param meas_name: unique name of measurement
         :param power_dbm: RF output Power in [dBm]
         :return: successful >> True, Failed >> False
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.running_measurements[meas_idx]['ouput_power'] = power_dbm
-        self.pna_device.write(f"SOURce{meas_cnum}:POWer{1}:LEVel:IMMediate:AMPLitude {power_dbm}") # Not sure about Power-number but seems to work!
+        meas.output_power = power_dbm
+        self.__write_setting(f"SOURce{meas_cnum}:POWer{1}:LEVel:IMMediate:AMPLitude", power_dbm) # Not sure about Power-number but seems to work!
         return True
 
     def pna_get_output_power(self, meas_name: str):
@@ -328,14 +714,14 @@ class E8361RemoteGPIB:
         :param meas_name: unique name of measurement
         :return: output power in dBm as float, False if error
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        response = self.pna_device.query(f"SOURce{meas_cnum}:POWer{1}:LEVel:IMMediate:AMPLitude?")
+        response = self.__query_cached(f"SOURce{meas_cnum}:POWer{1}:LEVel:IMMediate:AMPLitude?")
         return float(response)
 
     def pna_is_busy(self):
@@ -343,22 +729,22 @@ class E8361RemoteGPIB:
         Checks if PNA is busy doing some operation via GPIB.
         :return: True >> PNA busy, False >> PNA waiting
         """
-        busy_bool = bool(self.pna_device.query('*OPC?') != '+1')
+        busy_bool = bool(self.__query('*OPC?') != '+1')
         return busy_bool
 
     def pna_get_x_axis(self, meas_name: str) -> list:
         """
         Gets x axis values for given measurement name from PNA device
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.pna_device.write(f"CALC{meas_cnum}:PAR:SEL '{meas_name}'")
-        response = self.pna_device.query(f"SENS{meas_cnum}:X?")
+        self.__write_setting(f"CALC{meas_cnum}:PAR:SEL", f"'{meas_name}'")
+        response = self.__query_cached(f"SENS{meas_cnum}:X?")
         x_axis_stim_points = [float(x) for x in response.split(',')]
         return x_axis_stim_points
 
@@ -382,34 +768,26 @@ class E8361RemoteGPIB:
         :param meas_name:   unique measurement identifier
         :param parameter:   S-Parameter that should be read from measurement (S11, S12 or S22)
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        if parameter not in self.running_measurements[meas_idx]['parameter']:
+        # trace names are own names (manual setup) or PNA's names (setup by .cst-file), resolved in the registry
+        select_value = meas.select_values.get(parameter)
+        if select_value is None:
             print("Error - S-Parameter is not configured in given measurement!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
-
-        """ Differentiate between setup by .cst-file (use PNA's names!) or manual setup (use own names!) """
-        if 'meas_name_list' in self.running_measurements[meas_idx]:
-            # Use PNA's names to read data
-            # exploit the fact, that meas_name_list order is always same as parameter order...
-            detailed_meas_name = self.running_measurements[meas_idx]['meas_name_list'][self.running_measurements[meas_idx]['parameter'].index(parameter)]
-
-            # print(f"Using PNA's name: {detailed_meas_name} for {parameter}")  # debug
-        else:
-            # Use own names to read data
-            detailed_meas_name = meas_name + '_' + parameter
-
-        # Get stimulus points in Hz
-        self.pna_device.write(f"CALC{meas_cnum}:PAR:SEL '{detailed_meas_name}'")
-        x_axis_string = self.pna_device.query(f"SENS{meas_cnum}:X?")
-        x_axis_stim_points = [float(x) for x in x_axis_string.split(',')]
+        # Get stimulus points in Hz, select and (uncached) queries in one transaction if batching is enabled
+        # stimulus points are parsed once and kept in the registry if shadow cache is enabled
+        with self.pna_batch():
+            self.__write_setting(meas.select_header, select_value)
+            if meas.stimulus is None or not self.shadow_cache_enabled:
+                meas.stimulus = [float(x) for x in self.__query_cached(meas.x_query).split(',')]
+            data_string = self.__query(meas.data_query)
+        x_axis_stim_points = meas.stimulus
 
-        data_string = self.pna_device.query(f'CALC{meas_cnum}:DATA? SDATA')
         data_r_i_list = [float(x) for x in data_string.split(',')]
 
         # Assemble data list from X axis and real imaginary measurement data
@@ -428,9 +806,9 @@ class E8361RemoteGPIB:
 
         :return: True >> success, False >> failed
         """
-        for meas in self.running_measurements:
-            meas['trigger'] = 'manual'
-        self.pna_device.write("INIT:CONT OFF")
+        for meas in self.measurements.values():
+            meas.trigger = 'manual'
+        self.__write_setting("INIT:CONT", "OFF")
         return True
 
     def pna_trigger_measurement(self, meas_name: str):
@@ -440,32 +818,38 @@ class E8361RemoteGPIB:
 
         :return: True >> success, False >> failed
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
         # Clear average buffer if averaged measurement should be triggered
-        if self.running_measurements[meas_idx]['avg_num'] != 1:
-            self.pna_device.write(f"SENS{meas_cnum}:AVER:CLE")
-            while self.pna_device.query('*OPC?') != '+1':
+        if meas.avg_num != 1:
+            with self.pna_batch():
+                self.__write(meas.average_clear_command)
+                opc_response = self.__query('*OPC?')
+            while opc_response != '+1':
                 time.sleep(self.__busy_wait_timeout)
+                opc_response = self.__query('*OPC?')
 
-        number_of_triggers = self.running_measurements[meas_idx]['avg_num']
+        number_of_triggers = meas.avg_num
 
         # PNA E8361A bug: If there is more than one measurement configured, the PNA always misses one trigger when the
         # first measurement is addressed. Therefor in this case we trigger one more time.
-        if meas_idx == 0 and self.running_measurements.__len__() > 1:
+        if meas.index == 0 and len(self.measurements) > 1:
             number_of_triggers += 1
 
         for i in range(number_of_triggers):
             # print(f"Trigger {i}\n") # debug
-            self.pna_device.write(f"INIT{meas_cnum}:IMM")
-            while self.pna_device.query('*OPC?') != '+1':   # busy wait for measurement to finish before next trigger
+            with self.pna_batch():  # trigger and first busy request in one transaction if batching is enabled
+                self.__write(meas.trigger_command)
+                opc_response = self.__query('*OPC?')
+            while opc_response != '+1':   # busy wait for measurement to finish before next trigger
                 print("chamber ist beschäftigt!\n")
                 time.sleep(self.__busy_wait_timeout)
+                opc_response = self.__query('*OPC?')
 
         return True
 
@@ -475,10 +859,10 @@ class E8361RemoteGPIB:
 
         :return: True >> success, False >> failed
         """
-        for meas in self.running_measurements:
-            meas['trigger'] = 'continuous'
+        for meas in self.measurements.values():
+            meas.trigger = 'continuous'
 
-        self.pna_device.write("INIT:CONT ON")
+        self.__write_setting("INIT:CONT", "ON")
         return True
 
     def pna_set_average_number(self, meas_name: str, avg_number: int):
@@ -492,12 +876,12 @@ class E8361RemoteGPIB:
         :param avg_number:  number of sweeps that should be averaged (1 - 65536)
         :return: True >> success, False >> failed
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
         if avg_number < 0:
             avg_number *= -1
@@ -506,10 +890,10 @@ class E8361RemoteGPIB:
             self.pna_disable_average(meas_name)
             return True
 
-        self.running_measurements[meas_idx]['avg_num'] = avg_number
-        self.pna_device.write(f"SENS{meas_cnum}:AVER:STAT ON")
+        meas.avg_num = avg_number
+        self.__write_setting(f"SENS{meas_cnum}:AVER:STAT", "ON")
         #self.pna_device.write(f"SENS{meas_cnum}:AVER:MODE SWEEP") # command unknown and not necessary
-        self.pna_device.write(f"SENS{meas_cnum}:AVER:COUN {avg_number}")
+        self.__write_setting(f"SENS{meas_cnum}:AVER:COUN", avg_number)
         return True
 
     def pna_get_average_number(self, meas_name: str):
@@ -520,20 +904,20 @@ class E8361RemoteGPIB:
         :param meas_name: unique name of measurement
         :return: number of sweeps that are averaged for given measurement, False if error
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
         """ Check if averaging enabled """
-        avg_status = self.pna_device.query(f"SENS{meas_cnum}:AVER:STAT?")
+        avg_status = self.__query_cached(f"SENS{meas_cnum}:AVER:STAT?")
         if avg_status == '0':   # average is disabled
             return 1
 
         """ Check average number if necessary """
-        avg_num = self.pna_device.query(f"SENS{meas_cnum}:AVER:COUN?")
+        avg_num = self.__query_cached(f"SENS{meas_cnum}:AVER:COUN?")
         return int(avg_num)
 
     def pna_disable_average(self, meas_name: str):
@@ -541,20 +925,20 @@ class E8361RemoteGPIB:
         Disables average function for given measurement.
         :return: True >> success, False >> failed
         """
-        meas_idx = self.get_idx_of_meas(meas_name)
-        if meas_idx == -1:
-            print("Error - meas_name not found in running_measurements-list!")
+        meas = self.measurements.get(meas_name)
+        if meas is None:
+            print("Error - meas_name not found in measurements registry!")
             return False
 
-        meas_cnum = self.running_measurements[meas_idx]['cnum']
+        meas_cnum = meas.cnum
 
-        self.running_measurements[meas_idx]['avg_num'] = 1
-        self.pna_device.write(f"SENS{meas_cnum}:AVER:STAT OFF")
+        meas.avg_num = 1
+        self.__write_setting(f"SENS{meas_cnum}:AVER:STAT", "OFF")
         return True
 
     def pna_add_measurement_detailed(self, meas_name: str, parameter: list[str], freq_start: float, freq_stop: float,
                                      if_bw: float, sweep_num_points: int, output_power: float, trigger_manual: bool,
-                                     average_number: int):
+                                     average_number: int, segments: list[dict] = None):
         """
         Configures PNA measurement with all available configurations right away.
         :param meas_name:           unique measurement name
@@ -566,18 +950,23 @@ class E8361RemoteGPIB:
         :param output_power:        RF Output Power in [dBm]
         :param trigger_manual:      enables manual triggering if True. Otherwise, internal continuous trigger.
         :param average_number:      number of sweeps that should be averaged for one measurement result
+        :param segments:            optional segment table to sweep instead of the linear sweep, see
+                                    pna_set_segment_sweep()
         :return: True >> success, False >> failed
         """
-        self.pna_add_measurement(meas_name=meas_name, parameter=parameter)
-        self.pna_set_freq_start(meas_name=meas_name, freq_start=freq_start)
-        self.pna_set_freq_stop(meas_name=meas_name, freq_stop=freq_stop)
-        self.pna_set_IF_BW(meas_name=meas_name, if_bw=if_bw)
-        self.pna_set_sweep_num_points(meas_name=meas_name, num_of_points=sweep_num_points)
-        self.pna_set_output_power(meas_name=meas_name, power_dbm=output_power)
-        if trigger_manual:
-            self.pna_set_trigger_manual()
-        if average_number > 1:
-            self.pna_set_average_number(meas_name=meas_name, avg_number=average_number)
+        with self.pna_batch():
+            self.pna_add_measurement(meas_name=meas_name, parameter=parameter)
+            self.pna_set_freq_start(meas_name=meas_name, freq_start=freq_start)
+            self.pna_set_freq_stop(meas_name=meas_name, freq_stop=freq_stop)
+            self.pna_set_IF_BW(meas_name=meas_name, if_bw=if_bw)
+            self.pna_set_sweep_num_points(meas_name=meas_name, num_of_points=sweep_num_points)
+            self.pna_set_output_power(meas_name=meas_name, power_dbm=output_power)
+            if trigger_manual:
+                self.pna_set_trigger_manual()
+            if average_number > 1:
+                self.pna_set_average_number(meas_name=meas_name, avg_number=average_number)
+            if segments is not None and len(segments) > 0:
+                self.pna_set_segment_sweep(meas_name=meas_name, segments=segments)
         return True
 
     def pna_preset_from_file(self, file_name: str, meas_name: str, set_trigger_manual: bool = True):
@@ -587,12 +976,12 @@ class E8361RemoteGPIB:
         The current implementation supports only one channel, namely channel 1 (default cnum = 1), to be used by the
         preconfiguration. Measurements/Parameters not in channel 1 will not be detected.
 
-        This method updates the running_measurements-list in the E8361RemoteGPIB-object to enable reading the configured
+        This method updates the measurements registry in the E8361RemoteGPIB-object to enable reading the configured
         measurements from the PNA.
         SPECIAL:
-        Using this method, a new attribute 'meas_name_list' is added to the running_measurements-list to store
-        the PNA's internal measurement names one needs to read a certain dataset! (= S11 OR S12 OR S22)
-        This attribute is used by the pna_read_meas_data() method if it exists in the running_measurements-list.
+        Other than for measurements added by pna_add_measurement(), the trace names of the record are the PNA's
+        internal measurement names one needs to read a certain dataset! (= S11 OR S12 OR S22)
+        These names are used by the pna_read_meas_data() method.
 
         dict on return:
         pna_info = {
@@ -604,6 +993,8 @@ class E8361RemoteGPIB:
             'sweep_num_points': int,
             'output_power': float,
             'avg_num': int,
+            'segments': list[dict], only if the file configures a segment sweep (see pna_set_segment_sweep()).
+                        Then freq_start, freq_stop and sweep_num_points span all segments.
             }
 
 
@@ -620,12 +1011,11 @@ class E8361RemoteGPIB:
         self.pna_preset()
 
         """ Modify filepath if only filename given """
-        default_pna_rootpath = "C:/Program Files/Agilent/Network Analyzer/Documents/"   # specific to keysight PNA
-        if file_name.split('\\').__len__() == 1 and file_name.split('/').__len__() == 1:
-            file_name = default_pna_rootpath + file_name
+        file_name = self.__pna_file_path(file_name)
 
         """ Load file on PNA """
-        self.pna_device.write(f"MMEM:LOAD '{file_name}'")
+        self.__write(f"MMEM:LOAD '{file_name}'")
+        self.__clear_shadow()
 
         """ Read measured parameters in channel 1 """
         meas_list = self.pna_read_configured_measurements_on_channel(channel_number=default_cnum)
@@ -635,9 +1025,9 @@ class E8361RemoteGPIB:
         parameter_list = [meas[1] for meas in meas_list]
         meas_name_list = [meas[0] for meas in meas_list]
 
-        """ Update local running_measurements-list with minimum information """
-        self.running_measurements.append(
-            {'meas_name': meas_name, 'cnum': default_cnum, 'parameter': parameter_list})
+        """ Update local measurements registry with minimum information - USE PNA's NAMES TO READ MEASUREMENTS! """
+        meas = PnaMeasurement(meas_name, default_cnum, parameter_list, meas_name_list, len(self.measurements))
+        self.measurements[meas_name] = meas
 
         """ Assure manual triggering if needed """
         if set_trigger_manual:
@@ -650,6 +1040,11 @@ class E8361RemoteGPIB:
         sweep_num_points = self.pna_get_sweep_num_points(meas_name)
         output_power = self.pna_get_output_power(meas_name)
         avgerage_number = self.pna_get_average_number(meas_name)
+        segments = self.pna_get_segment_sweep(meas_name)
+        if segments:
+            freq_start = segments[0]['freq_start']
+            freq_stop = segments[-1]['freq_stop']
+            sweep_num_points = sum(segment['sweep_num_points'] for segment in segments)
 
         pna_info = {
             'meas_name': meas_name,
@@ -661,16 +1056,16 @@ class E8361RemoteGPIB:
             'output_power': output_power,
             'avg_num': avgerage_number,
             }
+        if segments:
+            pna_info['segments'] = segments
 
-        """ Update running_measurements-list with full information """
-        self.running_measurements[0]['freq_start'] = freq_start
-        self.running_measurements[0]['freq_stop'] = freq_stop
-        self.running_measurements[0]['if_bw'] = if_bw
-        self.running_measurements[0]['sweep_num_points'] = sweep_num_points
-        self.running_measurements[0]['output_power'] = output_power
-        self.running_measurements[0]['avg_num'] = avgerage_number
-        # Other than regular measurement extra:
-        self.running_measurements[0]['meas_name_list'] = meas_name_list  # USE THIS TO READ MEASUREMENTS!
+        """ Update measurements registry with full information """
+        meas.freq_start = freq_start
+        meas.freq_stop = freq_stop
+        meas.if_bw = if_bw
+        meas.sweep_num_points = sweep_num_points
+        meas.output_power = output_power
+        meas.avg_num = avgerage_number
 
         return pna_info
 
@@ -680,7 +1075,7 @@ class E8361RemoteGPIB:
         :param channel_number:  channel number to read measurements from (<cnum>)
         :return: list of lists with measurement names and parameters [ ['meas_name1', 'param1'], ['meas_name2', 'param2'], ...]. Empty list if no parameters measured on given channel.
         """
-        meas_list_str = self.pna_device.query(f"CALC{channel_number}:PAR:CAT:EXT?")  # example response: "CH1_S11_1,S11,CH1_S12_2,S12"
+        meas_list_str = self.__query(f"CALC{channel_number}:PAR:CAT:EXT?")  # example response: "CH1_S11_1,S11,CH1_S12_2,S12"
         if meas_list_str == '"NO CATALOG"':
             return []  # return empty list if no parameters measured on given cnum
         meas_list_str = meas_list_str[1:-1]  # remove quotation marks at start/end
@@ -688,8 +1083,74 @@ class E8361RemoteGPIB:
         meas_list = [meas_list_parts[i:i + 2] for i in range(0, len(meas_list_parts), 2)]  # sorted [ ['meas_name1', 'param1'], ['meas_name2', 'param2'], ...]
         return meas_list
 
+    def pna_save_state(self, file_name: str):
+        """
+        Stores the instrument state of the PNA to a '.cst' file on the PNA (MMEM:STOR) and takes a snapshot of the
+        measurements registry, so both can be restored in one step by pna_recall_state().
+        Meant to be called once after the measurement is configured.
+
+        :param file_name: name of cst-file on PNA, names without folder are stored in the default PNA documents folder
+        :return: dict (state snapshot) {'file_name': str, 'measurements': dict} >> success, None >> failed
+        """
+        if self.pna_device is None:
+            return None
+        if file_name.split('.')[-1] != 'cst':
+            print("Error save PNA state - File is not a CST file!")
+            return None
+        file_name = self.__pna_file_path(file_name)
+        visa_timeout = self.pna_device.timeout
+        self.pna_device.timeout = self.__state_load_timeout
+        try:
+            self.__write("*CLS")
+            self.__write(f"MMEM:STOR '{file_name}'")
+            self.__query('*OPC?')
+            error_response = self.__query("SYST:ERR?")
+        except pyvisa.VisaIOError as ex:
+            print(f'VISA ERROR - Save state failed!\nMSG: {ex}')
+            return None
+        finally:
+            if self.pna_device is not None:
+                self.pna_device.timeout = visa_timeout
+        if not error_response.startswith('+0'):
+            print(f"Error save PNA state - PNA reports: {error_response}")
+            return None
+        return {'file_name': file_name, 'measurements': copy.deepcopy(self.measurements)}
+
+    def pna_recall_state(self, state: dict):
+        """
+        Restores a state snapshot of pna_save_state() in one step: Loads the '.cst' file on the PNA (MMEM:LOAD) and
+        restores the measurements registry. Other than pna_preset_from_file(), neither a preset nor the queries of
+        the loaded configuration are needed.
+
+        :param state: dict returned by pna_save_state()
+        :return: successful >> True, Failed >> False
+        """
+        if self.pna_device is None or state is None:
+            return False
+        visa_timeout = self.pna_device.timeout
+        self.pna_device.timeout = self.__state_load_timeout
+        try:
+            self.__write("*CLS")
+            self.__write(f"MMEM:LOAD '{state['file_name']}'")
+            self.__clear_shadow()
+            self.__query('*OPC?')
+            error_response = self.__query("SYST:ERR?")
+        except pyvisa.VisaIOError as ex:
+            print(f'VISA ERROR - Recall state failed!\nMSG: {ex}')
+            return False
+        finally:
+            if self.pna_device is not None:
+                self.pna_device.timeout = visa_timeout
+        if not error_response.startswith('+0'):
+            print(f"Error recall PNA state - PNA reports: {error_response}")
+            return False
+        self.measurements = copy.deepcopy(state['measurements'])
+        return True
+
     def pna_write_custom_string(self, visa_str: str):
         try:
+            self.__flush_batch()
+            self.__clear_shadow()   # effect of the custom string on the settings is unknown
             self.pna_device.write(visa_str)
         except pyvisa.VisaIOError as ex:
             return str(f"ERROR - Error occurred while write.\nMSG: {ex}")
@@ -705,6 +1166,8 @@ class E8361RemoteGPIB:
 
     def pna_query_custom_string(self, visa_str: str):
         try:
+            self.__flush_batch()
+            self.__clear_shadow()   # effect of the custom string on the settings is unknown
             response = self.pna_device.query(visa_str)
         except pyvisa.VisaIOError as ex:
             return str(f"ERROR - Error occurred while query.\nMSG: {ex}")
@@ -45,6 +45,14 @@ def read_measurement_data_from_file(filepath: str) -> dict:
 
     with open(filepath, 'r') as json_file:
         read_in_measurement_data_buffer = json.load(json_file)
+    if read_in_measurement_data_buffer['measurement_config'].get('data_format') == 'point_list':
+        print('Error: Point list files (adaptive or region of interest measurements) are not supported, use '
+              'read_point_list_data_array() of PythonChamberApp/measurement_routines/adaptive_refinement.py')
+        return None
+    if read_in_measurement_data_buffer['measurement_config'].get('data_format') == 'continuous':
+        print('Error: Raw continuous scan files are not supported, use resample_continuous_data() of '
+              'PythonChamberApp/measurement_routines/continuous_scan.py')
+        return None
 
     # add additional vector data to dict for coherent dataflow from processcontroller to sub-methods/windows
     read_in_measurement_data_buffer['f_vec'] = np.linspace(
@@ -0,0 +1,150 @@
+"""
+Fixtures of the unit tests. None of them needs the chamber or the PNA.
+
+The packages of the app import each other by absolute imports from the PythonChamberApp folder (e.g.
+'from connection_handler import ...'), so the folder is put on the path like when the app is started.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'PythonChamberApp'))
+
+
+class FakePNA:
+    """
+    Stands in for the pyvisa resource of the PNA. Settings written as 'header value' are stored and answered by
+    'header?', the stimulus and data queries answer with a sweep of the configured frequency points. State files
+    (MMEM:STOR / MMEM:LOAD) hold a copy of the settings, errors are queued for SYST:ERR?. All messages are recorded
+    in 'messages', one entry per transaction.
+    """
+    resource_name = 'GPIB0::16::INSTR'
+
+    def __init__(self):
+        self.settings = {}
+        self.messages = []
+        self.num_triggers = 0
+        self.data_value = (0.5, 0.5)    # real, imag of every data point
+        self.files = {}     # state files on the PNA {file name: settings}
+        self.errors = []
+        self.read_termination = None
+        self.write_termination = None
+        self.timeout = 2000
+        self.chunk_size = 20 * 1024
+
+    def write(self, message: str):
+        self.messages.append(message)
+        for command in self.__split(message):
+            self.__execute(command)
+        return len(message)
+
+    def query(self, message: str) -> str:
+        self.messages.append(message)
+        return [self.__execute(command) for command in self.__split(message)][-1]
+
+    def clear(self):
+        return
+
+    def close(self):
+        return
+
+    @staticmethod
+    def __split(message: str) -> list:
+        return [command[1:] if command.startswith(':') else command for command in message.split(';')]
+
+    def __execute(self, command: str):
+        if '?' in command:
+            header = command.split('?')[0]
+            if header.endswith(':X'):
+                channel = header.split(':')[0]
+                num_points = int(self.settings.get(channel + ':SWE:POIN', '201'))
+                freq_start = float(self.settings.get(channel + ':FREQ:STAR', '1e9'))
+                freq_stop = float(self.settings.get(channel + ':FREQ:STOP', '2e9'))
+                return ','.join(str(freq) for freq in np.linspace(freq_start, freq_stop, num_points))
+            if header.endswith(':DATA'):
+                channel = 'SENS' + header[len('CALC'):].split(':')[0]
+                num_points = int(self.settings.get(channel + ':SWE:POIN', '201'))
+                return ','.join([f"{self.data_value[0]},{self.data_value[1]}"] * num_points)
+            if header == '*OPC':
+                return '+1'
+            if header == 'SYST:ERR':
+                return self.errors.pop(0) if len(self.errors) > 0 else '+0,"No error"'
+            return self.settings.get(header, '0')
+        header, _, value = command.partition(' ')
+        if header == '*CLS':
+            self.errors = []
+        elif header == 'MMEM:STOR':
+            self.files[value.strip("'")] = dict(self.settings)
+        elif header == 'MMEM:LOAD':
+            if value.strip("'") in self.files:
+                self.settings = dict(self.files[value.strip("'")])
+            else:
+                self.errors.append('-256,"File name not found"')
+        elif header.upper().startswith('SYST'):    # preset
+            self.settings = {}
+        elif header.startswith('INIT') and header.endswith(':IMM'):
+            self.num_triggers += 1
+        elif value:
+            self.settings[header] = {'ON': '1', 'OFF': '0'}.get(value, value)
+        return None
+
+
+class FakeResourceManager:
+    """
+    Stands in for the pyvisa ResourceManager, every opened resource is the same FakePNA.
+    """
+    def __init__(self, pna: FakePNA = None):
+        self.pna = pna if pna is not None else FakePNA()
+
+    def open_resource(self, resource_name: str):
+        self.pna.resource_name = resource_name
+        return self.pna
+
+    def list_resources(self, query: str = '?*::INSTR'):
+        return (self.pna.resource_name,)
+
+
+class FakeChamber:
+    """
+    Stands in for ChamberNetworkCommands, movements are recorded in 'positions' and done immediately.
+    """
+    def __init__(self):
+        self.positions = []
+
+    def chamber_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0,
+                        timing: dict = None):
+        self.positions.append((x, y, z))
+        return {'status_code': 204, 'content': b''}
+
+    def chamber_start_jog_abs(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, speed: float = 5.0,
+                              timing: dict = None):
+        if timing is not None:
+            timing['jog_submit'] = 0.0
+        return self.chamber_jog_abs(x, y, z, speed)
+
+    def chamber_isflagset(self):
+        return False
+
+
+@pytest.fixture
+def fake_pna():
+    return FakePNA()
+
+
+@pytest.fixture
+def fake_vna(fake_pna):
+    """
+    E8361RemoteGPIB connected to fake_pna.
+    """
+    from vna_net_interface import E8361RemoteGPIB
+    vna = E8361RemoteGPIB(resource_manager=FakeResourceManager(fake_pna))
+    assert vna.connect_pna(fake_pna.resource_name)
+    return vna
+
+
+@pytest.fixture
+def fake_chamber():
+    return FakeChamber()
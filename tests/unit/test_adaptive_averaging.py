@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+from measurement_routines import AutoMeasurementRoutine, configure_vna
+from measurement_routines.adaptive_averaging import calc_amplitude_uncertainty, resolve_averaging_config
+
+VNA_CONFIG = {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11, 'if_bw': 1000,
+              'output_power': 0, 'avg_num': 4}
+
+
+def run_job(tmp_path, chamber, vna, vna_info, job_name: str, averaging_config: dict = None) -> dict:
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    file_location = str(tmp_path / 'results' / job_name)
+    routine = AutoMeasurementRoutine(chamber, vna, vna_info, (0.0, 10.0), (0.0,), (5.0,), mov_speed=50,
+                                     zero_position=(0, 0, 0), file_location=file_location, move_pattern='snake',
+                                     averaging_config=averaging_config)
+    routine.run()
+    with open(file_location + '.json') as file:
+        return json.load(file)
+
+
+def test_uncertainty_of_constant_sweeps_is_zero():
+    pointer = np.array([1 + 1j, 0.5 - 0.2j])
+    uncertainty = calc_amplitude_uncertainty(3 * pointer, 3 * np.abs(pointer) ** 2, 3)
+    assert np.allclose(uncertainty, 0.0)
+
+
+def test_uncertainty_matches_sample_variance():
+    rng = np.random.default_rng(1)
+    sweeps = 1.0 + 0.1 * (rng.standard_normal((8, 5)) + 1j * rng.standard_normal((8, 5)))
+    uncertainty = calc_amplitude_uncertainty(sweeps.sum(axis=0), (np.abs(sweeps) ** 2).sum(axis=0), len(sweeps))
+    mean = sweeps.mean(axis=0)
+    variance = (np.abs(sweeps - mean) ** 2).sum(axis=0) / (len(sweeps) - 1)
+    expected = 20 * np.log10(1 + np.sqrt(variance / len(sweeps)) / np.abs(mean))
+    assert np.allclose(uncertainty, expected)
+
+
+def test_uncertainty_of_zero_average_is_inf():
+    pointer_sum = np.array([0.0 + 0.0j])
+    assert np.isinf(calc_amplitude_uncertainty(pointer_sum, np.array([2.0]), 2))[0]
+
+
+@pytest.mark.parametrize('config, expected', [({}, (2, 4)), ({'min_averages': 1}, (2, 4)),
+                                              ({'min_averages': 6}, (6, 6)), ({'max_averages': 16}, (2, 16))])
+def test_resolve_averaging_config(config, expected):
+    resolved = resolve_averaging_config(config, avg_num=4)
+    assert (resolved['min_averages'], resolved['max_averages']) == expected
+
+
+def test_next_job_with_same_vna_config_measures_with_pna_averaging(tmp_path, fake_pna, fake_vna, fake_chamber):
+    vna_info = configure_vna(fake_vna, VNA_CONFIG, 'AutoMeasurement')
+    averaged = run_job(tmp_path, fake_chamber, fake_vna, vna_info, 'job_1', {'target_uncertainty': 0.05})
+    assert averaged['point_averages']['values'][0][3] == 2     # constant data of the fake stops at min_averages
+
+    # job queue does not configure the PNA again for the same vna_config
+    assert fake_vna.get_measurement('AutoMeasurement').avg_num == 4
+    assert fake_pna.settings['SENS1:AVER:STAT'] == '1'
+    num_triggers_before = fake_pna.num_triggers
+    fixed = run_job(tmp_path, fake_chamber, fake_vna, vna_info, 'job_2')
+    assert fake_pna.num_triggers - num_triggers_before == 2 * 4     # two points with 4 sweeps each
+    assert fixed['measurement_config']['average_number'] == 4
+
+
+def test_pna_averaging_is_restored_if_scan_fails(tmp_path, fake_pna, fake_vna, fake_chamber):
+    vna_info = configure_vna(fake_vna, VNA_CONFIG, 'AutoMeasurement')
+
+    jog = fake_chamber.chamber_jog_abs
+
+    def failing_jog(*args, **kwargs):
+        if len(fake_chamber.positions) > 0:     # first point is measured, PNA averaging is off
+            raise KeyboardInterrupt     # not handled by the error recovery of the routine
+        return jog(*args, **kwargs)
+
+    fake_chamber.chamber_jog_abs = failing_jog
+    with pytest.raises(KeyboardInterrupt):
+        run_job(tmp_path, fake_chamber, fake_vna, vna_info, 'job_1', {'target_uncertainty': 0.05})
+    assert fake_vna.get_measurement('AutoMeasurement').avg_num == 4
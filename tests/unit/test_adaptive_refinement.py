@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from measurement_routines import AdaptiveRefinement, validate_adaptive_config, fill_point_list_grid
+from measurement_routines.adaptive_refinement import coarse_indices, split_cell
+from measurement_routines.path_planner import AxisCostModel
+
+AMP_TOLERANCE = 0.5     # [dB]
+PHASE_TOLERANCE = 5.0   # [deg]
+
+
+def beam(x_coor: float, y_coor: float) -> np.ndarray:
+    """
+    Gaussian beam with a tilted phase front over 3 frequencies, curvature of the amplitude is the same everywhere.
+    """
+    amplitude_db = -0.016 * ((x_coor - 3) ** 2 + (y_coor + 4) ** 2)
+    phase_deg = 2.0 * x_coor + 1.5 * y_coor + 0.01 * x_coor ** 2
+    return 10 ** (amplitude_db / 20) * np.exp(1j * np.radians(phase_deg)) * np.array([1.0, 0.9, 0.8])
+
+
+def run_refinement(num_x: int, num_y: int, coarse_step: int):
+    """
+    Runs the refinement like the AutoMeasurementRoutine on the analytic beam.
+
+    :return: tuple (refinement, measured {(x_idx, y_idx, z_idx): values}, interpolation error [dB], [deg])
+    """
+    x_vec = np.linspace(-50, 50, num_x)
+    y_vec = np.linspace(-40, 40, num_y)
+    z_vec = np.array([0.0])
+    refinement = AdaptiveRefinement(x_vec, y_vec, z_vec, {'coarse_step': coarse_step, 'amp_tolerance': AMP_TOLERANCE,
+                                                          'phase_tolerance': PHASE_TOLERANCE, 'dynamic_range': 60})
+    measured = {}
+    path = refinement.coarse_path('snake', AxisCostModel(50))
+    while len(path) > 0:
+        for x_coor, y_coor, z_coor in path:
+            values = beam(x_coor, y_coor)
+            refinement.add_measurement(x_coor, y_coor, z_coor, values)
+            measured[(int(np.argmin(np.abs(x_vec - x_coor))), int(np.argmin(np.abs(y_vec - y_coor))), 0)] = values
+        path = refinement.next_path(AxisCostModel(50))
+
+    grid = fill_point_list_grid(x_vec, y_vec, z_vec, np.array(list(measured)), np.array(list(measured.values())),
+                                coarse_step)[:, :, 0, :]
+    true_grid = np.array([[beam(x_coor, y_coor) for y_coor in y_vec] for x_coor in x_vec])
+    amp_error = np.abs(20 * np.log10(np.abs(grid)) - 20 * np.log10(np.abs(true_grid)))
+    phase_error = np.abs(np.degrees(np.angle(grid * np.conj(true_grid))))
+    return refinement, measured, float(np.max(amp_error)), float(np.max(phase_error))
+
+
+@pytest.mark.parametrize('num_x, num_y, coarse_step', [(41, 33, 3), (41, 33, 4), (41, 33, 5), (41, 33, 6),
+                                                       (41, 33, 7), (48, 48, 4)])
+def test_refinement_meets_tolerance(num_x, num_y, coarse_step):
+    refinement, measured, amp_error, phase_error = run_refinement(num_x, num_y, coarse_step)
+    assert amp_error <= AMP_TOLERANCE
+    assert phase_error <= PHASE_TOLERANCE
+    assert len(measured) < num_x * num_y
+    assert refinement.refinement_round >= 1
+
+
+def test_cell_without_neighbours_is_out_of_tolerance():
+    x_vec = np.linspace(0, 40, 5)   # coarse grid of 2 points in X and Y, no neighbour behind any edge
+    refinement = AdaptiveRefinement(x_vec, x_vec, np.array([0.0]), {'coarse_step': 4})
+    for x_coor, y_coor, z_coor in refinement.coarse_path('snake'):
+        refinement.add_measurement(x_coor, y_coor, z_coor, np.ones(3))
+    assert refinement.cell_error((0, 0, 4, 0, 4), np.array(-np.inf)) == np.inf
+    assert len(refinement.next_points()) == 5
+
+
+def test_linear_field_is_not_refined():
+    x_vec = np.linspace(0, 100, 21)
+    refinement = AdaptiveRefinement(x_vec, x_vec, np.array([0.0]), {'coarse_step': 5})
+    for x_coor, y_coor, z_coor in refinement.coarse_path('snake'):
+        refinement.add_measurement(x_coor, y_coor, z_coor,
+                                   10 ** ((-0.1 * x_coor + 0.05 * y_coor) / 20) * np.ones(3))
+    assert len(refinement.next_points()) == 0
+
+
+def test_coarse_indices_include_last_point():
+    assert coarse_indices(48, 4).tolist() == list(range(0, 48, 4)) + [47]
+    assert coarse_indices(9, 4).tolist() == [0, 4, 8]
+
+
+def test_split_cell_stops_at_mesh_spacing():
+    sub_cells, nodes = split_cell((0, 0, 3, 0, 1))
+    assert sub_cells == [(0, 0, 1, 0, 1), (0, 1, 3, 0, 1)]
+    assert split_cell((0, 0, 1, 0, 1)) == ([], [])
+
+
+@pytest.mark.parametrize('config, valid', [({}, True), ({'coarse_step': 5}, True), ({'coarse_step': 0}, False),
+                                           ({'coarse_step': -2}, False), ({'coarse_step': 2.5}, False),
+                                           ({'amp_tolerance': 0}, False), ({'max_points': 0}, False),
+                                           ({'max_points': 100}, True), ({'step': 4}, False)])
+def test_validate_adaptive_config(config, valid):
+    assert validate_adaptive_config(config) is valid
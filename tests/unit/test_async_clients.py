@@ -0,0 +1,340 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from chamber_net_interface import AsyncChamberNetworkCommands
+from chamber_net_interface.chamber_net_interface import build_jog_gcode
+from connection_handler import AsyncHttpSession, AsyncHttpResponse
+from measurement_routines import AsyncScanRoutine, configure_vna
+from vna_net_interface import AsyncE8361RemoteGPIB
+
+VNA_CONFIG = {'parameter': ['S11', 'S22'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 3,
+              'if_bw': 1000, 'output_power': 0, 'avg_num': 1}
+
+
+class HttpServer:
+    """
+    HTTP/1.1 server on localhost that answers by path: '/json' with Content-Length, '/chunked' with chunked transfer
+    encoding, '/close' with 'Connection: close', '/drop' closes the connection without telling, '/slow' answers late.
+    """
+    def __init__(self):
+        self.requests = []  # (method, path, headers, body)
+        self.num_connections = 0
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.__handle, '127.0.0.1', 0)
+        return 'http://127.0.0.1:%d' % self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.num_connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = request_line.decode('latin-1').split(' ')[:2]
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                self.requests.append((method, path, headers, body))
+                if path == '/chunked':
+                    writer.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n'
+                                 b'5\r\nhello\r\n6;ext=1\r\n world\r\n0\r\n\r\n')
+                elif path == '/close':
+                    writer.write(b'HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 2\r\n\r\nok')
+                    break
+                elif path == '/drop':
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\ndrop')
+                    break
+                else:
+                    if path == '/slow':
+                        await asyncio.sleep(1)
+                    content = json.dumps({'path': path, 'body': body.decode('utf-8')}).encode('utf-8')
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                                 b'Content-Length: %d\r\n\r\n%s' % (len(content), content))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def run_with_server(test):
+    async def main():
+        server = HttpServer()
+        url = await server.start()
+        try:
+            return await test(server, url)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+def test_requests_to_a_host_share_one_keep_alive_connection():
+    async def test(server, url):
+        session = AsyncHttpSession()
+        responses = [await session.get(url + '/json?a=1'),
+                     await session.post(url + '/api', headers={'X-Api-Key': 'key'}, json={'command': 'connect'}),
+                     await session.get(url + '/chunked')]
+        await session.close()
+        return responses, server.requests, server.num_connections
+
+    (first, second, chunked), server_requests, num_connections = run_with_server(test)
+    assert num_connections == 1
+    assert first.status_code == 200 and first.json() == {'path': '/json?a=1', 'body': ''}
+    assert second.json()['body'] == '{"command": "connect"}'
+    method, path, headers, body = server_requests[1]
+    assert (method, headers['x-api-key'], headers['content-type']) == ('POST', 'key', 'application/json')
+    assert chunked.content == b'hello world' and chunked.headers['transfer-encoding'] == 'chunked'
+
+
+def test_closed_connections_are_reopened():
+    async def test(server, url):
+        session = AsyncHttpSession()
+        responses = [await session.get(url + path) for path in ('/close', '/json', '/drop', '/json')]
+        await session.close()
+        return [response.content[:4] for response in responses], server.num_connections
+
+    contents, num_connections = run_with_server(test)
+    assert contents == [b'ok', b'{"pa', b'drop', b'{"pa']
+    assert num_connections == 3     # after the announced close and after the silent drop
+
+
+def test_slow_requests_time_out_and_the_session_recovers():
+    async def test(server, url):
+        session = AsyncHttpSession(timeout=0.2)
+        with pytest.raises(asyncio.TimeoutError):
+            await session.get(url + '/slow')
+        response = await session.get(url + '/json')
+        with pytest.raises(ValueError):
+            await session.get('ftp://127.0.0.1/file')
+        await session.close()
+        return response.status_code
+
+    assert run_with_server(test) == 200
+
+
+class FakeOctoPrint:
+    """
+    Stands in for the AsyncHttpSession of a chamber. The flag is reset after 'num_busy_polls' polls of the tool
+    endpoint following each command.
+    """
+    def __init__(self, num_busy_polls: int = 3, events: list = None):
+        self.num_busy_polls = num_busy_polls
+        self.posts = []
+        self.num_polls = 0
+        self.busy_polls_left = 0
+        self.events = events if events is not None else []
+        self.post_error = None
+        self.post_status = 204
+        self.closed = False
+
+    async def post(self, url: str, headers: dict = None, json=None):
+        if self.post_error is not None:
+            raise self.post_error
+        self.posts.append((url, json))
+        self.events.append(('post', id(self)))
+        self.busy_polls_left = self.num_busy_polls
+        return AsyncHttpResponse(self.post_status, {}, b'')
+
+    async def get(self, url: str, headers: dict = None):
+        self.num_polls += 1
+        target = 0
+        if self.busy_polls_left > 0:
+            self.busy_polls_left -= 1
+            target = 1
+        if self.busy_polls_left == 0 and target == 0:
+            self.events.append(('done', id(self)))
+        return AsyncHttpResponse(200, {}, b'{"tool0": {"actual": 21.0, "target": %d.0}}' % target)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_jog_sends_the_gcode_of_the_sync_client_and_waits_for_the_flag():
+    octoprint = FakeOctoPrint(num_busy_polls=3)
+    chamber = AsyncChamberNetworkCommands('192.168.0.7', 'key', http=octoprint)
+    chamber.check_flag_timeout = 0.001
+    timing = {}
+
+    async def test():
+        response = await chamber.chamber_jog_abs(x=100, y=50.123, z=20, speed=50, timing=timing)
+        await chamber.close()
+        return response
+
+    assert asyncio.run(test()) == {'status_code': 204, 'content': b''}
+    assert octoprint.posts == [('http://192.168.0.7/api/printer/command',
+                                {'commands': build_jog_gcode(100, 50.123, 20, 3000, True)})]
+    assert octoprint.num_polls == 4 and octoprint.closed
+    assert set(timing) == {'jog_submit', 'flag_wait'}
+
+
+def test_start_jog_returns_before_the_movement_is_done():
+    octoprint = FakeOctoPrint(num_busy_polls=2)
+    chamber = AsyncChamberNetworkCommands('192.168.0.7', 'key', http=octoprint)
+    chamber.check_flag_timeout = 0.001
+
+    async def test():
+        await chamber.chamber_start_jog_abs(x=1, y=2, z=3)
+        num_polls = octoprint.num_polls
+        await chamber.chamber_wait_for_flag()
+        return num_polls
+
+    assert asyncio.run(test()) == 0 and octoprint.num_polls == 3
+
+
+def test_connect_errors_are_returned():
+    octoprint = FakeOctoPrint()
+    chamber = AsyncChamberNetworkCommands('192.168.0.7', 'key', http=octoprint)
+    assert asyncio.run(chamber.chamber_connect_serial()) == {'status_code': 204, 'content': b''}
+    assert octoprint.posts[-1] == ('http://192.168.0.7/api/connection', {'command': 'connect'})
+    octoprint.post_status = 409
+    assert asyncio.run(chamber.chamber_connect_serial())['status_code'] == -1
+    octoprint.post_error = ConnectionRefusedError('connection refused')
+    result = asyncio.run(chamber.chamber_connect_serial())
+    assert result['status_code'] == -1 and 'ConnectionRefusedError' in result['error']
+
+
+def test_chambers_move_concurrently_in_one_event_loop():
+    events = []
+    chambers = [AsyncChamberNetworkCommands(f"192.168.0.{i}", 'key', http=FakeOctoPrint(5, events))
+                for i in range(3)]
+    for chamber in chambers:
+        chamber.check_flag_timeout = 0.001
+
+    async def test():
+        await asyncio.gather(*[chamber.chamber_jog_abs(x=10, y=10, z=10) for chamber in chambers])
+
+    asyncio.run(test())
+    assert [event for event, _ in events[:3]] == ['post'] * 3     # all jogs submitted before any is done
+    assert [event for event, _ in events[3:]] == ['done'] * 3
+
+
+def test_async_vna_runs_the_commands_in_the_actor_thread(fake_pna, fake_vna):
+    vna = AsyncE8361RemoteGPIB(fake_vna)
+
+    async def test():
+        vna_info = await vna.run(configure_vna, fake_vna, VNA_CONFIG, 'AutoMeasurement')
+        data = await vna.pna_read_meas_data('AutoMeasurement', 'S22')
+        assert vna.device is fake_vna and vna.pna_device is fake_pna   # attributes are read directly
+        await vna.close()
+        return vna_info, data
+
+    vna_info, data = asyncio.run(test())
+    assert vna_info['meas_name'] == 'AutoMeasurement'
+    assert np.array(data, dtype=float).shape == (3, 3)
+    assert fake_vna.pna_device is None and vna.get_actor().is_alive() is False
+
+
+class FakeAsyncChamber:
+    def __init__(self, move_time: float = 0.0, hang_at: int = None):
+        self.positions = []
+        self.move_time = move_time
+        self.hang_at = hang_at
+
+    async def chamber_jog_abs(self, x: float, y: float, z: float, speed: float):
+        if len(self.positions) == self.hang_at:
+            await asyncio.sleep(10)
+        await asyncio.sleep(self.move_time)
+        self.positions.append((x, y, z))
+        return {'status_code': 204, 'content': b''}
+
+
+class FakeAsyncVna:
+    """
+    Sweeps and reads out with the given durations, data of every point is 0.5 + 0.5j at 3 frequencies.
+    """
+    def __init__(self, sweep_time: float = 0.0, readout_time: float = 0.0):
+        self.sweep_time = sweep_time
+        self.readout_time = readout_time
+        self.num_triggers = 0
+
+    async def pna_trigger_measurement(self, meas_name: str):
+        await asyncio.sleep(self.sweep_time)
+        self.num_triggers += 1
+        return True
+
+    async def pna_read_meas_data(self, meas_name: str, parameter: str):
+        await asyncio.sleep(self.readout_time)
+        return [[1e9, 0.5, 0.5], [1.5e9, 0.5, 0.5], [2e9, 0.5, 0.5]]
+
+
+def scan_routine(chamber, vna, tmp_path, **kwargs):
+    vna_info = dict(VNA_CONFIG, meas_name='AutoMeasurement')
+    return AsyncScanRoutine(chamber, vna, vna_info, (90.0, 100.0, 110.0), (95.0, 105.0), (10.0, 20.0), mov_speed=50,
+                            zero_position=(100.0, 100.0, 0.0), file_location=str(tmp_path / 'scan'),
+                            move_pattern='snake', **kwargs)
+
+
+def test_async_scan_overlaps_readout_and_move(tmp_path):
+    chamber, vna = FakeAsyncChamber(move_time=0.03), FakeAsyncVna(sweep_time=0.01, readout_time=0.015)
+    routine = scan_routine(chamber, vna, tmp_path)
+    progress = []
+    routine.signals.progress.connect(lambda info: progress.append(dict(info)))
+    result = asyncio.run(routine.run())
+
+    assert result['stopped'] is False and vna.num_triggers == 12
+    assert chamber.positions == [tuple(point) for point in routine.scan_path.tolist()]
+    assert progress[-1]['status_flag'] == 'Measurement finished' and progress[-1]['total_current_point_number'] == 12
+    with open(tmp_path / 'scan.json') as file:
+        measurement = json.load(file)
+    data = np.array(measurement['data'])
+    assert data.shape == (12 * 3, 4 + 2 * 2)
+    assert data[:4, :4].tolist() == [[-10, -5, 10, 1e9], [-10, -5, 10, 1.5e9], [-10, -5, 10, 2e9],
+                                     [0, -5, 10, 1e9]]   # sorted like the files of the AutoMeasurementRoutine
+    assert np.allclose(data[:, 4], np.sqrt(0.5)) and np.allclose(data[:, 5], 45.0)
+    async_scan = measurement['measurement_config']['async_scan']
+    assert async_scan['num_points'] == 12 and async_scan['move_timeout'] == 120.0
+    assert async_scan['overlap_time'] > 0.1     # readouts of 11 points ran during moves
+
+
+def test_async_scan_with_the_actor_backed_vna(tmp_path, fake_vna):
+    vna = AsyncE8361RemoteGPIB(fake_vna)
+    configure_vna(fake_vna, VNA_CONFIG, 'AutoMeasurement')
+    routine = scan_routine(FakeAsyncChamber(), vna, tmp_path)
+
+    async def test():
+        result = await routine.run()
+        await vna.close()
+        return result
+
+    assert asyncio.run(test())['stopped'] is False
+    with open(tmp_path / 'scan.json') as file:
+        assert len(json.load(file)['data']) == 12 * 3
+
+
+def test_timed_out_move_stops_the_scan_and_keeps_the_measured_points(tmp_path):
+    routine = scan_routine(FakeAsyncChamber(hang_at=4), FakeAsyncVna(), tmp_path, scan_config={'move_timeout': 0.1})
+    errors = []
+    routine.signals.error.connect(errors.append)
+    start = time.perf_counter()
+    result = asyncio.run(routine.run())
+    assert time.perf_counter() - start < 5
+    assert result['stopped'] is True
+    assert errors[0]['error_code'] == -1 and 'TimeoutError' in errors[0]['error_msg']
+    with open(tmp_path / 'scan.json') as file:
+        assert len(json.load(file)['data']) == 4 * 3    # readout of the last point ran with the failed move
+
+
+def test_stopped_async_scan_reports_the_user_stop(tmp_path):
+    routine = scan_routine(FakeAsyncChamber(), FakeAsyncVna(), tmp_path)
+    errors = []
+    routine.signals.error.connect(errors.append)
+    routine.signals.progress.connect(lambda info: routine.stop() if info.get('total_current_point_number') == 2
+                                     else None)
+    result = asyncio.run(routine.run())
+    assert result['stopped'] is True
+    assert errors == [{'error_code': 0, 'error_msg': 'AsyncScan was stopped by user.'}]
+    with open(tmp_path / 'scan.json') as file:
+        measurement = json.load(file)
+    assert len(measurement['data']) == 2 * 3 and measurement['measurement_config']['async_scan']['num_points'] == 2
@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pytest
+
+from measurement_routines import AutoMeasurementRoutine, configure_vna, validate_scan_spec
+from measurement_routines.continuous_scan import resample_line, calc_line_speed, calc_line_endpoints
+
+
+def continuous_spec(x_num_steps: int) -> dict:
+    return {'type': 'auto_measurement', 'zero_position': [100, 100, 0],
+            'mesh': {'x_length': 20, 'x_num_steps': x_num_steps, 'y_length': 20, 'y_num_steps': 3,
+                     'z_start': 10, 'z_stop': 10, 'z_num_steps': 1},
+            'move_pattern': 'snake', 'jog_speed': 50, 'output_file': 'results/continuous',
+            'vna_config': {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11,
+                           'if_bw': 1000, 'output_power': 0, 'avg_num': 1},
+            'continuous': {}}
+
+
+@pytest.mark.parametrize('x_num_steps, valid', [(1, False), (2, True), (11, True)])
+def test_continuous_spec_needs_two_x_steps(x_num_steps, valid):
+    assert validate_scan_spec(continuous_spec(x_num_steps)) is valid
+
+
+def test_continuous_spec_with_mesh_vectors_needs_two_x_steps():
+    spec = continuous_spec(2)
+    spec['mesh'] = {'x_vec': [100.0], 'y_vec': [90.0, 100.0], 'z_vec': [10.0]}
+    assert validate_scan_spec(spec) is False
+
+
+def test_single_x_point_lines_are_measured_at_standstill(tmp_path, fake_vna, fake_chamber):
+    vna_info = configure_vna(fake_vna, continuous_spec(1)['vna_config'], 'AutoMeasurement')
+    (tmp_path / 'results').mkdir()
+    file_location = str(tmp_path / 'results' / 'continuous')
+    y_vec = (90.0, 100.0, 110.0)
+    routine = AutoMeasurementRoutine(fake_chamber, fake_vna, vna_info, (100.0,), y_vec, (10.0,), mov_speed=50,
+                                     zero_position=(100, 100, 0), file_location=file_location, move_pattern='snake',
+                                     continuous_config={'resample': True})
+    errors = []
+    routine.signals.error.connect(errors.append)
+    routine.run()
+    assert errors == []
+    with open(file_location + '.json') as file:
+        data = np.array(json.load(file)['data'])
+    assert sorted(set(map(tuple, data[:, :3]))) == [(0.0, -10.0, 10.0), (0.0, 0.0, 10.0), (0.0, 10.0, 10.0)]
+    assert len(data) == 3 * 11
+
+
+def test_measurement_file_is_written_before_finished(tmp_path, fake_vna, fake_chamber):
+    vna_info = configure_vna(fake_vna, continuous_spec(3)['vna_config'], 'AutoMeasurement')
+    (tmp_path / 'results').mkdir()
+    file_location = str(tmp_path / 'results' / 'continuous')
+    routine = AutoMeasurementRoutine(fake_chamber, fake_vna, vna_info, (90.0, 100.0, 110.0), (90.0, 100.0), (10.0,),
+                                     mov_speed=50, zero_position=(100, 100, 0), file_location=file_location,
+                                     move_pattern='snake', continuous_config={'resample': True})
+    files_at_finished = []
+
+    def read_file(result: dict):     # the job queue starts the next job from here
+        assert result['stopped'] is False
+        with open(file_location + '.json') as file:
+            files_at_finished.append(json.load(file))
+
+    routine.signals.finished.connect(read_file)
+    routine.run()
+    assert len(files_at_finished) == 1
+    assert len(files_at_finished[0]['data']) == 3 * 2 * 11
+
+
+def test_resample_line_interpolates_amplitude_and_phase():
+    x_samples = np.array([0.0, 1.0, 2.5, 4.0])
+    pointers = (1 + x_samples[:, None]) * np.exp(1j * np.radians(40 * x_samples[:, None])) * np.ones((1, 2))
+    grid = resample_line(x_samples, pointers, np.array([0.0, 2.0, 4.0]))
+    assert np.allclose(np.abs(grid[:, 0]), [1.0, 3.0, 5.0])
+    assert np.allclose(np.degrees(np.angle(grid[:, 1])), [0.0, 80.0, 160.0])
+
+
+def test_resample_line_unwraps_phase():
+    x_samples = np.array([0.0, 1.0, 2.0])
+    pointers = np.exp(1j * np.radians([[170.0], [-170.0], [-150.0]]))   # phase 170 > 190 > 210 deg
+    grid = resample_line(x_samples, pointers, np.array([0.5, 1.5]))
+    assert np.allclose(np.degrees(np.angle(grid[:, 0])) % 360, [180.0, 200.0])
+
+
+def test_resample_line_leaves_grid_outside_of_samples_zero():
+    x_samples = np.array([2.0, 3.0])
+    grid = resample_line(x_samples, np.ones((2, 1)), np.array([0.0, 1.0, 2.0, 3.0, 4.0]))
+    assert np.allclose(np.abs(grid[:, 0]), [0.0, 0.0, 1.0, 1.0, 0.0])
+
+
+def test_resample_line_unsorted_samples():
+    x_samples = np.array([2.0, 0.0, 1.0])   # backward line
+    grid = resample_line(x_samples, x_samples[:, None] + 1.0, np.array([0.0, 0.5, 2.0]))
+    assert np.allclose(np.abs(grid[:, 0]), [1.0, 1.5, 3.0])
+
+
+def test_resample_line_without_samples():
+    assert np.all(resample_line(np.zeros(0), np.zeros((0, 3)), np.array([0.0, 1.0])) == 0)
+
+
+def test_calc_line_speed():
+    x_vec = np.linspace(0, 10, 11)
+    assert calc_line_speed(x_vec, 0.1, 2, 50) == pytest.approx(5.0)
+    assert calc_line_speed(x_vec, 0.001, 2, 50) == 50
+    assert calc_line_speed(np.array([3.0]), 0.1, 2, 50) == 50
+
+
+def test_calc_line_endpoints_add_run_up_in_move_direction():
+    start, stop = calc_line_endpoints(np.array([100.0, 200.0]), 50.0, 10.0, False, 5.0)
+    assert start.tolist() == [205.0, 50.0, 10.0]
+    assert stop.tolist() == [95.0, 50.0, 10.0]
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from connection_handler import DeviceActor, PRIORITY_JOG, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+
+
+class Device:
+    """
+    Records the commands in order of execution, 'block' holds the actor thread until 'release' is set.
+    """
+    def __init__(self):
+        self.executed = []
+        self.threads = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.value = 42
+
+    def command(self, name: str):
+        self.executed.append(name)
+        self.threads.append(threading.current_thread())
+        return name
+
+    def block(self):
+        self.started.set()
+        assert self.release.wait(5)
+        return 'block'
+
+    def fail(self):
+        raise ValueError('device error')
+
+    @contextmanager
+    def batch(self):
+        self.executed.append('enter')
+        yield self
+        self.executed.append('exit')
+
+
+@pytest.fixture
+def device():
+    return Device()
+
+
+@pytest.fixture
+def actor(device):
+    actor = DeviceActor(device, 'test')
+    yield actor
+    device.release.set()
+    actor.stop()
+
+
+def block_actor(actor: DeviceActor, device: Device):
+    future = actor.submit(device.block)
+    assert device.started.wait(5)
+    return future
+
+
+def test_commands_are_executed_by_priority_then_in_order_of_submission(actor, device):
+    blocker = block_actor(actor, device)
+    futures = [actor.submit(device.command, 'background', priority=PRIORITY_BACKGROUND),
+               actor.submit(device.command, 'normal_1'),
+               actor.submit(device.command, 'jog_1', priority=PRIORITY_JOG),
+               actor.submit(device.command, 'normal_2', priority=PRIORITY_NORMAL),
+               actor.submit(device.command, 'jog_2', priority=PRIORITY_JOG)]
+    assert actor.get_num_pending() == 5
+    device.release.set()
+    assert [future.result(5) for future in futures] == ['background', 'normal_1', 'jog_1', 'normal_2', 'jog_2']
+    assert blocker.result(5) == 'block'
+    assert device.executed == ['jog_1', 'jog_2', 'normal_1', 'normal_2', 'background']
+    assert all(thread.name == 'test-actor' for thread in device.threads)
+
+
+def test_call_returns_result_and_raises_errors_of_the_command(actor, device):
+    assert actor.call(device.command, 'a') == 'a'
+    with pytest.raises(ValueError, match='device error'):
+        actor.call(device.fail)
+    assert actor.call(device.command, 'b') == 'b'     # actor survives the error
+
+
+def test_call_from_the_actor_thread_is_executed_right_away(actor, device):
+    def sequence():
+        return [actor.call(device.command, 'first'), actor.proxy().command('second')]
+
+    assert actor.submit(sequence).result(5) == ['first', 'second']
+    assert device.executed == ['first', 'second']
+
+
+def test_stop_executes_queued_commands_and_rejects_new_ones(actor, device):
+    block_actor(actor, device)
+    futures = [actor.submit(device.command, name) for name in ('a', 'b')]
+    threading.Timer(0.05, device.release.set).start()
+    actor.stop(wait=True)
+    assert [future.result(0) for future in futures] == ['a', 'b']
+    assert not actor.is_alive()
+    rejected = actor.submit(device.command, 'c')
+    with pytest.raises(RuntimeError):
+        rejected.result(0)
+    assert device.executed == ['a', 'b']
+    actor.stop()    # stopping twice does nothing
+
+
+def test_cancelled_commands_are_not_executed(actor, device):
+    block_actor(actor, device)
+    future = actor.submit(device.command, 'cancelled')
+    assert future.cancel()
+    device.release.set()
+    assert actor.call(device.command, 'next') == 'next'
+    assert device.executed == ['next']
+
+
+def test_proxy_forwards_methods_attributes_and_context_managers(actor, device):
+    proxy = actor.proxy()
+    assert proxy.value == 42
+    proxy.value = 7
+    assert device.value == 7
+    with proxy.batch() as batch_device:
+        assert batch_device is device
+        proxy.command('inside')
+    assert device.executed == ['enter', 'inside', 'exit']
+    assert proxy.get_actor() is actor
+
+
+def test_async_proxy_awaits_commands_of_the_actor(actor, device):
+    async_proxy = actor.async_proxy()
+
+    async def scan():
+        results = await asyncio.gather(async_proxy.command('a'), async_proxy.command('b', priority=PRIORITY_JOG),
+                                       async_proxy.run(device.command, 'c'))
+        with pytest.raises(ValueError):
+            await async_proxy.fail()
+        return results
+
+    assert asyncio.run(scan()) == ['a', 'b', 'c']
+    assert sorted(device.executed) == ['a', 'b', 'c']
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pytest
+
+from measurement_routines import VnaTimingModel, simulate_scan, format_dry_run_report
+
+VNA_INFO = {'parameter': ['S11', 'S21'], 'freq_start': 1e9, 'freq_stop': 2e9, 'if_bw': 1000, 'sweep_num_points': 11,
+            'output_power': 0, 'avg_num': 2}
+
+
+def auto_spec(move_pattern: str = 'snake', output_file: str = 'results/dry_run') -> dict:
+    return {'type': 'auto_measurement', 'zero_position': [100, 100, 0],
+            'mesh': {'x_length': 20, 'x_num_steps': 3, 'y_length': 20, 'y_num_steps': 4,
+                     'z_start': 10, 'z_stop': 20, 'z_num_steps': 2},
+            'move_pattern': move_pattern, 'jog_speed': 50, 'output_file': output_file,
+            'vna_config': {key: VNA_INFO[key] for key in VNA_INFO}}
+
+
+def body_spec() -> dict:
+    return {'type': 'body_scan', 'zero_position': [100, 100, 50],
+            'mesh': {'x_length': 20, 'x_num_steps': 2, 'y_length': 20, 'y_num_steps': 3,
+                     'z_length': 30, 'z_num_steps': 4, 'z_move_sleep_time': 0.5},
+            'move_pattern': 'line-by-line', 'jog_speed': 50, 'output_file': 'results/body',
+            'vna_config': {'preset_file': 'body.cst'}}
+
+
+def assert_durations_add_up(result: dict):
+    assert result['total_ms'] == pytest.approx(sum(result['phases_ms'].values()))
+    assert result['total_ms'] == pytest.approx(sum(result['layer_ms']))
+
+
+def test_auto_measurement_durations(tmp_path):
+    result = simulate_scan(auto_spec(), VNA_INFO)
+    assert (result['num_points'], result['num_moves']) == (24, 24)
+    assert result['layer_label'] == 'z-layer' and len(result['layer_ms']) == 2
+    assert_durations_add_up(result)
+    vna_model = VnaTimingModel()
+    assert result['phases_ms']['vna_sweep'] == pytest.approx(24 * vna_model.sweep_duration(VNA_INFO) * 1e3)
+    assert result['phases_ms']['readout'] == pytest.approx(24 * vna_model.readout_duration(VNA_INFO) * 1e3)
+    assert result['phases_ms']['settle'] == 0.0
+    assert result['file_size_bytes']['json_compact'] < result['file_size_bytes']['json_readable']
+
+
+def test_sweep_duration_counts_source_ports_and_averages():
+    vna_model = VnaTimingModel()
+    one_port = dict(VNA_INFO, parameter=['S11'], avg_num=1)
+    single = vna_model.sweep_duration(one_port) - vna_model.trigger_overhead_time
+    assert single == pytest.approx(11 * vna_model.sweep_time_factor / 1000 + vna_model.retrace_time)
+    two_ports = vna_model.sweep_duration(dict(one_port, parameter=['S11', 'S22'], avg_num=3))
+    assert two_ports - vna_model.trigger_overhead_time == pytest.approx(6 * single)
+
+
+def test_snake_moves_less_than_line_by_line():
+    snake = simulate_scan(auto_spec('snake'), VNA_INFO)
+    line_by_line = simulate_scan(auto_spec('line-by-line'), VNA_INFO)
+    assert snake['phases_ms']['move'] < line_by_line['phases_ms']['move']
+    assert snake['phases_ms']['vna_sweep'] == line_by_line['phases_ms']['vna_sweep']
+
+
+def test_body_scan_moves_below_each_column_and_settles():
+    result = simulate_scan(body_spec(), VNA_INFO)
+    assert result['num_points'] == 2 * 3 * 4
+    assert result['num_moves'] > result['num_points']    # move below each XY-column
+    assert result['layer_label'] == 'y-line' and len(result['layer_ms']) == 3
+    assert result['phases_ms']['settle'] == pytest.approx(24 * 500)
+    assert 'json_compact' not in result['file_size_bytes']
+    assert_durations_add_up(result)
+
+
+def test_file_size_estimate_matches_a_written_measurement_file(tmp_path, fake_vna, fake_chamber):
+    from measurement_routines import AutoMeasurementRoutine, calc_mesh_vectors, configure_vna
+    spec = auto_spec(output_file=str(tmp_path / 'results' / 'scan'))
+    (tmp_path / 'results').mkdir()
+    vna_info = configure_vna(fake_vna, spec['vna_config'], 'AutoMeasurement')
+    x_vec, y_vec, z_vec = calc_mesh_vectors(spec)
+    AutoMeasurementRoutine(fake_chamber, fake_vna, vna_info, x_vec, y_vec, z_vec, mov_speed=spec['jog_speed'],
+                           zero_position=tuple(spec['zero_position']), file_location=spec['output_file'],
+                           move_pattern=spec['move_pattern']).run()
+    file_size = os.path.getsize(spec['output_file'] + '.json')
+    estimate = simulate_scan(spec, VNA_INFO)['file_size_bytes']['json_readable']
+    assert 0.7 < estimate / file_size < 1.3
+
+
+def test_report_names_points_phases_and_file_sizes():
+    result = simulate_scan(auto_spec(), VNA_INFO)
+    report = format_dry_run_report(result)
+    assert report.startswith('Dry run of auto_measurement (snake): 24 points, 24 moves')
+    for phase in result['phases_ms']:
+        assert f"    {phase}: " in report
+    assert 'per z-layer (2x)' in report
+    assert f"file size json_compact: {result['file_size_bytes']['json_compact'] / 1e6:.2f} MB" in report
+    assert not report.endswith('\n')
+
+
+def test_empty_layers_give_no_layer_line():
+    result = simulate_scan(auto_spec(), VNA_INFO)
+    result['layer_ms'] = np.array([])
+    assert 'per z-layer' not in format_dry_run_report(result)
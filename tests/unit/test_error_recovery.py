@@ -0,0 +1,168 @@
+import pytest
+import pyvisa
+import requests
+
+from measurement_routines import RECOVERY_DEFAULTS, RecoveryPolicy, classify_error, validate_scan_spec
+from measurement_routines.error_recovery import VISA_ERROR_TIMEOUT, VISA_ERROR_NCIC, ESCALATION
+
+NO_BACKOFF = {'base_delay': 0.0}
+
+
+def http_error(status_code: int) -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+@pytest.mark.parametrize('error, expected', [
+    (pyvisa.errors.VisaIOError(VISA_ERROR_TIMEOUT), ('visa_timeout', VISA_ERROR_TIMEOUT)),
+    (pyvisa.errors.VisaIOError(VISA_ERROR_NCIC), ('visa_ncic', VISA_ERROR_NCIC)),
+    (pyvisa.errors.VisaIOError(-1073807343), ('visa_io', -1073807343)),
+    (requests.exceptions.ConnectionError(), ('chamber_http', -1)),
+    (http_error(409), ('chamber_http', 409)),
+    (ValueError('could not convert string to float'), ('parse', -1)),
+    (KeyError('data'), ('parse', -1)),
+    (Exception(f"VI_ERROR_TMO ({VISA_ERROR_TIMEOUT})"), ('visa_timeout', VISA_ERROR_TIMEOUT)),
+    (RuntimeError('something else'), ('unknown', -1)),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_total_budget_is_unlimited_by_default():
+    assert RECOVERY_DEFAULTS['total_budget'] is None
+    policy = RecoveryPolicy({}, NO_BACKOFF)
+    for point in range(100):
+        policy.begin_point()
+        for attempt in range(RECOVERY_DEFAULTS['point_budget'] - 1):
+            assert not policy.handle(requests.exceptions.ConnectionError(), f"point {point}")['give_up']
+    assert policy.num_errors == 100 * (RECOVERY_DEFAULTS['point_budget'] - 1)
+    assert policy.num_per_class == {'chamber_http': policy.num_errors}
+
+
+def test_point_budget_gives_up_after_its_attempts():
+    policy = RecoveryPolicy({}, dict(NO_BACKOFF, point_budget=3))
+    events = [policy.handle(requests.exceptions.ConnectionError()) for _ in range(3)]
+    assert [event['give_up'] for event in events] == [False, False, True]
+    assert [event['attempt'] for event in events] == [1, 2, 3]
+    assert events[-1]['action'] == 'give_up'
+    policy.begin_point()
+    assert not policy.handle(requests.exceptions.ConnectionError())['give_up']
+
+
+def test_total_budget_gives_up_across_points():
+    policy = RecoveryPolicy({}, dict(NO_BACKOFF, total_budget=3))
+    give_ups = []
+    for _ in range(3):
+        policy.begin_point()
+        give_ups.append(policy.handle(ValueError())['give_up'])
+    assert give_ups == [False, False, True]
+
+
+def test_each_error_class_escalates_along_its_ladder():
+    calls = []
+    actions = {tier: (lambda tier=tier: calls.append(tier)) for tier in ('clear_status', 'ifc', 'state_recall',
+                                                                         'full_preset')}
+    policy = RecoveryPolicy(actions, dict(NO_BACKOFF, point_budget=20))
+    timeout = pyvisa.errors.VisaIOError(VISA_ERROR_TIMEOUT)
+    assert [policy.handle(timeout)['action'] for _ in range(5)] == list(ESCALATION['visa_timeout']) + ['full_preset']
+    # the attempts of another class at the same point start at the beginning of its own ladder
+    assert policy.handle(pyvisa.errors.VisaIOError(VISA_ERROR_NCIC))['action'] == 'ifc'
+    assert calls == ['clear_status', 'state_recall', 'full_preset', 'full_preset', 'ifc']
+    policy.begin_point()
+    assert policy.handle(timeout)['action'] == 'retry'
+
+
+def test_failing_and_missing_actions_escalate_to_the_next_tier():
+    def failing_clear():
+        raise OSError('bus error')
+
+    policy = RecoveryPolicy({'clear_status': failing_clear, 'state_recall': lambda: False,
+                             'full_preset': lambda: True}, NO_BACKOFF)
+    event = policy.handle(pyvisa.errors.VisaIOError(-1073807343))   # visa_io ladder starts with clear_status
+    assert event['action'] == 'full_preset'
+    assert event['failed_actions'] == ['clear_status: bus error', 'state_recall']
+
+    policy = RecoveryPolicy({}, NO_BACKOFF)
+    assert policy.handle(pyvisa.errors.VisaIOError(VISA_ERROR_NCIC))['action'] == 'failed'
+
+
+def test_backoff_grows_exponentially_up_to_max_delay():
+    policy = RecoveryPolicy({}, {'base_delay': 0.1, 'backoff_factor': 2.0, 'max_delay': 0.5})
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+
+def test_stored_events_are_limited():
+    policy = RecoveryPolicy({}, dict(NO_BACKOFF, max_stored_events=3))
+    for index in range(5):
+        policy.begin_point()
+        policy.handle(ValueError(), f"point {index}")
+    json_dict = policy.to_json_dict()
+    assert [event['context'] for event in json_dict['events']] == ['point 2', 'point 3', 'point 4']
+    assert json_dict['num_errors'] == 5
+    assert json_dict['num_per_action'] == {'retry': 5}
+
+
+def scan_spec(error_recovery: dict, output_file: str = 'results/recovery') -> dict:
+    return {'type': 'auto_measurement', 'zero_position': [100, 100, 0],
+            'mesh': {'x_length': 20, 'x_num_steps': 3, 'y_length': 20, 'y_num_steps': 3,
+                     'z_start': 10, 'z_stop': 10, 'z_num_steps': 1},
+            'move_pattern': 'snake', 'jog_speed': 50, 'output_file': output_file,
+            'vna_config': {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11,
+                           'if_bw': 1000, 'output_power': 0, 'avg_num': 1},
+            'error_recovery': error_recovery}
+
+
+@pytest.mark.parametrize('error_recovery, valid', [({}, True), ({'total_budget': None}, True),
+                                                   ({'total_budget': 50}, True), ({'total_budget': 0}, False),
+                                                   ({'point_budget': 0}, False), ({'budget': 5}, False)])
+def test_validate_error_recovery_of_scan_spec(error_recovery, valid):
+    assert validate_scan_spec(scan_spec(error_recovery)) is valid
+
+
+def run_scan(tmp_path, chamber, vna) -> tuple:
+    """
+    :return: tuple (finished payload, ConsolePrinter) of a scan with point budget 2
+    """
+    from headless_runner import ConsolePrinter
+    from measurement_routines import AutoMeasurementRoutine, configure_vna
+    spec = scan_spec(dict(NO_BACKOFF, point_budget=2))
+    vna_info = configure_vna(vna, spec['vna_config'], 'AutoMeasurement')
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    routine = AutoMeasurementRoutine(chamber, vna, vna_info, (90.0, 100.0, 110.0), (90.0, 100.0, 110.0), (10.0,),
+                                     mov_speed=50, zero_position=(100, 100, 0),
+                                     file_location=str(tmp_path / 'results' / 'scan'), move_pattern='snake',
+                                     recovery_config=spec['error_recovery'])
+    printer = ConsolePrinter()
+    routine.signals.error.connect(printer.print_error)
+    routine.signals.finished.connect(printer.print_finished)
+    finished = []
+    routine.signals.finished.connect(finished.append)
+    chamber.routine = routine
+    routine.run()
+    return finished[0], printer
+
+
+def test_scan_that_exhausts_the_retry_budget_reports_the_stop_reason(tmp_path, fake_vna, fake_chamber):
+    def unreachable_chamber(*args, **kwargs):
+        raise requests.exceptions.ConnectionError('chamber not reachable')
+
+    fake_chamber.chamber_jog_abs = unreachable_chamber
+    finished, printer = run_scan(tmp_path, fake_chamber, fake_vna)
+    assert finished['stopped'] is True
+    assert finished['stop_reason'].startswith('retry budget exhausted (chamber_http error')
+    assert printer.stop_reason == finished['stop_reason']
+    assert (tmp_path / 'results' / 'scan.json').is_file()
+
+
+def test_scan_stopped_by_the_user_has_no_stop_reason(tmp_path, fake_vna, fake_chamber):
+    jog = fake_chamber.chamber_jog_abs
+
+    def jog_and_stop(*args, **kwargs):
+        fake_chamber.routine.stop()     # like Ctrl+C during the first move
+        return jog(*args, **kwargs)
+
+    fake_chamber.chamber_jog_abs = jog_and_stop
+    finished, printer = run_scan(tmp_path, fake_chamber, fake_vna)
+    assert finished['stopped'] is True and finished['stop_reason'] is None
+    assert printer.stopped is True and printer.stop_reason is None
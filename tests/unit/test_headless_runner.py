@@ -0,0 +1,115 @@
+import json
+import logging
+
+import numpy as np
+
+import headless_runner
+from headless_runner import ConsolePrinter, load_scan_spec
+from measurement_routines import calc_mesh_vectors, check_move_boundary
+
+CONNECTION = {'chamber': {'ip_address': '192.168.0.7', 'api_key': 'key'}, 'vna': {'visa_address': 'GPIB0::16::INSTR'}}
+
+
+def scan_spec(**entries) -> dict:
+    spec = {'type': 'auto_measurement', 'zero_position': [100, 100, 0],
+            'mesh': {'x_length': 20, 'x_num_steps': 3, 'y_length': 10, 'y_num_steps': 2,
+                     'z_start': 10, 'z_stop': 30, 'z_num_steps': 3},
+            'move_pattern': 'snake', 'jog_speed': 50, 'output_file': 'results/scan',
+            'vna_config': {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11,
+                           'if_bw': 1000, 'output_power': 0, 'avg_num': 1}}
+    spec.update(entries)
+    return spec
+
+
+def write_json(tmp_path, content, name: str = 'spec.json') -> str:
+    file_path = tmp_path / name
+    file_path.write_text(content if isinstance(content, str) else json.dumps(content))
+    return str(file_path)
+
+
+def test_load_scan_spec(tmp_path):
+    spec = dict(scan_spec(), **CONNECTION)
+    assert load_scan_spec(write_json(tmp_path, spec)) == spec
+    assert load_scan_spec(write_json(tmp_path, scan_spec())) is None    # no connection entries
+    assert load_scan_spec(write_json(tmp_path, dict(spec, type='near_field'))) is None
+    assert load_scan_spec(write_json(tmp_path, '{"type": ')) is None
+    assert load_scan_spec(str(tmp_path / 'missing.json')) is None
+
+
+def test_invalid_scan_spec_exits_with_error(tmp_path, capsys):
+    assert headless_runner.main([write_json(tmp_path, scan_spec())]) == 1
+    assert 'Error - scan spec misses' in capsys.readouterr().out
+
+
+def test_mesh_vectors_like_the_measurement_windows():
+    x_vec, y_vec, z_vec = calc_mesh_vectors(scan_spec())
+    assert x_vec.tolist() == [90, 100, 110] and y_vec.tolist() == [95, 105] and z_vec.tolist() == [10, 20, 30]
+    body_mesh = {'x_length': 20, 'x_num_steps': 2, 'y_length': 10, 'y_num_steps': 2, 'z_length': 30, 'z_num_steps': 4}
+    x_vec, y_vec, z_vec = calc_mesh_vectors(scan_spec(type='body_scan', mesh=body_mesh, zero_position=[50, 60, 70]))
+    assert x_vec.tolist() == [50, 70] and y_vec.tolist() == [60, 70] and z_vec.tolist() == [70, 80, 90, 100]
+    explicit = calc_mesh_vectors(scan_spec(mesh={'x_vec': [1, 2], 'y_vec': [3], 'z_vec': [4, 5]}))
+    assert [vec.tolist() for vec in explicit] == [[1, 2], [3], [4, 5]]
+
+
+def test_move_boundary_of_the_chamber():
+    assert check_move_boundary(*calc_mesh_vectors(scan_spec())) is True
+    assert check_move_boundary(np.array([-1.0, 10.0]), np.array([10.0]), np.array([10.0])) is False
+    assert check_move_boundary(np.array([10.0]), np.array([10.0]), np.array([1000.0])) is False
+    assert check_move_boundary(np.array([]), np.array([10.0]), np.array([10.0])) is False
+
+
+def progress(point: int, total: int = 100) -> dict:
+    return {'status_flag': 'Measuring', 'total_current_point_number': point, 'total_points_in_measurement': total,
+            'current_layer_number': 1, 'num_of_layers_in_measurement': 2, 'time_to_go': 10}
+
+
+def test_console_printer_limits_the_progress_lines(capsys):
+    printer = ConsolePrinter()
+    for point in range(1, 101):
+        printer.print_progress(progress(point))
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ['[Measuring] point 1/100, layer 1/2, time to go 10s',
+                     '[Measuring] point 100/100, layer 1/2, time to go 10s']    # last point is always printed
+
+
+def test_console_printer_prints_details_only_if_verbose(capsys):
+    printer = ConsolePrinter()
+    printer.print_log('Point 1 measured', logging.INFO)
+    printer.print_log('VNA readout retried', logging.WARNING)
+    printer.print_timing({'num_points': 0})
+    assert capsys.readouterr().out == 'VNA readout retried\n'
+    verbose_printer = ConsolePrinter(verbose=True)
+    verbose_printer.print_log('Point 1 measured', logging.INFO)
+    verbose_printer.print_timing({'num_points': 0})
+    assert capsys.readouterr().out == 'Point 1 measured\nTiming: no points measured yet\n'
+
+
+def test_console_printer_reports_a_stopped_scan(capsys):
+    printer = ConsolePrinter()
+    printer.print_error({'error_code': 3, 'error_msg': 'VNA readout failed'})
+    assert printer.stopped is False
+    printer.print_error({'error_code': 0, 'error_msg': 'Measurement stopped by user'})
+    assert printer.stopped is True
+    assert capsys.readouterr().out.splitlines() == ['Error 3: VNA readout failed',
+                                                    'Error 0: Measurement stopped by user']
+
+
+def test_console_printer_follows_a_scan(tmp_path, capsys, fake_vna, fake_chamber):
+    from measurement_routines import AutoMeasurementRoutine, configure_vna
+    spec = scan_spec()
+    vna_info = configure_vna(fake_vna, spec['vna_config'], 'AutoMeasurement')
+    (tmp_path / 'results').mkdir()
+    routine = AutoMeasurementRoutine(fake_chamber, fake_vna, vna_info, *calc_mesh_vectors(spec), mov_speed=50,
+                                     zero_position=(100, 100, 0), file_location=str(tmp_path / 'results' / 'scan'),
+                                     move_pattern='snake')
+    printer = ConsolePrinter()
+    routine.signals.update.connect(printer.print_update)
+    routine.signals.progress.connect(printer.print_progress)
+    routine.signals.error.connect(printer.print_error)
+    routine.signals.finished.connect(printer.print_finished)
+    routine.run()
+    output = capsys.readouterr().out
+    assert '] point 18/18, layer 3/3' in output
+    assert f"Data saved to \n< {tmp_path / 'results' / 'scan'}.json>" in output
+    assert printer.stopped is False
+    assert len(fake_chamber.positions) >= 18
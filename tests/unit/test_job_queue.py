@@ -0,0 +1,84 @@
+import json
+
+from measurement_routines import MeasurementJobQueue
+from measurement_routines.job_queue import JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_STOPPED, \
+    JOB_INTERRUPTED
+
+
+def scan_spec(output_file: str) -> dict:
+    return {'type': 'auto_measurement', 'zero_position': [100, 100, 0],
+            'mesh': {'x_length': 20, 'x_num_steps': 3, 'y_length': 20, 'y_num_steps': 3,
+                     'z_start': 10, 'z_stop': 10, 'z_num_steps': 1},
+            'move_pattern': 'snake', 'jog_speed': 50, 'output_file': output_file,
+            'vna_config': {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11,
+                           'if_bw': 1000, 'output_power': 0, 'avg_num': 1}}
+
+
+def test_jobs_are_taken_in_queue_order(tmp_path):
+    queue = MeasurementJobQueue(str(tmp_path / 'queue.json'))
+    ids = [queue.add_job(scan_spec(f"results/scan_{idx}")) for idx in range(3)]
+    assert ids == [1, 2, 3]
+    assert queue.get_next_pending_job()['id'] == 1
+    assert queue.move_job(3, -2) is True
+    assert [job['id'] for job in queue.get_jobs()] == [3, 1, 2]
+    assert queue.move_job(3, -1) is False   # already first
+    queue.set_job_status(3, JOB_RUNNING)
+    assert queue.get_next_pending_job()['id'] == 1
+    assert queue.remove_job(3) is False     # running
+    queue.set_job_status(3, JOB_DONE)
+    queue.set_job_status(1, JOB_FAILED, 'VNA configuration failed')
+    assert queue.get_next_pending_job()['id'] == 2
+    queue.clear_finished_jobs()
+    assert [(job['id'], job['status']) for job in queue.get_jobs()] == [(2, JOB_PENDING)]
+
+
+def test_invalid_spec_is_not_queued(tmp_path):
+    queue = MeasurementJobQueue(str(tmp_path / 'queue.json'))
+    spec = scan_spec('results/scan')
+    del spec['mesh']
+    assert queue.add_job(spec) is None
+    assert queue.get_jobs() == []
+
+
+def test_status_changes_set_timestamps(tmp_path):
+    queue = MeasurementJobQueue(str(tmp_path / 'queue.json'))
+    job_id = queue.add_job(scan_spec('results/scan'))
+    job = queue.get_job(job_id)
+    assert job['added'] != '' and job['started'] == '' and job['finished'] == ''
+    queue.set_job_status(job_id, JOB_RUNNING)
+    assert job['started'] != '' and job['finished'] == ''
+    queue.set_job_status(job_id, JOB_STOPPED, 'Stopped by user')
+    assert job['finished'] != '' and job['message'] == 'Stopped by user'
+    assert queue.set_job_status(99, JOB_DONE) is False
+
+
+def test_queue_is_persisted_and_running_jobs_are_interrupted_on_load(tmp_path):
+    file_path = str(tmp_path / 'queue.json')
+    queue = MeasurementJobQueue(file_path)
+    for idx in range(3):
+        queue.add_job(scan_spec(f"results/scan_{idx}"))
+    queue.set_job_status(1, JOB_DONE)
+    queue.set_job_status(2, JOB_RUNNING)    # the app is closed during this job
+
+    loaded = MeasurementJobQueue(file_path)
+    assert [job['status'] for job in loaded.get_jobs()] == [JOB_DONE, JOB_INTERRUPTED, JOB_PENDING]
+    assert loaded.get_next_pending_job()['id'] == 3
+    assert loaded.add_job(scan_spec('results/scan_3')) == 4    # ids are not reused
+    with open(file_path, 'r') as file:
+        assert json.load(file)['jobs'][1]['status'] == JOB_INTERRUPTED   # saved right away
+
+
+def test_output_file_of_pending_and_running_jobs_is_queued(tmp_path):
+    queue = MeasurementJobQueue(str(tmp_path / 'queue.json'))
+    job_id = queue.add_job(scan_spec(str(tmp_path / 'results' / 'scan')))
+    assert queue.is_output_file_queued(str(tmp_path / 'results' / '..' / 'results' / 'scan')) is True
+    queue.set_job_status(job_id, JOB_RUNNING)
+    assert queue.is_output_file_queued(str(tmp_path / 'results' / 'scan')) is True
+    queue.set_job_status(job_id, JOB_DONE)
+    assert queue.is_output_file_queued(str(tmp_path / 'results' / 'scan')) is False
+
+
+def test_unreadable_queue_file_gives_an_empty_queue(tmp_path):
+    (tmp_path / 'queue.json').write_text('{"jobs": [')
+    queue = MeasurementJobQueue(str(tmp_path / 'queue.json'))
+    assert queue.get_jobs() == []
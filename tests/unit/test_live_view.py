@@ -0,0 +1,83 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='module')
+def window():
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    from user_interface.ui_auto_measurement import UI_auto_measurement_window
+    window = UI_auto_measurement_window(600, 600, 700, 100)
+    window.app = app
+    return window
+
+
+def field_info(x_idx: list, y_idx: list, amplitude: list, phase: list, layer_number: int = 1) -> dict:
+    """
+    Payload of AutoMeasurementRoutine.signals.field_update, all points since the last emit as numpy arrays.
+    """
+    return {'parameter': 'S11', 'freq_idx': 0, 'frequency': 1e9, 'layer_number': layer_number, 'z_coor': 5.0,
+            'x_idx': np.array(x_idx), 'y_idx': np.array(y_idx), 'amplitude': np.array(amplitude, dtype=float),
+            'phase': np.array(phase, dtype=float)}
+
+
+def process_events(window, duration: float):
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        window.app.processEvents()
+        time.sleep(0.005)
+
+
+def test_live_view_redraws_by_timer_with_running_levels(window, monkeypatch):
+    axis = np.linspace(-10, 10, 5)
+    window.configure_live_view(['S11'], np.array([1e9]), axis, axis)
+    set_image_calls = []
+    set_image = window.live_view_image.setImage
+    monkeypatch.setattr(window.live_view_image, 'setImage',
+                        lambda *args, **kwargs: (set_image_calls.append(kwargs), set_image(*args, **kwargs)))
+
+    window.update_live_view(field_info([0, 1, 2], [0, 0, 0], [1.0, 0.1, 0.01], [0.0, 10.0, 20.0]))
+    window.update_live_view(field_info([3, 4, 4], [0, 0, 1], [1e-3, 1e-4, 0.0], [30.0, 40.0, np.nan]))
+    assert set_image_calls == []    # no redraw per point
+    process_events(window, 4 * window.LIVE_VIEW_REDRAW_MS / 1000)
+    assert set_image_calls == [{'autoLevels': False, 'levels': (-80.0, 0.0)}]
+    image = window.live_view_image.image
+    assert np.allclose(image[:, 0], [0, -20, -40, -60, -80]) and np.all(np.isnan(image[:4, 1:]))
+    assert image[4, 1] == -np.inf     # zero amplitude does not spoil the levels
+
+    window.live_view_value_comboBox.setCurrentIndex(1)  # phase is shown right away with its own levels
+    assert tuple(window.live_view_image.levels) == (0.0, 40.0)
+    window.live_view_value_comboBox.setCurrentIndex(0)
+
+    window.update_live_view(field_info([0], [0], [1.0], [0.0], layer_number=2))  # new layer resets image and levels
+    process_events(window, 4 * window.LIVE_VIEW_REDRAW_MS / 1000)
+    assert set_image_calls[-1]['levels'] == (-1.0, 1.0)
+    assert np.sum(~np.isnan(window.live_view_image.image)) == 1
+
+
+def test_live_view_takes_the_field_updates_of_a_running_scan(window, tmp_path, fake_vna, fake_chamber):
+    from measurement_routines import AutoMeasurementRoutine, configure_vna
+    vna_info = configure_vna(fake_vna, {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9,
+                                        'sweep_num_points': 11, 'if_bw': 1000, 'output_power': 0, 'avg_num': 1},
+                             'AutoMeasurement')
+    (tmp_path / 'results').mkdir()
+    x_vec = y_vec = (90.0, 100.0, 110.0)
+    routine = AutoMeasurementRoutine(fake_chamber, fake_vna, vna_info, x_vec, y_vec, (10.0,), mov_speed=50,
+                                     zero_position=(100, 100, 0), file_location=str(tmp_path / 'results' / 'live'),
+                                     move_pattern='snake')
+    routine.live_view_min_interval = 60.0   # all points of the layer in one emit
+    window.configure_live_view(vna_info['parameter'], np.linspace(1e9, 2e9, 11), np.array(x_vec) - 100,
+                               np.array(y_vec) - 100)
+    payloads = []
+    routine.signals.field_update.connect(payloads.append)
+    routine.signals.field_update.connect(window.update_live_view)
+    routine.run()
+    assert max(len(payload['x_idx']) for payload in payloads) > 1
+    process_events(window, 4 * window.LIVE_VIEW_REDRAW_MS / 1000)
+    assert np.allclose(window.live_view_image.image, 20 * np.log10(np.abs(0.5 + 0.5j)))     # data of the fake PNA
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('PyQt6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='module')
+def app():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def connect_bus(bus) -> tuple:
+    batches = []
+    status = []
+    bus.signals.messages.connect(batches.append)
+    bus.signals.status.connect(status.append)
+    return batches, status
+
+
+def process_events(app, duration: float):
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_flush_emits_one_batch_and_the_latest_status(app):
+    from process_controller.log_bus import LogBus, DEBUG, INFO
+    bus = LogBus()
+    batches, status = connect_bus(bus)
+    bus.post_info('Moving to point 1')
+    bus.post('Point 1 measured', INFO)
+    bus.post('VNA readout took 12 ms', DEBUG)
+    assert batches == []    # nothing is emitted before the flush
+    bus.flush()
+    assert [(level, message) for _, level, message in batches[0]] == \
+        [(INFO, 'Moving to point 1'), (INFO, 'Point 1 measured'), (DEBUG, 'VNA readout took 12 ms')]
+    assert status == ['Point 1 measured']   # debug messages do not reach the statusbar
+    bus.flush()
+    assert len(batches) == 1    # empty buffer is not flushed
+
+
+def test_full_buffer_drops_the_oldest_messages(app):
+    from process_controller.log_bus import LogBus, WARNING
+    bus = LogBus(max_buffered_messages=3)
+    batches, status = connect_bus(bus)
+    for idx in range(5):
+        bus.post_info(f"message {idx}")
+    bus.flush()
+    assert batches[0][0][1:] == (WARNING, '... 2 messages dropped, log rate too high ...')
+    assert [message for _, _, message in batches[0][1:]] == ['message 2', 'message 3', 'message 4']
+    assert status == ['message 4']
+    bus.post_info('message 5')
+    bus.flush()
+    assert [message for _, _, message in batches[1]] == ['message 5']  # drop counter is reset
+
+
+def test_messages_of_many_threads_are_flushed_at_the_timer_rate(app):
+    from process_controller.log_bus import LogBus
+    bus = LogBus(flush_interval_ms=50)
+    batches, status = connect_bus(bus)
+    bus.start()
+
+    def post_messages(thread_idx: int):
+        for idx in range(500):
+            bus.post_info(f"thread {thread_idx} message {idx}")
+
+    threads = [threading.Thread(target=post_messages, args=(thread_idx,)) for thread_idx in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    process_events(app, 0.2)
+    bus.post_info('last message')
+    bus.stop()  # flushes the rest
+    messages = [message for batch in batches for _, _, message in batch]
+    assert len(messages) == 4 * 500 + 1
+    assert len(batches) <= 6    # instead of one signal per message
+    assert messages[-1] == 'last message' and status[-1] == 'last message'
+    for thread_idx in range(4):     # order of each thread is kept
+        thread_messages = [message for message in messages if message.startswith(f"thread {thread_idx} ")]
+        assert thread_messages == [f"thread {thread_idx} message {idx}" for idx in range(500)]
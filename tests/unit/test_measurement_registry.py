@@ -0,0 +1,61 @@
+from vna_net_interface import PnaMeasurement
+
+DOCUMENTS = 'C:/Program Files/Agilent/Network Analyzer/Documents/'
+
+
+def test_measurements_are_registered_by_name_in_order_of_configuration(fake_vna):
+    fake_vna.pna_add_measurement('first', ['S11'])
+    fake_vna.pna_add_measurement('second', ['S11', 'S22'])
+    assert fake_vna.pna_add_measurement('first', ['S22']) == -1     # duplicate name
+    second = fake_vna.get_measurement('second')
+    assert isinstance(second, PnaMeasurement)
+    assert (second.meas_name, second.cnum, second.parameter) == ('second', 2, ['S11', 'S22'])
+    assert second.trace_names == {'S11': 'second_S11', 'S22': 'second_S22'}
+    assert [fake_vna.get_idx_of_meas(name) for name in ('first', 'second', 'unknown')] == [0, 1, -1]
+    assert fake_vna.get_measurement('unknown') is None
+
+
+def test_scpi_strings_of_the_hot_path_are_resolved_once():
+    meas = PnaMeasurement('meas', 3, ['S11', 'S22'], ['meas_S11', 'meas_S22'], 0)
+    assert meas.trigger_command == 'INIT3:IMM'
+    assert meas.average_clear_command == 'SENS3:AVER:CLE'
+    assert meas.select_header == 'CALC3:PAR:SEL'
+    assert meas.select_values == {'S11': "'meas_S11'", 'S22': "'meas_S22'"}
+    assert (meas.x_query, meas.data_query) == ('SENS3:X?', 'CALC3:DATA? SDATA')
+    assert not hasattr(meas, '__dict__')    # slots only
+
+
+def test_setters_update_the_record_and_reject_unknown_measurements(fake_pna, fake_vna):
+    fake_vna.pna_add_measurement_detailed('meas', parameter=['S11'], freq_start=1e9, freq_stop=2e9, if_bw=1000,
+                                          sweep_num_points=11, output_power=-5, trigger_manual=True,
+                                          average_number=4)
+    meas = fake_vna.get_measurement('meas')
+    assert (meas.freq_start, meas.freq_stop, meas.if_bw, meas.sweep_num_points, meas.output_power, meas.avg_num) == \
+        (1e9, 2e9, 1000, 11, -5, 4)
+    assert meas.trigger == 'manual'
+    assert fake_vna.pna_set_freq_start('meas', 1.5e9) is True and meas.freq_start == 1.5e9
+    assert fake_vna.pna_set_freq_start('unknown', 1.5e9) is False
+    fake_pna.messages.clear()
+    fake_vna.pna_trigger_measurement('meas')
+    assert fake_pna.messages.count('INIT1:IMM;*OPC?') + fake_pna.messages.count('INIT1:IMM') == 4
+
+
+def test_preset_clears_the_registry(fake_vna):
+    fake_vna.pna_add_measurement('meas', ['S11'])
+    fake_vna.pna_preset()
+    assert fake_vna.get_measurement('meas') is None
+    fake_vna.pna_add_measurement('meas', ['S22'])
+    assert fake_vna.get_measurement('meas').cnum == 1
+
+
+def test_preset_from_file_registers_the_trace_names_of_the_pna(fake_pna, fake_vna):
+    fake_pna.files[DOCUMENTS + 'body.cst'] = {'CALC1:PAR:CAT:EXT': '"CH1_S11_1,S11,CH1_S22_2,S22"',
+                                             'SENS1:SWE:POIN': '5', 'SENS1:AVER:STAT': '1',
+                                             'SENS1:AVER:COUN': '2'}
+    pna_info = fake_vna.pna_preset_from_file('body.cst', 'BodyScan')
+    assert pna_info['parameter'] == ['S11', 'S22']
+    meas = fake_vna.get_measurement('BodyScan')
+    assert meas.trace_names == {'S11': 'CH1_S11_1', 'S22': 'CH1_S22_2'}
+    assert (meas.sweep_num_points, meas.avg_num) == (5, 2)
+    fake_vna.pna_read_meas_data('BodyScan', 'S22')
+    assert fake_pna.settings['CALC1:PAR:SEL'] == "'CH1_S22_2'"
@@ -0,0 +1,58 @@
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from user_interface.ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
+
+
+def test_point_list_runs_x_fastest():
+    x_vec, y_vec, z_vec = (1.0, 2.0, 3.0), (10.0, 20.0), (100.0, 200.0)
+    point_list = Visualizer.generate_point_list(x_vec, y_vec, z_vec)
+    assert point_list.shape == (12, 3)
+    assert point_list.tolist() == [[x, y, z] for z, y, x in itertools.product(z_vec, y_vec, x_vec)]
+
+
+def test_decimated_vector_keeps_both_ends():
+    vec = np.arange(10.0)
+    assert Visualizer.decimate_vector(vec, 1).tolist() == vec.tolist()
+    assert Visualizer.decimate_vector(vec, 3).tolist() == [0, 3, 6, 9]
+    assert Visualizer.decimate_vector(vec, 4).tolist() == [0, 4, 8, 9]
+    assert Visualizer.decimate_vector((0.0, 1.0), 5).tolist() == [0, 1]
+
+
+@pytest.mark.parametrize('axis_lengths, max_points', [((51, 51, 51), 125000), ((201, 201, 201), 125000),
+                                                      ((1001, 3, 2), 1000), ((401, 401), 20000)])
+def test_lod_stride_is_the_smallest_one_below_the_limit(axis_lengths, max_points):
+    def num_points(stride: int):
+        return int(np.prod([len(Visualizer.decimate_vector(np.arange(n), stride)) for n in axis_lengths]))
+
+    stride = Visualizer.calc_lod_stride(axis_lengths, max_points)
+    assert num_points(stride) <= max_points
+    assert stride == 1 or num_points(stride - 1) > max_points
+
+
+def test_lod_point_list_of_a_dense_mesh_spans_the_full_mesh():
+    x_vec, y_vec, z_vec = np.linspace(0, 100, 201), np.linspace(-50, 50, 201), np.linspace(10, 60, 101)
+    point_list, stride = Visualizer.generate_lod_point_list(x_vec, y_vec, z_vec, max_points=125000)
+    assert stride > 1 and len(point_list) <= 125000
+    assert point_list.min(axis=0).tolist() == [0, -50, 10] and point_list.max(axis=0).tolist() == [100, 50, 60]
+    small_mesh, stride = Visualizer.generate_lod_point_list((1.0, 2.0), (3.0,), (4.0, 5.0))
+    assert stride == 1 and len(small_mesh) == 4
+
+    plane = Visualizer.generate_2d_lod_point_list(x_vec, z_vec, max_points=2000)
+    assert plane.shape[1] == 2 and len(plane) <= 2000
+    assert plane.min(axis=0).tolist() == [0, 10] and plane.max(axis=0).tolist() == [100, 60]
+
+
+def test_bounding_box_encloses_the_mesh():
+    vertices = Visualizer.generate_3d_bounding_box_vertices((5.0, 0.0, 10.0), (1.0, 2.0), (7.0,))
+    assert vertices.shape == (24, 3)
+    assert sorted({tuple(vertex) for vertex in vertices.tolist()}) == \
+        sorted(itertools.product((0.0, 10.0), (1.0, 2.0), (7.0,)))
+    edges = vertices.reshape(12, 2, 3)
+    assert all(np.count_nonzero(start != end) <= 1 for start, end in edges)   # edges run along one axis
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('PyQt6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='module')
+def app():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def process_events(app, duration: float, until=None):
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        if until is not None and until():
+            return
+        time.sleep(0.005)
+
+
+def test_rapid_requests_are_coalesced_into_one_computation(app):
+    from user_interface.ui_mesh_preview import MeshPreviewScheduler
+    inputs = {'text': ''}
+    collected, computed, applied = [], [], []
+
+    def collect():
+        collected.append(inputs['text'])
+        return (inputs['text'],)
+
+    def compute(text: str):
+        computed.append((text, threading.current_thread() is threading.main_thread()))
+        return {'text': text}
+
+    scheduler = MeshPreviewScheduler(collect, compute, applied.append, delay_ms=50)
+    for text in ('1', '10', '100'):    # typing
+        inputs['text'] = text
+        scheduler.request_update()
+        process_events(app, 0.01)
+    process_events(app, 2, until=lambda: applied)
+    process_events(app, 0.1)
+    assert collected == ['100'] and computed == [('100', False)] and applied == [{'text': '100'}]
+
+
+def test_incomplete_inputs_skip_the_update(app):
+    from user_interface.ui_mesh_preview import MeshPreviewScheduler
+    computed = []
+    scheduler = MeshPreviewScheduler(lambda: None, computed.append, computed.append, delay_ms=10)
+    scheduler.request_update()
+    process_events(app, 0.2)
+    assert computed == []
+
+
+def test_results_of_outdated_requests_are_dropped(app):
+    from user_interface.ui_mesh_preview import MeshPreviewScheduler
+    first_started, release_first = threading.Event(), threading.Event()
+    requests = [('first', release_first), ('second', None)]
+    applied = []
+
+    def compute(name: str, release: threading.Event):
+        if release is not None:
+            first_started.set()
+            release.wait(5)
+        return name
+
+    scheduler = MeshPreviewScheduler(lambda: requests.pop(0), compute, applied.append, delay_ms=10)
+    scheduler.request_update()
+    process_events(app, 2, until=first_started.is_set)
+    scheduler.request_update()  # inputs changed while the first request is computed
+    process_events(app, 0.1)
+    release_first.set()
+    process_events(app, 2, until=lambda: applied)
+    process_events(app, 0.1)
+    assert applied == ['second']
+
+
+@pytest.fixture()
+def window(app):
+    from user_interface.ui_auto_measurement import UI_auto_measurement_window
+    window = UI_auto_measurement_window(600, 600, 700, 100)
+    window.update_current_zero_pos(300.0, 300.0, 0.0)
+    process_events(app, 2, until=lambda: 'Mesh-display' in window.view_widget_status_label.text())
+    return window
+
+
+def test_window_pushes_only_the_changed_preview_parts(app, window, monkeypatch):
+    window.mesh_cubic_x_num_of_steps_lineEdit.setText('5')   # textChanged requests the update
+    assert window.view_widget_status_label.text() != 'Mesh-display: 2500 points'
+    process_events(app, 2, until=lambda: window.view_widget_status_label.text() == 'Mesh-display: 2500 points')
+    assert window.view_widget_status_label.text() == 'Mesh-display: 2500 points'
+
+    pushed = []
+    monkeypatch.setattr(window.plot_xy_mesh_points, 'setData', lambda *args, **kwargs: pushed.append('xy'))
+    monkeypatch.setattr(window.plot_xz_mesh_points, 'setData', lambda *args, **kwargs: pushed.append('xz'))
+    window.mesh_cubic_z_stop_lineEdit.setText('600')
+    process_events(app, 2, until=lambda: pushed)
+    process_events(app, 0.3)
+    assert pushed == ['xz']     # XY plane does not depend on Z
+
+
+def test_window_ignores_incomplete_mesh_inputs(app, window, monkeypatch):
+    pushed = []
+    monkeypatch.setattr(window.graphic_measurement_mesh_obj, 'setData', lambda *args, **kwargs: pushed.append(1))
+    window.mesh_cubic_y_num_of_steps_lineEdit.setText('')
+    process_events(app, 0.4)
+    window.mesh_cubic_y_num_of_steps_lineEdit.setText('0')
+    process_events(app, 0.4)
+    assert pushed == []
+    window.mesh_cubic_y_num_of_steps_lineEdit.setText('20')
+    process_events(app, 2, until=lambda: pushed)
+    assert pushed == [1] and window.view_widget_status_label.text() == 'Mesh-display: 10000 points'
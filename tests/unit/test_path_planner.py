@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from measurement_routines import AxisCostModel, plan_point_path, plan_auto_measurement_path, plan_body_scan_columns
+from measurement_routines.path_planner import grid_path, expand_body_scan_path
+
+X_VEC = np.array([0.0, 10.0, 20.0])
+Y_VEC = np.array([0.0, 10.0])
+Z_VEC = np.array([0.0, 5.0])
+
+
+def test_travel_time_of_long_and_short_moves():
+    model = AxisCostModel(50.0)
+    # 100 mm in X reaches the jog speed: distance / speed + speed / acceleration
+    assert model.travel_times(np.array([100.0, 0.0, 0.0])) == pytest.approx(100 / 50 + 50 / 500)
+    # 1 mm in X does not reach it, triangular profile
+    assert model.travel_times(np.array([1.0, 0.0, 0.0])) == pytest.approx(2 * np.sqrt(1 / 500))
+    # Z is limited to its own maximum speed
+    assert model.travel_times(np.array([0.0, 0.0, 100.0])) == pytest.approx(100 / 15 + 15 / 100)
+    assert model.travel_times(np.zeros(3)) == 0.0
+
+
+def test_path_times_add_overhead_and_backlash_on_reversal():
+    model = AxisCostModel(50.0)
+    path = np.array([[0.0, 0.0, 10.0], [0.0, 0.0, 20.0], [0.0, 0.0, 10.0], [0.0, 0.0, 0.0]])
+    times = model.path_times(path, start=np.zeros(3))
+    pure = model.travel_times(np.array([0.0, 0.0, 10.0]))
+    assert times == pytest.approx([pure + 0.2, pure + 0.2, pure + 0.2 + 0.3, pure + 0.2])
+    assert model.path_duration(path[:1]) == pytest.approx(0.2)  # start defaults to the first target
+    assert model.path_times(np.zeros((0, 3))).shape == (0,)
+
+
+def test_grid_path_raster_and_boustrophedon():
+    raster = grid_path(X_VEC, Y_VEC, [0.0], 'xyz')
+    assert raster[:, 0].tolist() == [0, 10, 20, 0, 10, 20]
+    snake = grid_path(X_VEC, Y_VEC, [0.0], 'xyz', boustrophedon=True)
+    assert snake[:, 0].tolist() == [0, 10, 20, 20, 10, 0]
+    y_first = grid_path(X_VEC, Y_VEC, [0.0], 'yxz')
+    assert y_first[:, :2].tolist() == [[0, 0], [0, 10], [10, 0], [10, 10], [20, 0], [20, 10]]
+
+
+@pytest.mark.parametrize('move_pattern, expected_xy', [
+    ('line-by-line', [[0, 0], [10, 0], [20, 0], [0, 10], [10, 10], [20, 10]] * 2),
+    ('snake', [[0, 0], [10, 0], [20, 0], [20, 10], [10, 10], [0, 10], [0, 10], [10, 10], [20, 10], [20, 0], [10, 0],
+               [0, 0]]),
+])
+def test_classic_patterns_keep_the_order_of_the_routines(move_pattern, expected_xy):
+    path = plan_auto_measurement_path(X_VEC, Y_VEC, Z_VEC, move_pattern)
+    assert path[:, :2].tolist() == expected_xy
+    assert path[:, 2].tolist() == [0.0] * 6 + [5.0] * 6
+
+
+def test_optimized_pattern_is_never_slower_and_keeps_all_points():
+    model = AxisCostModel(50.0)
+    x_vec = np.linspace(0, 200, 5)
+    y_vec = np.linspace(0, 200, 5)
+    z_vec = np.linspace(0, 300, 6)
+    optimized = plan_auto_measurement_path(x_vec, y_vec, z_vec, 'optimized', model)
+    snake = plan_auto_measurement_path(x_vec, y_vec, z_vec, 'snake', model)
+    assert sorted(map(tuple, optimized)) == sorted(map(tuple, snake))
+    assert model.path_duration(optimized) <= model.path_duration(snake)
+    # the slow Z-axis changes least often
+    assert np.count_nonzero(np.diff(optimized[:, 2])) == len(z_vec) - 1
+
+
+def test_plan_point_path_visits_each_point_once_from_the_closest_start():
+    model = AxisCostModel(50.0)
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 100, (40, 3))
+    path = plan_point_path(points, model, start=points[7] + 0.1)
+    assert sorted(map(tuple, path)) == sorted(map(tuple, points))
+    assert np.array_equal(path[0], points[7])
+    assert model.path_duration(path) < model.path_duration(points[[7] + [i for i in range(40) if i != 7]])
+
+
+def test_body_scan_columns_and_moves_below():
+    columns = plan_body_scan_columns(X_VEC, Y_VEC, Z_VEC, 'snake', z_move_below=20.0)
+    assert columns.tolist() == [[0, 0], [10, 0], [20, 0], [20, 10], [10, 10], [0, 10]]
+    targets, is_measure_point = expand_body_scan_path(columns[:2], Z_VEC, 20.0)
+    assert targets.tolist() == [[0, 0, -20], [0, 0, 0], [0, 0, 5], [10, 0, -20], [10, 0, 0], [10, 0, 5]]
+    assert is_measure_point.tolist() == [False, True, True, False, True, True]
+
+    model = AxisCostModel(50.0)
+    optimized = plan_body_scan_columns(X_VEC, Y_VEC, Z_VEC, 'optimized', 20.0, model)
+    assert sorted(map(tuple, optimized)) == sorted(map(tuple, columns))
+    assert model.path_duration(expand_body_scan_path(optimized, Z_VEC, 20.0)[0]) <= \
+        model.path_duration(expand_body_scan_path(columns, Z_VEC, 20.0)[0])
@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+import pytest
+
+from measurement_routines import PhaseTimer, format_timing_summary
+
+
+def test_phases_of_a_point_are_summed_up_and_total_is_appended():
+    timer = PhaseTimer(['move', 'readout'])
+    assert timer.phases == ['move', 'readout', 'total']
+    timer.start_point()
+    timer.add('move', 0.002)
+    timer.add('readout', 0.001)
+    timer.add('move', 0.003)    # retry of the point
+    time.sleep(0.01)
+    timer.end_point()
+    values = timer.get_array()
+    assert values.shape == (1, 3)
+    assert values[0, :2] == pytest.approx([5.0, 1.0])
+    assert values[0, 2] >= 10.0
+
+
+def test_measure_adds_the_time_of_the_block_also_on_errors():
+    timer = PhaseTimer(['readout'])
+    timer.start_point()
+    with pytest.raises(ValueError):
+        with timer.measure('readout'):
+            time.sleep(0.005)
+            raise ValueError('parse error')
+    timer.end_point()
+    assert timer.get_array()[0, 0] >= 5.0
+
+
+def test_phases_without_started_point_are_ignored():
+    timer = PhaseTimer(['move'])
+    timer.add('move', 1.0)
+    timer.end_point()
+    assert timer.get_num_points() == 0
+    assert timer.get_array().shape == (0, 2)
+    timer.start_point()
+    timer.start_point()     # unfinished point is discarded
+    timer.end_point()
+    assert timer.get_num_points() == 1 and timer.get_array()[0, 0] == 0.0
+
+
+def test_json_dict_is_rounded_to_microseconds():
+    timer = PhaseTimer(['move'])
+    timer.start_point()
+    timer.add('move', 0.0012345678)
+    timer.end_point()
+    json_dict = timer.to_json_dict()
+    assert json_dict['unit'] == 'ms' and json_dict['phases'] == ['move', 'total']
+    assert json_dict['values'][0][0] == 1.235
+
+
+def test_summary_statistics_and_histogram():
+    timer = PhaseTimer(['move', 'idle'])
+    for duration in np.arange(1, 101) * 1e-3:
+        timer.start_point()
+        timer.add('move', duration)
+        timer.end_point()
+    summary = timer.get_summary(num_bins=10)
+    assert summary['num_points'] == 100 and summary['unit'] == 'ms'
+    move = summary['phases']['move']
+    assert (move['mean'], move['median'], move['max']) == pytest.approx((50.5, 50.5, 100.0))
+    assert move['p95'] == pytest.approx(95.05)
+    assert move['sum'] == pytest.approx(5050.0)
+    assert move['counts'] == [10] * 10 and len(move['bin_edges']) == 11
+
+    text = format_timing_summary(summary)
+    assert text.startswith('Timing of 100 points [ms] (mean / p95):')
+    assert f"\n    move: 50.5 / {move['p95']:.1f}" in text
+    assert 'idle' not in text   # phases without any time are skipped
+
+
+def test_summary_of_no_points():
+    summary = PhaseTimer(['move']).get_summary()
+    assert summary == {'num_points': 0, 'unit': 'ms', 'phases': {}}
+    assert format_timing_summary(summary) == 'Timing: no points measured yet'
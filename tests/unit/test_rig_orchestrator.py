@@ -0,0 +1,128 @@
+import threading
+
+import requests
+
+from rig_orchestrator import RigOrchestrator, RigSession
+from measurement_routines.job_queue import JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_STOPPED
+
+
+def scan_spec(output_file: str, rig: str = None, error_recovery: dict = None) -> dict:
+    spec = {'type': 'auto_measurement', 'zero_position': [100, 100, 0],
+            'mesh': {'x_length': 20, 'x_num_steps': 3, 'y_length': 20, 'y_num_steps': 3,
+                     'z_start': 10, 'z_stop': 10, 'z_num_steps': 1},
+            'move_pattern': 'snake', 'jog_speed': 50, 'output_file': output_file,
+            'vna_config': {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11,
+                           'if_bw': 1000, 'output_power': 0, 'avg_num': 1}}
+    if rig is not None:
+        spec['rig'] = rig
+    if error_recovery is not None:
+        spec['error_recovery'] = error_recovery
+    return spec
+
+
+def orchestrator_with_rigs(tmp_path, rig_names: tuple = ('rig_a', 'rig_b')) -> RigOrchestrator:
+    orchestrator = RigOrchestrator(str(tmp_path / 'queue.json'))
+    for name in rig_names:
+        orchestrator.add_rig(name, {'chamber': {}, 'vna': {}})
+    return orchestrator
+
+
+def test_jobs_bound_to_a_rig_are_only_taken_by_that_rig(tmp_path):
+    orchestrator = orchestrator_with_rigs(tmp_path)
+    bound_id = orchestrator.submit(scan_spec(str(tmp_path / 'bound'), rig='rig_b'))
+    free_id = orchestrator.submit(scan_spec(str(tmp_path / 'free')))
+
+    job = orchestrator.take_next_job('rig_a')
+    assert job['id'] == free_id and job['spec']['rig'] == 'rig_a'
+    assert orchestrator.job_queue.get_job(free_id)['spec']['rig'] == 'rig_a'   # queue file tells the rig
+    assert orchestrator.take_next_job('rig_a') is None
+    assert orchestrator.take_next_job('rig_b')['id'] == bound_id
+    assert [job['status'] for job in orchestrator.job_queue.get_jobs()] == [JOB_RUNNING, JOB_RUNNING]
+
+    orchestrator.finish_job(free_id, JOB_DONE)
+    assert orchestrator.job_queue.get_job(free_id)['status'] == JOB_DONE
+
+
+def test_taken_job_is_a_copy(tmp_path):
+    orchestrator = orchestrator_with_rigs(tmp_path)
+    job_id = orchestrator.submit(scan_spec(str(tmp_path / 'scan')))
+    job = orchestrator.take_next_job('rig_a')
+    job['spec']['output_file'] = 'changed'
+    assert orchestrator.job_queue.get_job(job_id)['spec']['output_file'] == str(tmp_path / 'scan')
+
+
+def test_submit_rejects_unknown_rig_and_queued_output_file(tmp_path):
+    orchestrator = orchestrator_with_rigs(tmp_path)
+    assert orchestrator.submit(scan_spec(str(tmp_path / 'scan'), rig='rig_c')) is None
+    assert orchestrator.submit(scan_spec(str(tmp_path / 'scan'))) == 1
+    assert orchestrator.submit(scan_spec(str(tmp_path / 'scan'), rig='rig_b')) is None
+    orchestrator.finish_job(1, JOB_FAILED, 'VNA configuration failed')
+    assert orchestrator.submit(scan_spec(str(tmp_path / 'scan'))) == 2   # the failed job does not write anymore
+
+
+def test_each_job_is_taken_by_exactly_one_rig(tmp_path):
+    rig_names = tuple(f"rig_{idx}" for idx in range(8))
+    orchestrator = orchestrator_with_rigs(tmp_path, rig_names)
+    num_jobs = 40
+    for idx in range(num_jobs):
+        orchestrator.submit(scan_spec(str(tmp_path / f"scan_{idx}")))
+    taken = {name: [] for name in rig_names}
+    start = threading.Barrier(len(rig_names))
+
+    def take_all(name: str):
+        start.wait()
+        while (job := orchestrator.take_next_job(name)) is not None:
+            taken[name].append(job['id'])
+
+    threads = [threading.Thread(target=take_all, args=(name,)) for name in rig_names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    taken_ids = [job_id for ids in taken.values() for job_id in ids]
+    assert sorted(taken_ids) == list(range(1, num_jobs + 1))
+    assert all(orchestrator.job_queue.get_job(job_id)['spec']['rig'] == name
+               for name, ids in taken.items() for job_id in ids)
+    assert not any(job['status'] == JOB_PENDING for job in orchestrator.job_queue.get_jobs())
+
+
+def run_rig_job(tmp_path, session: RigSession, spec: dict) -> tuple:
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    return session.run_job({'id': 1, 'spec': spec})
+
+
+def test_rig_session_runs_a_job_on_its_devices(tmp_path, fake_vna, fake_chamber):
+    session = RigSession('rig_a', {})
+    session.chamber, session.vna = fake_chamber, fake_vna
+    assert run_rig_job(tmp_path, session, scan_spec(str(tmp_path / 'results' / 'scan'))) == (JOB_DONE, '')
+    assert len(fake_chamber.positions) >= 9
+    assert (tmp_path / 'results' / 'scan.json').is_file()
+    assert session.routine is None and session.job_id is None
+    assert run_rig_job(tmp_path, session, scan_spec(str(tmp_path / 'results' / 'scan')))[0] == JOB_FAILED  # exists
+
+
+def test_job_that_exhausts_the_retry_budget_failed(tmp_path, fake_vna, fake_chamber):
+    def unreachable_chamber(*args, **kwargs):
+        raise requests.exceptions.ConnectionError('chamber not reachable')
+
+    fake_chamber.chamber_jog_abs = unreachable_chamber
+    session = RigSession('rig_a', {})
+    session.chamber, session.vna = fake_chamber, fake_vna
+    status, message = run_rig_job(tmp_path, session, scan_spec(str(tmp_path / 'results' / 'scan'),
+                                                               error_recovery={'base_delay': 0.0, 'point_budget': 2}))
+    assert status == JOB_FAILED
+    assert message.startswith('retry budget exhausted (chamber_http error')
+    assert (tmp_path / 'results' / 'scan.json').is_file()
+
+
+def test_job_stopped_by_the_user_is_stopped(tmp_path, fake_vna, fake_chamber):
+    session = RigSession('rig_a', {})
+    jog = fake_chamber.chamber_jog_abs
+
+    def jog_and_stop(*args, **kwargs):
+        session.stop()      # like Ctrl+C during the first move
+        return jog(*args, **kwargs)
+
+    fake_chamber.chamber_jog_abs = jog_and_stop
+    session.chamber, session.vna = fake_chamber, fake_vna
+    assert run_rig_job(tmp_path, session, scan_spec(str(tmp_path / 'results' / 'scan'))) == (JOB_STOPPED, 'Stopped')
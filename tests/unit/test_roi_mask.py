@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from measurement_routines import validate_roi, calc_roi_mask
+from measurement_routines.roi_mask import points_in_polygon, points_in_mask, column_z_vectors
+
+REFERENCE = (100.0, 200.0, 50.0)
+X_VEC = REFERENCE[0] + np.arange(-20.0, 21.0, 10.0)     # -20 ... 20 relative to the reference
+Y_VEC = REFERENCE[1] + np.arange(-20.0, 21.0, 10.0)
+Z_VEC = REFERENCE[2] + np.array([0.0, 10.0, 20.0])
+
+
+@pytest.mark.parametrize('roi, valid', [
+    ({'shape': 'cylinder', 'center': [0, 0], 'radius': 5}, True),
+    ({'shape': 'cylinder', 'center': [0, 0]}, False),
+    ({'shape': 'cone', 'center': [0, 0], 'radius': 5}, False),
+    ({'shape': 'polygon', 'points': [[0, 0], [1, 0]]}, False),
+    ({'shape': 'polygon', 'points': [[0, 0], [1, 0], [0, 1]]}, True),
+    ({'shape': 'image', 'path': 'missing_mask.png', 'x_range': [0, 1], 'y_range': [0, 1]}, False),
+])
+def test_validate_roi(roi, valid):
+    assert validate_roi(roi) is valid
+
+
+def test_cylinder_is_relative_to_the_reference_and_through_all_z():
+    mask = calc_roi_mask(X_VEC, Y_VEC, Z_VEC, {'shape': 'cylinder', 'center': [10, 0], 'radius': 10}, REFERENCE)
+    assert mask.shape == (5, 5, 3)
+    expected = np.zeros((5, 5), dtype=bool)
+    expected[3, 2] = expected[2, 2] = expected[4, 2] = expected[3, 1] = expected[3, 3] = True
+    assert np.all(mask == expected[:, :, np.newaxis])
+
+
+def test_sphere_depends_on_z():
+    mask = calc_roi_mask(X_VEC, Y_VEC, Z_VEC, {'shape': 'sphere', 'center': [0, 0, 0], 'radius': 15}, REFERENCE)
+    assert mask[:, :, 0].sum() == 9     # points within 15 mm in the plane of the center
+    assert mask[:, :, 1].sum() == 5
+    assert mask[:, :, 2].sum() == 0
+
+
+def test_polygon_and_invert():
+    triangle = {'shape': 'polygon', 'points': [[-25, -25], [25, -25], [-25, 25]]}
+    mask = calc_roi_mask(X_VEC, Y_VEC, Z_VEC, triangle, REFERENCE)[:, :, 0]
+    x_rel, y_rel = np.meshgrid(X_VEC - REFERENCE[0], Y_VEC - REFERENCE[1], indexing='ij')
+    assert np.all(mask[x_rel + y_rel < 0]) and not np.any(mask[x_rel + y_rel > 0])   # points on the outline vary
+    inverted = calc_roi_mask(X_VEC, Y_VEC, Z_VEC, dict(triangle, invert=True), REFERENCE)[:, :, 0]
+    assert np.all(inverted == ~mask)
+
+
+def test_points_in_polygon_concave_outline():
+    u_shape = np.array([[0, 0], [3, 0], [3, 3], [2, 3], [2, 1], [1, 1], [1, 3], [0, 3]], dtype=float)
+    x = np.array([0.5, 1.5, 2.5, 1.5, 4.0])
+    y = np.array([2.0, 2.0, 2.0, 0.5, 0.5])
+    assert points_in_polygon(x, y, u_shape).tolist() == [True, False, True, True, False]
+
+
+def test_image_mask(tmp_path):
+    image = np.zeros((3, 5))    # rows from y_max (top) to y_min (bottom)
+    image[0, 4] = 1.0           # top right pixel
+    image[2, :] = 0.8           # bottom row
+    path = str(tmp_path / 'mask.npy')
+    np.save(path, image)
+    roi = {'shape': 'image', 'path': path, 'x_range': [-20, 20], 'y_range': [-10, 10]}
+    mask = calc_roi_mask(X_VEC, Y_VEC, Z_VEC, roi, REFERENCE)[:, :, 0]
+    expected = np.zeros((5, 5), dtype=bool)
+    expected[4, 3] = True       # x 20, y 10
+    expected[:, 1] = True       # y -10
+    assert np.all(mask == expected)     # y -20 and y 20 are outside of the image
+    assert not np.any(calc_roi_mask(X_VEC, Y_VEC, Z_VEC, dict(roi, threshold=0.9), REFERENCE)[:, 1, 0])
+
+
+def test_invalid_roi_gives_none():
+    assert calc_roi_mask(X_VEC, Y_VEC, Z_VEC, {'shape': 'sphere', 'radius': 5}, REFERENCE) is None
+
+
+def test_points_in_mask_and_column_z_vectors():
+    mask = calc_roi_mask(X_VEC, Y_VEC, Z_VEC, {'shape': 'sphere', 'center': [0, 0, 0], 'radius': 15}, REFERENCE)
+    points = np.array([[REFERENCE[0], REFERENCE[1], REFERENCE[2] + 9.0],     # closest mesh point z 10
+                       [REFERENCE[0] + 20, REFERENCE[1], REFERENCE[2]]])
+    assert points_in_mask(points, X_VEC, Y_VEC, Z_VEC, mask).tolist() == [True, False]
+    columns = column_z_vectors(np.array([[REFERENCE[0], REFERENCE[1]], [REFERENCE[0] + 10, REFERENCE[1] + 10]]),
+                               X_VEC, Y_VEC, Z_VEC, mask)
+    assert columns[0].tolist() == [REFERENCE[2], REFERENCE[2] + 10]
+    assert columns[1].tolist() == [REFERENCE[2]]
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from measurement_routines import validate_segments, apply_segments, calc_segment_frequencies, get_frequency_vector, \
+    parse_segment_string, format_segment_string, configure_vna
+from measurement_routines.segment_sweep import calc_sweep_bandwidths, MAX_SWEEP_POINTS
+
+SEGMENTS = [{'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11},
+            {'freq_start': 5e9, 'freq_stop': 6e9, 'sweep_num_points': 3, 'if_bw': 100}]
+
+
+@pytest.mark.parametrize('segments, valid', [
+    (SEGMENTS, True),
+    ([], False),
+    ({'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11}, False),     # dict instead of list
+    ([{'freq_start': 1e9, 'freq_stop': 2e9}], False),
+    ([{'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11, 'power': 0}], False),
+    ([{'freq_start': 2e9, 'freq_stop': 1e9, 'sweep_num_points': 11}], False),
+    ([{'freq_start': 1e9, 'freq_stop': 1e9, 'sweep_num_points': 1}], True),     # CW segment
+    ([{'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 0}], False),
+    ([dict(SEGMENTS[1], if_bw=0)], False),
+    ([SEGMENTS[0], dict(SEGMENTS[1], freq_start=2e9)], False),     # overlap at 2 GHz
+    ([SEGMENTS[1], SEGMENTS[0]], False),    # descending
+    ([{'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': MAX_SWEEP_POINTS + 1}], False),
+])
+def test_validate_segments(segments, valid):
+    assert validate_segments(segments) is valid
+
+
+def test_segment_frequencies_and_bandwidths():
+    frequencies = calc_segment_frequencies(SEGMENTS)
+    assert len(frequencies) == 14
+    assert np.allclose(frequencies[:11], np.linspace(1e9, 2e9, 11))
+    assert np.allclose(frequencies[11:], [5e9, 5.5e9, 6e9])
+    config = apply_segments({'segments': SEGMENTS, 'if_bw': 1000})
+    assert (config['freq_start'], config['freq_stop'], config['sweep_num_points']) == (1e9, 6e9, 14)
+    assert calc_sweep_bandwidths(config).tolist() == [1000.0] * 11 + [100.0] * 3
+
+
+def test_get_frequency_vector_prefers_stored_frequencies():
+    linear = {'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 5}
+    assert np.allclose(get_frequency_vector(linear), np.linspace(1e9, 2e9, 5))
+    assert np.allclose(get_frequency_vector(dict(linear, segments=SEGMENTS)), calc_segment_frequencies(SEGMENTS))
+    assert get_frequency_vector(dict(linear, segments=SEGMENTS, frequencies=[1.0, 2.0])).tolist() == [1.0, 2.0]
+    assert apply_segments(dict(linear)) == linear   # nothing changes without segments
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1e9:2e9:11; 5e9:6e9:3:100', SEGMENTS),
+    ('1e9:2e9:11;', SEGMENTS[:1]),
+    ('', []),
+    ('  ', []),
+    ('1e9:2e9', None),
+    ('1e9:2e9:11:100:5', None),
+    ('1e9:2e9:eleven', None),
+    ('1e9:2e9:11.5', None),
+])
+def test_parse_segment_string(text, expected):
+    assert parse_segment_string(text) == expected
+
+
+def test_format_and_parse_round_trip():
+    text = format_segment_string(SEGMENTS)
+    assert text == '1e+09:2e+09:11; 5e+09:6e+09:3:100'
+    assert parse_segment_string(text) == SEGMENTS
+    assert format_segment_string(None) == ''
+
+
+def test_configure_vna_spans_the_segments(fake_pna, fake_vna):
+    vna_config = {'parameter': ['S11'], 'freq_start': 0, 'freq_stop': 0, 'sweep_num_points': 0, 'if_bw': 1000,
+                  'output_power': 0, 'avg_num': 1, 'segments': SEGMENTS}
+    vna_info = configure_vna(fake_vna, vna_config, 'AutoMeasurement')
+    assert vna_info['segments'] == SEGMENTS
+    assert (vna_info['freq_start'], vna_info['freq_stop'], vna_info['sweep_num_points']) == (1e9, 6e9, 14)
+    assert fake_pna.settings['SENS1:SWE:TYPE'] == 'SEGM'
+    assert fake_pna.settings['SENS1:SEGM2:BWID'] == '100'
+    assert fake_pna.settings['SENS1:SEGM1:BWID'] == '1000'     # channel IF bandwidth for segments without own
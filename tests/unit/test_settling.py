@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from measurement_routines import SETTLING_DEFAULTS, SettlingDetector
+
+VNA_INFO = {'meas_name': 'BodyScan', 'parameter': ['S11', 'S21'], 'sweep_num_points': 201, 'avg_num': 4}
+
+
+class FakeVna:
+    """
+    Answers the settle readings with the given complex values (one per reading, equal at all frequencies) and
+    records the sweep settings.
+    """
+    def __init__(self, readings: list):
+        self.readings = list(readings)
+        self.calls = []
+        self.sweep_num_points = VNA_INFO['sweep_num_points']
+
+    @contextmanager
+    def pna_batch(self):
+        yield
+
+    def pna_trigger_measurement(self, meas_name: str):
+        self.calls.append(('trigger', meas_name))
+
+    def pna_read_meas_data(self, meas_name: str, parameter: str):
+        self.calls.append(('read', parameter))
+        value = self.readings.pop(0) if len(self.readings) > 1 else self.readings[0]
+        return [[1e9 + idx, value.real, value.imag] for idx in range(self.sweep_num_points)]
+
+    def pna_set_sweep_num_points(self, meas_name: str, num_points: int):
+        self.calls.append(('points', num_points))
+        self.sweep_num_points = num_points
+
+    def pna_disable_average(self, meas_name: str):
+        self.calls.append(('average', 1))
+
+    def pna_set_average_number(self, meas_name: str, num: int):
+        self.calls.append(('average', num))
+
+
+def polar(amplitude_db: float, phase_deg: float) -> complex:
+    return 10 ** (amplitude_db / 20) * np.exp(1j * np.radians(phase_deg))
+
+
+@pytest.mark.parametrize('reading_b, agree', [
+    (polar(-10.05, 30.5), True),
+    (polar(-10.2, 30.0), False),    # amplitude tolerance 0.1 dB
+    (polar(-10.0, 31.5), False),    # phase tolerance 1 deg
+    (polar(-10.0, 30.0 + 360), True),
+])
+def test_readings_agree_within_the_tolerances(reading_b, agree):
+    detector = SettlingDetector(FakeVna([0j]), VNA_INFO)
+    reading_a = np.full(3, polar(-10.0, 30.0))
+    assert detector.readings_agree(reading_a, np.full(3, reading_b)) is agree
+
+
+def test_readings_agree_with_zeros():
+    detector = SettlingDetector(FakeVna([0j]), VNA_INFO)
+    assert detector.readings_agree(np.zeros(3, dtype=complex), np.zeros(3, dtype=complex)) is True
+    assert detector.readings_agree(np.zeros(3, dtype=complex), np.full(3, 0.5 + 0j)) is False
+
+
+def test_wait_returns_after_the_agreeing_readings():
+    vna = FakeVna([polar(-3, 0), polar(-6, 10), polar(-10, 20), polar(-10.01, 20.1), polar(-10.02, 20.1),
+                   polar(-10.02, 20.2)])
+    detector = SettlingDetector(vna, VNA_INFO, {'timeout': 10.0})
+    settle_time, num_readings, settled = detector.wait()
+    assert settled is True
+    assert num_readings == 5    # two agreeing pairs after the third reading
+    assert [call for call in vna.calls if call[0] == 'read'] == [('read', 'S11')] * 5
+    # short sweep without averaging for the readings, the sweep of the measurement afterwards
+    assert vna.calls[:2] == [('points', SETTLING_DEFAULTS['num_points']), ('average', 1)]
+    assert vna.calls[-2:] == [('points', 201), ('average', 4)]
+    assert detector.num_timeouts == 0 and detector.settle_times == [settle_time]
+
+
+def test_disagreeing_pair_restarts_the_count():
+    vna = FakeVna([polar(-10, 0), polar(-10, 0), polar(-5, 0), polar(-5, 0), polar(-5, 0)])
+    detector = SettlingDetector(vna, VNA_INFO, {'timeout': 10.0, 'parameter': 'S21'})
+    assert detector.wait()[1:] == (5, True)
+    assert ('read', 'S21') in vna.calls
+
+
+def test_wait_gives_up_at_the_timeout_and_restores_the_sweep():
+    vna = FakeVna([0j])
+    read = vna.pna_read_meas_data
+
+    def swinging_read(meas_name, parameter):
+        vna.readings = [polar(-10, 10 * len(vna.calls))]     # the phase changes with every reading
+        return read(meas_name, parameter)
+
+    vna.pna_read_meas_data = swinging_read
+    detector = SettlingDetector(vna, VNA_INFO, {'timeout': 0.05})
+    settle_time, num_readings, settled = detector.wait()
+    assert settled is False and num_readings > 1
+    assert settle_time >= 0.05
+    assert vna.calls[-2:] == [('points', 201), ('average', 4)]
+    json_dict = detector.to_json_dict()
+    assert (json_dict['num_points_settled'], json_dict['num_timeouts']) == (1, 1)
+    assert json_dict['max_settle_time'] == pytest.approx(settle_time)
+
+
+def test_sweep_is_restored_if_a_reading_fails():
+    vna = FakeVna([0j])
+
+    def failing_read(meas_name, parameter):
+        raise ConnectionError('GPIB bus error')
+
+    vna.pna_read_meas_data = failing_read
+    detector = SettlingDetector(vna, VNA_INFO, {'timeout': 1.0})
+    with pytest.raises(ConnectionError):
+        detector.wait()
+    assert vna.calls[-2:] == [('points', 201), ('average', 4)]
@@ -0,0 +1,124 @@
+import pytest
+import pyvisa
+import requests
+
+from conftest import FakePNA, FakeResourceManager
+from connection_handler import Transcript, TranscriptMismatch
+from chamber_net_interface import ChamberNetworkCommands
+from vna_net_interface import E8361RemoteGPIB
+
+VNA_CONFIG = {'parameter': ['S11'], 'freq_start': 1e9, 'freq_stop': 2e9, 'if_bw': 1000, 'sweep_num_points': 5,
+              'output_power': 0, 'trigger_manual': True, 'average_number': 2}
+
+
+class FakeHttp:
+    """
+    Stands in for the requests module of the chamber. The flag of each jog is set for one poll.
+    """
+    def __init__(self):
+        self.requests = []
+        self.flag_polls = []
+
+    @staticmethod
+    def __response(status_code: int, content: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content.encode('utf-8')
+        return response
+
+    def post(self, url: str, **kwargs):
+        self.requests.append(('post', url, kwargs.get('json')))
+        if url.endswith('/api/printer/command'):
+            self.flag_polls = [1, 0]
+        return self.__response(204, '')
+
+    def get(self, url: str, **kwargs):
+        self.requests.append(('get', url, None))
+        flag = self.flag_polls.pop(0) if len(self.flag_polls) > 0 else 0
+        return self.__response(200, '{"tool0": {"actual": 0.0, "target": ' + f"{flag}.0" + '}}')
+
+
+def run_session(vna: E8361RemoteGPIB, chamber: ChamberNetworkCommands) -> list:
+    """
+    Configures, moves and measures like a scan of one point.
+    """
+    assert vna.connect_pna('GPIB0::16::INSTR')
+    vna.pna_add_measurement_detailed('meas', **VNA_CONFIG)
+    jog_response = chamber.chamber_jog_abs(x=10.0, y=20.0, z=30.0, speed=50)
+    vna.pna_trigger_measurement('meas')
+    return [jog_response['status_code'], vna.pna_read_meas_data('meas', 'S11'), vna.pna_get_freq_stop('meas')]
+
+
+def record_session(file_name: str):
+    transcript = Transcript()
+    pna = FakePNA()
+    pna.data_value = (0.25, -0.125)
+    http = FakeHttp()
+    vna = E8361RemoteGPIB(resource_manager=transcript.record_resource_manager(FakeResourceManager(pna)))
+    chamber = ChamberNetworkCommands(ip_address='192.168.0.7', api_key='secret-key',
+                                     http=transcript.record_http(http))
+    result = run_session(vna, chamber)
+    transcript.save(file_name)
+    return transcript, result, pna, http
+
+
+@pytest.mark.parametrize('file_name', ['scan.jsonl', 'scan.jsonl.gz'])
+def test_replay_of_a_saved_transcript_gives_the_recorded_results(tmp_path, file_name):
+    transcript, recorded_result, pna, http = record_session(str(tmp_path / file_name))
+    assert len(transcript.entries) == len(pna.messages) + len(http.requests) + 1     # + open of the resource
+    loaded = Transcript.load(str(tmp_path / file_name))
+    assert loaded.entries == transcript.entries
+
+    vna = E8361RemoteGPIB(resource_manager=loaded.replay_resource_manager())
+    chamber = ChamberNetworkCommands(ip_address='replay', api_key='', http=loaded.replay_http())
+    assert run_session(vna, chamber) == recorded_result
+    assert recorded_result[1][0] == [1e9, 0.25, -0.125]
+
+
+def test_transcript_stores_no_api_key_and_no_host(tmp_path):
+    record_session(str(tmp_path / 'scan.jsonl'))
+    text = (tmp_path / 'scan.jsonl').read_text()
+    assert 'secret-key' not in text and '192.168.0.7' not in text
+    assert '"url":"/api/printer/command"' in text
+
+
+def test_strict_replay_raises_on_different_request(tmp_path):
+    transcript = record_session(str(tmp_path / 'scan.jsonl'))[0]
+    vna = E8361RemoteGPIB(resource_manager=transcript.replay_resource_manager(strict=True))
+    assert vna.connect_pna('GPIB0::16::INSTR')
+    with pytest.raises(TranscriptMismatch):
+        vna.pna_add_measurement_detailed('meas', **dict(VNA_CONFIG, freq_start=1.5e9))
+
+
+def test_non_strict_replay_skips_to_the_next_matching_transaction(tmp_path):
+    transcript = record_session(str(tmp_path / 'scan.jsonl'))[0]
+    transcript.rewind()
+    resource = transcript.replay_resource_manager(strict=False).open_resource('GPIB0::16::INSTR')
+    data = resource.query('CALC1:DATA? SDATA')  # configuration and trigger of the recording are skipped
+    assert data.startswith('0.25,-0.125')
+    with pytest.raises(TranscriptMismatch):
+        resource.query('*IDN?')     # never recorded
+
+
+def test_recorded_errors_are_raised_in_replay(tmp_path):
+    transcript = Transcript()
+    pna = FakePNA()
+
+    def timeout_query(message: str):
+        raise pyvisa.errors.VisaIOError(pyvisa.constants.VI_ERROR_TMO)
+
+    pna.query = timeout_query
+    resource = transcript.record_resource_manager(FakeResourceManager(pna)).open_resource('GPIB0::16::INSTR')
+    with pytest.raises(pyvisa.errors.VisaIOError):
+        resource.query('*OPC?')
+    transcript.save(str(tmp_path / 'error.jsonl'))
+
+    replay_resource_manager = Transcript.load(str(tmp_path / 'error.jsonl')).replay_resource_manager()
+    replayed = replay_resource_manager.open_resource('GPIB0::16::INSTR')
+    with pytest.raises(pyvisa.errors.VisaIOError) as error:
+        replayed.query('*OPC?')
+    assert error.value.error_code == pyvisa.constants.VI_ERROR_TMO
+
+
+def test_load_of_missing_file_gives_none(tmp_path):
+    assert Transcript.load(str(tmp_path / 'missing.jsonl')) is None
@@ -0,0 +1,86 @@
+import socket
+
+import pytest
+
+from conftest import FakePNA, FakeResourceManager
+from vna_net_interface import E8361RemoteGPIB, TRANSPORT_SETTINGS, get_transport
+from vna_net_interface.transport_benchmark import ScpiSocketStandIn, benchmark_transport, format_benchmark_report
+
+
+@pytest.mark.parametrize('resource_name, transport', [
+    ('GPIB0::16::INSTR', 'gpib'),
+    ('TCPIP0::192.168.0.9::inst0::INSTR', 'vxi11'),
+    ('TCPIP0::192.168.0.9::INSTR', 'vxi11'),
+    ('TCPIP0::192.168.0.9::hislip0::INSTR', 'hislip'),
+    ('tcpip0::192.168.0.9::5025::socket', 'socket'),
+    ('USB0::0x0957::0x0118::MY123::INSTR', 'gpib'),
+])
+def test_get_transport(resource_name, transport):
+    assert get_transport(resource_name) == transport
+
+
+def test_connect_pna_applies_the_settings_of_the_transport():
+    pna = FakePNA()
+    vna = E8361RemoteGPIB(resource_manager=FakeResourceManager(pna))
+    assert vna.connect_pna('TCPIP0::192.168.0.9::hislip0::INSTR') is True
+    assert vna.transport == 'hislip'
+    assert pna.chunk_size == TRANSPORT_SETTINGS['hislip']['chunk_size'] > TRANSPORT_SETTINGS['gpib']['chunk_size']
+    assert pna.timeout == TRANSPORT_SETTINGS['hislip']['timeout']
+    assert vna.connect_pna('TCPIP0::192.168.0.9::5025::SOCKET', timeout=5000) is True
+    assert (vna.transport, pna.timeout) == ('socket', 5000)
+
+
+def test_connect_pna_fails_if_the_library_does_not_support_the_transport():
+    class NoLanResourceManager(FakeResourceManager):
+        def open_resource(self, resource_name: str):
+            raise ValueError('pyvisa-py does not support GPIB without gpib-ctypes')
+
+    vna = E8361RemoteGPIB(resource_manager=NoLanResourceManager())
+    assert vna.connect_pna('GPIB0::16::INSTR') is False
+
+
+def test_benchmark_measures_latency_and_throughput_of_a_fake_transport():
+    pna = FakePNA()
+    pna.settings['SENS1:SWE:POIN'] = '101'
+    vna = E8361RemoteGPIB(resource_manager=FakeResourceManager(pna))
+    result = benchmark_transport(vna, 'TCPIP0::192.168.0.9::5025::SOCKET', num_latency=10, num_transfers=3)
+    assert result['transport'] == 'socket'
+    assert pna.messages.count('*OPC?') == 10 and pna.messages.count('CALC1:DATA? SDATA') == 3
+    assert result['transfer_bytes'] == len(','.join(['0.5,0.5'] * 101)) + 1
+    assert result['latency_mean'] > 0 and result['latency_p95'] > 0
+    assert result['throughput'] > 0
+    assert vna.pna_device is None   # disconnected after the benchmark
+
+    report = format_benchmark_report([result]).splitlines()
+    assert report[0].startswith('transport') and report[0].endswith('resource')
+    assert report[1].startswith('socket') and report[1].endswith('TCPIP0::192.168.0.9::5025::SOCKET')
+
+
+def test_benchmark_of_a_failing_transport_gives_none():
+    pna = FakePNA()
+
+    def broken_query(message: str):
+        raise ConnectionResetError('connection reset by peer')
+
+    pna.query = broken_query
+    vna = E8361RemoteGPIB(resource_manager=FakeResourceManager(pna))
+    assert benchmark_transport(vna, 'GPIB0::16::INSTR', num_latency=2, num_transfers=1) is None
+    assert vna.pna_device is None
+
+
+def test_socket_stand_in_answers_like_a_pna():
+    stand_in = ScpiSocketStandIn(num_points=5)
+    stand_in.start()
+    try:
+        host, port = stand_in.server.server_address[:2]
+        assert stand_in.resource_name == f"TCPIP0::{host}::{port}::SOCKET"
+        with socket.create_connection((host, port), timeout=5) as connection:
+            stream = connection.makefile('rwb')
+            stream.write(b'SENS1:AVER:CLE\n*OPC?\n:INIT1:IMM;*OPC?\nCALC1:DATA? SDATA\n')
+            stream.flush()
+            assert stream.readline() == b'+1\n'
+            assert stream.readline() == b'+1\n'     # concatenated commands are answered by their last query
+            values = stream.readline().decode('ascii').strip().split(',')
+            assert len(values) == 10 and float(values[0]) == 0.5
+    finally:
+        stand_in.stop()
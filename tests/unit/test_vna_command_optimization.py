@@ -0,0 +1,122 @@
+import pytest
+import pyvisa
+
+from conftest import FakePNA, FakeResourceManager
+from vna_net_interface import E8361RemoteGPIB
+
+DETAILED_CONFIG = {'parameter': ['S11', 'S21'], 'freq_start': 1e9, 'freq_stop': 2e9, 'if_bw': 1000,
+                   'sweep_num_points': 11, 'output_power': 0, 'trigger_manual': True, 'average_number': 4}
+
+
+def connect(batching: bool, shadow_cache: bool):
+    pna = FakePNA()
+    vna = E8361RemoteGPIB(resource_manager=FakeResourceManager(pna))
+    assert vna.connect_pna(pna.resource_name)
+    vna.pna_set_command_optimization(batching=batching, shadow_cache=shadow_cache)
+    pna.messages.clear()
+    vna.num_transactions = 0
+    return pna, vna
+
+
+def test_without_optimization_every_command_is_one_transaction():
+    pna, vna = connect(False, False)
+    vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+    assert vna.num_transactions == len(pna.messages) > 10
+    assert not any(';' in message for message in pna.messages)
+
+
+def test_batching_sends_the_configuration_in_one_transaction():
+    reference_pna, reference_vna = connect(False, False)
+    reference_vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+    pna, vna = connect(True, False)
+    with vna.pna_batch():
+        vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+        assert pna.messages == []   # nothing is sent before the outermost block ends
+    assert vna.num_transactions == len(pna.messages) == 1
+    assert pna.settings == reference_pna.settings
+
+
+def test_long_batches_are_split_and_preset_is_sent_alone():
+    pna, vna = connect(True, False)
+    with vna.pna_batch():
+        for idx in range(30):
+            vna.pna_add_measurement(f"meas_{idx}", ['S11', 'S21'])
+        vna.pna_preset()
+        vna.pna_add_measurement('meas', ['S11'])
+    preset_idx = pna.messages.index('SYSTem:PRESet')
+    assert preset_idx > 1   # measurements before the preset need several transactions
+    assert all(len(message) <= 1000 for message in pna.messages)
+    assert len(pna.messages) == preset_idx + 2
+    assert pna.messages[-1].startswith('CALC:PAR:DEL:ALL;')
+    num_commands = sum(len(message.split(';')) for message in pna.messages[:preset_idx])
+    assert num_commands == 30 * 5   # window, definition and feed of both traces
+
+
+def test_batched_queries_carry_the_pending_writes():
+    pna, vna = connect(True, False)
+    vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+    pna.messages.clear()
+    vna.pna_trigger_measurement('meas')
+    assert pna.messages == ['SENS1:AVER:CLE;*OPC?'] + ['INIT1:IMM;*OPC?'] * 4
+    assert pna.num_triggers == 4
+
+
+def test_shadow_cache_skips_unchanged_settings_and_answers_getters():
+    pna, vna = connect(False, True)
+    vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+    pna.messages.clear()
+    vna.pna_set_freq_start('meas', 1e9)
+    vna.pna_set_IF_BW('meas', 1000)
+    assert pna.messages == []
+    assert vna.pna_get_freq_start('meas') == 1e9
+    assert vna.pna_get_sweep_num_points('meas') == 11
+    assert pna.messages == []
+    vna.pna_set_freq_start('meas', 1.5e9)
+    assert pna.messages == ['SENS1:FREQ:STAR 1500000000.0']
+
+
+def test_shadow_cache_keeps_the_stimulus_until_the_sweep_changes():
+    pna, vna = connect(True, True)
+    vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+    vna.pna_read_meas_data('meas', 'S11')
+    pna.messages.clear()
+    data = vna.pna_read_meas_data('meas', 'S11')
+    assert len(pna.messages) == 1 and pna.messages[0].endswith('DATA? SDATA')   # select and stimulus from cache
+    assert [point[0] for point in data][0] == 1e9 and len(data) == 11
+    vna.pna_set_sweep_num_points('meas', 21)
+    assert len(vna.pna_read_meas_data('meas', 'S11')) == 21
+
+
+@pytest.mark.parametrize('invalidate', ['visa_error', 'custom_string', 'preset'])
+def test_shadow_cache_is_cleared_if_the_pna_state_is_unknown(invalidate):
+    pna, vna = connect(False, True)
+    vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+    if invalidate == 'visa_error':
+        write = pna.write
+
+        def failing_write(message):
+            raise pyvisa.errors.VisaIOError(pyvisa.constants.VI_ERROR_TMO)
+
+        pna.write = failing_write
+        with pytest.raises(pyvisa.errors.VisaIOError):
+            vna.pna_set_freq_stop('meas', 3e9)
+        pna.write = write
+    elif invalidate == 'custom_string':
+        vna.pna_write_custom_string('SENS1:FREQ:STAR 5e9')
+    else:
+        vna.pna_preset()
+        vna.pna_add_measurement('meas', ['S11'])
+    pna.messages.clear()
+    vna.pna_set_freq_start('meas', 1e9)
+    assert pna.messages == ['SENS1:FREQ:STAR 1000000000.0']
+    assert pna.settings['SENS1:FREQ:STAR'] == '1000000000.0'
+
+
+def test_measurement_data_is_the_same_with_all_optimizations():
+    results = []
+    for batching, shadow_cache in ((False, False), (True, False), (False, True), (True, True)):
+        pna, vna = connect(batching, shadow_cache)
+        vna.pna_add_measurement_detailed('meas', **DETAILED_CONFIG)
+        vna.pna_trigger_measurement('meas')
+        results.append((vna.pna_read_meas_data('meas', 'S11'), vna.pna_read_meas_data('meas', 'S21')))
+    assert all(result == results[0] for result in results)
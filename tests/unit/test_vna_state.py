@@ -0,0 +1,103 @@
+import pyvisa
+
+from measurement_routines import configure_vna
+
+VNA_CONFIG = {'parameter': ['S11', 'S22'], 'freq_start': 1e9, 'freq_stop': 2e9, 'sweep_num_points': 11,
+              'if_bw': 1000, 'output_power': 0, 'avg_num': 2}
+DOCUMENTS = 'C:/Program Files/Agilent/Network Analyzer/Documents/'
+
+
+def configure(vna):
+    return vna.pna_add_measurement_detailed('meas', parameter=['S11'], freq_start=1e9, freq_stop=2e9, if_bw=1000,
+                                            sweep_num_points=11, output_power=0, trigger_manual=True,
+                                            average_number=2)
+
+
+def test_recall_restores_the_pna_settings_and_the_measurements(fake_pna, fake_vna):
+    configure(fake_vna)
+    data = fake_vna.pna_read_meas_data('meas', 'S11')
+    settings = dict(fake_pna.settings)
+    state = fake_vna.pna_save_state('job.cst')
+    assert state['file_name'] == DOCUMENTS + 'job.cst'
+    assert fake_pna.files[DOCUMENTS + 'job.cst'] == settings
+
+    fake_vna.pna_preset()
+    assert fake_pna.settings != settings
+    fake_pna.messages.clear()
+    assert fake_vna.pna_recall_state(state) is True
+    assert fake_pna.settings == settings
+    assert not any(message.startswith('SYSTem:PRESet') or message.startswith('CALC1:PAR:DEF')
+                   for message in fake_pna.messages)
+    assert fake_vna.pna_read_meas_data('meas', 'S11') == data     # measurement is known again without queries
+
+
+def test_snapshot_is_not_changed_by_later_configuration(fake_vna):
+    configure(fake_vna)
+    state = fake_vna.pna_save_state('C:/states/job.cst')
+    assert state['file_name'] == 'C:/states/job.cst'
+    fake_vna.pna_add_measurement('other', ['S22'])
+    assert fake_vna.pna_recall_state(state) is True
+    assert fake_vna.pna_add_measurement('other', ['S22']) != -1     # 'other' is not configured after recall
+
+
+def test_save_and_recall_fail_on_pna_errors(fake_pna, fake_vna):
+    assert fake_vna.pna_save_state('job.csa') is None   # no cst file
+    configure(fake_vna)
+    assert fake_vna.pna_recall_state({'file_name': DOCUMENTS + 'missing.cst', 'measurements': {},
+                                      'running_measurements': []}) is False
+    assert fake_vna.pna_recall_state(None) is False
+    fake_pna.errors.append('-100,"Command error"')
+    assert fake_vna.pna_save_state('job.cst') is not None   # errors of earlier commands are cleared by *CLS first
+
+    query = fake_pna.query
+
+    def error_on_stor(message: str):
+        if 'SYST:ERR?' in message and any(m.startswith('MMEM:STOR') for m in fake_pna.messages[-3:]):
+            return '-256,"File name not found"'
+        return query(message)
+
+    fake_pna.query = error_on_stor
+    assert fake_vna.pna_save_state('job.cst') is None
+
+
+def test_visa_timeout_is_raised_while_loading_and_restored(fake_pna, fake_vna):
+    configure(fake_vna)
+    visa_timeout = fake_pna.timeout
+    timeouts = []
+    write = fake_pna.write
+
+    def record_timeout(message: str):
+        if message.startswith('MMEM'):
+            timeouts.append(fake_pna.timeout)
+        return write(message)
+
+    fake_pna.write = record_timeout
+    state = fake_vna.pna_save_state('job.cst')
+    assert fake_vna.pna_recall_state(state) is True
+    assert len(timeouts) == 2 and min(timeouts) > visa_timeout
+    assert fake_pna.timeout == visa_timeout
+
+    def failing_write(message: str):
+        raise pyvisa.errors.VisaIOError(pyvisa.constants.VI_ERROR_TMO)
+
+    fake_pna.write = failing_write
+    assert fake_vna.pna_recall_state(state) is False
+    assert fake_pna.timeout == visa_timeout
+
+
+def test_configure_vna_recalls_a_configuration_of_the_cache(fake_pna, fake_vna):
+    state_cache = {}
+    vna_info = configure_vna(fake_vna, VNA_CONFIG, 'AutoMeasurement', state_cache)
+    assert len(state_cache) == 1 and len(fake_pna.files) == 1
+    configure_vna(fake_vna, dict(VNA_CONFIG, if_bw=100), 'AutoMeasurement', state_cache)
+    assert len(state_cache) == 2
+
+    fake_pna.messages.clear()
+    assert configure_vna(fake_vna, VNA_CONFIG, 'AutoMeasurement', state_cache) == vna_info
+    assert any(message.startswith('MMEM:LOAD') for message in fake_pna.messages)
+    assert 'SYSTem:PRESet' not in fake_pna.messages    # no preset
+    assert fake_pna.settings['SENSe1:BAND:RES'] == '1000'
+
+    fake_pna.files.clear()  # e.g. deleted on the PNA, configured from scratch again
+    assert configure_vna(fake_vna, VNA_CONFIG, 'AutoMeasurement', state_cache) == vna_info
+    assert len(fake_pna.files) == 1
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='module')
+def window():
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    from user_interface.ui_display_measurement_window import UI_display_measurement_window
+    window = UI_display_measurement_window()
+    window.app = app
+    return window
+
+
+@pytest.fixture()
+def measurement(window):
+    """
+    Configures the display window like ProcessController does after reading a measurement file.
+    """
+    x_vec, y_vec, z_vec = np.linspace(0, 40, 5), np.linspace(10, 30, 3), np.linspace(100, 160, 4)
+    window.x_zero_pos, window.y_zero_pos, window.z_zero_pos = 20.0, 20.0, 100.0
+    window.coor_AUT_checkBox.setChecked(False)
+    window.set_selectable_parameters(['S11', 'S22'])
+    window.set_selectable_frequency(np.array([1e9, 2e9]))
+    window.set_selectable_x_coordinates(x_vec)
+    window.set_selectable_y_coordinates(y_vec)
+    window.set_selectable_z_coordinates(z_vec)
+    window.unit_display_comboBox.setCurrentText('Linear')
+    window.volume_mode_comboBox.setCurrentText('Amplitude')
+    window.volume_enable_checkBox.setChecked(True)
+    window.reset_volume_plot()
+    amplitude = np.arange(5 * 3 * 4, dtype=float).reshape(5, 3, 4)
+    phase = np.linspace(-180, 180, 5 * 3 * 4).reshape(5, 3, 4)
+    return amplitude, phase
+
+
+def test_downsample_volume_keeps_small_grids_and_bounds_large_ones():
+    from user_interface.ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
+    volume = np.zeros((51, 51, 51))
+    assert Visualizer.downsample_volume(volume)[1] == 1
+    decimated, stride = Visualizer.downsample_volume(np.zeros((200, 50, 10)), max_voxels=10000)
+    assert decimated.size <= 10000 and decimated.shape == tuple(int(np.ceil(n / stride)) for n in (200, 50, 10))
+    assert Visualizer.downsample_volume(np.zeros((200, 50, 10)), max_voxels=10000 * 8)[1] < stride
+
+
+def test_volume_rgba_scales_color_and_opacity_with_the_values():
+    from user_interface.ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
+    values = np.array([0.0, 1.0, 2.0, np.nan]).reshape(2, 2, 1)
+    rgba = Visualizer.generate_3d_volume_rgba(values, alpha_max=60)
+    assert rgba.shape == (2, 2, 1, 4) and rgba.dtype == np.ubyte
+    assert rgba[..., 3].ravel().tolist() == [0, 30, 60, 0]     # nan counts like the minimum
+    weighted = Visualizer.generate_3d_volume_rgba(values, cmap_name='hsv', alpha_values=2.0 - np.nan_to_num(values))
+    assert weighted[..., 3].ravel().tolist() == [60, 30, 0, 60]
+    assert Visualizer.generate_3d_volume_rgba(np.ones((2, 2, 2)))[..., 3].max() == 0
+
+
+def test_volume_is_centered_on_the_measured_points():
+    from user_interface.ui_3d_visualizer import VisualizerPyqtGraph as Visualizer
+    x_vec, y_vec, z_vec = np.array([10.0, 12.0, 14.0]), np.array([0.0, 5.0]), np.array([100.0])
+    volume_obj = Visualizer.generate_3d_volume_obj(np.zeros((3, 2, 1, 4), dtype=np.ubyte), x_vec, y_vec, z_vec)
+    voxel_center = volume_obj.transform().map(np.array([[2.5, 1.5, 0.5]]).T)
+    assert np.allclose(voxel_center.ravel()[:3], [14.0, 5.0, 100.0])
+    Visualizer.place_3d_volume_obj(volume_obj, x_vec, y_vec, z_vec, stride=2)
+    assert np.allclose(volume_obj.transform().map(np.array([[1.5, 0.5, 0.5]]).T).ravel()[:3], [14.0, 0.0, 100.0])
+
+
+def test_texture_is_only_rebuilt_if_the_displayed_data_changes(window, measurement, monkeypatch):
+    amplitude, phase = measurement
+    window.update_volume_plot(amplitude, phase)
+    volume_obj = window.graphic_volume_obj
+    assert volume_obj is not None and volume_obj.visible()
+    assert window.volume_info_label.text() == 'Displayed grid: 5 x 3 x 4'
+
+    set_data_calls = []
+    monkeypatch.setattr(volume_obj, 'setData', lambda data: set_data_calls.append(data))
+    window.coor_AUT_checkBox.setChecked(True)   # moves the volume only
+    window.update_volume_plot(amplitude, phase)
+    assert set_data_calls == [] and window.graphic_volume_obj is volume_obj
+    assert np.allclose(volume_obj.transform().map(np.array([[0.5, 0.5, 0.5]]).T).ravel()[:3], [-20.0, -10.0, 0.0])
+
+    window.volume_mode_comboBox.setCurrentText('Phase')
+    window.update_volume_plot(amplitude, phase)
+    window.unit_display_comboBox.setCurrentText('dBmax')
+    window.update_volume_plot(amplitude, phase)
+    assert len(set_data_calls) == 2 and window.graphic_volume_obj is volume_obj
+
+
+def test_dense_volume_is_decimated_and_hidden_if_disabled(window, measurement, monkeypatch):
+    monkeypatch.setattr(window, '_UI_display_measurement_window__volume_max_voxels', 20)
+    amplitude, phase = measurement
+    window.update_volume_plot(amplitude, phase)
+    assert window.volume_info_label.text() == 'Displayed grid: 3 x 2 x 2 (every 2. point)'
+
+    window.volume_enable_checkBox.setChecked(False)
+    window.update_volume_plot(amplitude, phase)
+    assert window.graphic_volume_obj.visible() is False
+    window.reset_volume_plot()
+    assert window.graphic_volume_obj is None and window.volume_info_label.text() == 'No volume displayed'